@@ -2,3 +2,8 @@
 from .macro_context import *
 from .predictability import *
 from .regime_labels import *
+from .event_study import *
+from .rolling_corr import *
+from .corr_spectrum import *
+from .corr_clusters import *
+from .corr_null import *
@@ -0,0 +1,168 @@
+"""Flat average-linkage clusters of a slowly moving correlation matrix.
+
+Assets are clustered on the distance ``sqrt(2 (1 - c))``. The dendrogram is
+cut at ``threshold`` (1.0, i.e. ``c = 0.5`` between cluster averages), as
+``fcluster(..., criterion="distance")`` does. scipy's ``linkage`` is used
+when it is installed. Otherwise a nearest-neighbour-chain implementation
+in numpy builds the same dendrogram in ``O(N^2)`` memory and time, so
+clustering does not depend on scipy.
+
+``ClusterTracker`` reports labels on a fixed id index, for example the
+columns of a returns panel, with ``0`` marking ids that were not
+clustered. Two dates compare with a vectorised ``pair_turnover`` and need
+no per-ticker lookups. A date whose ids match the last clustered matrix
+and whose correlations are all within ``tol`` of it reuses that
+assignment instead of clustering again. The reference is the matrix that
+was actually clustered, not the previous date, so reuse cannot drift by
+more than ``tol`` in total.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+try:
+    from scipy.cluster.hierarchy import fcluster, linkage
+    from scipy.spatial.distance import squareform
+except Exception:  # pragma: no cover
+    linkage = None
+
+CLUSTERING_BACKEND = "scipy" if linkage is not None else "numpy"
+
+
+@dataclass
+class ClusterAssignment:
+    labels: np.ndarray  # cluster id (1..count) per id of the tracker's index, 0 where absent
+    count: int
+    largest_share: float
+    entropy: float
+    reused: bool = False  # True when the previous assignment was kept (within tol)
+
+
+def corr_distance(corr: np.ndarray) -> np.ndarray:
+    c = np.clip(np.asarray(corr, dtype=float), -1.0, 1.0)
+    dist = np.sqrt(np.clip(2.0 * (1.0 - c), 0.0, None))
+    np.fill_diagonal(dist, 0.0)
+    return dist
+
+
+def _nn_chain_labels(dist: np.ndarray, threshold: float) -> np.ndarray:
+    """Average-linkage flat clusters by nearest-neighbour chain (Lance-Williams updates)."""
+    n = dist.shape[0]
+    d = np.array(dist, dtype=float)
+    np.fill_diagonal(d, np.inf)
+    size = np.ones(n)
+    root = np.arange(n)
+    chain: list[int] = []
+    alive = n
+    while alive > 1:
+        if not chain:
+            chain.append(int(np.argmin(np.isinf(size))))  # first live slot
+        while True:
+            a = chain[-1]
+            b = int(np.argmin(d[a]))
+            if len(chain) > 1 and d[a, chain[-2]] <= d[a, b]:
+                break
+            chain.append(b)
+        a, b = chain.pop(), chain.pop()
+        height = d[a, b]
+        # Slot a holds the merged cluster from here on; merges are monotone, so
+        # a merge above the cut is never followed by one below it on the same branch.
+        if height <= threshold:
+            root[root == b] = a
+        row = (size[a] * d[a] + size[b] * d[b]) / (size[a] + size[b])
+        d[a], d[:, a] = row, row
+        d[a, a] = np.inf
+        d[b], d[:, b] = np.inf, np.inf
+        size[a] += size[b]
+        size[b] = np.inf
+        alive -= 1
+    _, first, inv = np.unique(root, return_index=True, return_inverse=True)
+    return np.argsort(np.argsort(first))[inv] + 1
+
+
+def average_linkage_labels(corr: np.ndarray, threshold: float = 1.0) -> np.ndarray:
+    """Flat cluster ids ``1..k`` per row of ``corr`` (average linkage cut at ``threshold``)."""
+    dist = corr_distance(corr)
+    if dist.shape[0] < 2:
+        return np.ones(dist.shape[0], dtype=int)
+    if linkage is not None:
+        z = linkage(squareform(dist, checks=False), method="average")
+        return fcluster(z, t=float(threshold), criterion="distance").astype(int)
+    return _nn_chain_labels(dist, float(threshold)).astype(int)
+
+
+def pair_turnover(labels_a: np.ndarray, labels_b: np.ndarray) -> float:
+    """Share of id pairs (among ids labelled in both) grouped together in one assignment but not the other."""
+    a = np.asarray(labels_a)
+    b = np.asarray(labels_b)
+    both = (a > 0) & (b > 0)
+    m = int(np.sum(both))
+    if m < 2:
+        return float("nan")
+    a, b = a[both].astype(np.int64), b[both].astype(np.int64)
+
+    def _same_pairs(x: np.ndarray) -> int:
+        counts = np.unique(x, return_counts=True)[1].astype(np.int64)
+        return int(np.sum(counts * (counts - 1) // 2))
+
+    same_both = _same_pairs(a * (int(b.max()) + 1) + b)
+    changed = _same_pairs(a) + _same_pairs(b) - 2 * same_both
+    return float(changed / (m * (m - 1) // 2))
+
+
+class ClusterTracker:
+    """Flat clusters per date on a fixed index of ``n_ids`` ids, reused while the matrix stays within ``tol``."""
+
+    def __init__(self, n_ids: int, threshold: float = 1.0, tol: float = 0.0) -> None:
+        self.n_ids = int(n_ids)
+        self.threshold = float(threshold)
+        self.tol = float(tol)
+        self.reset()
+
+    def reset(self) -> None:
+        self._ids: np.ndarray | None = None
+        self._corr: np.ndarray | None = None
+        self._labels: np.ndarray | None = None
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Last clustered matrix, its ids and row labels (empty before the first update)."""
+        if self._ids is None or self._corr is None or self._labels is None:
+            return {"ids": np.zeros(0, dtype=np.int64), "corr": np.zeros((0, 0)), "labels": np.zeros(0, dtype=np.int64)}
+        return {"ids": self._ids.copy(), "corr": self._corr.copy(), "labels": self._labels.copy()}
+
+    def restore(self, state: dict[str, np.ndarray]) -> "ClusterTracker":
+        ids = np.asarray(state["ids"])
+        if ids.size == 0:
+            self.reset()
+        else:
+            self._ids = ids.copy()
+            self._corr = np.asarray(state["corr"], dtype=float).copy()
+            self._labels = np.asarray(state["labels"], dtype=np.int64).copy()
+        return self
+
+    def update(self, corr: np.ndarray, ids: np.ndarray) -> ClusterAssignment:
+        c = np.asarray(corr, dtype=float)
+        ids = np.asarray(ids)
+        reused = (
+            self._ids is not None
+            and np.array_equal(ids, self._ids)
+            and float(np.max(np.abs(c - self._corr), initial=0.0)) <= self.tol
+        )
+        if not reused:
+            self._ids = ids.copy()
+            self._corr = c.copy()
+            self._labels = average_linkage_labels(c, self.threshold)
+        labels = np.zeros(self.n_ids, dtype=np.int64)
+        labels[ids] = self._labels
+        counts = np.unique(self._labels, return_counts=True)[1]
+        p = counts.astype(float) / max(int(counts.sum()), 1)
+        return ClusterAssignment(
+            labels=labels,
+            count=int(counts.size),
+            largest_share=float(np.max(p)) if p.size else float("nan"),
+            entropy=float(-np.sum(p * np.log(p + 1e-12))),
+            reused=bool(reused),
+        )
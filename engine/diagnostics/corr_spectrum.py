@@ -0,0 +1,178 @@
+"""Leading eigenpairs of a slowly moving correlation matrix.
+
+The regime metrics only read the top of the spectrum: ``lambda1..k``, the
+shares ``p1`` and ``top5`` and the leading eigenvector. The remaining
+quantities come from identities that need no eigenvalues. The eigenvalue sum
+is the trace, and the sum of squared eigenvalues is ``||C||_F^2``, so
+``deff = 1 / sum(p_i^2) = trace^2 / ||C||_F^2``.
+
+``SpectrumTracker`` finds the top ``k`` eigenpairs with a block Krylov
+Rayleigh-Ritz iteration on ``[V, CV, C^2 V, C^3 V]``. The start block ``V`` is
+the previous date's Ritz vectors mapped onto the current tickers, so one
+or two iterations usually meet the tolerance. Convergence is judged from
+residuals alone. A Ritz value ``theta`` with residual ``r`` and gap ``g`` to
+the other Ritz values is within ``min(r, r^2 / g)`` of an eigenvalue, and
+the leading vector is within angle ``r_1 / g_1``. The first call, small
+matrices and iterations that fail to converge use a dense ``eigh``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class TopSpectrum:
+    values: np.ndarray  # leading eigenvalues, descending
+    vectors: np.ndarray  # matching unit eigenvectors, one per column
+    trace: float
+    frob2: float
+    iterations: int = 0  # 0 means a dense decomposition was used
+
+    @property
+    def p1(self) -> float:
+        return float(self.values[0] / self.trace) if self.trace > 0 and self.values.size else float("nan")
+
+    @property
+    def deff(self) -> float:
+        return float(self.trace**2 / self.frob2) if self.trace > 0 and self.frob2 > 0 else float("nan")
+
+    def top_share(self, n: int = 5) -> float:
+        return float(np.sum(self.values[:n]) / self.trace) if self.trace > 0 else float("nan")
+
+    @property
+    def v1(self) -> np.ndarray:
+        return self.vectors[:, 0]
+
+
+def dense_spectrum(corr: np.ndarray, k: int) -> TopSpectrum:
+    """Top ``k`` eigenpairs from a full ``eigh`` (the reference the tracker is checked against)."""
+    c = np.asarray(corr, dtype=float)
+    w, v = np.linalg.eigh(c)
+    order = np.argsort(w)[::-1][: int(k)]
+    return TopSpectrum(values=w[order], vectors=v[:, order], trace=float(np.trace(c)), frob2=float(np.sum(c * c)))
+
+
+def vector_overlap(ids_a: np.ndarray, a: np.ndarray, ids_b: np.ndarray, b: np.ndarray, min_common: int = 3) -> float:
+    """``|<a, b>|`` over the ids both vectors cover, after renormalising each restriction."""
+    common, ia, ib = np.intersect1d(np.asarray(ids_a), np.asarray(ids_b), assume_unique=True, return_indices=True)
+    if common.size < int(min_common):
+        return float("nan")
+    x, y = a[ia], b[ib]
+    nx, ny = float(np.linalg.norm(x)), float(np.linalg.norm(y))
+    if nx <= 1e-12 or ny <= 1e-12:
+        return float("nan")
+    return float(abs(np.dot(x / nx, y / ny)))
+
+
+class SpectrumTracker:
+    """Warm-started top-``k`` eigenpairs of a sequence of symmetric matrices.
+
+    ``ids`` name the rows of each matrix (e.g. ticker positions in a panel),
+    so the previous eigenvectors can seed the next call when tickers come and
+    go. ``guard`` extra vectors ride along to speed up convergence of the
+    ``k``-th pair. ``tol`` bounds the error of each of the ``k`` values
+    relative to ``lambda1``, and ``sqrt(tol)`` bounds the angle error of
+    the leading vector. Matrices with at most ``dense_below`` rows go
+    straight to ``eigh``.
+    """
+
+    def __init__(
+        self,
+        k: int = 10,
+        guard: int = 14,
+        depth: int = 3,
+        tol: float = 1e-9,
+        max_iter: int = 6,
+        dense_below: int | None = None,
+    ) -> None:
+        self.k = int(k)
+        self.guard = int(guard)
+        self.depth = max(1, int(depth))
+        self.tol = float(tol)
+        self.max_iter = int(max_iter)
+        self.dense_below = int(dense_below) if dense_below is not None else 2 * (self.depth + 1) * (self.k + self.guard)
+        self._ids: np.ndarray | None = None
+        self._vectors: np.ndarray | None = None
+
+    def reset(self) -> None:
+        self._ids = None
+        self._vectors = None
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Warm-start vectors and their ids (empty before the first update)."""
+        if self._ids is None or self._vectors is None:
+            return {"ids": np.zeros(0, dtype=np.int64), "vectors": np.zeros((0, 0))}
+        return {"ids": self._ids.copy(), "vectors": self._vectors.copy()}
+
+    def restore(self, state: dict[str, np.ndarray]) -> "SpectrumTracker":
+        ids = np.asarray(state["ids"])
+        if ids.size == 0:
+            self.reset()
+        else:
+            self._ids = ids.copy()
+            self._vectors = np.asarray(state["vectors"], dtype=float).copy()
+        return self
+
+    def _start_block(self, ids: np.ndarray, n: int, b: int) -> np.ndarray | None:
+        if self._ids is None or self._vectors is None:
+            return None
+        _, i_new, i_old = np.intersect1d(ids, self._ids, assume_unique=True, return_indices=True)
+        if i_new.size < b:
+            return None
+        v = np.zeros((n, min(b, self._vectors.shape[1])))
+        v[i_new] = self._vectors[i_old, : v.shape[1]]
+        return v
+
+    def update(self, corr: np.ndarray, ids: np.ndarray | None = None) -> TopSpectrum:
+        c = np.asarray(corr, dtype=float)
+        n = c.shape[0]
+        ids = np.arange(n) if ids is None else np.asarray(ids)
+        b = min(self.k + self.guard, n)
+        v = self._start_block(ids, n, b) if n > self.dense_below else None
+        out = self._iterate(c, v) if v is not None else None
+        if out is None:
+            w, vec = np.linalg.eigh(c)
+            order = np.argsort(w)[::-1][:b]
+            values, vectors, iterations = w[order], vec[:, order], 0
+        else:
+            values, vectors, iterations = out
+        self._ids = ids.copy()
+        self._vectors = vectors
+        k = min(self.k, n)
+        return TopSpectrum(
+            values=values[:k].copy(),
+            vectors=vectors[:, :k].copy(),
+            trace=float(np.trace(c)),
+            frob2=float(np.sum(c * c)),
+            iterations=iterations,
+        )
+
+    def _iterate(self, c: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray, int] | None:
+        b = v.shape[1]
+        k = min(self.k, b)
+        cv = c @ v
+        for it in range(1, self.max_iter + 1):
+            blocks = [v, cv]
+            for _ in range(self.depth - 1):
+                blocks.append(c @ blocks[-1])
+            q, _ = np.linalg.qr(np.hstack(blocks))
+            cq = c @ q
+            h = q.T @ cq
+            w, s = np.linalg.eigh(0.5 * (h + h.T))
+            order = np.argsort(w)[::-1][:b]
+            # C times the Ritz vectors comes from C Q, which seeds the next basis as well.
+            values, v, cv = w[order], q @ s[:, order], cq @ s[:, order]
+            resid = np.linalg.norm(cv[:, :k] - v[:, :k] * values[:k], axis=0)
+            if not np.all(np.isfinite(resid)):
+                return None
+            gaps = np.abs(values[:k, None] - values[None, :])
+            np.fill_diagonal(gaps[:, :k], np.inf)
+            gap = np.maximum(np.min(gaps, axis=1), 1e-300)
+            scale = max(abs(float(values[0])), 1e-300)
+            value_err = np.minimum(resid, resid * resid / gap)
+            if float(np.max(value_err)) <= self.tol * scale and float(resid[0] / gap[0]) <= np.sqrt(self.tol):
+                return values, v, it
+        return None
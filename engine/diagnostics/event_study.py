@@ -0,0 +1,168 @@
+"""Batch event-study metrics for many alert masks over one calendar.
+
+``evaluate_alert_matrix`` scores an ``(n_masks, T)`` boolean alert matrix
+against event positions in one pass: windows before and after each event are
+read from per-row prefix counts, the first alert inside a lookback window
+comes from a ``searchsorted`` over the flattened alert positions, and "an
+event follows within the horizon" depends only on the day, so it is computed
+once for the calendar and shared by every row. Metrics follow the
+per-mask definitions used by the event-study scripts (episode-based
+precision and false alarms, lead = event - first alert in the lookback).
+
+``sample_alert_masks`` draws the random baselines (iid days or contiguous
+blocks) as a matrix instead of one mask at a time.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+ALERT_METRICS = (
+    "recall",
+    "precision",
+    "false_alarm_per_year",
+    "mean_lead_days",
+    "coincident_rate",
+    "n_events",
+    "n_alert_days",
+    "n_false_alert_days",
+    "n_alert_episodes",
+    "n_false_alert_episodes",
+)
+
+
+def event_positions(dates: Iterable, event_dates: Iterable) -> np.ndarray:
+    """Sorted row positions of ``event_dates`` in ``dates`` (dates not on the calendar are dropped)."""
+    days = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+    events = pd.to_datetime(pd.Series(event_dates)).to_numpy(dtype="datetime64[ns]")
+    events = events[~np.isnat(events)]
+    if days.size == 0 or events.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    # Stable sort + right-side search picks the last row of a repeated date.
+    order = np.argsort(days, kind="stable")
+    ordered = days[order]
+    at = np.searchsorted(ordered, events, side="right") - 1
+    found = (at >= 0) & (ordered[np.maximum(at, 0)] == events)
+    return np.sort(order[at[found]]).astype(np.int64)
+
+
+def evaluate_alert_matrix(
+    alerts: np.ndarray,
+    event_idx: np.ndarray,
+    lookback_days: int,
+    assoc_horizon_days: int = 20,
+) -> Dict[str, np.ndarray]:
+    """Event-study metrics for each row of ``alerts``; every value is an array of length ``n_masks``."""
+    a = np.atleast_2d(np.asarray(alerts, dtype=bool))
+    n_masks, n_total = a.shape
+    ev = np.sort(np.asarray(event_idx, dtype=np.int64))
+    lookback = int(lookback_days)
+    horizon = int(assoc_horizon_days)
+    counts = np.zeros((n_masks, n_total + 1), dtype=np.int64)
+    np.cumsum(a, axis=1, out=counts[:, 1:])
+
+    # Recall and lead: alerts in [max(0, e - lookback), e).
+    lo = np.maximum(ev - lookback, 0)
+    open_window = (ev >= 1) & (lookback >= 1)
+    hit = (counts[:, ev] - counts[:, lo] > 0) & open_window
+    flat = np.flatnonzero(a)
+    rows = np.arange(n_masks, dtype=np.int64)[:, None] * n_total
+    pos = np.searchsorted(flat, (rows + lo).ravel())
+    first = flat[np.minimum(pos, max(flat.size - 1, 0))].reshape(hit.shape) - rows if flat.size else np.zeros(hit.shape, dtype=np.int64)
+    lead = np.where(hit, ev - first, 0)
+    detected = hit.sum(axis=1)
+    mean_lead = np.where(detected > 0, lead.sum(axis=1) / np.maximum(detected, 1), np.nan)
+
+    # Coincident: an alert in [e, e + 2].
+    coincident = (counts[:, np.minimum(ev + 3, n_total)] - counts[:, ev] > 0).sum(axis=1)
+
+    # Day t is "good" when an event falls in (t, t + horizon]; the same for every row.
+    days = np.arange(n_total)
+    covered = np.searchsorted(ev, days + horizon, side="right") - np.searchsorted(ev, days, side="right") > 0
+    starts = a.copy()
+    starts[:, 1:] &= ~a[:, :-1]
+    n_episodes = starts.sum(axis=1)
+    good_episodes = (starts & covered).sum(axis=1)
+    n_alert_days = counts[:, -1]
+    good_days = (a & covered).sum(axis=1)
+    years = max(1e-9, n_total / 252.0)
+
+    n_events = ev.size
+    n_false_episodes = np.maximum(0, n_episodes - good_episodes)
+    return {
+        "recall": detected / n_events if n_events else np.full(n_masks, np.nan),
+        "precision": np.where(n_episodes > 0, good_episodes / np.maximum(n_episodes, 1), np.nan),
+        "false_alarm_per_year": n_false_episodes / years,
+        "mean_lead_days": mean_lead,
+        "coincident_rate": coincident / n_events if n_events else np.full(n_masks, np.nan),
+        "n_events": np.full(n_masks, n_events),
+        "n_alert_days": n_alert_days,
+        "n_false_alert_days": np.maximum(0, n_alert_days - good_days),
+        "n_alert_episodes": n_episodes,
+        "n_false_alert_episodes": n_false_episodes,
+    }
+
+
+def sample_alert_masks(
+    n_total: int,
+    n_alert_days: int,
+    n_masks: int,
+    rng: np.random.Generator,
+    method: str = "iid",
+    block_size: int = 10,
+) -> np.ndarray:
+    """``(n_masks, n_total)`` random alert masks with about ``n_alert_days`` alert days each.
+
+    ``iid``: exactly ``n_alert_days`` days drawn without replacement.
+    ``block``: union of ``ceil(n_alert_days / block)`` blocks with uniform
+    starts (overlaps can leave fewer days), thinned to ``n_alert_days`` days
+    at random when the union is larger.
+    """
+    n_total = int(n_total)
+    n_masks = int(n_masks)
+    target = int(max(0, min(int(n_alert_days), n_total)))
+    out = np.zeros((n_masks, n_total), dtype=bool)
+    if target == 0 or n_masks == 0:
+        return out
+    rows = np.arange(n_masks)[:, None]
+    if str(method).strip().lower() != "block":
+        keep = np.argpartition(rng.random((n_masks, n_total)), target - 1, axis=1)[:, :target]
+        out[rows, keep] = True
+        return out
+    bsz = int(max(2, min(int(block_size), max(2, n_total))))
+    step = min(bsz, n_total)
+    n_blocks = -(-target // step)
+    starts = rng.integers(0, max(1, n_total - bsz + 1), size=(n_masks, n_blocks))
+    edges = np.zeros((n_masks, n_total + 1), dtype=np.int64)
+    np.add.at(edges, (np.broadcast_to(rows, starts.shape), starts), 1)
+    np.add.at(edges, (np.broadcast_to(rows, starts.shape), np.minimum(starts + bsz, n_total)), -1)
+    cover = np.cumsum(edges[:, :n_total], axis=1) > 0
+    keys = np.where(cover, rng.random((n_masks, n_total)), 2.0)
+    keep = np.argpartition(keys, target - 1, axis=1)[:, :target]
+    out[rows, keep] = True
+    return out & cover
+
+
+def random_alert_metrics(
+    n_total: int,
+    n_alert_days: int,
+    event_idx: np.ndarray,
+    lookback_days: int,
+    n_masks: int,
+    rng: np.random.Generator,
+    method: str = "iid",
+    block_size: int = 10,
+    assoc_horizon_days: int = 20,
+    chunk: int = 256,
+) -> Dict[str, np.ndarray]:
+    """``evaluate_alert_matrix`` over ``n_masks`` random masks, drawn ``chunk`` rows at a time."""
+    parts = []
+    for lo in range(0, int(n_masks), max(1, int(chunk))):
+        masks = sample_alert_masks(n_total, n_alert_days, min(int(chunk), int(n_masks) - lo), rng, method=method, block_size=block_size)
+        parts.append(evaluate_alert_matrix(masks, event_idx, lookback_days, assoc_horizon_days=assoc_horizon_days))
+    if not parts:
+        return {k: np.zeros(0) for k in ALERT_METRICS}
+    return {k: np.concatenate([p[k] for p in parts]) for k in ALERT_METRICS}
@@ -8,6 +8,7 @@ import hashlib
 import json
 
 import numpy as np
+from scipy.spatial.distance import pdist
 from sklearn.cluster import DBSCAN, KMeans
 from sklearn.preprocessing import StandardScaler
 
@@ -135,12 +136,12 @@ class RegimeClassifier:
             data = data[idx]
             n = data.shape[0]
 
-        diffs = data[:, None, :] - data[None, :, :]
-        dists = np.linalg.norm(diffs, axis=2)
+        # Condensed upper triangle instead of the n x n x d difference tensor.
+        tri = pdist(data)
         if epsilon is None:
-            tri = dists[np.triu_indices(n, k=1)]
             epsilon = np.percentile(tri, percentile) if tri.size else 0.0
-        recurrence = (dists <= epsilon).mean()
+        diagonal = n if epsilon >= 0 else 0
+        recurrence = (diagonal + 2 * np.count_nonzero(tri <= epsilon)) / float(n * n)
         return float(recurrence)
 
     def scan_embeddings(
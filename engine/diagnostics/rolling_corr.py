@@ -0,0 +1,202 @@
+"""Trailing-window cross-sectional correlation maintained by row updates.
+
+``RollingCorrelation`` follows a ``(T, N)`` return panel one date at a time and
+reproduces the per-window recipe of the correlation lab: keep the tickers
+whose non-missing share over the window reaches ``min_coverage``, drop every
+row with a gap in one of them (listwise), then correlate.
+
+Instead of rebuilding the window, it keeps the sums, the cross-product matrix
+and the row count over the rows currently in use. Advancing one date
+adds the entering row and drops the leaving one (a rank-one update each). When a
+ticker enters or leaves coverage, only the rows whose completeness flips are
+added or dropped, which is a handful of rows at the usual coverage thresholds.
+Per-date cost is therefore O(k N^2) for k changed rows, whatever the window
+length. The sums are rebuilt from the rows every ``refresh_every`` steps
+(default: one window), which bounds the rounding drift of add/drop updates
+at O(N^2) amortised per date.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Columns whose update-based std is this small are re-measured from the rows,
+# so "constant series" checks see exact zeros instead of cancellation noise.
+_STD_RECHECK = 1e-6
+
+
+class RollingCorrelation:
+    """Listwise-complete trailing-window correlation of a return panel.
+
+    Call ``update(i)`` with the index of the last row of the window; calls are
+    cheapest in increasing order, one row apart (any other jump rebuilds).
+    ``NaN`` marks a missing value; ``+/-inf`` counts as present (as in pandas)
+    and makes the column's std ``NaN``, so a ``std > tol`` filter drops it.
+    """
+
+    def __init__(self, values: np.ndarray, window: int, min_coverage: float = 1.0, refresh_every: int | None = None) -> None:
+        x = np.asarray(values, dtype=float)
+        if x.ndim != 2:
+            raise ValueError("values must be a (T, N) array")
+        self.window = int(window)
+        if self.window < 1:
+            raise ValueError("window must be >= 1")
+        self.min_coverage = float(min_coverage)
+        self.refresh_every = int(refresh_every) if refresh_every else self.window
+        self._x = x
+        self._valid = ~np.isnan(x)
+        self._inf = np.isinf(x)
+        self._z = np.where(np.isfinite(x), x, 0.0)
+        n_cols = x.shape[1]
+        self._active = np.zeros(x.shape[0], dtype=bool)
+        self._selected = np.zeros(n_cols, dtype=bool)
+        self._present = np.zeros(n_cols, dtype=np.int64)
+        self._n = 0
+        self._s1 = np.zeros(n_cols)
+        self._s2 = np.zeros((n_cols, n_cols))
+        self._n_inf = np.zeros(n_cols, dtype=np.int64)
+        self._end: int | None = None
+        self._since_rebuild = 0
+
+    @property
+    def end(self) -> int | None:
+        """Index of the last row of the current window."""
+        return self._end
+
+    @property
+    def columns(self) -> np.ndarray:
+        """Positions of the tickers meeting ``min_coverage`` in the current window."""
+        return np.flatnonzero(self._selected)
+
+    @property
+    def n_obs(self) -> int:
+        """Rows of the current window with no gap in any selected ticker."""
+        return int(self._n)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Positions of those rows, in time order."""
+        return np.flatnonzero(self._active)
+
+    def data(self, cols: np.ndarray | None = None) -> np.ndarray:
+        """The listwise-complete ``(n_obs, k)`` block (``cols`` defaults to ``columns``)."""
+        cols = self.columns if cols is None else np.asarray(cols)
+        return self._x[np.ix_(self.rows, cols)]
+
+    def update(self, end: int) -> "RollingCorrelation":
+        """Move the window to the ``window`` rows ending at row ``end``."""
+        end = int(end)
+        if not (self.window - 1 <= end < self._x.shape[0]):
+            raise IndexError(f"window ending at {end} is outside the panel")
+        lo = end - self.window + 1
+        if self._end is None or end != self._end + 1 or self._since_rebuild + 1 >= self.refresh_every:
+            self._rebuild(end)
+            return self
+        self._present += self._valid[end]
+        self._present -= self._valid[lo - 1]
+        selected = self._present / self.window >= self.min_coverage
+        target = self._active.copy()
+        target[lo - 1] = False
+        if np.array_equal(selected, self._selected):
+            target[end] = bool(np.all(self._valid[end, selected]))
+        else:
+            target[lo : end + 1] = np.all(self._valid[lo : end + 1][:, selected], axis=1)
+            self._selected = selected
+        self._apply(np.flatnonzero(target & ~self._active), 1.0)
+        self._apply(np.flatnonzero(self._active & ~target), -1.0)
+        self._active = target
+        self._end = end
+        self._since_rebuild += 1
+        return self
+
+    def _apply(self, rows: np.ndarray, sign: float) -> None:
+        if rows.size == 0:
+            return
+        z = self._z[rows]
+        self._s2 += sign * (z.T @ z)
+        self._s1 += sign * z.sum(axis=0)
+        self._n_inf += int(sign) * self._inf[rows].sum(axis=0)
+        self._n += int(sign) * rows.size
+
+    def _rebuild(self, end: int) -> None:
+        lo = end - self.window + 1
+        self._present = self._valid[lo : end + 1].sum(axis=0)
+        self._selected = self._present / self.window >= self.min_coverage
+        self._active = np.zeros(self._x.shape[0], dtype=bool)
+        self._active[lo : end + 1] = np.all(self._valid[lo : end + 1][:, self._selected], axis=1)
+        self._s1 = np.zeros(self._x.shape[1])
+        self._s2 = np.zeros((self._x.shape[1], self._x.shape[1]))
+        self._n_inf = np.zeros(self._x.shape[1], dtype=np.int64)
+        self._n = 0
+        self._apply(np.flatnonzero(self._active), 1.0)
+        self._end = end
+        self._since_rebuild = 0
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Update state as plain arrays; ``restore`` on a panel with the same leading rows resumes exactly."""
+        return {
+            "end": np.array(-1 if self._end is None else self._end),
+            "since_rebuild": np.array(self._since_rebuild),
+            "rows": self.rows,
+            "selected": self._selected.copy(),
+            "present": self._present.copy(),
+            "n": np.array(self._n),
+            "s1": self._s1.copy(),
+            "s2": self._s2.copy(),
+            "n_inf": self._n_inf.copy(),
+        }
+
+    def restore(self, state: dict[str, np.ndarray]) -> "RollingCorrelation":
+        end = int(state["end"])
+        if end < 0:
+            return self
+        if state["s2"].shape != self._s2.shape or end >= self._x.shape[0]:
+            raise ValueError("state does not match this panel")
+        self._end = end
+        self._since_rebuild = int(state["since_rebuild"])
+        self._active = np.zeros(self._x.shape[0], dtype=bool)
+        self._active[np.asarray(state["rows"], dtype=np.int64)] = True
+        self._selected = np.asarray(state["selected"], dtype=bool).copy()
+        self._present = np.asarray(state["present"], dtype=np.int64).copy()
+        self._n = int(state["n"])
+        self._s1 = np.asarray(state["s1"], dtype=float).copy()
+        self._s2 = np.asarray(state["s2"], dtype=float).copy()
+        self._n_inf = np.asarray(state["n_inf"], dtype=np.int64).copy()
+        return self
+
+    def std(self, cols: np.ndarray | None = None) -> np.ndarray:
+        """Population std of ``cols`` over the complete rows (``NaN`` where a value is infinite)."""
+        cols = self.columns if cols is None else np.asarray(cols)
+        if self._n == 0 or cols.size == 0:
+            return np.full(cols.size, np.nan)
+        mean = self._s1[cols] / self._n
+        var = np.diagonal(self._s2)[cols] / self._n - mean * mean
+        out = np.sqrt(np.clip(var, 0.0, None))
+        recheck = np.flatnonzero(out < _STD_RECHECK)
+        if recheck.size:
+            out[recheck] = np.std(self._x[np.ix_(self.rows, cols[recheck])], axis=0)
+        out[self._n_inf[cols] > 0] = np.nan
+        return out
+
+    def covariance(self, cols: np.ndarray | None = None) -> np.ndarray:
+        """Sample covariance (``ddof=1``) of ``cols`` over the complete rows."""
+        cols = self.columns if cols is None else np.asarray(cols)
+        n = self._n
+        if n < 2:
+            return np.full((cols.size, cols.size), np.nan)
+        s1 = self._s1[cols]
+        cov = self._s2[np.ix_(cols, cols)] - np.outer(s1, s1) / n
+        cov /= n - 1
+        if np.any(self._n_inf[cols] > 0):
+            bad = self._n_inf[cols] > 0
+            cov[bad, :] = np.nan
+            cov[:, bad] = np.nan
+        return cov
+
+    def corr(self, cols: np.ndarray | None = None) -> np.ndarray:
+        """Correlation of ``cols`` over the complete rows, clipped to [-1, 1] like ``np.corrcoef``."""
+        cov = self.covariance(cols)
+        sd = np.sqrt(np.diagonal(cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = cov / sd[:, None] / sd[None, :]
+        return np.clip(c, -1.0, 1.0, out=c)
@@ -1,18 +1,16 @@
 import numpy as np
 import pandas as pd
 
+from engine.graph.embedding import delay_embedding
+
 
 def embed(series, tau, m):
+    # X is a read-only strided view (row i: series[i + start], series[i + start - tau], ...).
     series = np.asarray(series, dtype=float)
     start = (m - 1) * tau
-    X = []
-    idx = []
-    for i in range(start, len(series)):
-        X.append([series[i - j * tau] for j in range(m)])
-        idx.append(i)
-    if not X:
+    if len(series) <= start:
         return None, None
-    return np.array(X), np.array(idx)
+    return delay_embedding(series, m=m, tau=tau), np.arange(start, len(series))
 
 
 def _pca_anisotropy(X):
@@ -1,6 +1,8 @@
 """Graph/regime API facade."""
 
+from engine.graph.cache import ResultCache, cached_compute_diagnostics, cached_run_graph_engine
 from engine.graph.core import GraphResult, run_graph_engine
+from engine.graph.incremental import GraphEngineState, RefitPolicy
 from engine.graph.multilayer import MultilayerConfig, run_multilayer_engine
 from engine.graph.schema import GraphAsset, GraphConfig, GraphLinks, GraphMetrics, GraphState
 
@@ -12,6 +14,11 @@ __all__ = [
     "GraphState",
     "GraphResult",
     "run_graph_engine",
+    "GraphEngineState",
+    "RefitPolicy",
+    "ResultCache",
+    "cached_run_graph_engine",
+    "cached_compute_diagnostics",
     "MultilayerConfig",
     "run_multilayer_engine",
 ]
@@ -0,0 +1,240 @@
+"""Content-addressed on-disk cache for graph engine and diagnostics results.
+
+Entries are keyed by a SHA-256 over the input series bytes, every call
+parameter and ``ENGINE_VERSION``, so a version bump or any changed argument
+misses cleanly. Arrays are stored as ``.npz`` members; nested dicts are stored
+as JSON with arrays lifted out into the same archive. The cache directory is
+size-bounded and evicts least-recently-used entries (file mtime is touched on
+every hit).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from scipy import sparse
+
+from .core import GraphResult, run_graph_engine
+from .diagnostics import compute_diagnostics
+from .sparse_backend import SmoothedTransitionMatrix
+from .version import ENGINE_VERSION
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+_SUFFIX = ".npz"
+_ARRAY_TAG = "__ndarray__"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions}
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {"dtype": str(value.dtype), "shape": list(value.shape), "sha256": hashlib.sha256(value.tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return repr(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+def cache_key(kind: str, series: np.ndarray, params: dict[str, Any]) -> str:
+    arr = np.ascontiguousarray(np.asarray(series, dtype=float))
+    h = hashlib.sha256()
+    h.update(kind.encode())
+    h.update(ENGINE_VERSION.encode())
+    h.update(str(arr.shape).encode())
+    h.update(arr.tobytes())
+    h.update(json.dumps(_canonical(params), sort_keys=True).encode())
+    return h.hexdigest()
+
+
+def _encode(value: Any, arrays: dict[str, np.ndarray]) -> Any:
+    if isinstance(value, dict):
+        return {str(k): _encode(v, arrays) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v, arrays) for v in value]
+    if isinstance(value, np.ndarray):
+        name = f"a{len(arrays)}"
+        arrays[name] = value
+        return {_ARRAY_TAG: name}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode(value: Any, data: Any) -> Any:
+    if isinstance(value, dict):
+        if set(value) == {_ARRAY_TAG}:
+            return data[value[_ARRAY_TAG]]
+        return {k: _decode(v, data) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v, data) for v in value]
+    return value
+
+
+def _graph_payload(result: GraphResult) -> dict[str, Any]:
+    arrays: dict[str, np.ndarray] = {}
+    doc: dict[str, Any] = {}
+    for f in fields(GraphResult):
+        value = getattr(result, f.name)
+        if isinstance(value, SmoothedTransitionMatrix):
+            csr = value.counts
+            doc[f.name] = {"sparse_alpha": value.alpha, "shape": list(csr.shape)}
+            arrays["p_data"], arrays["p_indices"], arrays["p_indptr"] = csr.data, csr.indices, csr.indptr
+        elif isinstance(value, np.ndarray):
+            arrays[f"f_{f.name}"] = value
+        else:
+            doc[f.name] = _encode(value, arrays)
+    arrays["doc"] = np.array(json.dumps(doc))
+    return arrays
+
+
+def _graph_from_npz(data: Any) -> GraphResult:
+    doc = json.loads(str(data["doc"]))
+    kwargs: dict[str, Any] = {}
+    for f in fields(GraphResult):
+        if f"f_{f.name}" in data.files:
+            kwargs[f.name] = data[f"f_{f.name}"]
+        elif isinstance(doc.get(f.name), dict) and "sparse_alpha" in doc[f.name]:
+            spec = doc[f.name]
+            counts = sparse.csr_matrix((data["p_data"], data["p_indices"], data["p_indptr"]), shape=tuple(spec["shape"]))
+            kwargs[f.name] = SmoothedTransitionMatrix(counts, alpha=spec["sparse_alpha"])
+        else:
+            kwargs[f.name] = _decode(doc.get(f.name), data)
+    return GraphResult(**kwargs)
+
+
+class ResultCache:
+    """Size-bounded LRU store of engine outputs under ``root``."""
+
+    def __init__(self, root: Path | str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.stats = CacheStats()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{_SUFFIX}"
+
+    def _read(self, key: str) -> Any | None:
+        path = self._path(key)
+        try:
+            data = np.load(path, allow_pickle=False)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:  # pragma: no cover
+            pass
+        self.stats.hits += 1
+        return data
+
+    def _write(self, key: str, arrays: dict[str, np.ndarray]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                np.savez_compressed(handle, **arrays)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.stats.writes += 1
+        self.evict(keep=path)
+
+    def evict(self, keep: Path | None = None) -> int:
+        """Drop least-recently-used entries until the store fits ``max_bytes`` (``keep`` is never dropped)."""
+        entries = []
+        total = 0
+        for path in self.root.glob(f"*/*{_SUFFIX}"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:  # pragma: no cover
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self.stats.evictions += removed
+        return removed
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob(f"*/*{_SUFFIX}"))
+
+    def get_graph(self, key: str) -> GraphResult | None:
+        data = self._read(key)
+        if data is None:
+            return None
+        with data:
+            return _graph_from_npz(data)
+
+    def put_graph(self, key: str, result: GraphResult) -> None:
+        self._write(key, _graph_payload(result))
+
+    def get_json(self, key: str) -> dict[str, Any] | None:
+        data = self._read(key)
+        if data is None:
+            return None
+        with data:
+            return _decode(json.loads(str(data["doc"])), data)
+
+    def put_json(self, key: str, payload: dict[str, Any]) -> None:
+        arrays: dict[str, np.ndarray] = {}
+        doc = _encode(payload, arrays)
+        arrays["doc"] = np.array(json.dumps(doc))
+        self._write(key, arrays)
+
+
+def cached_run_graph_engine(series: np.ndarray, cache: ResultCache | None = None, **params: Any) -> GraphResult:
+    """``run_graph_engine`` with results memoised in ``cache`` (passthrough when ``None``)."""
+    if cache is None:
+        return run_graph_engine(series, **params)
+    key = cache_key("run_graph_engine", series, params)
+    result = cache.get_graph(key)
+    if result is None:
+        result = run_graph_engine(series, **params)
+        cache.put_graph(key, result)
+    return result
+
+
+def cached_compute_diagnostics(series: np.ndarray, cache: ResultCache | None = None, **params: Any) -> dict[str, Any]:
+    """``compute_diagnostics`` with results memoised in ``cache`` (passthrough when ``None``)."""
+    if cache is None:
+        return compute_diagnostics(series, **params)
+    key = cache_key("compute_diagnostics", series, params)
+    result = cache.get_json(key)
+    if result is None:
+        result = compute_diagnostics(series, **params)
+        cache.put_json(key, result)
+    return result
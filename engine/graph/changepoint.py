@@ -0,0 +1,129 @@
+"""Change-point detection without ``ruptures``.
+
+``SegmentCost`` holds prefix sums of a series once; the cost of any segment
+``[start, end)`` is then O(1), for a single segment or a whole vector of
+candidate starts. ``pelt`` is a numpy port of the PELT search used by
+``ruptures.Pelt`` (same breakpoint grid, min_size/jump handling and pruning
+rule) over such a cost, so a suffix of the series (a recent window) reuses
+the prefix sums of the full run.
+
+``split_scores`` / ``top_splits`` are the moment-shift scorer used when
+``ruptures`` is unavailable, computed from rolling windows instead of per-split
+slices.
+"""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+from .rolling import rolling_mean, rolling_var
+
+COST_MODELS = ("l2", "normal")
+
+
+class SegmentCost:
+    """O(1) segment costs from prefix sums.
+
+    ``l2``: sum of squared deviations from the segment mean.
+    ``normal``: ``len * log(var)`` (Gaussian change in mean and variance).
+
+    Costs are in units of the standardised series, so the usual
+    ``pen ~ log(n)`` penalties mean the same thing for prices and returns;
+    ``scale`` re-standardises for a sub-range.
+    """
+
+    def __init__(self, values: np.ndarray, model: str = "l2", min_var: float = 1e-12) -> None:
+        if model not in COST_MODELS:
+            raise ValueError(f"unknown cost model: {model}")
+        x = np.asarray(values, dtype=float)
+        self.model = model
+        self.min_var = float(min_var)
+        self.n = x.size
+        scale = float(np.std(x)) if x.size else 0.0
+        centered = (x - (float(np.mean(x)) if x.size else 0.0)) / (scale if scale > 0 else 1.0)
+        self._s1 = np.concatenate([[0.0], np.cumsum(centered)])
+        self._s2 = np.concatenate([[0.0], np.cumsum(centered * centered)])
+
+    def scale(self, start: int, end: int) -> float:
+        """Cost multiplier that makes a run on ``[start, end)`` match a run on that slice alone."""
+        if self.model != "l2":
+            # len * log(var) only shifts by a constant under rescaling.
+            return 1.0
+        var = float(self.error(start, end)) / max(end - start, 1)
+        return 1.0 / var if var > 0 else 1.0
+
+    def error(self, start, end):
+        """Cost of ``[start, end)``; ``start``/``end`` may be integer arrays."""
+        length = np.asarray(end) - np.asarray(start)
+        s1 = self._s1[end] - self._s1[start]
+        sse = np.maximum(self._s2[end] - self._s2[start] - s1 * s1 / length, 0.0)
+        if self.model == "l2":
+            return sse
+        return length * np.log(np.maximum(sse / length, self.min_var))
+
+
+def pelt(
+    cost: SegmentCost,
+    pen: float,
+    min_size: int = 2,
+    jump: int = 5,
+    start: int = 0,
+    end: int | None = None,
+) -> List[int]:
+    """Penalised optimal partition of ``[start, end)``; breakpoints are relative to ``start`` and end with the length."""
+    end = cost.n if end is None else int(end)
+    n = end - int(start)
+    min_size = max(1, int(min_size))
+    jump = max(1, int(jump))
+    grid = [k for k in range(0, n, jump) if k >= min_size] + [n]
+    best = {0: 0.0}
+    prev = {0: -1}
+    admissible = np.zeros(0, dtype=int)
+    unit = cost.scale(int(start), end)
+    for bkp in grid:
+        new_point = int(np.floor((bkp - min_size) / jump)) * jump
+        if new_point in best:
+            admissible = np.append(admissible, new_point)
+        if admissible.size == 0:
+            continue
+        totals = np.array([best[t] for t in admissible]) + unit * cost.error(start + admissible, start + bkp) + pen
+        k = int(np.argmin(totals))
+        best[bkp] = float(totals[k])
+        prev[bkp] = int(admissible[k])
+        admissible = admissible[totals <= best[bkp] + pen]
+    bkps = []
+    t = n
+    while t > 0 and t in prev:
+        bkps.append(t)
+        t = prev[t]
+    return sorted(bkps)
+
+
+def split_scores(values: np.ndarray, min_size: int) -> np.ndarray:
+    """``|mean(post) - mean(pre)| + |var(post) - var(pre)|`` for splits ``i`` in ``[min_size, n - min_size)``.
+
+    ``pre = x[i - min_size : i]`` and ``post = x[i : i + min_size]``.
+    """
+    x = np.asarray(values, dtype=float)
+    n = x.size
+    if min_size < 5 or n < 2 * min_size + 1:
+        return np.zeros(0)
+    mean = rolling_mean(x, min_size)
+    var = rolling_var(x, min_size)
+    split = np.arange(min_size, n - min_size)
+    pre = split - 1
+    post = split + min_size - 1
+    return np.abs(mean[post] - mean[pre]) + np.abs(var[post] - var[pre])
+
+
+def top_splits(values: np.ndarray, min_size: int, k: int = 5) -> List[int]:
+    """Best ``k`` split scores, dropping any within ``min_size`` of a better one (sorted)."""
+    scores = split_scores(values, min_size)
+    order = np.argsort(-scores, kind="stable")[:k]
+    bkpts: List[int] = []
+    for idx in (order + min_size).tolist():
+        if all(abs(idx - b) > min_size for b in bkpts):
+            bkpts.append(idx)
+    return sorted(bkpts)
@@ -7,12 +7,18 @@ import numpy as np
 
 from .embedding import takens_embed
 from .graph_builder import build_micrograph, knn_edges, normalize_counts, transition_counts
+from .kernels import local_divergence_kernel
+from .sparse_backend import transition_counts_sparse
 from .labels import compute_confidence, compute_graph_quality, labels_for_series
 from .metastable import metastable_regimes
 from .microstates import build_microstates
 from .multilayer import run_multilayer_engine
 
 
+# "auto" transition backend switches to sparse CSR + partial eigensolvers here.
+SPARSE_MIN_STATES = 1000
+
+
 @dataclass
 class GraphResult:
     embedding: np.ndarray
@@ -31,21 +37,7 @@ class GraphResult:
 
 
 def local_divergence(embedded: np.ndarray, theiler: int = 10) -> tuple[np.ndarray, np.ndarray]:
-    n = embedded.shape[0]
-    stretch = np.zeros(n - 1)
-    frac_pos = np.zeros(n - 1)
-    for i in range(n - 1):
-        k = min(n - 1, i + theiler)
-        a = embedded[i]
-        b = embedded[k]
-        c = embedded[i + 1]
-        d = embedded[min(n - 1, k + 1)]
-        d0 = np.linalg.norm(a - b) + 1e-8
-        d1 = np.linalg.norm(c - d) + 1e-8
-        ell = np.log(d1 / d0)
-        stretch[i] = ell
-        frac_pos[i] = 1.0 if ell > 0 else 0.0
-    return stretch, frac_pos
+    return local_divergence_kernel(embedded, theiler=theiler)
 
 
 def run_graph_engine(
@@ -67,8 +59,10 @@ def run_graph_engine(
     state_smooth: str | None = None,
     state_smooth_noise: float = 0.05,
     use_multilayer: bool = True,
+    transition_backend: str = "dense",
+    dtype: str = "float64",
 ) -> GraphResult:
-    embedding = takens_embed(series, m=m, tau=tau)
+    embedding = takens_embed(series, m=m, tau=tau, dtype=dtype)
     micro_labels, centroids = build_microstates(
         embedding,
         n_micro=n_micro,
@@ -78,7 +72,12 @@ def run_graph_engine(
         smooth_method=micro_smooth,
         smooth_noise=micro_smooth_noise,
     )
-    counts = transition_counts(micro_labels)
+    if transition_backend == "auto":
+        transition_backend = "sparse" if n_micro >= SPARSE_MIN_STATES else "dense"
+    if transition_backend == "sparse":
+        counts = transition_counts_sparse(micro_labels)
+    else:
+        counts = transition_counts(micro_labels)
     p_matrix = normalize_counts(counts, alpha=alpha)
     micro_regime = metastable_regimes(p_matrix, n_regimes=n_regimes, seed=seed, method=method)
     conf = compute_confidence(p_matrix, micro_regime, micro_labels)
@@ -5,9 +5,11 @@ from typing import Any, Dict, Tuple
 
 import numpy as np
 from sklearn.neighbors import NearestNeighbors
-from sklearn.metrics import pairwise_distances
 
-from .embedding import takens_embed
+from .changepoint import COST_MODELS, SegmentCost, pelt, top_splits
+from .embedding import ami_curve, scan_embedding_dims, takens_embed
+from .rolling import rolling_autocorr, rolling_moments
+from .rqa import rqa_metrics
 
 try:  # optional dependency
     import ruptures as rpt
@@ -30,19 +32,7 @@ def _ami_adaptive(series: np.ndarray, max_lag: int, bins: int = 16) -> np.ndarra
     edges = np.quantile(values, qs)
     if np.unique(edges).size < bins + 1:
         edges = np.linspace(float(values.min()), float(values.max()), bins + 1)
-    ami = np.zeros(max_lag)
-    for lag in range(1, max_lag + 1):
-        x = values[:-lag]
-        y = values[lag:]
-        hist2d, _, _ = np.histogram2d(x, y, bins=[edges, edges])
-        pxy = hist2d / max(hist2d.sum(), 1.0)
-        px = pxy.sum(axis=1, keepdims=True)
-        py = pxy.sum(axis=0, keepdims=True)
-        with np.errstate(divide="ignore", invalid="ignore"):
-            ratio = pxy / (px @ py + 1e-12)
-            mi = np.nansum(pxy * np.log(ratio + 1e-12))
-        ami[lag - 1] = float(mi)
-    return ami
+    return ami_curve(values, max_lag, edges)
 
 
 def estimate_tau_adaptive(series: np.ndarray, max_lag: int = 20) -> Tuple[int, Dict[str, Any]]:
@@ -59,27 +49,8 @@ def estimate_tau_adaptive(series: np.ndarray, max_lag: int = 20) -> Tuple[int, D
 
 
 def _cao_metrics(series: np.ndarray, tau: int, max_dim: int = 10) -> Tuple[np.ndarray, np.ndarray]:
-    values = np.asarray(series, dtype=float)
-    e1 = []
-    e2 = []
-    for m in range(1, max_dim):
-        emb_m = takens_embed(values, m=m, tau=tau)
-        emb_m1 = takens_embed(values, m=m + 1, tau=tau)
-        n = min(emb_m.shape[0], emb_m1.shape[0])
-        emb_m = emb_m[:n]
-        emb_m1 = emb_m1[:n]
-        nn = NearestNeighbors(n_neighbors=2, algorithm="auto")
-        nn.fit(emb_m)
-        distances, indices = nn.kneighbors(emb_m, return_distance=True)
-        nbr = indices[:, 1]
-        d_m = distances[:, 1] + 1e-12
-        d_m1 = np.linalg.norm(emb_m1 - emb_m1[nbr], axis=1) + 1e-12
-        e1.append(float(np.mean(d_m1 / d_m)))
-        # Cao E2 approximation: mean difference of added component
-        added = np.abs(emb_m1[:, -1] - emb_m1[nbr, -1]) + 1e-12
-        prev = np.abs(emb_m[:, -1] - emb_m[nbr, -1]) + 1e-12
-        e2.append(float(np.mean(added / prev)))
-    return np.asarray(e1), np.asarray(e2)
+    scan = scan_embedding_dims(series, tau=tau, max_m=max_dim)
+    return scan["e1"], scan["e2"]
 
 
 def estimate_embedding_dim(series: np.ndarray, tau: int, max_dim: int = 10) -> Dict[str, Any]:
@@ -101,42 +72,62 @@ def estimate_embedding_dim(series: np.ndarray, tau: int, max_dim: int = 10) -> D
     }
 
 
-def estimate_lle_rosenstein(embedded: np.ndarray, theiler: int = 10, max_t: int = 20) -> Dict[str, Any]:
+def _theiler_neighbors(embedded: np.ndarray, theiler: int, n_neighbors: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    # First of the k nearest candidates (self column dropped) outside the Theiler window.
+    nn = NearestNeighbors(n_neighbors=min(n_neighbors, embedded.shape[0]), algorithm="auto")
+    nn.fit(embedded)
+    indices = nn.kneighbors(embedded, return_distance=False)[:, 1:]
+    rows = np.arange(embedded.shape[0])
+    outside = np.abs(indices - rows[:, None]) > theiler
+    has = outside.any(axis=1)
+    first = outside.argmax(axis=1)
+    return rows[has], indices[has, first[has]]
+
+
+def _pair_log_divergence(embedded: np.ndarray, i: np.ndarray, j: np.ndarray, horizons: np.ndarray) -> np.ndarray:
+    # (pairs x horizons) log(d_k / d_0); entries past the end of the series are NaN.
     n = embedded.shape[0]
+    d0 = np.linalg.norm(embedded[i] - embedded[j], axis=1) + 1e-12
+    ii = i[:, None] + horizons
+    jj = j[:, None] + horizons
+    inside = (ii < n) & (jj < n)
+    dk = np.linalg.norm(embedded[np.minimum(ii, n - 1)] - embedded[np.minimum(jj, n - 1)], axis=2) + 1e-12
+    return np.where(inside, np.log(dk / d0[:, None]), np.nan)
+
+
+def estimate_lle_rosenstein(
+    embedded: np.ndarray,
+    theiler: int = 10,
+    max_t: int = 20,
+    ftle_window: int = 0,
+) -> Dict[str, Any]:
+    """Rosenstein largest Lyapunov exponent and short-horizon FTLE.
+
+    With ``ftle_window > 0`` the result also carries ``ftle_series``: the mean
+    pairwise FTLE over the trailing ``ftle_window`` bars, indexed by the
+    embedding row at which each pair's horizon ends (causal).
+    """
+    n = embedded.shape[0]
+    empty = {"lle": float("nan"), "ftle_recent": float("nan")}
+    if ftle_window > 0:
+        empty["ftle_series"] = np.full(n, np.nan)
     if n < max_t + 5:
-        return {"lle": float("nan"), "ftle_recent": float("nan")}
-    nn = NearestNeighbors(n_neighbors=10, algorithm="auto")
-    nn.fit(embedded)
-    distances, indices = nn.kneighbors(embedded, return_distance=True)
-    neighbors = []
-    for i in range(n):
-        cand = indices[i, 1:]
-        j = None
-        for c in cand:
-            if abs(int(c) - i) > theiler:
-                j = int(c)
-                break
-        if j is None:
-            continue
-        neighbors.append((i, j))
-    if len(neighbors) < 10:
-        return {"lle": float("nan"), "ftle_recent": float("nan")}
+        return empty
+    i, j = _theiler_neighbors(embedded, theiler)
+    if i.size < 10:
+        return empty
 
     max_t = min(max_t, n - 1)
-    div = np.zeros(max_t)
-    counts = np.zeros(max_t)
-    for i, j in neighbors:
-        max_k = min(max_t, n - max(i, j) - 1)
-        if max_k <= 1:
-            continue
-        for k in range(1, max_k):
-            d0 = np.linalg.norm(embedded[i] - embedded[j]) + 1e-12
-            d1 = np.linalg.norm(embedded[i + k] - embedded[j + k]) + 1e-12
-            div[k] += np.log(d1 / d0)
-            counts[k] += 1
+    horizons = np.arange(1, max_t)
+    # Pair (i, j) contributes horizons k < min(max_t, n - max(i, j) - 1), and only if that bound exceeds 1.
+    max_k = np.minimum(max_t, n - np.maximum(i, j) - 1)
+    logs = _pair_log_divergence(embedded, i, j, horizons)
+    use = (horizons[None, :] < max_k[:, None]) & (max_k[:, None] > 1)
+    counts = use.sum(axis=0)
+    div = np.where(use, logs, 0.0).sum(axis=0)
     valid = counts > 0
     if not np.any(valid):
-        return {"lle": float("nan"), "ftle_recent": float("nan")}
+        return empty
     y = div[valid] / counts[valid]
     x = np.arange(len(y))
     fit_len = min(10, len(y))
@@ -148,68 +139,25 @@ def estimate_lle_rosenstein(embedded: np.ndarray, theiler: int = 10, max_t: int
 
     # FTLE recent (short horizon)
     h = min(5, max_t - 1)
-    ftle_vals = []
-    for i, j in neighbors:
-        if i + h >= n or j + h >= n:
-            continue
-        d0 = np.linalg.norm(embedded[i] - embedded[j]) + 1e-12
-        d1 = np.linalg.norm(embedded[i + h] - embedded[j + h]) + 1e-12
-        ftle_vals.append(float(np.log(d1 / d0) / max(h, 1)))
-    ftle_recent = float(np.mean(ftle_vals)) if ftle_vals else float("nan")
-    return {"lle": lle, "ftle_recent": ftle_recent}
+    ftle = _pair_log_divergence(embedded, i, j, np.array([h]))[:, 0] / max(h, 1)
+    ok = np.isfinite(ftle)
+    out: Dict[str, Any] = {"lle": lle, "ftle_recent": float(np.mean(ftle[ok])) if ok.any() else float("nan")}
+    if ftle_window > 0:
+        end = np.maximum(i, j)[ok] + h
+        sums = np.bincount(end, weights=ftle[ok], minlength=n)[:n]
+        cnts = np.bincount(end, minlength=n)[:n].astype(float)
+        csum = np.concatenate([[0.0], np.cumsum(sums)])
+        ccnt = np.concatenate([[0.0], np.cumsum(cnts)])
+        lo = np.maximum(np.arange(1, n + 1) - int(ftle_window), 0)
+        win_cnt = ccnt[1:] - ccnt[lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["ftle_series"] = np.where(win_cnt > 0, (csum[1:] - csum[lo]) / win_cnt, np.nan)
+    return out
 
 
 def _rqa_metrics(embedded: np.ndarray, max_points: int = 600) -> Dict[str, float]:
-    if embedded.shape[0] > max_points:
-        idx = np.linspace(0, embedded.shape[0] - 1, max_points).astype(int)
-        data = embedded[idx]
-    else:
-        data = embedded
-    if data.shape[0] < 10:
-        return {"det": float("nan"), "lam": float("nan"), "tt": float("nan")}
-    dist = pairwise_distances(data)
-    eps = np.quantile(dist, 0.1)
-    R = (dist <= eps).astype(int)
-    np.fill_diagonal(R, 0)
-    total_rec = float(R.sum())
-    if total_rec == 0:
-        return {"det": 0.0, "lam": 0.0, "tt": 0.0}
-
-    # Diagonal lines
-    det_count = 0
-    for k in range(-R.shape[0] + 1, R.shape[0]):
-        diag = np.diag(R, k=k)
-        run = 0
-        for v in diag:
-            if v:
-                run += 1
-            else:
-                if run >= 2:
-                    det_count += run
-                run = 0
-        if run >= 2:
-            det_count += run
-    det = det_count / total_rec
-
-    # Vertical lines
-    lam_count = 0
-    vert_lengths = []
-    for col in range(R.shape[1]):
-        run = 0
-        for v in R[:, col]:
-            if v:
-                run += 1
-            else:
-                if run >= 2:
-                    lam_count += run
-                    vert_lengths.append(run)
-                run = 0
-        if run >= 2:
-            lam_count += run
-            vert_lengths.append(run)
-    lam = lam_count / total_rec
-    tt = float(np.mean(vert_lengths)) if vert_lengths else 0.0
-    return {"det": float(det), "lam": float(lam), "tt": float(tt)}
+    rqa = rqa_metrics(embedded, max_points=max_points)
+    return {"det": rqa["det"], "lam": rqa["lam"], "tt": rqa["tt"]}
 
 
 def _intrinsic_dim_twonn(embedded: np.ndarray) -> float:
@@ -286,20 +234,10 @@ def _rolling_ews(returns: np.ndarray, window: int = 60) -> dict[str, float]:
     if returns.size < max(20, window + 5):
         return {"ar1": float("nan"), "var": float("nan"), "skew": float("nan"), "kurt": float("nan"), "ar1_slope": float("nan"), "var_slope": float("nan")}
     w = min(window, max(20, returns.size // 3))
-    metrics = []
-    for i in range(w, returns.size + 1):
-        seg = returns[i - w : i]
-        if seg.size < 5:
-            continue
-        seg = seg - np.mean(seg)
-        ar1 = np.corrcoef(seg[:-1], seg[1:])[0, 1] if seg.size > 2 else 0.0
-        var = float(np.var(seg))
-        skew = float(np.mean((seg / (np.std(seg) + 1e-12)) ** 3))
-        kurt = float(np.mean((seg / (np.std(seg) + 1e-12)) ** 4))
-        metrics.append((ar1, var, skew, kurt))
-    if not metrics:
-        return {"ar1": float("nan"), "var": float("nan"), "skew": float("nan"), "kurt": float("nan"), "ar1_slope": float("nan"), "var_slope": float("nan")}
-    arr = np.asarray(metrics)
+    moments = rolling_moments(returns, w)
+    ar1 = rolling_autocorr(returns, w, lag=1)
+    # One row per full trailing window: (ar1, var, skew, kurt).
+    arr = np.column_stack([ar1, moments["var"], moments["skew"], moments["kurt"]])[w - 1 :]
     latest = arr[-1]
     trend_len = min(10, arr.shape[0])
     x = np.arange(trend_len)
@@ -315,30 +253,36 @@ def _rolling_ews(returns: np.ndarray, window: int = 60) -> dict[str, float]:
     }
 
 
-def _detect_change_points(values: np.ndarray, min_size: int = 30, model: str = "rbf") -> dict[str, Any]:
+def _detect_change_points(
+    values: np.ndarray,
+    min_size: int = 30,
+    model: str = "rbf",
+    jump: int = 1,
+    cost: SegmentCost | None = None,
+    offset: int = 0,
+) -> dict[str, Any]:
+    """Change points of ``values``.
+
+    ``model="rbf"`` uses ``ruptures`` when installed, else the moment-shift
+    scorer. ``"l2"``/``"normal"`` run the numpy PELT; pass ``cost`` (built on
+    a longer series with ``values == series[offset:offset + len(values)]``) to
+    reuse its prefix sums.
+    """
     data = np.asarray(values, dtype=float)
     data = data[np.isfinite(data)]
     if data.size < min_size * 2:
         return {"cpd_indices": [], "cpd_last_offset": None, "cpd_score": float("nan")}
-    if rpt is not None:
-        algo = rpt.Pelt(model=model, min_size=min_size, jump=1)
+    if model in COST_MODELS:
+        if cost is None or cost.model != model:
+            cost, offset = SegmentCost(data, model=model), 0
+        bkpts = pelt(cost, pen=2.0 * np.log(len(data)), min_size=min_size, jump=jump, start=offset, end=offset + data.size)
+        bkpts = [int(b) for b in bkpts if b < len(data)]
+    elif rpt is not None:
+        algo = rpt.Pelt(model=model, min_size=min_size, jump=jump)
         bkpts = algo.fit(data).predict(pen=2.0 * np.log(len(data)))
         bkpts = [int(b) for b in bkpts if b < len(data)]
     else:
-        scores = []
-        for i in range(min_size, len(data) - min_size):
-            pre = data[i - min_size : i]
-            post = data[i : i + min_size]
-            if pre.size < 5 or post.size < 5:
-                continue
-            score = abs(np.mean(post) - np.mean(pre)) + abs(np.var(post) - np.var(pre))
-            scores.append((i, float(score)))
-        scores.sort(key=lambda x: x[1], reverse=True)
-        bkpts = []
-        for idx, _ in scores[:5]:
-            if all(abs(idx - b) > min_size for b in bkpts):
-                bkpts.append(idx)
-        bkpts.sort()
+        bkpts = top_splits(data, min_size)
     last_offset = int(len(data) - bkpts[-1]) if bkpts else None
     score = float("nan")
     if bkpts:
@@ -352,7 +296,19 @@ def compute_diagnostics(
     tau: int,
     theiler: int,
     max_points: int = 800,
+    dtype: str = "float64",
+    lle_max_points: int | None = None,
+    cpd_model: str = "rbf",
+    cpd_jump: int = 1,
+    ftle_window: int = 0,
 ) -> Dict[str, Any]:
+    """Embedding, chaos, RQA, early-warning and change-point diagnostics of ``series``.
+
+    With ``ftle_window > 0`` the result also carries ``ftle_series``: the rolling
+    FTLE of ``estimate_lle_rosenstein`` over the trailing ``ftle_window`` rows of
+    the LLE embedding, placed at the finite input value where each row ends
+    (NaN elsewhere, including the points skipped by an LLE subsample).
+    """
     values = np.asarray(series, dtype=float)
     values = values[np.isfinite(values)]
     if values.size < (m - 1) * tau + 10:
@@ -360,21 +316,53 @@ def compute_diagnostics(
     sub = _subsample(values, max_points=max_points)
     tau_adapt, ami_info = estimate_tau_adaptive(sub, max_lag=min(20, sub.size // 4))
     cao_info = estimate_embedding_dim(sub, tau=tau, max_dim=min(10, max(3, m + 3)))
-    emb = takens_embed(sub, m=m, tau=tau)
-    lle_info = estimate_lle_rosenstein(emb, theiler=theiler, max_t=min(20, emb.shape[0] - 1))
+    emb = takens_embed(sub, m=m, tau=tau, dtype=dtype)
+    lle_emb = emb
+    lle_idx = _subsample(np.arange(values.size), max_points=max_points)
+    if lle_max_points is not None:
+        # LLE/FTLE no longer need the shared subsample cap; 0 uses the full series.
+        if lle_max_points > 0:
+            lle_idx = _subsample(np.arange(values.size), max_points=lle_max_points)
+        else:
+            lle_idx = np.arange(values.size)
+        lle_emb = takens_embed(values[lle_idx], m=m, tau=tau, dtype=dtype)
+    lle_info = estimate_lle_rosenstein(
+        lle_emb,
+        theiler=theiler,
+        max_t=min(20, lle_emb.shape[0] - 1),
+        ftle_window=ftle_window,
+    )
+    ftle_series = None
+    if ftle_window > 0:
+        # Embedding row r ends at LLE input point (m - 1) * tau + r.
+        ftle_series = np.full(values.size, np.nan)
+        ftle_series[lle_idx[(m - 1) * tau :]] = lle_info["ftle_series"]
     rqa = _rqa_metrics(emb)
     id_est = _intrinsic_dim_twonn(emb)
     anis = _anisotropy_score(emb)
     k_val = _zero_one_test(sub)
     returns = _safe_returns(values)
     ews = _rolling_ews(returns, window=min(80, max(20, returns.size // 4))) if returns.size else {}
-    cpd_ret = _detect_change_points(returns, min_size=max(15, min(50, returns.size // 6))) if returns.size else {}
-    cpd_price = _detect_change_points(values, min_size=max(20, min(80, values.size // 8))) if values.size else {}
+    cpd_opts = {"model": cpd_model, "jump": cpd_jump}
+    # The recent window is a suffix of the price series, so PELT costs share its prefix sums.
+    price_cost = SegmentCost(values, model=cpd_model) if cpd_model in COST_MODELS else None
+    cpd_ret = _detect_change_points(returns, min_size=max(15, min(50, returns.size // 6)), **cpd_opts) if returns.size else {}
+    cpd_price = (
+        _detect_change_points(values, min_size=max(20, min(80, values.size // 8)), cost=price_cost, **cpd_opts)
+        if values.size
+        else {}
+    )
     recent_window = min(252, values.size)
     cpd_recent = {}
     if recent_window >= 120:
         recent_slice = values[-recent_window:]
-        cpd_recent = _detect_change_points(recent_slice, min_size=max(20, recent_window // 6))
+        cpd_recent = _detect_change_points(
+            recent_slice,
+            min_size=max(20, recent_window // 6),
+            cost=price_cost,
+            offset=values.size - recent_window,
+            **cpd_opts,
+        )
     cpd = {
         "returns": cpd_ret,
         "price": cpd_price,
@@ -402,7 +390,7 @@ def compute_diagnostics(
         )
     )
 
-    return {
+    out = {
         "status": "ok",
         "tau_adaptive": int(tau_adapt),
         "ami": ami_info.get("ami", []),
@@ -419,3 +407,6 @@ def compute_diagnostics(
         "ews": ews,
         "cpd": cpd,
     }
+    if ftle_series is not None:
+        out["ftle_series"] = ftle_series.tolist()
+    return out
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.spatial import cKDTree
 from typing import Tuple
 
 
@@ -16,6 +18,95 @@ def _autocorr(series: np.ndarray, max_lag: int) -> np.ndarray:
     return out
 
 
+def histogram_codes(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Bin index of each value using ``np.histogram2d`` rules (last edge inclusive); -1 if outside or non-finite."""
+    values = np.asarray(values, dtype=float)
+    edges = np.asarray(edges, dtype=float)
+    bins = edges.size - 1
+    codes = np.searchsorted(edges, values, side="right") - 1
+    codes[values == edges[-1]] = bins - 1
+    codes[(codes < 0) | (codes >= bins) | ~np.isfinite(values)] = -1
+    return codes
+
+
+def _lag_pair_codes(codes: np.ndarray, max_lag: int, bins: int) -> np.ndarray:
+    # Row i, column k-1: flat (lag, x-bin, y-bin) index of the pair (i, i + k), or -1.
+    padded = np.concatenate([codes, np.full(max_lag, -1, dtype=codes.dtype)])
+    window = sliding_window_view(padded, max_lag + 1)[: codes.size]
+    head = window[:, :1]
+    tail = window[:, 1:]
+    lag_offset = np.arange(max_lag) * bins * bins
+    return np.where((head >= 0) & (tail >= 0), lag_offset + head * bins + tail, -1)
+
+
+def _mutual_information(hist: np.ndarray) -> np.ndarray:
+    # hist: (n_lags, bins, bins) joint counts; same estimator as the per-lag histogram2d loop.
+    totals = np.maximum(hist.sum(axis=(1, 2), keepdims=True), 1.0)
+    pxy = hist / totals
+    px = pxy.sum(axis=2, keepdims=True)
+    py = pxy.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = pxy / (px @ py + 1e-12)
+        return np.nansum(pxy * np.log(ratio + 1e-12), axis=(1, 2))
+
+
+def ami_curve(values: np.ndarray, max_lag: int, edges: np.ndarray) -> np.ndarray:
+    """Average mutual information for lags ``1..max_lag`` from one ``bincount`` over all lag pairs."""
+    bins = len(edges) - 1
+    pairs = _lag_pair_codes(histogram_codes(values, edges), max_lag, bins).ravel()
+    hist = np.bincount(pairs[pairs >= 0], minlength=max_lag * bins * bins)
+    return _mutual_information(hist.reshape(max_lag, bins, bins).astype(float))
+
+
+def rolling_ami(
+    series: np.ndarray,
+    window: int,
+    max_lag: int = 20,
+    bins: int = 16,
+    step: int = 1,
+    edges: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """AMI curves over sliding windows; returns ``(ends, scores)`` with ``scores[w]`` for ``series[ends[w]-window:ends[w]]``.
+
+    Bins are shared by all windows (``edges`` or the full-sample min/max grid),
+    so the joint histograms are updated by adding the pairs that enter and
+    subtracting the pairs that leave instead of being rebuilt per window.
+    """
+    values = np.asarray(series, dtype=float)
+    window = int(window)
+    step = max(1, int(step))
+    if window < max_lag + 2 or values.size < window:
+        return np.zeros(0, dtype=int), np.zeros((0, max_lag))
+    if edges is None:
+        finite = values[np.isfinite(values)]
+        vmin, vmax = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+        if vmin == vmax:
+            ends = np.arange(window, values.size + 1, step)
+            return ends, np.zeros((ends.size, max_lag))
+        edges = np.linspace(vmin, vmax, bins + 1)
+    bins = len(edges) - 1
+    size = max_lag * bins * bins
+    by_start = _lag_pair_codes(histogram_codes(values, edges), max_lag, bins)
+    # Same pairs indexed by their later point: by_end[j, k-1] = by_start[j-k, k-1].
+    lags = np.arange(1, max_lag + 1)
+    rows = np.arange(values.size)[:, None] - lags
+    by_end = np.where(rows >= 0, by_start[np.maximum(rows, 0), lags - 1], -1)
+
+    def _count(block: np.ndarray) -> np.ndarray:
+        flat = block.ravel()
+        return np.bincount(flat[flat >= 0], minlength=size)
+
+    ends = np.arange(window, values.size + 1, step)
+    scores = np.zeros((ends.size, max_lag))
+    hist = _count(by_end[:window])
+    for w, end in enumerate(ends):
+        if w:
+            start = end - window
+            hist += _count(by_end[end - step : end]) - _count(by_start[start - step : start])
+        scores[w] = _mutual_information(hist.reshape(max_lag, bins, bins).astype(float))
+    return ends, scores
+
+
 def _ami(series: np.ndarray, max_lag: int, bins: int = 16) -> np.ndarray:
     values = np.asarray(series, dtype=float)
     values = values[np.isfinite(values)]
@@ -24,28 +115,11 @@ def _ami(series: np.ndarray, max_lag: int, bins: int = 16) -> np.ndarray:
     vmin, vmax = float(values.min()), float(values.max())
     if vmin == vmax:
         return np.zeros(max_lag)
-    edges = np.linspace(vmin, vmax, bins + 1)
-    ami = np.zeros(max_lag)
-    for lag in range(1, max_lag + 1):
-        x = values[:-lag]
-        y = values[lag:]
-        hist2d, _, _ = np.histogram2d(x, y, bins=[edges, edges])
-        pxy = hist2d / max(hist2d.sum(), 1.0)
-        px = pxy.sum(axis=1, keepdims=True)
-        py = pxy.sum(axis=0, keepdims=True)
-        with np.errstate(divide="ignore", invalid="ignore"):
-            ratio = pxy / (px @ py + 1e-12)
-            mi = np.nansum(pxy * np.log(ratio + 1e-12))
-        ami[lag - 1] = float(mi)
-    return ami
+    return ami_curve(values, max_lag, np.linspace(vmin, vmax, bins + 1))
 
 
-def select_tau(series: np.ndarray, max_lag: int = 20, max_tau: int = 3, method: str = "ami") -> int:
-    if method == "ami":
-        scores = _ami(series, max_lag=max_lag, bins=16)
-    else:
-        scores = _autocorr(series, max_lag=max_lag)
-    # Prefer first local minimum; fallback to global minimum; else 1.
+def first_minimum_lag(scores: np.ndarray, max_tau: int) -> int:
+    """First local minimum of a lag curve (lag = index + 1), else the global minimum, capped at ``max_tau``."""
     for i in range(1, len(scores) - 1):
         if scores[i] < scores[i - 1] and scores[i] < scores[i + 1]:
             return min(i + 1, max_tau)
@@ -54,59 +128,92 @@ def select_tau(series: np.ndarray, max_lag: int = 20, max_tau: int = 3, method:
     return min(1, max_tau)
 
 
-def _fnn_fraction(series: np.ndarray, m: int, tau: int, r_tol: float, a_tol: float) -> float:
-    from sklearn.neighbors import NearestNeighbors
-
-    emb_m = takens_embed(series, m=m, tau=tau)
-    emb_m1 = takens_embed(series, m=m + 1, tau=tau)
-    n = emb_m1.shape[0]
-    emb_m = emb_m[:n]
-
-    nn = NearestNeighbors(n_neighbors=2, algorithm="auto")
-    nn.fit(emb_m)
-    distances, indices = nn.kneighbors(emb_m, return_distance=True)
-    d_m = distances[:, 1]
-    nbr = indices[:, 1]
-    std = float(np.std(series)) if np.std(series) > 0 else 1.0
-
-    delta = np.abs(emb_m1[:, -1] - emb_m1[nbr, -1]) / (d_m + 1e-12)
-    d_m1 = np.linalg.norm(emb_m1 - emb_m1[nbr], axis=1)
-    false = (delta > r_tol) | ((d_m1 / std) > a_tol)
-    return float(np.mean(false))
-
-
-def _cao_e1(series: np.ndarray, m: int, tau: int) -> float:
-    from sklearn.neighbors import NearestNeighbors
-
-    emb_m = takens_embed(series, m=m, tau=tau)
-    emb_m1 = takens_embed(series, m=m + 1, tau=tau)
-    n = emb_m1.shape[0]
-    emb_m = emb_m[:n]
-    nn = NearestNeighbors(n_neighbors=2, algorithm="auto")
-    nn.fit(emb_m)
-    distances, indices = nn.kneighbors(emb_m, return_distance=True)
-    nbr = indices[:, 1]
-    d_m = distances[:, 1] + 1e-12
-    d_m1 = np.linalg.norm(emb_m1 - emb_m1[nbr], axis=1) + 1e-12
-    return float(np.mean(d_m1 / d_m))
+def select_tau(series: np.ndarray, max_lag: int = 20, max_tau: int = 3, method: str = "ami") -> int:
+    if method == "ami":
+        scores = _ami(series, max_lag=max_lag, bins=16)
+    else:
+        scores = _autocorr(series, max_lag=max_lag)
+    # Prefer first local minimum; fallback to global minimum; else 1.
+    return first_minimum_lag(scores, max_tau)
+
+
+def _iter_dim_scan(values: np.ndarray, tau: int, m_values, r_tol: float, a_tol: float):
+    # One KD-tree query per m serves E1, E2 and FNN. Rows are oldest-first, so
+    # the first m columns of the (m+1)-window view are the truncated m-embedding.
+    std = float(np.std(values)) if np.std(values) > 0 else 1.0
+    for m in m_values:
+        window = sliding_window_view(values, m * tau + 1)[:, ::tau]
+        n = window.shape[0]
+        emb_m = np.ascontiguousarray(window[:, :m])
+        distances, indices = cKDTree(emb_m).query(emb_m, k=2)
+        rows = np.arange(n)
+        # Skip the query point itself (it may come second when it has exact duplicates).
+        first_is_self = indices[:, 0] == rows
+        nbr = np.where(first_is_self, indices[:, 1], indices[:, 0])
+        d_m = np.where(first_is_self, distances[:, 1], distances[:, 0])
+        d_m1 = np.linalg.norm(window - window[nbr], axis=1)
+        # Column 0 here is column -1 of the newest-first ``takens_embed`` layout.
+        added = np.abs(window[:, 0] - window[nbr, 0])
+        prev = np.abs(emb_m[:, 0] - emb_m[nbr, 0])
+        e1 = float(np.mean((d_m1 + 1e-12) / (d_m + 1e-12)))
+        e2 = float(np.mean((added + 1e-12) / (prev + 1e-12)))
+        false = (added / (d_m + 1e-12) > r_tol) | ((d_m1 / std) > a_tol)
+        yield m, e1, e2, float(np.mean(false))
+
+
+def scan_embedding_dims(
+    series: np.ndarray,
+    tau: int,
+    max_m: int,
+    min_m: int = 1,
+    r_tol: float = 10.0,
+    a_tol: float = 2.0,
+) -> dict[str, np.ndarray]:
+    """Cao E1/E2 and false-nearest-neighbour curves for ``m = min_m .. max_m - 1`` in one pass.
+
+    Each dimension embeds ``series`` as a strided view and runs a single
+    nearest-neighbour query that all three statistics share.
+    """
+    values = np.asarray(series, dtype=float)
+    m_values = [m for m in range(int(min_m), int(max_m)) if values.size > m * tau + 1]
+    rows = list(_iter_dim_scan(values, int(tau), m_values, r_tol, a_tol))
+    return {
+        "m": np.array([r[0] for r in rows], dtype=int),
+        "e1": np.array([r[1] for r in rows], dtype=float),
+        "e2": np.array([r[2] for r in rows], dtype=float),
+        "fnn": np.array([r[3] for r in rows], dtype=float),
+    }
 
 
 def select_m(series: np.ndarray, tau: int, max_m: int = 6, threshold: float = 0.15, method: str = "cao") -> int:
+    values = np.asarray(series, dtype=float)
+    scan = _iter_dim_scan(values, int(tau), range(2, max_m + 1), r_tol=10.0, a_tol=2.0)
     if method == "cao":
         prev = None
-        for m in range(2, max_m + 1):
-            e1 = _cao_e1(series, m=m, tau=tau)
+        for m, e1, _, _ in scan:
             if prev is not None and abs(e1 - prev) < 0.01:
                 return min(m, max_m)
             prev = e1
         return max_m
-    for m in range(2, max_m + 1):
-        frac = _fnn_fraction(series, m=m, tau=tau, r_tol=10.0, a_tol=2.0)
+    for m, _, _, frac in scan:
         if frac <= threshold:
             return min(m, max_m)
     return max_m
 
 
+def rolling_tau(
+    series: np.ndarray,
+    window: int,
+    max_lag: int = 20,
+    max_tau: int = 3,
+    step: int = 1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-window ``select_tau(method="ami")`` rule on ``rolling_ami`` curves; returns ``(ends, taus)``."""
+    ends, scores = rolling_ami(series, window=window, max_lag=max_lag, step=step)
+    taus = np.array([first_minimum_lag(row, max_tau) for row in scores], dtype=int)
+    return ends, taus
+
+
 def estimate_embedding_params(
     series: np.ndarray,
     max_tau: int = 20,
@@ -119,16 +226,27 @@ def estimate_embedding_params(
     return m, tau
 
 
-def takens_embed(series: np.ndarray, m: int, tau: int) -> np.ndarray:
-    values = np.asarray(series, dtype=float)
+def delay_embedding(series: np.ndarray, m: int, tau: int, dtype: np.dtype | str | None = None) -> np.ndarray:
+    """Read-only strided ``(n - (m-1)*tau, m)`` delay view of ``series``; column 0 is the newest value.
+
+    No data is copied unless ``dtype`` differs from the input's.
+    """
+    values = np.asarray(series, dtype=dtype or float)
     if values.ndim != 1:
         raise ValueError("series must be 1-D")
-    min_len = (m - 1) * tau + 1
-    if values.size < min_len:
+    span = (m - 1) * tau + 1
+    if values.size < span:
         raise ValueError("series too short for embedding")
-    embed_len = values.size - (m - 1) * tau
-    columns = [
-        values[(m - 1 - lag) * tau : (m - 1 - lag) * tau + embed_len]
-        for lag in range(m)
-    ]
-    return np.column_stack(columns)
+    return sliding_window_view(values, span)[:, ::-tau]
+
+
+def takens_embed(
+    series: np.ndarray,
+    m: int,
+    tau: int,
+    dtype: np.dtype | str | None = None,
+    copy: bool = True,
+) -> np.ndarray:
+    """Takens delay embedding; ``copy=False`` returns the zero-copy ``delay_embedding`` view."""
+    view = delay_embedding(series, m=m, tau=tau, dtype=dtype)
+    return np.ascontiguousarray(view) if copy else view
@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import numpy as np
+from scipy import sparse
 from sklearn.neighbors import NearestNeighbors
 
+from .kernels import transition_counts_kernel
+from .sparse_backend import SmoothedTransitionMatrix
+
 
 def transition_counts(labels: np.ndarray) -> np.ndarray:
-    n = int(labels.max()) + 1
-    counts = np.zeros((n, n), dtype=float)
-    for a, b in zip(labels[:-1], labels[1:]):
-        counts[int(a), int(b)] += 1.0
-    return counts
+    return transition_counts_kernel(labels)
 
 
 def normalize_counts(counts: np.ndarray, alpha: float = 1.0) -> np.ndarray:
+    if sparse.issparse(counts):
+        # Smoothing stays lazy: the dense n x n matrix is never built.
+        return SmoothedTransitionMatrix(counts, alpha=alpha)
     smoothed = counts + alpha
     row_sums = smoothed.sum(axis=1, keepdims=True)
     return smoothed / np.maximum(row_sums, 1e-12)
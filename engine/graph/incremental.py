@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from scipy import sparse
+
+from .core import SPARSE_MIN_STATES, GraphResult, local_divergence
+from .embedding import takens_embed
+from .graph_builder import build_micrograph, knn_edges, normalize_counts, transition_counts
+from .kernels import regime_row_mass
+from .labels import _label_params, _label_point, _median_filter, compute_graph_quality, labels_for_series
+from .metastable import metastable_regimes
+from .microstates import build_microstates
+from .sparse_backend import transition_counts_sparse
+
+
+@dataclass
+class RefitPolicy:
+    """When an incremental state must fall back to a full refit."""
+
+    max_bars: int = 63
+    drift_window: int = 20
+    max_drift: float = 2.0
+
+
+def state_path(root: Path, asset: str, timeframe: str) -> Path:
+    return Path(root) / f"{asset}_{timeframe}.npz"
+
+
+@dataclass
+class GraphEngineState:
+    """Persistable graph-engine state advanced one bar at a time.
+
+    Microstate centroids and metastable regimes are frozen between refits;
+    transition counts, ``p_matrix``, confidence, stretch and the causal label
+    thresholds are refreshed on every appended bar. A full refit runs when the
+    ``RefitPolicy`` detects staleness or quantization drift. With the sparse
+    transition backend the counts stay in CSR form and ``p_matrix`` is the lazy
+    ``SmoothedTransitionMatrix``, as in ``run_graph_engine``.
+    """
+
+    params: dict[str, Any]
+    series: np.ndarray
+    centroids: np.ndarray
+    micro_labels: np.ndarray
+    counts: np.ndarray
+    micro_regime: np.ndarray
+    stretch_raw: np.ndarray
+    frac_raw: np.ndarray
+    state_labels: np.ndarray
+    edges: list[tuple[int, int]]
+    baseline_qerr: float
+    recent_qerr: list[float] = field(default_factory=list)
+    bars_since_refit: int = 0
+    refit_count: int = 0
+    last_refit_reason: str = "fit"
+    policy: RefitPolicy = field(default_factory=RefitPolicy)
+    p_matrix: np.ndarray = field(init=False)
+    confidence: np.ndarray = field(init=False)
+    quality: dict[str, float] = field(init=False)
+    thresholds: dict[str, float] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.p_matrix = normalize_counts(self.counts, alpha=float(self.params["alpha"]))
+        if sparse.issparse(self.counts):
+            self._row_mass = self.p_matrix.regime_row_mass(self.micro_regime)
+        else:
+            self._row_mass = regime_row_mass(self.p_matrix, self.micro_regime)
+        self.confidence = self._row_mass[self.micro_labels]
+        self._occupancy = np.bincount(self.micro_labels, minlength=int(self.params["n_micro"])).astype(float)
+        self.quality = self._compute_quality()
+        self.thresholds = self._tail_thresholds()
+
+    @classmethod
+    def fit(
+        cls,
+        series: np.ndarray,
+        m: int = 3,
+        tau: int = 1,
+        n_micro: int = 200,
+        micro_method: str = "kmeans",
+        micro_params: dict | None = None,
+        n_regimes: int = 4,
+        k_nn: int = 5,
+        theiler: int = 10,
+        alpha: float = 2.0,
+        seed: int = 7,
+        method: str = "spectral",
+        timeframe: str = "daily",
+        policy: RefitPolicy | None = None,
+        transition_backend: str = "dense",
+        dtype: str = "float64",
+        sizing: dict[str, Any] | None = None,
+    ) -> "GraphEngineState":
+        """Fit on ``series``. ``sizing`` records the caller's request behind ``n_micro``/``k_nn`` (stored, not used)."""
+        params = {
+            "m": int(m),
+            "tau": int(tau),
+            "n_micro": int(n_micro),
+            "micro_method": micro_method,
+            "micro_params": micro_params,
+            "n_regimes": int(n_regimes),
+            "k_nn": int(k_nn),
+            "theiler": int(theiler),
+            "alpha": float(alpha),
+            "seed": int(seed),
+            "method": method,
+            "timeframe": timeframe,
+            "transition_backend": str(transition_backend),
+            "dtype": str(dtype),
+        }
+        if sizing is not None:
+            params["sizing"] = dict(sizing)
+        return cls._build(np.asarray(series, dtype=float), params, policy or RefitPolicy())
+
+    @classmethod
+    def _build(
+        cls,
+        series: np.ndarray,
+        params: dict[str, Any],
+        policy: RefitPolicy,
+        refit_count: int = 0,
+        reason: str = "fit",
+    ) -> "GraphEngineState":
+        embedding = takens_embed(series, m=params["m"], tau=params["tau"], dtype=params.get("dtype"))
+        micro_labels, centroids = build_microstates(
+            embedding,
+            n_micro=params["n_micro"],
+            seed=params["seed"],
+            method=params["micro_method"],
+            cluster_params=params["micro_params"],
+        )
+        n_states = max(len(centroids), int(micro_labels.max()) + 1)
+        backend = params.get("transition_backend", "dense")
+        if backend == "auto":
+            backend = "sparse" if int(params["n_micro"]) >= SPARSE_MIN_STATES else "dense"
+        if backend == "sparse":
+            counts = transition_counts_sparse(micro_labels, n_states)
+        else:
+            counts = np.zeros((n_states, n_states), dtype=float)
+            base = transition_counts(micro_labels)
+            counts[: base.shape[0], : base.shape[1]] = base
+        p_matrix = normalize_counts(counts, alpha=params["alpha"])
+        micro_regime = metastable_regimes(p_matrix, n_regimes=params["n_regimes"], seed=params["seed"], method=params["method"])
+        stretch_raw, frac_raw = local_divergence(embedding, theiler=params["theiler"])
+        qerr = np.linalg.norm(embedding - centroids[micro_labels], axis=1)
+        edges = knn_edges(centroids, k=params["k_nn"])
+        state = cls(
+            params=params,
+            series=series,
+            centroids=np.asarray(centroids, dtype=float),
+            micro_labels=np.asarray(micro_labels, dtype=int),
+            counts=counts,
+            micro_regime=np.asarray(micro_regime, dtype=int),
+            stretch_raw=stretch_raw,
+            frac_raw=frac_raw,
+            state_labels=np.array([], dtype=str),
+            edges=[(int(a), int(b)) for a, b in edges],
+            baseline_qerr=float(np.median(qerr)) if qerr.size else 0.0,
+            refit_count=refit_count,
+            last_refit_reason=reason,
+            policy=policy,
+        )
+        stretch_mu, frac_pos = state._stretch_arrays()
+        state.state_labels, state.thresholds = labels_for_series(
+            state.confidence,
+            stretch_mu,
+            frac_pos,
+            quality_score=state.quality["score"],
+            timeframe=params["timeframe"],
+        )
+        return state
+
+    @property
+    def stretch_mu(self) -> np.ndarray:
+        return self._stretch_arrays()[0]
+
+    @property
+    def stretch_frac_pos(self) -> np.ndarray:
+        return self._stretch_arrays()[1]
+
+    def _stretch_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        stretch = self.stretch_raw
+        if stretch.size > 0:
+            lo = float(np.quantile(stretch, 0.05))
+            hi = float(np.quantile(stretch, 0.95))
+            stretch = np.clip(stretch, lo, hi)
+        return np.pad(stretch, (0, 1), mode="edge"), np.pad(self.frac_raw, (0, 1), mode="edge")
+
+    def _compute_quality(self) -> dict[str, float]:
+        return compute_graph_quality(
+            int(self.params["n_micro"]),
+            self.edges,
+            self._occupancy,
+            self.p_matrix,
+            {"n_points": float(len(self.micro_labels))},
+        )
+
+    def _tail_thresholds(self) -> dict[str, float]:
+        """Causal thresholds at the last bar, from the trailing label window only."""
+        cfg = _label_params(self.params["timeframe"])
+        window = int(cfg["window"])
+        stretch_mu, frac_pos = self._stretch_arrays()
+        conf_tail = self.confidence[-(window + 2) :]
+        conf_smoothed = _median_filter(conf_tail, window=5)
+        if conf_tail.size == window + 2:
+            conf_smoothed = conf_smoothed[2:]
+        escape = 1.0 - conf_smoothed
+        stretch_tail = stretch_mu[-window:]
+        frac_tail = frac_pos[-window:]
+        self._conf_smoothed_last = float(conf_smoothed[-1])
+        return {
+            "escape_lo": float(np.quantile(escape, cfg["escape_lo_q"])),
+            "escape_hi": float(np.quantile(escape, 0.80)),
+            "stretch_lo": float(np.quantile(stretch_tail, cfg["stretch_lo_q"])),
+            "stretch_hi": float(np.quantile(stretch_tail, 0.75)),
+            "frac_hi": float(np.quantile(frac_tail, 0.75)),
+            "conf_lo": float(np.quantile(conf_smoothed, 0.35)),
+            "conf_hi": float(np.quantile(conf_smoothed, cfg["conf_hi_q"])),
+        }
+
+    def _append_bar(self, value: float) -> str:
+        m, tau, theiler = self.params["m"], self.params["tau"], self.params["theiler"]
+        alpha = float(self.params["alpha"])
+        n_old = len(self.micro_labels)
+        self.series = np.append(self.series, float(value))
+
+        point = self.series[-1 - np.arange(m) * tau]
+        dist2 = np.sum((self.centroids - point) ** 2, axis=1)
+        label = int(np.argmin(dist2))
+        self.recent_qerr.append(float(np.sqrt(dist2[label])))
+        self.recent_qerr = self.recent_qerr[-max(1, self.policy.drift_window) :]
+
+        prev = int(self.micro_labels[-1])
+        same = self.micro_regime == self.micro_regime[prev]
+        if sparse.issparse(self.counts):
+            self.counts = self.counts + sparse.csr_matrix(([1.0], ([prev], [label])), shape=self.counts.shape)
+            self.p_matrix = normalize_counts(self.counts, alpha=alpha)
+            start, end = self.counts.indptr[prev], self.counts.indptr[prev + 1]
+            inside = same[self.counts.indices[start:end]]
+            mass = float(self.counts.data[start:end][inside].sum()) + alpha * float(same.sum())
+            self._row_mass[prev] = mass / self.p_matrix.row_sums[prev]
+        else:
+            self.counts[prev, label] += 1.0
+            row = self.counts[prev] + alpha
+            self.p_matrix[prev] = row / max(row.sum(), 1e-12)
+            self._row_mass[prev] = self.p_matrix[prev, same].sum()
+        self.micro_labels = np.append(self.micro_labels, label)
+        if label < self._occupancy.size:
+            self._occupancy[label] += 1.0
+        self.confidence = self._row_mass[self.micro_labels]
+
+        # Only the last theiler+1 divergence terms see the series end; recompute those.
+        g0 = max(0, n_old - 2 - theiler)
+        n_rows = n_old + 1 - g0
+        tail = takens_embed(self.series[-(n_rows + (m - 1) * tau) :], m=m, tau=tau, copy=False)
+        stretch_tail, frac_tail = local_divergence(tail, theiler=theiler)
+        self.stretch_raw = np.concatenate([self.stretch_raw[:g0], stretch_tail])
+        self.frac_raw = np.concatenate([self.frac_raw[:g0], frac_tail])
+
+        self.quality = self._compute_quality()
+        self.thresholds = self._tail_thresholds()
+        stretch_mu, frac_pos = self._stretch_arrays()
+        state = _label_point(
+            self._conf_smoothed_last,
+            float(stretch_mu[-1]),
+            float(frac_pos[-1]),
+            self.thresholds,
+            self.quality["score"],
+        )
+        self.state_labels = np.append(self.state_labels, state)
+        self.bars_since_refit += 1
+        return state
+
+    def refit_reason(self) -> str | None:
+        policy = self.policy
+        if policy.max_bars > 0 and self.bars_since_refit >= policy.max_bars:
+            return "stale"
+        if len(self.recent_qerr) >= max(1, policy.drift_window) and self.baseline_qerr > 0:
+            drift = float(np.median(self.recent_qerr)) / self.baseline_qerr
+            if drift > policy.max_drift:
+                return "drift"
+        return None
+
+    def refit(self, reason: str = "manual") -> None:
+        fresh = self._build(self.series, self.params, self.policy, refit_count=self.refit_count + 1, reason=reason)
+        self.__dict__.update(fresh.__dict__)
+
+    def update(self, new_values: np.ndarray) -> np.ndarray:
+        """Append new bars and return their state labels."""
+        values = np.atleast_1d(np.asarray(new_values, dtype=float))
+        values = values[np.isfinite(values)]
+        out = [self._append_bar(float(v)) for v in values]
+        reason = self.refit_reason()
+        if reason is not None:
+            self.refit(reason=reason)
+            if out:
+                out = self.state_labels[-len(out) :].tolist()
+        return np.asarray(out)
+
+    def to_result(self) -> GraphResult:
+        stretch_mu, frac_pos = self._stretch_arrays()
+        if sparse.issparse(self.counts):
+            p_matrix = normalize_counts(self.counts.copy(), alpha=float(self.params["alpha"]))
+        else:
+            p_matrix = self.p_matrix.copy()
+        return GraphResult(
+            embedding=takens_embed(self.series, m=self.params["m"], tau=self.params["tau"], dtype=self.params.get("dtype")),
+            micro_labels=self.micro_labels.copy(),
+            centroids=self.centroids.copy(),
+            p_matrix=p_matrix,
+            micro_regime=self.micro_regime.copy(),
+            confidence=self.confidence.copy(),
+            stretch_mu=stretch_mu,
+            stretch_frac_pos=frac_pos,
+            state_labels=self.state_labels.copy(),
+            micrograph=build_micrograph(self.centroids, self.edges),
+            quality=dict(self.quality),
+            thresholds=dict(self.thresholds),
+            multilayer=None,
+        )
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "params": self.params,
+            "edges": self.edges,
+            "baseline_qerr": self.baseline_qerr,
+            "bars_since_refit": self.bars_since_refit,
+            "refit_count": self.refit_count,
+            "last_refit_reason": self.last_refit_reason,
+            "policy": {
+                "max_bars": self.policy.max_bars,
+                "drift_window": self.policy.drift_window,
+                "max_drift": self.policy.max_drift,
+            },
+        }
+        if sparse.issparse(self.counts):
+            csr = self.counts.tocsr()
+            counts = {
+                "counts_data": csr.data,
+                "counts_indices": csr.indices,
+                "counts_indptr": csr.indptr,
+                "counts_shape": np.asarray(csr.shape),
+            }
+        else:
+            counts = {"counts": self.counts}
+        with path.open("wb") as handle:
+            np.savez_compressed(
+                handle,
+                series=self.series,
+                centroids=self.centroids,
+                micro_labels=self.micro_labels,
+                **counts,
+                micro_regime=self.micro_regime,
+                stretch_raw=self.stretch_raw,
+                frac_raw=self.frac_raw,
+                state_labels=self.state_labels.astype(str),
+                recent_qerr=np.asarray(self.recent_qerr, dtype=float),
+                meta=np.array(json.dumps(meta)),
+            )
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "GraphEngineState":
+        with np.load(Path(path), allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if "counts_indptr" in data.files:
+                counts = sparse.csr_matrix(
+                    (data["counts_data"], data["counts_indices"], data["counts_indptr"]),
+                    shape=tuple(int(v) for v in data["counts_shape"]),
+                )
+            else:
+                counts = data["counts"]
+            return cls(
+                params=meta["params"],
+                series=data["series"],
+                centroids=data["centroids"],
+                micro_labels=data["micro_labels"].astype(int),
+                counts=counts,
+                micro_regime=data["micro_regime"].astype(int),
+                stretch_raw=data["stretch_raw"],
+                frac_raw=data["frac_raw"],
+                state_labels=data["state_labels"],
+                edges=[(int(a), int(b)) for a, b in meta["edges"]],
+                baseline_qerr=float(meta["baseline_qerr"]),
+                recent_qerr=data["recent_qerr"].tolist(),
+                bars_since_refit=int(meta["bars_since_refit"]),
+                refit_count=int(meta["refit_count"]),
+                last_refit_reason=str(meta["last_refit_reason"]),
+                policy=RefitPolicy(**meta["policy"]),
+            )
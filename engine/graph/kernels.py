@@ -0,0 +1,116 @@
+"""Array-native kernels for the graph engine's per-point loops.
+
+Each kernel reproduces the reference loop exactly (same reductions in the same
+order), so labels computed from them are bit-identical to the loop versions.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+STATE_NAMES = np.array(["STABLE", "TRANSITION", "UNSTABLE", "NOISY"])
+_STABLE, _TRANSITION, _UNSTABLE, _NOISY = range(4)
+
+
+def _row_norms(diff: np.ndarray) -> np.ndarray:
+    # np.linalg.norm on a 1-D float vector is sqrt(dot(x, x)); a batched matmul
+    # keeps that exact reduction (einsum/sum(axis=1) round differently).
+    return np.sqrt(np.matmul(diff[:, None, :], diff[:, :, None]).reshape(-1))
+
+
+def local_divergence_kernel(embedded: np.ndarray, theiler: int = 10) -> tuple[np.ndarray, np.ndarray]:
+    emb = np.asarray(embedded)
+    n = emb.shape[0]
+    if n < 2:
+        return np.zeros(0), np.zeros(0)
+    i = np.arange(n - 1)
+    k = np.minimum(n - 1, i + theiler)
+    kn = np.minimum(n - 1, k + 1)
+    d0 = _row_norms(emb[i] - emb[k]) + 1e-8
+    d1 = _row_norms(emb[i + 1] - emb[kn]) + 1e-8
+    stretch = np.log(d1 / d0)
+    frac_pos = (stretch > 0).astype(float)
+    return stretch, frac_pos
+
+
+def transition_counts_kernel(labels: np.ndarray, n_states: int | None = None) -> np.ndarray:
+    lab = np.asarray(labels, dtype=np.int64)
+    n = int(lab.max()) + 1 if n_states is None else int(n_states)
+    if lab.size < 2:
+        return np.zeros((n, n), dtype=float)
+    codes = lab[:-1] * n + lab[1:]
+    return np.bincount(codes, minlength=n * n).reshape(n, n).astype(float)
+
+
+def regime_row_mass(p_matrix: np.ndarray, micro_regime: np.ndarray) -> np.ndarray:
+    """Probability mass each microstate keeps inside its own metastable regime."""
+    regime = np.asarray(micro_regime)
+    out = np.zeros(p_matrix.shape[0], dtype=float)
+    for r in np.unique(regime):
+        mask = regime == r
+        out[mask] = p_matrix[np.ix_(mask, mask)].sum(axis=1)
+    return out
+
+
+def confidence_kernel(p_matrix: np.ndarray, micro_regime: np.ndarray, micro_labels: np.ndarray) -> np.ndarray:
+    labels = np.asarray(micro_labels, dtype=int)
+    if labels.size == 0:
+        return np.zeros(0, dtype=float)
+    return regime_row_mass(p_matrix, micro_regime)[labels]
+
+
+def median_filter_kernel(values: np.ndarray, window: int) -> np.ndarray:
+    vals = np.asarray(values)
+    if window <= 1 or len(vals) == 0:
+        return vals
+    half = window // 2
+    n = len(vals)
+    out = np.empty(n, dtype=float)
+    full = 2 * half + 1
+    if n >= full:
+        out[half : n - half] = np.median(sliding_window_view(vals, full), axis=1)
+        edges = list(range(half)) + list(range(n - half, n))
+    else:
+        edges = list(range(n))
+    for i in edges:
+        lo = max(0, i - half)
+        hi = min(n, i + half + 1)
+        out[i] = float(np.median(vals[lo:hi]))
+    return out
+
+
+def state_codes(
+    conf: np.ndarray,
+    stretch_mu: np.ndarray,
+    frac_pos: np.ndarray,
+    thresholds: dict[str, np.ndarray],
+    quality_score: float,
+    noisy_threshold: float = 0.3,
+) -> np.ndarray:
+    """Vectorized ``_label_point``: one state code per point (index into ``STATE_NAMES``)."""
+    c = np.asarray(conf, dtype=float)
+    s = np.asarray(stretch_mu, dtype=float)
+    f = np.asarray(frac_pos, dtype=float)
+    if quality_score < noisy_threshold:
+        return np.full(c.shape, _NOISY, dtype=np.int8)
+    escape = 1.0 - c
+    escape_hi = escape >= thresholds["escape_hi"]
+    low_conf = c < thresholds["conf_lo"]
+    unstable = escape_hi & ((f >= thresholds["frac_hi"]) | (s >= thresholds["stretch_hi"]))
+    stable = (escape <= thresholds["escape_lo"]) & (s <= thresholds["stretch_lo"])
+    return np.select(
+        [low_conf & escape_hi, low_conf, unstable, stable],
+        [_UNSTABLE, _TRANSITION, _UNSTABLE, _STABLE],
+        default=_TRANSITION,
+    ).astype(np.int8)
+
+
+def state_names(codes: np.ndarray) -> np.ndarray:
+    """Map state codes to a string array typed like ``np.asarray(list_of_labels)``."""
+    codes = np.asarray(codes, dtype=np.int8)
+    if codes.size == 0:
+        return np.asarray([])
+    present = np.unique(codes)
+    width = max(len(STATE_NAMES[c]) for c in present)
+    return STATE_NAMES[codes].astype(f"<U{width}")
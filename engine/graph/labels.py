@@ -5,13 +5,14 @@ from collections import defaultdict, deque
 import numpy as np
 import pandas as pd
 
+from .kernels import confidence_kernel, median_filter_kernel, state_codes, state_names
+from .sparse_backend import SmoothedTransitionMatrix
+
 
 def compute_confidence(p_matrix: np.ndarray, micro_regime: np.ndarray, micro_labels: np.ndarray) -> np.ndarray:
-    conf = np.zeros_like(micro_labels, dtype=float)
-    for i, state in enumerate(micro_labels):
-        same = micro_regime == micro_regime[state]
-        conf[i] = p_matrix[state, same].sum()
-    return conf
+    if isinstance(p_matrix, SmoothedTransitionMatrix):
+        return p_matrix.regime_row_mass(micro_regime)[np.asarray(micro_labels, dtype=int)]
+    return confidence_kernel(p_matrix, micro_regime, micro_labels)
 
 
 def _largest_component_ratio(n_nodes: int, edges: list[tuple[int, int]]) -> float:
@@ -89,15 +90,20 @@ def compute_graph_quality(
     max_edges = n_nodes * (n_nodes - 1) / 2 if n_nodes > 1 else 1
     graph_density = float(len(edge_set) / max_edges)
 
-    if p_matrix.size:
-        active = np.count_nonzero(p_matrix > 0) - p_matrix.shape[0]
-        active_edges = max(active, 0)
-        active_edge_frac = float(active_edges / max(1, p_matrix.shape[0] * (p_matrix.shape[0] - 1)))
+    if isinstance(p_matrix, SmoothedTransitionMatrix):
+        active_edge_frac = p_matrix.active_edge_frac() if p_matrix.size else 0.0
+        pi = p_matrix.stationary_distribution()
+        entropy_rate = p_matrix.entropy_rate(pi)
     else:
-        active_edge_frac = 0.0
+        if p_matrix.size:
+            active = np.count_nonzero(p_matrix > 0) - p_matrix.shape[0]
+            active_edges = max(active, 0)
+            active_edge_frac = float(active_edges / max(1, p_matrix.shape[0] * (p_matrix.shape[0] - 1)))
+        else:
+            active_edge_frac = 0.0
 
-    pi = _stationary_distribution(p_matrix)
-    entropy_rate = _entropy_rate(p_matrix, pi)
+        pi = _stationary_distribution(p_matrix)
+        entropy_rate = _entropy_rate(p_matrix, pi)
 
     quality = 0.35 * lcc_ratio + 0.2 * (1.0 - deg_low_frac) + 0.2 * entropy_norm + 0.15 * coverage + 0.1 * graph_density
     quality = float(np.clip(quality, 0.0, 1.0))
@@ -115,15 +121,7 @@ def compute_graph_quality(
 
 
 def _median_filter(values: np.ndarray, window: int) -> np.ndarray:
-    if window <= 1 or len(values) == 0:
-        return values
-    half = window // 2
-    out = np.empty_like(values, dtype=float)
-    for i in range(len(values)):
-        lo = max(0, i - half)
-        hi = min(len(values), i + half + 1)
-        out[i] = float(np.median(values[lo:hi]))
-    return out
+    return median_filter_kernel(values, window)
 
 
 def _hmm_smooth_labels(labels: list[str], noise: float = 0.05) -> list[str]:
@@ -214,6 +212,31 @@ def label_state(conf: float, stretch_mu: float, escape: float, frac_pos: float,
     return "TRANSITION"
 
 
+def _label_params(timeframe: str) -> dict[str, float]:
+    """Quantile levels and rolling window used by the causal state thresholds."""
+    if timeframe == "daily":
+        return {"escape_lo_q": 0.50, "stretch_lo_q": 0.40, "conf_hi_q": 0.60, "window": 252}
+    return {"escape_lo_q": 0.45, "stretch_lo_q": 0.35, "conf_hi_q": 0.70, "window": 104}
+
+
+def _label_point(
+    c_val: float,
+    stretch_mu: float,
+    frac_pos: float,
+    thresholds: dict[str, float],
+    quality_score: float,
+    noisy_threshold: float = 0.3,
+) -> str:
+    if quality_score < noisy_threshold:
+        return "NOISY"
+    if c_val < thresholds["conf_lo"]:
+        # Low confidence -> avoid STABLE classification.
+        if (1.0 - c_val) >= thresholds["escape_hi"]:
+            return "UNSTABLE"
+        return "TRANSITION"
+    return label_state(c_val, stretch_mu, float(1.0 - c_val), frac_pos, thresholds)
+
+
 def labels_for_series(
     conf: np.ndarray,
     stretch_mu: np.ndarray,
@@ -226,16 +249,11 @@ def labels_for_series(
 ) -> tuple[np.ndarray, dict[str, float]]:
     conf_smoothed = _median_filter(conf, window=5)
     escape = 1.0 - conf_smoothed
-    if timeframe == "daily":
-        escape_lo_q = 0.50
-        stretch_lo_q = 0.40
-        conf_hi_q = 0.60
-        window = 252
-    else:
-        escape_lo_q = 0.45
-        stretch_lo_q = 0.35
-        conf_hi_q = 0.70
-        window = 104
+    params = _label_params(timeframe)
+    escape_lo_q = params["escape_lo_q"]
+    stretch_lo_q = params["stretch_lo_q"]
+    conf_hi_q = params["conf_hi_q"]
+    window = int(params["window"])
     min_periods = max(20, window // 8)
 
     thr_escape_lo = _causal_quantile(escape, escape_lo_q, window=window, min_periods=min_periods)
@@ -246,29 +264,22 @@ def labels_for_series(
     thr_conf_lo = _causal_quantile(conf_smoothed, 0.35, window=window, min_periods=min_periods)
     thr_conf_hi = _causal_quantile(conf_smoothed, conf_hi_q, window=window, min_periods=min_periods)
 
-    labels = []
-    for i, (c, s, f) in enumerate(zip(conf_smoothed, stretch_mu, stretch_frac_pos)):
-        thresholds_i = {
-            "escape_lo": float(thr_escape_lo[i]),
-            "escape_hi": float(thr_escape_hi[i]),
-            "stretch_lo": float(thr_stretch_lo[i]),
-            "stretch_hi": float(thr_stretch_hi[i]),
-            "frac_hi": float(thr_frac_hi[i]),
-            "conf_lo": float(thr_conf_lo[i]),
-            "conf_hi": float(thr_conf_hi[i]),
-        }
-        if quality_score < noisy_threshold:
-            labels.append("NOISY")
-        else:
-            c_val = float(c)
-            if c_val < thresholds_i["conf_lo"]:
-                # Low confidence -> avoid STABLE classification.
-                if (1.0 - c_val) >= thresholds_i["escape_hi"]:
-                    labels.append("UNSTABLE")
-                else:
-                    labels.append("TRANSITION")
-            else:
-                labels.append(label_state(c_val, float(s), float(1.0 - c_val), float(f), thresholds_i))
+    codes = state_codes(
+        conf_smoothed,
+        stretch_mu,
+        stretch_frac_pos,
+        {
+            "escape_lo": thr_escape_lo,
+            "escape_hi": thr_escape_hi,
+            "stretch_lo": thr_stretch_lo,
+            "stretch_hi": thr_stretch_hi,
+            "frac_hi": thr_frac_hi,
+            "conf_lo": thr_conf_lo,
+        },
+        quality_score=quality_score,
+        noisy_threshold=noisy_threshold,
+    )
+    labels = state_names(codes)
 
     thresholds = {
         "escape_lo": float(thr_escape_lo[-1]) if thr_escape_lo.size else 0.0,
@@ -280,5 +291,5 @@ def labels_for_series(
         "conf_hi": float(thr_conf_hi[-1]) if thr_conf_hi.size else 0.0,
     }
     if smooth_method == "hmm":
-        labels = _hmm_smooth_labels(labels, noise=smooth_noise)
-    return np.asarray(labels), thresholds
+        labels = np.asarray(_hmm_smooth_labels(labels.tolist(), noise=smooth_noise))
+    return labels, thresholds
@@ -3,6 +3,8 @@ from __future__ import annotations
 import numpy as np
 from sklearn.cluster import KMeans, SpectralClustering
 
+from .sparse_backend import SmoothedTransitionMatrix, metastable_regimes_sparse
+
 
 def _pcca_like(p_matrix: np.ndarray, n_regimes: int, seed: int) -> np.ndarray:
     # Simple PCCA-like approach: cluster dominant eigenvectors of P.
@@ -26,6 +28,8 @@ def metastable_regimes(
         return np.zeros(n, dtype=int)
     if n_regimes > n:
         n_regimes = n
+    if isinstance(p_matrix, SmoothedTransitionMatrix):
+        return metastable_regimes_sparse(p_matrix, n_regimes=n_regimes, seed=seed, method=method)
     affinity = (p_matrix + p_matrix.T) / 2.0
     if method == "pcca":
         return _pcca_like(p_matrix, n_regimes=n_regimes, seed=seed)
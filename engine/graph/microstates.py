@@ -18,7 +18,7 @@ def _remap_labels(labels: np.ndarray) -> tuple[np.ndarray, dict[int, int]]:
 
 
 def _centroids_from_labels(embedded: np.ndarray, labels: np.ndarray, n_clusters: int) -> np.ndarray:
-    centroids = np.zeros((n_clusters, embedded.shape[1]), dtype=float)
+    centroids = np.zeros((n_clusters, embedded.shape[1]), dtype=embedded.dtype)
     for k in range(n_clusters):
         mask = labels == k
         if not np.any(mask):
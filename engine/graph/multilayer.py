@@ -4,8 +4,11 @@ from dataclasses import dataclass
 from typing import Any, Dict, Tuple
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 from engine.graph.embedding import estimate_embedding_params, takens_embed
+from engine.graph.rolling import cusum_abs, rolling_std
+from engine.graph.streaming import WarmStartGMM1D, robust_z_online
 
 try:
     from sklearn.mixture import GaussianMixture
@@ -31,20 +34,23 @@ class MultilayerConfig:
     vol_alert_z: float = 2.2
     cusum_alert_z: float = 2.2
     hmm_alert_z: float = 1.8
+    # "refit" = cold GaussianMixture per window; "online" = warm-started EM (WarmStartGMM1D).
+    hmm_mode: str = "refit"
+    hmm_em_iters: int = 3
+    # 0 = use ``step``; online mode is cheap enough for 1.
+    hmm_step: int = 0
+    # Online mode only: slide EM sufficient statistics between full refits.
+    hmm_sufficient_stats: bool = False
+    # Online mode only: bars between cold EM restarts (0 = warm start throughout).
+    hmm_restart_every: int = 10
+    # Emit layer 2/3 subspace metrics at every bar instead of every ``step``.
+    subspace_every_bar: bool = False
+    # Bars between exact Gram recomputes in the sliding Hankel tracker.
+    gram_refresh: int = 256
 
 
 def _robust_z_online(values: np.ndarray, min_points: int = 25, eps: float = 1e-9) -> np.ndarray:
-    out = np.full(values.shape, np.nan, dtype=float)
-    for i in range(values.size):
-        x = values[: i + 1]
-        x = x[np.isfinite(x)]
-        if x.size < min_points:
-            continue
-        med = float(np.median(x))
-        mad = float(np.median(np.abs(x - med)))
-        scale = 1.4826 * mad + eps
-        out[i] = (values[i] - med) / scale
-    return out
+    return robust_z_online(values, min_points=min_points, eps=eps)
 
 
 def _safe_returns(series: np.ndarray) -> np.ndarray:
@@ -136,33 +142,119 @@ def _subspace_metrics(
     }
 
 
-def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
-    out = np.full(values.shape, np.nan, dtype=float)
-    if values.size < window:
+def _hankel_grams(values: np.ndarray, L: int, width: int, ends: np.ndarray, refresh: int = 256) -> np.ndarray:
+    """``X @ X.T`` of ``_hankel(values[e - width + 1 : e + 1], L)`` for each ``e`` in ``ends``.
+
+    Consecutive windows share all but one Hankel column, so the Gram matrix is
+    slid with a rank-one add/remove per bar (a cumulative sum of outer-product
+    deltas) and recomputed exactly every ``refresh`` bars to bound round-off.
+    """
+    out = np.empty((ends.size, L, L), dtype=float)
+    if ends.size == 0:
         return out
-    for i in range(window - 1, values.size):
-        seg = values[i - window + 1 : i + 1]
-        out[i] = float(np.std(seg))
+    cols = sliding_window_view(values, L)
+    k = width - L + 1
+    first = int(ends[0])
+    bars = np.arange(first, int(ends[-1]) + 1)
+    n_blocks = -(-bars.size // refresh)
+    grams = np.zeros((n_blocks * refresh, L, L), dtype=float)
+    new = cols[bars - L + 1]
+    old = cols[np.maximum(bars - width, 0)]
+    grams[: bars.size] = new[:, :, None] * new[:, None, :] - old[:, :, None] * old[:, None, :]
+    for b in range(n_blocks):
+        lo = first + b * refresh - width + 1
+        block = cols[lo : lo + k]
+        grams[b * refresh] = block.T @ block
+    grams = np.cumsum(grams.reshape(n_blocks, refresh, L, L), axis=1).reshape(-1, L, L)
+    out[:] = grams[ends - first]
     return out
 
 
-def _cusum_abs(values: np.ndarray, window: int) -> np.ndarray:
-    out = np.full(values.shape, np.nan, dtype=float)
-    if values.size < window:
+def _gram_svals(grams: np.ndarray) -> np.ndarray:
+    # Singular values of X from eig(X X^T), descending.
+    return np.sqrt(np.clip(np.linalg.eigvalsh(grams)[:, ::-1], 0.0, None))
+
+
+def _gram_top_vectors(grams: np.ndarray, svals: np.ndarray, r: int) -> np.ndarray:
+    """Leading ``r`` left singular vectors of X from its Gram matrices, shape ``(n, L, r)``."""
+    if r > 1:
+        return np.linalg.eigh(grams)[1][:, :, ::-1][:, :, :r]
+    # Rank one: inverse iteration at the (known) top eigenvalue converges in a step or two.
+    lam = svals[:, 0] ** 2
+    shift = lam + 1e-10 * np.maximum(lam, 1e-300)
+    shifted = grams - shift[:, None, None] * np.eye(grams.shape[1])
+    try:
+        v = np.ones(grams.shape[:2], dtype=float)
+        for _ in range(2):
+            v = np.linalg.solve(shifted, v[:, :, None])[:, :, 0]
+            v /= np.linalg.norm(v, axis=1, keepdims=True)
+    except np.linalg.LinAlgError:
+        return np.linalg.eigh(grams)[1][:, :, -1:]
+    if not np.all(np.isfinite(v)):
+        return np.linalg.eigh(grams)[1][:, :, -1:]
+    return v[:, :, None]
+
+
+def _gd_rank_batch(svals: np.ndarray, beta: float) -> Tuple[np.ndarray, np.ndarray]:
+    tau = _omega_gd(beta) * np.median(svals, axis=1)
+    rank = np.clip(np.sum(svals >= tau[:, None], axis=1), 1, svals.shape[1])
+    return rank, tau
+
+
+def _subspace_metrics_batch(
+    values: np.ndarray,
+    ends: np.ndarray,
+    w_ref: int,
+    w_cur: int,
+    l_ref: int,
+    l_cur: int,
+    refresh: int = 256,
+) -> Dict[str, np.ndarray]:
+    """``_subspace_metrics`` for the ref/cur windows ending at each ``t`` in ``ends``."""
+    keys = ("d_proj", "d_geo", "gap_cur", "rank_ref", "rank_cur", "tau_ref", "tau_cur")
+    out = {key: np.full(ends.size, np.nan, dtype=float) for key in keys}
+    if ends.size == 0 or w_ref < l_ref + 2 or w_cur < l_cur + 2:
         return out
-    mu = np.full(values.shape, np.nan, dtype=float)
-    for i in range(window - 1, values.size):
-        mu[i] = float(np.mean(values[i - window + 1 : i + 1]))
-    pos = 0.0
-    neg = 0.0
-    for i, v in enumerate(values):
-        m = mu[i] if np.isfinite(mu[i]) else 0.0
-        pos = max(0.0, pos + (v - m))
-        neg = max(0.0, neg - (v - m))
-        out[i] = pos + neg
+
+    g_ref = _hankel_grams(values, l_ref, w_ref, ends - w_cur, refresh=refresh)
+    g_cur = _hankel_grams(values, l_cur, w_cur, ends, refresh=refresh)
+    sr = _gram_svals(g_ref)
+    sc = _gram_svals(g_cur)
+    rr, tau_r = _gd_rank_batch(sr, beta=min(l_ref / (w_ref - l_ref + 1), 1.0))
+    rc, tau_c = _gd_rank_batch(sc, beta=min(l_cur / (w_cur - l_cur + 1), 1.0))
+
+    r_all = np.minimum(rr, rc)
+    for r in np.unique(r_all).tolist():
+        sel = np.where(r_all == r)[0]
+        ur = _gram_top_vectors(g_ref[sel], sr[sel], r)
+        uc = _gram_top_vectors(g_cur[sel], sc[sel], r)
+        g = np.clip(np.linalg.svd(np.matmul(ur.transpose(0, 2, 1), uc), compute_uv=False), -1.0, 1.0)
+        out["d_proj"][sel] = np.sqrt(np.maximum(0.0, r - np.sum(g**2, axis=1)))
+        out["d_geo"][sel] = np.sqrt(np.sum(np.arccos(g) ** 2, axis=1))
+
+    out["gap_cur"] = sc[:, 0] / np.maximum(sc[:, 1], 1e-9) if sc.shape[1] > 1 else np.ones(ends.size)
+    out["rank_ref"] = rr.astype(float)
+    out["rank_cur"] = rc.astype(float)
+    out["tau_ref"] = tau_r
+    out["tau_cur"] = tau_c
     return out
 
 
+def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    return rolling_std(values, window)
+
+
+def _cusum_abs(values: np.ndarray, window: int) -> np.ndarray:
+    return cusum_abs(values, window)
+
+
+def _switch_entropy_score(probs: np.ndarray) -> float:
+    states = np.argmax(probs, axis=1)
+    switch_rate = float(np.mean(states[1:] != states[:-1])) if states.size > 1 else 0.0
+    entropy = float(-np.mean(np.sum(probs * np.log(probs + 1e-12), axis=1)))
+    return switch_rate + entropy
+
+
 def _hmm_auditor(values: np.ndarray, window: int, step: int) -> np.ndarray:
     out = np.full(values.shape, np.nan, dtype=float)
     if values.size < window or GaussianMixture is None:
@@ -173,16 +265,75 @@ def _hmm_auditor(values: np.ndarray, window: int, step: int) -> np.ndarray:
         try:
             gmm = GaussianMixture(n_components=2, covariance_type="full", random_state=7)
             gmm.fit(X)
-            probs = gmm.predict_proba(X)
-            states = np.argmax(probs, axis=1)
-            switch_rate = float(np.mean(states[1:] != states[:-1])) if states.size > 1 else 0.0
-            entropy = float(-np.mean(np.sum(probs * np.log(probs + 1e-12), axis=1)))
-            out[i] = switch_rate + entropy
+            out[i] = _switch_entropy_score(gmm.predict_proba(X))
         except Exception:
             out[i] = np.nan
     return out
 
 
+def _hmm_auditor_online(
+    values: np.ndarray,
+    window: int,
+    step: int,
+    em_iters: int = 3,
+    sufficient_stats: bool = False,
+    restart_every: int = 10,
+) -> np.ndarray:
+    """``_hmm_auditor`` with each window's EM warm-started from the previous window's fit.
+
+    Warm-started EM drifts from the basin the cold refit lands in (it tends to keep
+    one component on a past outlier cluster), so the mixture is refit from the cold
+    init every ``restart_every`` bars; ``0`` disables the restarts.
+
+    With ``sufficient_stats`` the mixture is slid instead of refit: new points get
+    responsibilities under the current parameters, dropped points' stored
+    responsibilities are subtracted, and one M-step runs from the running sums.
+    The window's responsibilities are then recomputed under the new parameters,
+    so the score and the next slide use the current fit. A full refit happens
+    at least once per ``window`` bars.
+    """
+    out = np.full(values.shape, np.nan, dtype=float)
+    if values.size < window:
+        return out
+    gmm = WarmStartGMM1D(n_components=2, em_iters=em_iters)
+    resp = np.zeros((values.size, 2), dtype=float)
+    stats: list[np.ndarray] | None = None
+    last_full = last_cold = prev_i = prev_lo = 0
+    for i in range(window - 1, values.size, max(1, step)):
+        lo = i - window + 1
+        seg = values[lo : i + 1]
+        try:
+            if restart_every > 0 and gmm.fitted and i - last_cold >= restart_every:
+                gmm.reset()
+                stats = None
+            if not gmm.fitted:
+                last_cold = i
+            if sufficient_stats and stats is not None and i - last_full < window:
+                new = values[prev_i + 1 : i + 1]
+                old = values[prev_lo:lo]
+                r_new = gmm.predict_proba(new)
+                r_old = resp[prev_lo:lo]
+                gmm.set_from_stats(
+                    stats[0] + r_new.sum(axis=0) - r_old.sum(axis=0),
+                    stats[1] + r_new.T @ new - r_old.T @ old,
+                    stats[2] + r_new.T @ (new * new) - r_old.T @ (old * old),
+                )
+                probs = gmm.predict_proba(seg)
+            else:
+                probs = gmm.fit(seg).predict_proba(seg)
+                last_full = i
+            if sufficient_stats:
+                resp[lo : i + 1] = probs
+                stats = [probs.sum(axis=0), probs.T @ seg, probs.T @ (seg * seg)]
+            out[i] = _switch_entropy_score(probs)
+        except (FloatingPointError, ValueError, np.linalg.LinAlgError):
+            gmm.reset()
+            stats = None
+            out[i] = np.nan
+        prev_i, prev_lo = i, lo
+    return out
+
+
 def _sigmoid(x: float) -> float:
     return float(1.0 / (1.0 + np.exp(-np.clip(x, -30.0, 30.0))))
 
@@ -253,7 +404,7 @@ def run_multilayer_engine(
         m_auto, tau_auto = int(m_hint), int(tau_hint)
     m_use = max(2, int(m_auto))
     tau_use = max(1, int(tau_auto))
-    emb = takens_embed(returns, m=m_use, tau=tau_use)
+    emb = takens_embed(returns, m=m_use, tau=tau_use, copy=False)
     noise_to_signal = float(np.var(np.diff(returns)) / max(np.var(returns), 1e-12))
     layer1 = {
         "m": m_use,
@@ -278,15 +429,14 @@ def run_multilayer_engine(
     l_ref = int(np.clip(3 * m_use, 8, max(12, w_ref // 3)))
     l_cur = int(np.clip(3 * m_use, 8, max(12, w_cur // 3)))
 
-    for t in range(w_ref + w_cur - 1, n, max(1, cfg.step)):
-        ref_seg = returns[t - w_ref - w_cur + 1 : t - w_cur + 1]
-        cur_seg = returns[t - w_cur + 1 : t + 1]
-        met = _subspace_metrics(ref_seg, cur_seg, l_ref=l_ref, l_cur=l_cur)
-        d_proj[t] = met["d_proj"]
-        d_geo[t] = met["d_geo"]
-        gap[t] = met["gap_cur"]
-        rank_ref[t] = met["rank_ref"]
-        rank_cur[t] = met["rank_cur"]
+    stride = 1 if cfg.subspace_every_bar else max(1, cfg.step)
+    ends = np.arange(w_ref + w_cur - 1, n, stride)
+    met = _subspace_metrics_batch(returns, ends, w_ref, w_cur, l_ref, l_cur, refresh=max(1, cfg.gram_refresh))
+    d_proj[ends] = met["d_proj"]
+    d_geo[ends] = met["d_geo"]
+    gap[ends] = met["gap_cur"]
+    rank_ref[ends] = met["rank_ref"]
+    rank_cur[ends] = met["rank_cur"]
 
     z_geo = _robust_z_online(d_proj)
     z_gap = _robust_z_online(gap)
@@ -295,7 +445,19 @@ def run_multilayer_engine(
     # Layer 4: auditors.
     vol_sig = _robust_z_online(_rolling_std(returns, window=cfg.vol_window))
     cusum_sig = _robust_z_online(_cusum_abs(returns, window=cfg.cusum_window))
-    hmm_sig = _robust_z_online(_hmm_auditor(returns, window=cfg.hmm_window, step=max(1, cfg.step)))
+    hmm_step = max(1, cfg.hmm_step or cfg.step)
+    if cfg.hmm_mode == "online":
+        hmm_raw = _hmm_auditor_online(
+            returns,
+            window=cfg.hmm_window,
+            step=hmm_step,
+            em_iters=cfg.hmm_em_iters,
+            sufficient_stats=cfg.hmm_sufficient_stats,
+            restart_every=cfg.hmm_restart_every,
+        )
+    else:
+        hmm_raw = _hmm_auditor(returns, window=cfg.hmm_window, step=hmm_step)
+    hmm_sig = _robust_z_online(hmm_raw)
 
     # Layer 5: fusion/decision.
     idx = int(n - 1)
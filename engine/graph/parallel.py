@@ -0,0 +1,245 @@
+"""Process-pool fan-out for per-asset engine runs.
+
+``SeriesPanel`` packs many 1-D series into one flat ``.npy`` file with an
+offset index; workers open it with ``mmap_mode="r"`` so every process reads
+the same pages instead of re-parsing CSVs or receiving pickled copies.
+
+``run_tasks`` runs ``fn(*args)`` for each task in worker processes. Each
+worker holds one task at a time over its own pipe, so a task that raises,
+kills its process or overruns ``timeout`` is reported on its own and only
+that worker is replaced. Outcomes come back in task order regardless of
+completion order, which keeps merged outputs deterministic.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import pickle
+import time
+import traceback
+from dataclasses import dataclass
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from threadpoolctl import threadpool_limits
+except Exception:  # pragma: no cover
+    threadpool_limits = None
+
+BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+_POLL_SEC = 0.2
+
+
+def limit_blas_threads(n_threads: int = 1) -> None:
+    """Cap BLAS/OpenMP thread pools in this process and in processes it starts.
+
+    Environment variables cover libraries loaded later (and spawned children);
+    ``threadpoolctl``, when installed, also resizes pools already loaded.
+    """
+    n_threads = max(1, int(n_threads))
+    for var in BLAS_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=n_threads)
+
+
+def _panel_key(key: Hashable) -> str:
+    return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+
+class SeriesPanel:
+    """Read-only, memory-mapped store of named 1-D ``float64`` series."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        index = json.loads((self.path / "index.json").read_text(encoding="utf-8"))
+        self._index: Dict[str, Tuple[int, int]] = {k: (int(v[0]), int(v[1])) for k, v in index.items()}
+        self._data = np.load(self.path / "values.npy", mmap_mode="r") if self._index else np.zeros(0)
+
+    @classmethod
+    def write(cls, path: Path | str, series: Mapping[Hashable, np.ndarray]) -> "SeriesPanel":
+        """Write ``series`` (keys: str or tuples of str) to ``path`` and open it."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        index: Dict[str, Tuple[int, int]] = {}
+        offset = 0
+        for key, values in series.items():
+            n = int(np.asarray(values).size)
+            index[_panel_key(key)] = (offset, n)
+            offset += n
+        out = np.lib.format.open_memmap(path / "values.npy", mode="w+", dtype=np.float64, shape=(max(offset, 1),))
+        for key, values in series.items():
+            start, n = index[_panel_key(key)]
+            out[start : start + n] = np.asarray(values, dtype=np.float64).ravel()
+        out.flush()
+        del out
+        (path / "index.json").write_text(json.dumps(index), encoding="utf-8")
+        return cls(path)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return _panel_key(key) in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, key: Hashable) -> np.ndarray:
+        start, n = self._index[_panel_key(key)]
+        return self._data[start : start + n]
+
+
+@dataclass
+class TaskOutcome:
+    index: int
+    status: str  # "ok" | "error" | "timeout" | "crash"
+    value: Any = None
+    error: str | None = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def _call(fn: Callable[..., Any], index: int, args: Sequence[Any]) -> Tuple[int, str, bytes | None, str | None, float]:
+    t0 = time.perf_counter()
+    try:
+        # Pickle here so an unpicklable result is reported as this task's error.
+        payload = pickle.dumps(fn(*args), protocol=pickle.HIGHEST_PROTOCOL)
+        return index, "ok", payload, None, time.perf_counter() - t0
+    except Exception:
+        return index, "error", None, traceback.format_exc(limit=20), time.perf_counter() - t0
+
+
+def _worker_main(conn, fn, initializer, initargs, blas_threads) -> None:
+    if blas_threads:
+        limit_blas_threads(blas_threads)
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            item = conn.recv()
+        except EOFError:
+            break
+        if item is None:
+            break
+        conn.send(_call(fn, *item))
+    conn.close()
+
+
+class _Slot:
+    def __init__(self, ctx, fn, initializer, initargs, blas_threads) -> None:
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, fn, initializer, initargs, blas_threads), daemon=True)
+        self.proc.start()
+        child.close()
+        self.task: int | None = None
+        self.started = 0.0
+
+    def submit(self, index: int, args: Sequence[Any]) -> None:
+        self.task = index
+        self.started = time.monotonic()
+        self.conn.send((index, tuple(args)))
+
+    def kill(self) -> None:
+        if self.proc.is_alive():
+            self.proc.terminate()
+        self.proc.join(5)
+        self.conn.close()
+
+
+def run_tasks(
+    fn: Callable[..., Any],
+    tasks: Iterable[Sequence[Any]],
+    workers: int = 1,
+    timeout: float | None = None,
+    initializer: Callable[..., None] | None = None,
+    initargs: Sequence[Any] = (),
+    blas_threads: int | None = 1,
+    start_method: str | None = None,
+    on_result: Callable[[TaskOutcome], None] | None = None,
+) -> List[TaskOutcome]:
+    """Run ``fn(*args)`` for every ``args`` in ``tasks``; outcomes follow task order.
+
+    ``workers < 1`` runs inline in this process (no isolation or timeouts).
+    ``timeout`` is per task, in seconds. ``blas_threads`` caps BLAS pools in
+    each worker (``None`` leaves them alone). ``on_result`` sees outcomes in
+    completion order.
+    """
+    tasks = [tuple(args) for args in tasks]
+    outcomes: List[TaskOutcome | None] = [None] * len(tasks)
+
+    def _record(outcome: TaskOutcome) -> None:
+        outcomes[outcome.index] = outcome
+        if on_result is not None:
+            on_result(outcome)
+
+    def _from_message(msg: Tuple[int, str, bytes | None, str | None, float]) -> TaskOutcome:
+        index, status, payload, error, seconds = msg
+        value = pickle.loads(payload) if payload is not None else None
+        return TaskOutcome(index=index, status=status, value=value, error=error, seconds=seconds)
+
+    if workers < 1 or not tasks:
+        if initializer is not None and tasks:
+            initializer(*initargs)
+        for index, args in enumerate(tasks):
+            _record(_from_message(_call(fn, index, args)))
+        return [o for o in outcomes if o is not None]
+
+    ctx = mp.get_context(start_method)
+    pending = list(range(len(tasks)))[::-1]
+    spawn = lambda: _Slot(ctx, fn, initializer, initargs, blas_threads)  # noqa: E731
+    slots = [spawn() for _ in range(min(int(workers), len(tasks)))]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            for slot in slots:
+                if slot.task is None and pending:
+                    index = pending.pop()
+                    slot.submit(index, tasks[index])
+            busy = [s for s in slots if s.task is not None]
+            for conn in wait([s.conn for s in busy], timeout=_POLL_SEC):
+                slot = next(s for s in busy if s.conn is conn)
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    continue  # worker died; handled below
+                slot.task = None
+                _record(_from_message(msg))
+                remaining -= 1
+            now = time.monotonic()
+            for i, slot in enumerate(slots):
+                if slot.task is None:
+                    continue
+                if timeout is not None and now - slot.started > timeout:
+                    status, error = "timeout", f"no result after {timeout:g}s"
+                elif not slot.proc.is_alive():
+                    status, error = "crash", f"worker exited with code {slot.proc.exitcode}"
+                else:
+                    continue
+                _record(TaskOutcome(index=slot.task, status=status, error=error, seconds=now - slot.started))
+                remaining -= 1
+                slot.kill()
+                slot.task = None  # a dead slot is never waited on again
+                if pending:
+                    slots[i] = spawn()
+    finally:
+        for slot in slots:
+            try:
+                slot.conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for slot in slots:
+            slot.proc.join(5)
+            slot.kill()
+    return [o for o in outcomes if o is not None]
@@ -0,0 +1,201 @@
+"""Rolling-window statistics from anchored prefix sums.
+
+Every trailing-window statistic here is a difference of prefix sums, so a full
+pass costs O(n) regardless of the window length. Raw power sums lose precision
+when the level of the series is large next to its local spread (prices), so the
+prefix sums are taken block by block around a per-block anchor: each block of
+outputs only sees ``x - anchor`` over its own span plus one window of history.
+
+Windows holding a non-finite value return NaN, as ``np.std`` / ``np.mean`` on
+the slice would. Output index ``i`` always describes ``x[i - window + 1 : i + 1]``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence
+
+import numpy as np
+from scipy.signal import lfilter
+
+_MIN_BLOCK = 256
+
+
+def _window_sums(
+    x: np.ndarray,
+    window: int,
+    powers: Sequence[int] = (1, 2),
+    lag: int = 0,
+) -> tuple[list[np.ndarray], np.ndarray]:
+    """Anchored trailing-window sums of ``(x - c)^p`` (and ``(x_t - c)(x_{t-lag} - c)`` when ``lag``).
+
+    Returns ``(sums, anchor)``: ``sums[k][i]`` is the sum over the window ending
+    at ``i`` (NaN where fewer than ``window`` points or any non-finite value),
+    in the order of ``powers`` followed by the lag product when requested.
+    """
+    n = x.size
+    bad = ~np.isfinite(x)
+    outs = [np.full(n, np.nan) for _ in range(len(powers) + (1 if lag else 0))]
+    anchor = np.full(n, np.nan)
+    if n < window or window < 1:
+        return outs, anchor
+    block = max(_MIN_BLOCK, window)
+    for start in range(window - 1, n, block):
+        stop = min(start + block, n)
+        lo = start - window + 1
+        seg = x[lo:stop]
+        ok = ~bad[lo:stop]
+        c = float(np.mean(seg[ok])) if ok.any() else 0.0
+        d = np.where(ok, seg - c, 0.0)
+        nbad = np.concatenate([[0], np.cumsum(~ok)])
+        invalid = (nbad[window:] - nbad[:-window]) > 0
+        anchor[start:stop] = c
+        terms = [d**p for p in powers]
+        if lag:
+            prod = np.zeros_like(d)
+            prod[lag:] = d[lag:] * d[:-lag]
+            terms.append(prod)
+        for j, (out, term) in enumerate(zip(outs, terms)):
+            csum = np.concatenate([[0.0], np.cumsum(term)])
+            # The lag product at t pairs x[t] with x[t - lag]; only the last window - lag of them fit.
+            back = lag if j == len(powers) else 0
+            vals = csum[window:] - csum[back : csum.size - window + back]
+            vals[invalid] = np.nan
+            out[start:stop] = vals
+    return outs, anchor
+
+
+def _constant(x: np.ndarray, length: int) -> np.ndarray:
+    # True at i when x[i - length + 1 : i + 1] holds a single repeated value. Prefix sums
+    # only get such windows to round-off, so their spread is pinned to exactly 0.
+    out = np.zeros(x.size, dtype=bool)
+    if length < 1 or x.size < length:
+        return out
+    changes = np.concatenate([[0], np.cumsum(x[1:] != x[:-1])])
+    out[length - 1 :] = changes[length - 1 :] == changes[: x.size - length + 1]
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    x = np.asarray(values, dtype=float)
+    (s1,), anchor = _window_sums(x, window, powers=(1,))
+    return anchor + s1 / window
+
+
+def rolling_var(values: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+    x = np.asarray(values, dtype=float)
+    (s1, s2), _ = _window_sums(x, window, powers=(1, 2))
+    m2 = np.maximum(s2 - s1 * s1 / window, 0.0)
+    m2[_constant(x, window)] = 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return m2 / (window - ddof)
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+    return np.sqrt(rolling_var(values, window, ddof=ddof))
+
+
+def rolling_moments(values: np.ndarray, window: int, eps: float = 1e-12) -> Dict[str, np.ndarray]:
+    """Trailing mean, population variance, skewness and (non-excess) kurtosis.
+
+    Skew and kurtosis are standardised by ``std + eps`` as in the EWS
+    diagnostics (``mean((seg / (std + eps)) ** 3)``).
+    """
+    x = np.asarray(values, dtype=float)
+    (s1, s2, s3, s4), anchor = _window_sums(x, window, powers=(1, 2, 3, 4))
+    mu = s1 / window
+    m2 = np.maximum(s2 / window - mu**2, 0.0)
+    m3 = s3 / window - 3.0 * mu * s2 / window + 2.0 * mu**3
+    m4 = s4 / window - 4.0 * mu * s3 / window + 6.0 * mu**2 * s2 / window - 3.0 * mu**4
+    flat = _constant(x, window)
+    m2[flat] = m3[flat] = m4[flat] = 0.0
+    scale = np.sqrt(m2) + eps
+    return {
+        "mean": anchor + mu,
+        "var": m2,
+        "skew": m3 / scale**3,
+        "kurt": m4 / scale**4,
+    }
+
+
+def rolling_autocorr(values: np.ndarray, window: int, lag: int = 1) -> np.ndarray:
+    """Pearson correlation of ``seg[:-lag]`` with ``seg[lag:]`` for each trailing window ``seg``.
+
+    Same value as ``np.corrcoef`` / ``pd.Series.autocorr(lag)`` on the slice;
+    NaN when either side is constant.
+    """
+    x = np.asarray(values, dtype=float)
+    n = x.size
+    out = np.full(n, np.nan)
+    k = window - lag
+    if lag < 1 or k < 2 or n < window:
+        return out
+    (s1, s2, sxy), anchor = _window_sums(x, window, powers=(1, 2), lag=lag)
+    idx = np.arange(window - 1, n)
+    c = anchor[idx][:, None]
+    # Leading (``x`` side drops the tail) and trailing (``y`` side drops the head) lag points.
+    head = x[idx[:, None] - window + 1 + np.arange(lag)] - c
+    tail = x[idx[:, None] - lag + 1 + np.arange(lag)] - c
+    sx = s1[idx] - tail.sum(axis=1)
+    sxx = s2[idx] - (tail**2).sum(axis=1)
+    sy = s1[idx] - head.sum(axis=1)
+    syy = s2[idx] - (head**2).sum(axis=1)
+    vx = sxx - sx * sx / k
+    vy = syy - sy * sy / k
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (sxy[idx] - sx * sy / k) / np.sqrt(vx * vy)
+    flat = _constant(x, k)
+    r[~((vx > 0) & (vy > 0)) | flat[idx - lag] | flat[idx]] = np.nan
+    out[idx] = np.clip(r, -1.0, 1.0)
+    return out
+
+
+def ewma(values: np.ndarray, lam: float, init: float = 0.0) -> np.ndarray:
+    """``y[i] = lam * y[i-1] + (1 - lam) * x[i]`` with ``y[-1] = init``, as one ``lfilter`` pass."""
+    x = np.asarray(values, dtype=float)
+    if x.size == 0:
+        return x.copy()
+    y, _ = lfilter([1.0 - lam], [1.0, -lam], x, zi=[lam * float(init)])
+    return y
+
+
+def ewma_variance(returns: np.ndarray, lam: float = 0.94, v0: float | None = None) -> np.ndarray:
+    """RiskMetrics variance ``v[i] = lam * v[i-1] + (1 - lam) * r[i-1]^2`` (``v[0] = v0``).
+
+    ``v0`` defaults to the variance of the first 30 returns.
+    """
+    r = np.asarray(returns, dtype=float)
+    if r.size == 0:
+        return r.copy()
+    if v0 is None:
+        v0 = float(np.var(r[: min(30, r.size)]))
+    out = np.empty(r.size)
+    out[0] = v0
+    out[1:] = ewma(r[:-1] ** 2, lam, init=v0)
+    return out
+
+
+def cusum_abs(values: np.ndarray, window: int) -> np.ndarray:
+    """Two-sided CUSUM ``pos + neg`` of deviations from the trailing ``window`` mean.
+
+    The reference mean is 0 until the first full window (and for windows with
+    a non-finite value). ``pos`` and ``neg`` are the reflected (Lindley) walks
+    ``max(0, s + d)``, computed in closed form per segment:
+    ``pos_t = S_t - min(0, min_{s<=t} S_s)`` with ``S`` the cumulative sum of
+    deviations. A non-finite value resets both walks to 0, as ``max(0.0, nan)``
+    does in the recursive form.
+    """
+    x = np.asarray(values, dtype=float)
+    out = np.zeros(x.size)
+    if x.size == 0:
+        return out
+    mu = rolling_mean(x, window)
+    dev = x - np.where(np.isfinite(mu), mu, 0.0)
+    bounds = np.flatnonzero(~np.isfinite(dev))
+    for lo, hi in zip(np.concatenate([[-1], bounds]) + 1, np.concatenate([bounds, [x.size]])):
+        if hi <= lo:
+            continue
+        walk = np.cumsum(dev[lo:hi])
+        pos = walk - np.minimum(np.minimum.accumulate(walk), 0.0)
+        neg = np.maximum(np.maximum.accumulate(walk), 0.0) - walk
+        out[lo:hi] = pos + neg
+    return out
@@ -0,0 +1,211 @@
+"""Recurrence quantification analysis on sparse recurrence pairs.
+
+The recurrence matrix is never materialised. A KD-tree radius query returns
+the upper-triangle pairs ``(i, j)``, ``i < j``, with ``|x_i - x_j| <= eps``.
+Because the matrix is symmetric with an empty main diagonal, every line
+statistic can be read off those pairs:
+
+* diagonal lines are runs of consecutive ``i`` along a fixed offset
+  ``j - i`` (mirrored below the diagonal, so counts double);
+* vertical lines are runs of consecutive rows in a column, built from both
+  orientations of every pair.
+
+Runs are found by run-length encoding the sorted pair keys with ``np.diff``,
+so memory is O(#pairs) rather than O(n^2).
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import pdist
+
+DEFAULT_MAX_PAIRS = 4_000_000
+QUANTILE_SAMPLE = 1_000_000
+
+
+def _square_quantile(condensed: np.ndarray, n: int, q: float) -> float:
+    # np.quantile of the full n x n distance matrix (n zeros on the diagonal,
+    # each off-diagonal distance twice) from the condensed upper triangle.
+    total = n * n
+    pos = q * (total - 1)
+    lo = int(np.floor(pos))
+    hi = min(lo + 1, total - 1)
+    ranks = sorted({max(lo - n, 0) // 2, max(hi - n, 0) // 2})
+    part = np.partition(condensed, ranks)
+
+    def _at(k: int) -> float:
+        return 0.0 if k < n else float(part[(k - n) // 2])
+
+    a, b = _at(lo), _at(hi)
+    return a + (b - a) * (pos - lo)
+
+
+def recurrence_radius(
+    data: np.ndarray,
+    quantile: float = 0.1,
+    include_diagonal: bool = True,
+    max_pairs: int = DEFAULT_MAX_PAIRS,
+    seed: int = 0,
+) -> float:
+    """Distance quantile used as recurrence threshold.
+
+    ``include_diagonal=True`` matches ``np.quantile`` over the full square
+    distance matrix; ``False`` uses the upper triangle only. Above
+    ``max_pairs`` distinct pairs the quantile is estimated from a seeded
+    random sample of ``QUANTILE_SAMPLE`` pairs.
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.shape[0]
+    if n < 2:
+        return 0.0
+    n_pairs = n * (n - 1) // 2
+    if n_pairs <= max_pairs:
+        condensed = pdist(data)
+        if include_diagonal:
+            return _square_quantile(condensed, n, quantile)
+        return float(np.quantile(condensed, quantile))
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, n, size=QUANTILE_SAMPLE)
+    b = rng.integers(0, n - 1, size=QUANTILE_SAMPLE)
+    b = b + (b >= a)
+    sample = np.linalg.norm(data[a] - data[b], axis=1)
+    if include_diagonal:
+        # Diagonal zeros make up 1/n of the square matrix.
+        sample = np.concatenate([sample, np.zeros(int(round(QUANTILE_SAMPLE / (n - 1))))])
+    return float(np.quantile(sample, quantile))
+
+
+def recurrence_pairs(data: np.ndarray, eps: float) -> np.ndarray:
+    """Upper-triangle recurrence pairs ``(i, j)``, ``i < j``, sorted by ``(i, j)`` (int32)."""
+    data = np.asarray(data, dtype=float)
+    if data.shape[0] < 2:
+        return np.zeros((0, 2), dtype=np.int32)
+    pairs = cKDTree(data).query_pairs(r=float(eps), output_type="ndarray").astype(np.int32)
+    if pairs.size == 0:
+        return np.zeros((0, 2), dtype=np.int32)
+    order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+    return pairs[order]
+
+
+def _run_lengths(group: np.ndarray, pos: np.ndarray) -> np.ndarray:
+    # Lengths of runs of consecutive ``pos`` within equal ``group`` (input sorted by (group, pos)).
+    if group.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    breaks = (np.diff(group) != 0) | (np.diff(pos) != 1)
+    starts = np.flatnonzero(np.concatenate([[True], breaks]))
+    return np.diff(np.concatenate([starts, [group.size]]))
+
+
+def line_lengths(pairs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Diagonal (upper triangle only) and vertical (all columns) line lengths of the recurrence matrix."""
+    pairs = np.asarray(pairs).reshape(-1, 2)
+    i, j = pairs[:, 0], pairs[:, 1]
+    offset = j - i
+    order = np.lexsort((i, offset))
+    diagonal = _run_lengths(offset[order], i[order])
+    rows = np.concatenate([i, j])
+    cols = np.concatenate([j, i])
+    order = np.lexsort((rows, cols))
+    vertical = _run_lengths(cols[order], rows[order])
+    return diagonal, vertical
+
+
+def _entropy(lengths: np.ndarray) -> float:
+    if lengths.size == 0:
+        return 0.0
+    _, counts = np.unique(lengths, return_counts=True)
+    p = counts / counts.sum()
+    return float(-np.sum(p * np.log(p)))
+
+
+def rqa_from_pairs(pairs: np.ndarray, n: int, l_min: int = 2, v_min: int = 2) -> Dict[str, float]:
+    """DET, LAM, TT, L_max, L_mean, V_max, ENTR and RR from upper-triangle recurrence pairs."""
+    total_rec = 2.0 * pairs.shape[0]
+    rr = total_rec / float(n * n) if n else float("nan")
+    if total_rec == 0:
+        return {"rr": rr, "det": 0.0, "lam": 0.0, "tt": 0.0, "l_max": 0, "l_mean": 0.0, "v_max": 0, "entr": 0.0}
+    diagonal, vertical = line_lengths(pairs)
+    diag_lines = diagonal[diagonal >= l_min]
+    vert_lines = vertical[vertical >= v_min]
+    return {
+        "rr": rr,
+        "det": float(2 * diag_lines.sum()) / total_rec,
+        "lam": float(vert_lines.sum()) / total_rec,
+        "tt": float(np.mean(vert_lines)) if vert_lines.size else 0.0,
+        "l_max": int(diagonal.max()) if diagonal.size else 0,
+        "l_mean": float(np.mean(diag_lines)) if diag_lines.size else 0.0,
+        "v_max": int(vertical.max()) if vertical.size else 0,
+        "entr": _entropy(diag_lines),
+    }
+
+
+def _budget(embedded: np.ndarray, max_points: int | None) -> np.ndarray:
+    data = np.asarray(embedded, dtype=float)
+    if max_points and data.shape[0] > max_points:
+        idx = np.linspace(0, data.shape[0] - 1, max_points).astype(int)
+        data = data[idx]
+    return data
+
+
+def rqa_metrics(
+    embedded: np.ndarray,
+    max_points: int | None = 600,
+    quantile: float = 0.1,
+    eps: float | None = None,
+) -> Dict[str, float]:
+    """Full RQA summary; ``eps`` defaults to the ``quantile`` of all pairwise distances (diagonal included)."""
+    data = _budget(embedded, max_points)
+    n = data.shape[0]
+    if n < 10:
+        nan = float("nan")
+        return {"rr": nan, "det": nan, "lam": nan, "tt": nan, "l_max": 0, "l_mean": nan, "v_max": 0, "entr": nan, "eps": nan}
+    radius = recurrence_radius(data, quantile) if eps is None else float(eps)
+    out = rqa_from_pairs(recurrence_pairs(data, radius), n)
+    out["eps"] = radius
+    return out
+
+
+def windowed_rqa(
+    embedded: np.ndarray,
+    window: int,
+    step: int = 1,
+    quantile: float = 0.1,
+    eps: float | None = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """RQA over sliding windows of ``embedded`` with one global radius.
+
+    The radius query runs once on the whole series; each window keeps the
+    pairs whose two points both fall inside it. Returns ``(ends, metrics)``
+    where ``metrics[name][w]`` describes rows ``ends[w] - window .. ends[w] - 1``.
+    """
+    data = np.asarray(embedded, dtype=float)
+    n = data.shape[0]
+    window = int(window)
+    step = max(1, int(step))
+    ends = np.arange(window, n + 1, step) if window >= 2 else np.zeros(0, dtype=int)
+    radius = recurrence_radius(data, quantile) if eps is None else float(eps)
+    pairs = recurrence_pairs(data, radius)
+    # Pairs are sorted by i, so each window is a contiguous slice in i, then filtered on j.
+    keys = ["rr", "det", "lam", "tt", "l_max", "l_mean", "v_max", "entr"]
+    metrics = {k: np.full(ends.size, np.nan) for k in keys}
+    lo = np.searchsorted(pairs[:, 0], ends - window, side="left")
+    hi = np.searchsorted(pairs[:, 0], ends, side="left")
+    for w, end in enumerate(ends):
+        block = pairs[lo[w] : hi[w]]
+        block = block[block[:, 1] < end] - (end - window)
+        row = rqa_from_pairs(block, window)
+        for k in keys:
+            metrics[k][w] = row[k]
+    return ends, metrics
+
+
+def recurrence_rate(data: np.ndarray, eps: float) -> float:
+    """Share of the full ``n x n`` matrix (diagonal included) with distance ``<= eps``."""
+    data = np.asarray(data, dtype=float)
+    n = data.shape[0]
+    if n == 0:
+        return float("nan")
+    return float(n + 2 * recurrence_pairs(data, eps).shape[0]) / float(n * n)
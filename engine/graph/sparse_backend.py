@@ -0,0 +1,237 @@
+"""Sparse transition-matrix backend for large microstate counts.
+
+Transition counts are kept in CSR form and the Dirichlet smoothing ``alpha`` is
+applied lazily, so an ``n_micro x n_micro`` matrix is never materialised.
+Spectral quantities come from ARPACK partial solves (only the leading
+``n_regimes`` eigenvectors), and the stationary distribution is the leading
+left eigenvector of the same operator.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import ArpackNoConvergence, LinearOperator, eigs, eigsh
+from sklearn.cluster import KMeans
+
+# Below this size ARPACK gains nothing over dense LAPACK.
+_DENSE_FALLBACK_STATES = 64
+
+
+def transition_counts_sparse(labels: np.ndarray, n_states: int | None = None) -> sparse.csr_matrix:
+    lab = np.asarray(labels, dtype=np.int64)
+    n = int(lab.max()) + 1 if n_states is None else int(n_states)
+    if lab.size < 2:
+        return sparse.csr_matrix((n, n), dtype=float)
+    data = np.ones(lab.size - 1, dtype=float)
+    return sparse.coo_matrix((data, (lab[:-1], lab[1:])), shape=(n, n)).tocsr()
+
+
+class SmoothedTransitionMatrix:
+    """Row-stochastic ``(counts + alpha) / row_sums`` kept as sparse counts plus a rank-one term."""
+
+    ndim = 2
+    dtype = np.dtype(float)
+
+    def __init__(self, counts: sparse.spmatrix, alpha: float = 1.0) -> None:
+        self.counts = sparse.csr_matrix(counts, dtype=float)
+        self.alpha = float(alpha)
+        n = self.counts.shape[0]
+        self.shape = (n, n)
+        raw = np.asarray(self.counts.sum(axis=1)).ravel()
+        self.row_sums = np.maximum(raw + self.alpha * n, 1e-12)
+
+    @property
+    def size(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    def matvec(self, x: np.ndarray) -> np.ndarray:
+        """``P @ x``."""
+        x = np.asarray(x, dtype=float)
+        return (self.counts @ x + self.alpha * x.sum()) / self.row_sums
+
+    def rmatvec(self, x: np.ndarray) -> np.ndarray:
+        """``x @ P`` (equivalently ``P.T @ x``)."""
+        y = np.asarray(x, dtype=float) / self.row_sums
+        return self.counts.T @ y + self.alpha * y.sum()
+
+    def row(self, i: int) -> np.ndarray:
+        out = np.full(self.shape[1], self.alpha, dtype=float)
+        start, end = self.counts.indptr[i], self.counts.indptr[i + 1]
+        out[self.counts.indices[start:end]] += self.counts.data[start:end]
+        return out / self.row_sums[i]
+
+    def toarray(self) -> np.ndarray:
+        return (self.counts.toarray() + self.alpha) / self.row_sums[:, None]
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> np.ndarray:
+        dense = self.toarray()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def tolist(self) -> list:
+        return self.toarray().tolist()
+
+    def regime_row_mass(self, micro_regime: np.ndarray) -> np.ndarray:
+        """Probability mass each state keeps inside its own regime (sparse ``compute_confidence``)."""
+        regime = np.asarray(micro_regime, dtype=int)
+        n_reg = int(regime.max()) + 1 if regime.size else 0
+        onehot = sparse.csr_matrix(
+            (np.ones(regime.size), (np.arange(regime.size), regime)),
+            shape=(regime.size, n_reg),
+        )
+        per_regime = np.asarray((self.counts @ onehot).todense())
+        sizes = np.bincount(regime, minlength=n_reg).astype(float)
+        idx = np.arange(regime.size)
+        return (per_regime[idx, regime] + self.alpha * sizes[regime]) / self.row_sums
+
+    def active_edge_frac(self) -> float:
+        n = self.shape[0]
+        positive = n * n if self.alpha > 0 else int(self.counts.count_nonzero())
+        active = max(positive - n, 0)
+        return float(active / max(1, n * (n - 1)))
+
+    def entropy_rate(self, pi: np.ndarray) -> float:
+        n = self.shape[0]
+        if n == 0 or pi.size == 0:
+            return 0.0
+        rs = self.row_sums
+        nnz_rows = np.diff(self.counts.indptr)
+        rows = np.repeat(np.arange(n), nnz_rows)
+        p_nz = (self.counts.data + self.alpha) / rs[rows]
+        h_nz = np.bincount(rows, weights=p_nz * np.log(p_nz + 1e-12), minlength=n)
+        p0 = self.alpha / rs
+        h_zero = (n - nnz_rows) * p0 * np.log(p0 + 1e-12)
+        return float(-np.sum(pi * (h_nz + h_zero)))
+
+    def row_entropy(self) -> np.ndarray:
+        """Shannon entropy of every row of ``P`` from the CSR counts (the ``alpha``-only entries in closed form)."""
+        n = self.shape[0]
+        nnz_rows = np.diff(self.counts.indptr)
+        rows = np.repeat(np.arange(n), nnz_rows)
+        p_nz = (self.counts.data + self.alpha) / self.row_sums[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h_nz = np.bincount(rows, weights=np.where(p_nz > 0, -p_nz * np.log(p_nz), 0.0), minlength=n)
+            p0 = self.alpha / self.row_sums
+            h_zero = np.where(p0 > 0, -(n - nnz_rows) * p0 * np.log(p0), 0.0)
+        return h_nz + h_zero
+
+    def von_neumann_entropy(self, probes: int = 24, steps: int = 40, seed: int = 7) -> float:
+        """Stochastic Lanczos estimate of ``-tr(rho log rho)``, ``rho = L / tr(L)``.
+
+        ``L`` is the Laplacian of the symmetrised ``(P + P.T) / 2``, as in the
+        dense entropy metric. Only products with ``P`` and ``P.T`` are used.
+        Each Rademacher probe contributes a ``steps``-point Gauss quadrature of
+        ``-x log x`` over the spectrum of ``rho``.
+        """
+        n = self.shape[0]
+        if n < 2:
+            return 0.0
+        ones = np.ones(n)
+        degree = 0.5 * (self.matvec(ones) + self.rmatvec(ones))
+        diag = (self.counts.diagonal() + self.alpha) / self.row_sums
+        trace = float(np.sum(degree - diag))
+        if trace <= 0:
+            return 0.0
+
+        def _rho(x: np.ndarray) -> np.ndarray:
+            return (degree * x - 0.5 * (self.matvec(x) + self.rmatvec(x))) / trace
+
+        rng = np.random.default_rng(seed)
+        steps = max(2, min(int(steps), n))
+        total = 0.0
+        for _ in range(max(1, int(probes))):
+            q = rng.choice([-1.0, 1.0], size=n) / np.sqrt(n)
+            basis = np.zeros((steps, n))
+            alphas: list[float] = []
+            betas: list[float] = []
+            for j in range(steps):
+                basis[j] = q
+                w = _rho(q)
+                alphas.append(float(q @ w))
+                w -= basis[: j + 1].T @ (basis[: j + 1] @ w)  # full reorthogonalisation
+                b = float(np.linalg.norm(w))
+                if j == steps - 1 or b <= 1e-12:
+                    break
+                betas.append(b)
+                q = w / b
+            m = len(alphas)
+            t = np.diag(alphas) + np.diag(betas[: m - 1], 1) + np.diag(betas[: m - 1], -1)
+            theta, vecs = np.linalg.eigh(t)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                f = np.where(theta > 1e-12, -theta * np.log(theta), 0.0)
+            total += n * float(np.sum(vecs[0] ** 2 * f))
+        return float(total / max(1, int(probes)))
+
+    def leading_left_eigs(self, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` eigenpairs of ``P.T`` by real part (right columns = left eigvecs of P)."""
+        n = self.shape[0]
+        k = max(1, min(k, n))
+        if n <= _DENSE_FALLBACK_STATES or k >= n - 1:
+            vals, vecs = np.linalg.eig(self.toarray().T)
+        else:
+            op = LinearOperator(self.shape, matvec=self.rmatvec, dtype=float)
+            v0 = np.full(n, 1.0 / n)
+            try:
+                vals, vecs = eigs(op, k=k, which="LR", v0=v0, tol=1e-10)
+            except ArpackNoConvergence as exc:
+                vals, vecs = exc.eigenvalues, exc.eigenvectors
+                if vals.size == 0:
+                    vals, vecs = np.linalg.eig(self.toarray().T)
+        order = np.argsort(-np.real(vals))[:k]
+        return vals[order], vecs[:, order]
+
+    def stationary_distribution(self, vecs: np.ndarray | None = None) -> np.ndarray:
+        if self.shape[0] == 0:
+            return np.array([])
+        if vecs is None:
+            _, vecs = self.leading_left_eigs(1)
+        pi = np.abs(np.real(vecs[:, 0]))
+        return pi / max(pi.sum(), 1e-12)
+
+
+def _sign_flip(vectors: np.ndarray) -> np.ndarray:
+    # Deterministic orientation (largest-|.| entry positive), as sklearn does.
+    idx = np.argmax(np.abs(vectors), axis=0)
+    signs = np.sign(vectors[idx, np.arange(vectors.shape[1])])
+    signs[signs == 0] = 1.0
+    return vectors * signs
+
+
+def _spectral_maps(p_matrix: SmoothedTransitionMatrix, n_regimes: int) -> np.ndarray:
+    """Laplacian eigenmaps of the symmetrised affinity ``(P + P.T) / 2`` via ``eigsh``."""
+    n = p_matrix.shape[0]
+    ones = np.ones(n)
+    degree = 0.5 * (p_matrix.matvec(ones) + p_matrix.rmatvec(ones))
+    dd = np.sqrt(np.maximum(degree, 1e-12))
+
+    def _normalized(x: np.ndarray) -> np.ndarray:
+        y = np.asarray(x, dtype=float).ravel() / dd
+        return 0.5 * (p_matrix.matvec(y) + p_matrix.rmatvec(y)) / dd
+
+    if n <= _DENSE_FALLBACK_STATES or n_regimes >= n - 1:
+        dense = p_matrix.toarray()
+        affinity = 0.5 * (dense + dense.T) / np.outer(dd, dd)
+        vals, vecs = np.linalg.eigh(affinity)
+        vecs = vecs[:, np.argsort(-vals)[:n_regimes]]
+    else:
+        op = LinearOperator((n, n), matvec=_normalized, dtype=float)
+        vals, vecs = eigsh(op, k=n_regimes, which="LA", v0=dd / np.linalg.norm(dd), tol=1e-10)
+        vecs = vecs[:, np.argsort(-vals)]
+    return _sign_flip(vecs / dd[:, None])
+
+
+def metastable_regimes_sparse(
+    p_matrix: SmoothedTransitionMatrix,
+    n_regimes: int,
+    seed: int = 7,
+    method: str = "spectral",
+) -> np.ndarray:
+    if method == "pcca":
+        _, vecs = p_matrix.leading_left_eigs(n_regimes)
+        maps = np.real(vecs)
+    else:
+        maps = _spectral_maps(p_matrix, n_regimes)
+    km = KMeans(n_clusters=n_regimes, random_state=seed, n_init=10)
+    return km.fit_predict(maps)
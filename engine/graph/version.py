@@ -1 +1,2 @@
-ENGINE_VERSION = "2026.02.06-sector-risk-v1"
+# Bump whenever engine outputs change: the result cache (engine/graph/cache.py) keys on this string.
+ENGINE_VERSION = "2026.10.17-graph-perf-v2"
@@ -0,0 +1,33 @@
+"""Local market-data storage."""
+
+from engine.marketdata.catalog import DataCatalog, find_csv, local_catalog
+from engine.marketdata.fetch import (
+    FetchPolicy,
+    FetchResult,
+    HTTPProvider,
+    LocalPriceServer,
+    PriceProvider,
+    TransientFetchError,
+    YFinanceProvider,
+    fetch_updates,
+)
+from engine.marketdata.store import PriceStore, build_store, open_store, read_price_csv, store_dir_for
+
+__all__ = [
+    "DataCatalog",
+    "FetchPolicy",
+    "FetchResult",
+    "HTTPProvider",
+    "LocalPriceServer",
+    "PriceProvider",
+    "TransientFetchError",
+    "YFinanceProvider",
+    "fetch_updates",
+    "find_csv",
+    "local_catalog",
+    "PriceStore",
+    "build_store",
+    "open_store",
+    "read_price_csv",
+    "store_dir_for",
+]
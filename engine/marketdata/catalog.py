@@ -0,0 +1,228 @@
+"""Persistent catalog of local CSV files, keyed by ticker.
+
+The catalog mirrors what a top-down ``os.walk`` of ``base_dir`` would find:
+every ``*.csv`` outside directories whose path contains one of
+``SKIP_PARTS``, in walk order. For each file it keeps the schema (header),
+row count, first/last value of the date column and a SHA-256 of the content.
+
+``refresh`` is incremental. A directory whose mtime is unchanged reuses its
+cached listing (adding or removing entries always bumps the parent's mtime),
+so only changed directories are listed again; a file is re-read only when its
+size or mtime changed. Skipped directories are pruned instead of walked.
+Lookups are a dict hit on the upper-cased stem (``_CLEANED`` suffix ignored).
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+SKIP_PARTS = ("venv", "site-packages", "website", "results", ".git")
+CATALOG_NAME = ".data_catalog.json"
+CATALOG_VERSION = 1
+_DATE_NAMES = ("date", "datetime", "timestamp", "time")
+
+
+def ticker_keys(stem: str) -> List[str]:
+    key = stem.upper()
+    alias = key.replace("_CLEANED", "")
+    return [key] if alias == key else [key, alias]
+
+
+def _date_column(columns: List[str]) -> int | None:
+    lower = [c.strip().lower() for c in columns]
+    for cand in _DATE_NAMES:
+        for i, name in enumerate(lower):
+            if name == cand or name.endswith(cand):
+                return i
+    return None
+
+
+def describe_csv(path: Path | str) -> Dict[str, object]:
+    """Schema, row count, date range (first/last row) and SHA-256 of one CSV."""
+    data = Path(path).read_bytes()
+    lines = data.splitlines()
+    while lines and not lines[-1].strip():
+        lines.pop()
+    header = next(csv.reader(io.StringIO(lines[0].decode("utf-8-sig", errors="replace")))) if lines else []
+    meta: Dict[str, object] = {
+        "columns": header,
+        "rows": max(len(lines) - 1, 0),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "first": None,
+        "last": None,
+    }
+    col = _date_column(header)
+    if col is not None and len(lines) > 1:
+        for key, raw in (("first", lines[1]), ("last", lines[-1])):
+            row = next(csv.reader(io.StringIO(raw.decode("utf-8", errors="replace"))), [])
+            meta[key] = row[col] if col < len(row) else None
+    return meta
+
+
+class DataCatalog:
+    """Ticker -> CSV paths under ``base_dir``, persisted at ``path``."""
+
+    def __init__(self, base_dir: Path | str, path: Path | str | None = None, skip_parts=SKIP_PARTS) -> None:
+        self.base_dir = str(base_dir)
+        self.path = Path(path) if path else Path(base_dir) / CATALOG_NAME
+        self.skip_parts = tuple(skip_parts)
+        self._dirs: Dict[str, dict] = {}
+        self._files: Dict[str, dict] = {}
+        self._index: Dict[str, List[str]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            doc = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if doc.get("version") != CATALOG_VERSION or doc.get("skip_parts") != list(self.skip_parts):
+            return
+        self._dirs = doc.get("dirs", {})
+        self._files = doc.get("files", {})
+        self._reindex()
+
+    def save(self) -> None:
+        doc = {
+            "version": CATALOG_VERSION,
+            "skip_parts": list(self.skip_parts),
+            "dirs": self._dirs,
+            "files": self._files,
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        except OSError:
+            return  # read-only checkout: the in-memory catalog still works
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(doc, handle)
+            os.replace(tmp, self.path)
+        except OSError:
+            Path(tmp).unlink(missing_ok=True)
+
+    def _reindex(self) -> None:
+        index: Dict[str, List[str]] = {}
+        for rel in self._files:  # insertion order == walk order
+            for key in ticker_keys(Path(rel).stem):
+                index.setdefault(key, []).append(rel)
+        self._index = index
+
+    def _skipped(self, rel: str) -> bool:
+        root = self.base_dir if rel == "" else os.path.join(self.base_dir, rel)
+        return any(part in root for part in self.skip_parts)
+
+    def refresh(self) -> Dict[str, int]:
+        """Bring the catalog in line with the tree; returns counts of the work done."""
+        stats = {"dirs_listed": 0, "dirs_reused": 0, "files_read": 0, "files": 0}
+        dirs: Dict[str, dict] = {}
+        files: Dict[str, dict] = {}
+        stack = [""]
+        while stack:
+            rel = stack.pop()
+            full = os.path.join(self.base_dir, rel) if rel else self.base_dir
+            try:
+                mtime = os.stat(full).st_mtime_ns
+            except OSError:
+                continue
+            cached = self._dirs.get(rel)
+            if cached is not None and cached["mtime_ns"] == mtime:
+                entry = cached
+                stats["dirs_reused"] += 1
+            else:
+                subdirs, csvs = [], []
+                try:
+                    with os.scandir(full) as it:
+                        for item in it:
+                            try:
+                                is_dir = item.is_dir()
+                            except OSError:
+                                continue
+                            if is_dir:
+                                # Like os.walk, symlinked directories are not followed.
+                                if not item.is_symlink():
+                                    subdirs.append(item.name)
+                            elif item.name.lower().endswith(".csv"):
+                                csvs.append(item.name)
+                except OSError:
+                    continue
+                entry = {"mtime_ns": mtime, "dirs": subdirs, "csvs": csvs}
+                stats["dirs_listed"] += 1
+            dirs[rel] = entry
+            if not self._skipped(rel):
+                for name in entry["csvs"]:
+                    frel = os.path.join(rel, name) if rel else name
+                    try:
+                        st = os.stat(os.path.join(self.base_dir, frel))
+                    except OSError:
+                        continue
+                    meta = self._files.get(frel)
+                    if meta is None or meta["size"] != st.st_size or meta["mtime_ns"] != st.st_mtime_ns:
+                        try:
+                            meta = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, **describe_csv(os.path.join(self.base_dir, frel))}
+                        except OSError:
+                            continue
+                        stats["files_read"] += 1
+                    files[frel] = meta
+            # Skipped directories are not descended into: every path below them is skipped too.
+            for name in reversed(entry["dirs"]):
+                sub = os.path.join(rel, name) if rel else name
+                if not self._skipped(sub):
+                    stack.append(sub)
+        self._dirs = dirs
+        self._files = files
+        self._reindex()
+        stats["files"] = len(files)
+        return stats
+
+    def lookup(self, ticker: str) -> List[Path]:
+        """CSV paths for ``ticker`` (case-insensitive), in walk order."""
+        return [Path(self.base_dir) / rel for rel in self._index.get(str(ticker).upper(), [])]
+
+    def describe(self, path: Path | str) -> Dict[str, object] | None:
+        """Catalogued metadata for ``path`` (absolute or relative to ``base_dir``)."""
+        try:
+            rel = os.path.relpath(path, self.base_dir)
+        except ValueError:
+            return None
+        return self._files.get(rel)
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+_CATALOGS: Dict[str, DataCatalog] = {}
+
+
+def local_catalog(base_dir: Path | str, path: Path | str | None = None) -> DataCatalog:
+    """Process-wide catalog for ``base_dir``, refreshed (and saved) on first use."""
+    key = f"{os.path.abspath(base_dir)}|{path or ''}"
+    catalog = _CATALOGS.get(key)
+    if catalog is None:
+        catalog = DataCatalog(base_dir, path=path)
+        _refresh(catalog)
+        _CATALOGS[key] = catalog
+    return catalog
+
+
+def _refresh(catalog: DataCatalog) -> None:
+    stats = catalog.refresh()
+    if stats["dirs_listed"] or stats["files_read"] or not catalog.path.exists():
+        catalog.save()
+
+
+def find_csv(ticker: str, base_dir: Path | str) -> List[Path]:
+    """Catalog lookup for ``ticker``; a miss re-checks the tree once before answering."""
+    catalog = local_catalog(base_dir)
+    hits = catalog.lookup(ticker)
+    if not hits:
+        _refresh(catalog)
+        hits = catalog.lookup(ticker)
+    return hits
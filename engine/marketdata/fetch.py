@@ -0,0 +1,362 @@
+"""Incremental price fetching into the price store.
+
+``fetch_updates`` asks a provider only for bars after each ticker's last
+stored date, over a bounded thread pool (fetching is I/O bound) with retry
+and exponential backoff on transient errors. Results are applied by the
+calling thread in batches through ``PriceStore.write`` (one manifest commit
+per batch), optionally mirrored as appended rows to the per-ticker CSVs, and
+summarised in a per-run JSON manifest.
+
+Providers implement ``fetch(ticker, start, end) -> DataFrame[date, price]``.
+``HTTPProvider`` speaks a minimal CSV-over-HTTP protocol
+(``GET {base_url}/prices/{ticker}?start=YYYY-MM-DD&end=YYYY-MM-DD``) that
+``LocalPriceServer`` serves from a directory of CSVs, so the whole path runs
+offline; ``YFinanceProvider`` wraps ``yfinance`` when it is installed.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, quote, unquote, urlparse
+from urllib.request import urlopen
+
+import numpy as np
+import pandas as pd
+
+from .store import FIELDS, MANIFEST, Frame, PriceStore, _source_stat, compile_store
+
+
+class TransientFetchError(RuntimeError):
+    """A failure worth retrying (rate limit, 5xx, network)."""
+
+
+def _price_frame(df: pd.DataFrame) -> pd.DataFrame:
+    cols = {c.lower(): c for c in df.columns}
+    date_col = cols.get("date") or cols.get("datetime") or df.columns[0]
+    price_col = next((cols[c] for c in ("adj close", "adj_close", "close", "price") if c in cols), None)
+    if price_col is None:
+        raise RuntimeError(f"no price column in {list(df.columns)}")
+    out = pd.DataFrame(
+        {
+            "date": pd.to_datetime(df[date_col], errors="coerce").dt.tz_localize(None),
+            "price": pd.to_numeric(df[price_col], errors="coerce"),
+        }
+    )
+    return out.dropna().sort_values("date").reset_index(drop=True)
+
+
+class PriceProvider:
+    """Source of daily bars; ``fetch`` returns ``date, price`` rows in ``[start, end]``."""
+
+    name = "provider"
+
+    def fetch(self, ticker: str, start: date | None, end: date | None) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class HTTPProvider(PriceProvider):
+    """CSV-over-HTTP provider (``GET {base_url}/prices/{ticker}?start=&end=``); 404 means no data."""
+
+    name = "http"
+
+    def __init__(self, base_url: str, timeout: float = 30.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = float(timeout)
+
+    def fetch(self, ticker: str, start: date | None, end: date | None) -> pd.DataFrame:
+        query = "&".join(f"{k}={v.isoformat()}" for k, v in (("start", start), ("end", end)) if v is not None)
+        url = f"{self.base_url}/prices/{quote(ticker, safe='')}" + (f"?{query}" if query else "")
+        try:
+            with urlopen(url, timeout=self.timeout) as resp:
+                body = resp.read().decode("utf-8")
+        except HTTPError as exc:
+            if exc.code == 404:
+                return pd.DataFrame(columns=["date", "price"])
+            if exc.code == 429 or exc.code >= 500:
+                raise TransientFetchError(f"HTTP {exc.code} for {ticker}") from exc
+            raise RuntimeError(f"HTTP {exc.code} for {ticker}") from exc
+        except (URLError, TimeoutError, ConnectionError) as exc:
+            raise TransientFetchError(f"network error for {ticker}: {exc}") from exc
+        if not body.strip():
+            return pd.DataFrame(columns=["date", "price"])
+        return _price_frame(pd.read_csv(io.StringIO(body)))
+
+
+class YFinanceProvider(PriceProvider):
+    """Adjusted closes from ``yfinance`` (close when no adjusted column)."""
+
+    name = "yfinance"
+
+    def fetch(self, ticker: str, start: date | None, end: date | None) -> pd.DataFrame:
+        try:
+            import yfinance as yf
+        except ImportError as exc:
+            raise RuntimeError("yfinance not installed; cannot fetch remote data.") from exc
+        try:
+            df = yf.download(
+                ticker,
+                start=(start or date(2009, 1, 1)).isoformat(),
+                end=(end + timedelta(days=1)).isoformat() if end else None,
+                progress=False,
+                auto_adjust=False,
+                group_by="column",
+                threads=False,
+            )
+        except Exception as exc:
+            raise TransientFetchError(f"yfinance error for {ticker}: {exc}") from exc
+        if df is None or df.empty:
+            return pd.DataFrame(columns=["date", "price"])
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = [col[0] for col in df.columns]
+        return _price_frame(df.reset_index())
+
+
+class LocalPriceServer:
+    """File-backed stand-in for a price API, serving ``HTTPProvider`` requests from ``root/<ticker>.csv``.
+
+    ``fail_first`` makes the first N requests per ticker answer 503, to
+    exercise retries. Use as a context manager; ``url`` is the base URL.
+    """
+
+    def __init__(self, root: Path | str, fail_first: int = 0, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.root = Path(root)
+        self.fail_first = int(fail_first)
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                parsed = urlparse(self.path)
+                parts = parsed.path.strip("/").split("/")
+                if len(parts) != 2 or parts[0] != "prices":
+                    self.send_error(404)
+                    return
+                ticker = unquote(parts[1])
+                with server._lock:
+                    seen = server.requests.get(ticker, 0)
+                    server.requests[ticker] = seen + 1
+                if seen < server.fail_first:
+                    self.send_error(503)
+                    return
+                path = server.root / f"{ticker}.csv"
+                if not path.exists():
+                    self.send_error(404)
+                    return
+                df = _price_frame(pd.read_csv(path))
+                query = parse_qs(parsed.query)
+                if "start" in query:
+                    df = df[df["date"] >= pd.Timestamp(query["start"][0])]
+                if "end" in query:
+                    df = df[df["date"] <= pd.Timestamp(query["end"][0])]
+                body = df.assign(date=df["date"].dt.strftime("%Y-%m-%d")).to_csv(index=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalPriceServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self) -> "LocalPriceServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+@dataclass
+class FetchPolicy:
+    workers: int = 8
+    retries: int = 3
+    backoff: float = 0.5
+    backoff_max: float = 8.0
+    timeout: float = 30.0
+    history_start: str = "2009-01-01"
+    commit_every: int = 50
+
+
+@dataclass
+class FetchResult:
+    ticker: str
+    status: str  # appended | added | up_to_date | no_data | failed
+    start: str | None = None
+    new_rows: int = 0
+    last: str | None = None
+    attempts: int = 0
+    seconds: float = 0.0
+    message: str = ""
+
+
+def _with_retries(
+    call: Callable[[], pd.DataFrame],
+    policy: FetchPolicy,
+    sleep: Callable[[float], None],
+) -> tuple[pd.DataFrame, int]:
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return call(), attempt
+        except TransientFetchError:
+            if attempt > policy.retries:
+                raise
+            sleep(min(policy.backoff_max, policy.backoff * 2 ** (attempt - 1)))
+
+
+def _append_csv(path: Path, new: Frame) -> Dict[str, np.ndarray]:
+    """Append ``new`` to ``path``; returns the values as ``pd.read_csv`` parses them back."""
+    days, values = new
+    rows = pd.DataFrame({"date": np.asarray(days).astype("datetime64[D]").astype(str), **{f: values[f] for f in FIELDS}})
+    header = not path.exists() or path.stat().st_size == 0
+    text = rows.to_csv(index=False, header=header)
+    parsed = pd.read_csv(io.StringIO(text), header=0 if header else None, names=None if header else list(rows.columns))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8", newline="") as handle:
+        handle.write(text)
+    return {f: parsed[f].to_numpy(dtype=float) for f in FIELDS}
+
+
+def open_or_create_store(root: Path | str, source_dir: Path | str | None = None) -> PriceStore:
+    root = Path(root)
+    if (root / MANIFEST).exists():
+        return PriceStore(root)
+    return compile_store(root, {}, source_dir=source_dir)
+
+
+def fetch_updates(
+    store: PriceStore,
+    tickers: Iterable[str],
+    provider: PriceProvider,
+    policy: FetchPolicy | None = None,
+    csv_dir: Path | str | None = None,
+    manifest_dir: Path | str | None = None,
+    today: date | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, object]:
+    """Fetch bars newer than the store's last bar for each ticker and append them.
+
+    With ``csv_dir`` the new rows are also appended to ``<csv_dir>/<ticker>.csv``
+    and the store records the resulting file stat, so ``read_price_csv`` keeps
+    serving those files from the store. Returns the run manifest, also written
+    to ``manifest_dir`` (default ``<store>/fetch_runs``).
+    """
+    policy = policy or FetchPolicy()
+    today = today or datetime.now(timezone.utc).date()
+    started = datetime.now(timezone.utc)
+    csv_dir = Path(csv_dir) if csv_dir else None
+    tickers = list(dict.fromkeys(str(t).strip() for t in tickers if str(t).strip()))
+
+    plans: Dict[str, date] = {}
+    results: Dict[str, FetchResult] = {}
+    for ticker in tickers:
+        span = store.date_range(ticker)
+        start = date.fromisoformat(span[1]) + timedelta(days=1) if span else date.fromisoformat(policy.history_start)
+        if start > today:
+            results[ticker] = FetchResult(ticker, "up_to_date", start=start.isoformat(), last=span[1] if span else None)
+        else:
+            plans[ticker] = start
+
+    def _task(ticker: str) -> tuple[pd.DataFrame | None, FetchResult]:
+        t0 = time.perf_counter()
+        res = FetchResult(ticker, "failed", start=plans[ticker].isoformat())
+        try:
+            df, res.attempts = _with_retries(lambda: provider.fetch(ticker, plans[ticker], today), policy, sleep)
+        except Exception as exc:
+            res.message = str(exc)
+            res.attempts = res.attempts or policy.retries + 1
+            df = None
+        res.seconds = round(time.perf_counter() - t0, 4)
+        return df, res
+
+    pending: Dict[str, Frame] = {}
+    sources: Dict[str, dict] = {}
+
+    def _flush() -> None:
+        if pending:
+            store.write(dict(pending), sources=dict(sources))
+            pending.clear()
+            sources.clear()
+
+    with ThreadPoolExecutor(max_workers=max(1, int(policy.workers))) as pool:
+        futures = {pool.submit(_task, ticker): ticker for ticker in plans}
+        for future in as_completed(futures):
+            df, res = future.result()
+            results[res.ticker] = res
+            if df is None:
+                continue
+            frames = store.extend(res.ticker, df["date"], df["price"]) if len(df) else None
+            if frames is None:
+                res.status = "up_to_date" if res.ticker in store else "no_data"
+                continue
+            full, new = frames
+            res.status = "appended" if res.ticker in store else "added"
+            res.new_rows = int(new[0].size)
+            res.last = str(np.datetime64(int(new[0][-1]), "D"))
+            if csv_dir is not None:
+                path = csv_dir / f"{res.ticker}.csv"
+                if path.exists() and not store.is_current(res.ticker, path):
+                    # The CSV holds rows the store has not seen; appending would misplace ours.
+                    res.message = f"csv mirror skipped: store is not current for {path}"
+                else:
+                    # Store what a CSV reader gets back, so store and file agree to the last bit.
+                    parsed = _append_csv(path, new)
+                    for f in FIELDS:
+                        full[1][f][-res.new_rows :] = parsed[f]
+                    sources[res.ticker] = _source_stat(path)
+            pending[res.ticker] = full
+            if len(pending) >= policy.commit_every:
+                _flush()
+    _flush()
+
+    ordered: List[FetchResult] = [results[t] for t in tickers]
+    counts: Dict[str, int] = {}
+    for res in ordered:
+        counts[res.status] = counts.get(res.status, 0) + 1
+    manifest = {
+        "run_id": started.strftime("%Y%m%dT%H%M%S%fZ"),
+        "provider": provider.name,
+        "started": started.isoformat(),
+        "finished": datetime.now(timezone.utc).isoformat(),
+        "today": today.isoformat(),
+        "policy": asdict(policy),
+        "store": str(store.root),
+        "csv_dir": str(csv_dir) if csv_dir else None,
+        "counts": counts,
+        "new_rows": int(sum(r.new_rows for r in ordered)),
+        "results": [asdict(r) for r in ordered],
+    }
+    out_dir = Path(manifest_dir) if manifest_dir else store.root / "fetch_runs"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / f"fetch_{manifest['run_id']}.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
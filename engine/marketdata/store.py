@@ -0,0 +1,477 @@
+"""Columnar, memory-mapped store of daily price histories.
+
+A store compiles a directory of per-ticker CSVs (``date,price,log_price,r``)
+into one panel per field: a raw ``float64`` file of shape
+``(n_tickers, capacity)`` in C order, so one ticker is one contiguous row, plus
+an ``int64`` day axis (days since 1970-01-01) shared by every ticker. Missing
+(ticker, date) cells are NaN. ``manifest.json`` records the axis length, each
+ticker's row and ``[start, end)`` span on the axis, and the size/mtime of the
+CSV it came from.
+
+Writes go to the data files first and become visible when the manifest is
+replaced (``os.replace``); readers only look inside the spans the manifest
+describes, so a reader never sees a half-written append. New dates are
+appended in place while the axis has spare capacity; anything else (dates
+inserted mid-axis, capacity exhausted) writes a new generation of files. One
+writer at a time is assumed.
+
+``read_price_csv(path)`` is the drop-in for ``pd.read_csv(path)`` on a price
+CSV: it serves the frame from the store when the store holds an up-to-date
+copy of that file and falls back to parsing the CSV otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ("price", "log_price", "r")
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+SPARE_DAYS = 512
+DEFAULT_ROOT = Path(__file__).resolve().parents[2] / "data" / "price_store"
+
+Frame = Tuple[np.ndarray, Dict[str, np.ndarray]]
+
+
+def store_dir_for(source_dir: Path | str, root: Path | str | None = None) -> Path:
+    """Store location for a CSV directory: ``<root>/<source_dir name>``.
+
+    ``root`` defaults to ``$PRICE_STORE_DIR`` or ``data/price_store``.
+    """
+    root = Path(root or os.environ.get("PRICE_STORE_DIR") or DEFAULT_ROOT)
+    return root / Path(source_dir).name
+
+
+def _to_days(dates: Iterable) -> np.ndarray:
+    return pd.DatetimeIndex(pd.to_datetime(dates)).to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+
+def _day_str(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+
+def _source_stat(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def parse_price_csv(path: Path | str) -> Frame | None:
+    """``(days, {field: values})`` from a ``date,price,log_price,r`` CSV (sorted, last duplicate wins).
+
+    Rows without a price are dropped. Missing ``log_price``/``r`` columns are derived from ``price``.
+    """
+    try:
+        df = pd.read_csv(path)
+    except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError, OSError):
+        return None
+    if "date" not in df.columns or "price" not in df.columns:
+        return None
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df = df.dropna(subset=["date"]).sort_values("date", kind="stable").drop_duplicates("date", keep="last")
+    price = pd.to_numeric(df["price"], errors="coerce").to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_price = pd.to_numeric(df["log_price"], errors="coerce").to_numpy(dtype=float) if "log_price" in df else np.log(price)
+    if "r" in df:
+        r = pd.to_numeric(df["r"], errors="coerce").to_numpy(dtype=float)
+    else:
+        r = np.r_[np.nan, np.diff(log_price)] if log_price.size else log_price.copy()
+    ok = ~np.isnan(price)
+    return _to_days(df["date"])[ok], {"price": price[ok], "log_price": log_price[ok], "r": r[ok]}
+
+
+def _week_end(days: np.ndarray) -> np.ndarray:
+    # Sunday closing each Monday..Sunday week (pandas ``resample("W")`` labels); day 0 was a Thursday.
+    return days + 6 - (days + 3) % 7
+
+
+class PriceStore:
+    """Read/append access to a compiled store directory."""
+
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        self.manifest = json.loads((self.root / MANIFEST).read_text(encoding="utf-8"))
+        if int(self.manifest.get("format", 0)) != FORMAT_VERSION:
+            raise ValueError(f"unsupported price store format in {self.root}")
+        self._open()
+
+    # -- layout -------------------------------------------------------------
+
+    def _file(self, name: str, generation: int | None = None) -> Path:
+        gen = self.manifest["generation"] if generation is None else generation
+        return self.root / f"{name}-{gen}.bin"
+
+    def _open(self, mode: str = "r") -> None:
+        m = self.manifest
+        rows, cap = len(m["tickers"]), int(m["capacity"])
+        self._days = np.memmap(self._file("dates"), dtype=np.int64, mode=mode, shape=(cap,))
+        self._panel = {
+            f: np.memmap(self._file(f), dtype=np.float64, mode=mode, shape=(max(rows, 1), cap)) if rows else np.zeros((0, cap))
+            for f in FIELDS
+        }
+        self._weekly: Dict[Tuple[str, int], np.ndarray] = {}
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.manifest["tickers"])
+
+    @property
+    def source_dir(self) -> Path | None:
+        src = self.manifest.get("source_dir")
+        return Path(src) if src else None
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self.manifest["tickers"]
+
+    def __len__(self) -> int:
+        return len(self.manifest["tickers"])
+
+    def dates(self) -> np.ndarray:
+        """Shared day axis as ``datetime64[D]``."""
+        return np.asarray(self._days[: self.manifest["n_dates"]]).astype("datetime64[D]")
+
+    def date_range(self, ticker: str) -> Tuple[str, str] | None:
+        entry = self.manifest["tickers"].get(ticker)
+        if not entry or not entry["n_obs"]:
+            return None
+        return entry["first"], entry["last"]
+
+    def is_current(self, ticker: str, csv_path: Path | str) -> bool:
+        """True when ``ticker`` was compiled from ``csv_path`` as it is on disk now."""
+        entry = self.manifest["tickers"].get(ticker)
+        try:
+            return bool(entry) and entry.get("source") == _source_stat(Path(csv_path))
+        except OSError:
+            return False
+
+    # -- reads --------------------------------------------------------------
+
+    def _rows(self, ticker: str, start=None, end=None) -> np.ndarray:
+        entry = self.manifest["tickers"][ticker]
+        lo, hi = int(entry["start"]), int(entry["end"])
+        axis = self._days[:hi]
+        if start is not None:
+            lo = max(lo, int(np.searchsorted(axis, _to_days([start])[0], side="left")))
+        if end is not None:
+            hi = min(hi, int(np.searchsorted(axis, _to_days([end])[0], side="right")))
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64)
+        row = self._panel["price"][entry["row"], lo:hi]
+        return lo + np.flatnonzero(~np.isnan(row))
+
+    def _last_per_week(self, rows: np.ndarray) -> np.ndarray:
+        if rows.size == 0:
+            return rows
+        wk = _week_end(np.asarray(self._days[rows]))
+        return rows[np.r_[wk[1:] != wk[:-1], True]]
+
+    def _weekly_rows(self, ticker: str, idx: np.ndarray, ranged: bool) -> np.ndarray:
+        # Last observation of every calendar week; the full-history pick is cached per ticker span.
+        if ranged:
+            return self._last_per_week(idx)
+        key = (ticker, int(self.manifest["tickers"][ticker]["end"]))
+        if key not in self._weekly:
+            self._weekly[key] = self._last_per_week(idx)
+        return self._weekly[key]
+
+    def get(self, ticker: str, start=None, end=None, freq: str = "D") -> pd.DataFrame:
+        """``date, price, log_price, r`` rows for ``ticker`` within ``[start, end]``.
+
+        ``freq="W"`` keeps the last bar of each week, dated at the week's
+        closing Sunday like ``resample("W").last()``.
+        """
+        if ticker not in self.manifest["tickers"]:
+            raise KeyError(ticker)
+        idx = self._rows(ticker, start, end)
+        days = np.asarray(self._days[idx])
+        if str(freq).upper().startswith("W"):
+            idx = self._weekly_rows(ticker, idx, ranged=start is not None or end is not None)
+            days = _week_end(np.asarray(self._days[idx]))
+        row = self.manifest["tickers"][ticker]["row"]
+        out = {"date": pd.to_datetime(days.astype("datetime64[D]"))}
+        for f in FIELDS:
+            out[f] = np.asarray(self._panel[f][row, idx])
+        return pd.DataFrame(out)
+
+    def series(self, ticker: str, field: str = "price", start=None, end=None, freq: str = "D") -> np.ndarray:
+        return self.get(ticker, start=start, end=end, freq=freq)[field].to_numpy()
+
+    # -- writes -------------------------------------------------------------
+
+    def _commit(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(self.manifest, handle, indent=1, sort_keys=True)
+            os.replace(tmp, self.root / MANIFEST)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _frames(self) -> Dict[str, Frame]:
+        frames = {}
+        for ticker in self.tickers:
+            idx = self._rows(ticker)
+            row = self.manifest["tickers"][ticker]["row"]
+            frames[ticker] = (np.asarray(self._days[idx]), {f: np.asarray(self._panel[f][row, idx]) for f in FIELDS})
+        return frames
+
+    def write(self, updates: Mapping[str, Frame], sources: Mapping[str, Dict[str, int]] | None = None) -> Dict[str, str]:
+        """Merge ``updates`` (ticker -> frame) into the store.
+
+        A frame replaces the ticker's stored history. Tickers whose update
+        only adds bars after their last stored bar, on dates at or past the
+        end of the shared axis, are written in place; other changes rebuild
+        the panel. Returns ``{ticker: "appended" | "added" | "rewritten"}``.
+        """
+        sources = dict(sources or {})
+        m = self.manifest
+        n_dates, cap = int(m["n_dates"]), int(m["capacity"])
+        axis = np.asarray(self._days[:n_dates])
+        plan: Dict[str, Tuple[str, np.ndarray, Dict[str, np.ndarray]]] = {}
+        new_days: List[np.ndarray] = []
+        in_place = True
+        for ticker, (days, values) in updates.items():
+            days = np.asarray(days, dtype=np.int64)
+            entry = m["tickers"].get(ticker)
+            keep = 0
+            if entry is not None:
+                stored = self._rows(ticker)
+                keep = stored.size
+                same = keep <= days.size and np.array_equal(days[:keep], axis[stored]) and all(
+                    np.array_equal(values[f][:keep], self._panel[f][entry["row"], stored], equal_nan=True) for f in FIELDS
+                )
+                if not same:
+                    in_place = False
+            tail = days[keep:]
+            inside = tail[tail <= (axis[-1] if axis.size else np.iinfo(np.int64).min)]
+            if inside.size and not np.isin(inside, axis).all():
+                in_place = False
+            new_days.append(tail[~np.isin(tail, axis)])
+            plan[ticker] = ("appended" if entry is not None else "added", days, values)
+        extra = np.unique(np.concatenate(new_days)) if new_days else np.zeros(0, dtype=np.int64)
+        if n_dates + extra.size > cap:
+            in_place = False
+        if not in_place:
+            frames = self._frames()
+            for ticker, (_, days, values) in plan.items():
+                frames[ticker] = (days, values)
+            merged = {**{t: e.get("source") for t, e in m["tickers"].items()}, **sources}
+            rebuilt = compile_store(self.root, frames, sources=merged, source_dir=self.source_dir)
+            self.manifest = rebuilt.manifest
+            self._open()
+            return {ticker: "rewritten" for ticker in plan}
+
+        # In place: extend the axis, add rows for new tickers, then fill spans.
+        self._open("r+")
+        self._days[n_dates : n_dates + extra.size] = extra
+        n_dates += extra.size
+        added = [t for t, (kind, _, _) in plan.items() if kind == "added"]
+        if added:
+            blank = np.full((len(added), cap), np.nan).tobytes()
+            for f in FIELDS:
+                with open(self._file(f), "ab") as handle:
+                    handle.write(blank)
+            for ticker in added:
+                m["tickers"][ticker] = {"row": len(m["tickers"]), "start": 0, "end": 0, "n_obs": 0}
+            self._open("r+")
+        axis = np.asarray(self._days[:n_dates])
+        for ticker, (_, days, values) in plan.items():
+            entry = m["tickers"][ticker]
+            keep = int(entry["n_obs"])
+            pos = np.searchsorted(axis, days[keep:])
+            for f in FIELDS:
+                self._panel[f][entry["row"], pos] = values[f][keep:]
+            if days.size:
+                entry.update(
+                    start=int(np.searchsorted(axis, days[0])),
+                    end=int(np.searchsorted(axis, days[-1])) + 1,
+                    n_obs=int(days.size),
+                    first=_day_str(days[0]),
+                    last=_day_str(days[-1]),
+                )
+            if ticker in sources:
+                entry["source"] = sources[ticker]
+        for arr in [self._days, *self._panel.values()]:
+            if isinstance(arr, np.memmap):
+                arr.flush()
+        m["n_dates"] = n_dates
+        self._commit()
+        self._open()
+        return {ticker: kind for ticker, (kind, _, _) in plan.items()}
+
+    def extend(self, ticker: str, dates: Iterable, price: Iterable[float]) -> Tuple[Frame, Frame] | None:
+        """``(full, new)`` frames for ``ticker`` with bars after its last stored date added.
+
+        Bars without a positive price are dropped; ``log_price`` and ``r``
+        are derived, ``r`` chaining on from the last stored bar. ``None``
+        when nothing is new. The store itself is not modified.
+        """
+        days = _to_days(list(dates))
+        price = np.asarray(list(price), dtype=float)
+        ok = np.isfinite(price) & (price > 0)
+        days, price = days[ok], price[ok]
+        order = np.argsort(days, kind="stable")
+        days, price = days[order], price[order]
+        keep = np.r_[days[1:] != days[:-1], True] if days.size else np.zeros(0, dtype=bool)
+        days, price = days[keep], price[keep]  # last duplicate wins
+        base_days = np.zeros(0, dtype=np.int64)
+        base = {f: np.zeros(0) for f in FIELDS}
+        if ticker in self:
+            idx = self._rows(ticker)
+            row = self.manifest["tickers"][ticker]["row"]
+            base_days = np.asarray(self._days[idx])
+            base = {f: np.asarray(self._panel[f][row, idx]) for f in FIELDS}
+        if base_days.size:
+            new = days > base_days[-1]
+            days, price = days[new], price[new]
+        if days.size == 0:
+            return None
+        prev_log = base["log_price"][-1] if base_days.size else np.nan
+        log_price = np.log(price)
+        added = {"price": price, "log_price": log_price, "r": np.diff(np.r_[prev_log, log_price])}
+        full = (np.r_[base_days, days], {f: np.r_[base[f], added[f]] for f in FIELDS})
+        return full, (days, added)
+
+    def append(self, ticker: str, dates: Iterable, price: Iterable[float]) -> int:
+        """Append bars after the ticker's last stored date (see ``extend``). Returns bars added."""
+        frames = self.extend(ticker, dates, price)
+        if frames is None:
+            return 0
+        self.write({ticker: frames[0]})
+        return int(frames[1][0].size)
+
+    def refresh(self, source_dir: Path | str | None = None) -> Dict[str, List[str]]:
+        """Re-read CSVs whose size/mtime changed since they were compiled; add new ones.
+
+        Returns tickers grouped by outcome: ``unchanged``, ``failed`` and the
+        ``write`` outcomes.
+        """
+        source_dir = Path(source_dir) if source_dir else self.source_dir
+        if source_dir is None:
+            raise ValueError("store has no source_dir; pass one")
+        report: Dict[str, List[str]] = {"unchanged": [], "failed": []}
+        updates: Dict[str, Frame] = {}
+        sources: Dict[str, Dict[str, int]] = {}
+        for path in sorted(source_dir.glob("*.csv")):
+            ticker = path.stem
+            if self.is_current(ticker, path):
+                report["unchanged"].append(ticker)
+                continue
+            frame = parse_price_csv(path)
+            if frame is None:
+                report["failed"].append(ticker)
+                continue
+            updates[ticker] = frame
+            sources[ticker] = _source_stat(path)
+        if updates:
+            for ticker, kind in self.write(updates, sources).items():
+                report.setdefault(kind, []).append(ticker)
+        return report
+
+
+def compile_store(
+    root: Path | str,
+    frames: Mapping[str, Frame],
+    sources: Mapping[str, Dict[str, int] | None] | None = None,
+    source_dir: Path | str | None = None,
+    spare_days: int = SPARE_DAYS,
+) -> PriceStore:
+    """Write ``frames`` (ticker -> ``(days, {field: values})``) as a new store generation."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    old = None
+    if (root / MANIFEST).exists():
+        old = json.loads((root / MANIFEST).read_text(encoding="utf-8"))
+    generation = int(old["generation"]) + 1 if old else 0
+    tickers = sorted(frames)
+    axis = np.unique(np.concatenate([np.asarray(frames[t][0], dtype=np.int64) for t in tickers])) if tickers else np.zeros(0, np.int64)
+    cap = int(axis.size + spare_days)
+    days_out = np.zeros(cap, dtype=np.int64)
+    days_out[: axis.size] = axis
+    days_out.tofile(root / f"dates-{generation}.bin")
+    entries: Dict[str, dict] = {}
+    for f in FIELDS:
+        panel = np.full((len(tickers), cap), np.nan)
+        for row, ticker in enumerate(tickers):
+            days, values = frames[ticker]
+            pos = np.searchsorted(axis, days)
+            panel[row, pos] = values[f]
+            if f == FIELDS[0]:
+                entry = {"row": row, "start": 0, "end": 0, "n_obs": int(len(days))}
+                if len(days):
+                    entry.update(start=int(pos[0]), end=int(pos[-1]) + 1, first=_day_str(days[0]), last=_day_str(days[-1]))
+                src = (sources or {}).get(ticker)
+                if src:
+                    entry["source"] = src
+                entries[ticker] = entry
+        panel.tofile(root / f"{f}-{generation}.bin")
+    manifest = {
+        "format": FORMAT_VERSION,
+        "generation": generation,
+        "capacity": cap,
+        "n_dates": int(axis.size),
+        "fields": list(FIELDS),
+        "source_dir": str(Path(source_dir).resolve()) if source_dir else None,
+        "tickers": entries,
+    }
+    store = PriceStore.__new__(PriceStore)
+    store.root = root
+    store.manifest = manifest
+    store._commit()
+    if old:
+        for name in ("dates", *FIELDS):
+            (root / f"{name}-{old['generation']}.bin").unlink(missing_ok=True)
+    return PriceStore(root)
+
+
+def build_store(source_dir: Path | str, root: Path | str | None = None) -> PriceStore:
+    """Compile every ``*.csv`` in ``source_dir`` into a fresh store (default: ``store_dir_for(source_dir)``)."""
+    source_dir = Path(source_dir)
+    frames: Dict[str, Frame] = {}
+    sources: Dict[str, Dict[str, int]] = {}
+    for path in sorted(source_dir.glob("*.csv")):
+        frame = parse_price_csv(path)
+        if frame is not None:
+            frames[path.stem] = frame
+            sources[path.stem] = _source_stat(path)
+    return compile_store(root or store_dir_for(source_dir), frames, sources=sources, source_dir=source_dir)
+
+
+_OPEN: Dict[Path, Tuple[float, PriceStore]] = {}
+
+
+def open_store(root: Path | str) -> PriceStore | None:
+    """Open (and memoise) the store at ``root``; ``None`` when there is none."""
+    root = Path(root)
+    try:
+        mtime = (root / MANIFEST).stat().st_mtime_ns
+    except OSError:
+        return None
+    hit = _OPEN.get(root)
+    if hit is None or hit[0] != mtime:
+        try:
+            hit = (mtime, PriceStore(root))
+        except (OSError, ValueError):
+            return None
+        _OPEN[root] = hit
+    return hit[1]
+
+
+def read_price_csv(path: Path | str, store_root: Path | str | None = None) -> pd.DataFrame:
+    """``pd.read_csv(path)`` for a price CSV, served from the store when it is up to date.
+
+    From the store, ``date`` comes back as ``datetime64`` instead of strings;
+    every caller passes it through ``pd.to_datetime`` anyway.
+    """
+    path = Path(path)
+    store = open_store(store_dir_for(path.parent, store_root))
+    if store is not None and store.is_current(path.stem, path):
+        return store.get(path.stem)
+    return pd.read_csv(path)
@@ -1,19 +1,16 @@
 import numpy as np
 
+from engine.graph.embedding import delay_embedding
+
 
 def embed(series, tau, m):
+    # X is a read-only strided view (row i: series[i + start], series[i + start - tau], ...).
     series = np.asarray(series, dtype=float)
     start = (m - 1) * tau
-    X = []
-    y = []
-    idx = []
-    for i in range(start, len(series) - 1):
-        X.append([series[i - j * tau] for j in range(m)])
-        y.append(series[i + 1])
-        idx.append(i + 1)
-    if not X:
+    if len(series) - 1 <= start:
         return None, None, None
-    return np.array(X), np.array(y), np.array(idx)
+    X = delay_embedding(series[:-1], m=m, tau=tau)
+    return X, series[start + 1 :].copy(), np.arange(start + 1, len(series))
 
 
 class TakensKNN:
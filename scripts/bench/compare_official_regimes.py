@@ -23,7 +23,7 @@ ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from engine.graph.core import run_graph_engine  # noqa: E402
+from engine.graph.cache import ResultCache, cached_run_graph_engine  # noqa: E402
 from engine.graph.embedding import estimate_embedding_params  # noqa: E402
 
 
@@ -50,9 +50,21 @@ def load_official(path: Path) -> pd.DataFrame:
     return df.dropna(subset=["date"])
 
 
-def engine_labels(series: pd.Series, m: int, tau: int, n_micro: int, n_regimes: int, k_nn: int, theiler: int, alpha: float, method: str) -> Tuple[pd.Series, pd.Series, pd.Series]:
-    result = run_graph_engine(
+def engine_labels(
+    series: pd.Series,
+    m: int,
+    tau: int,
+    n_micro: int,
+    n_regimes: int,
+    k_nn: int,
+    theiler: int,
+    alpha: float,
+    method: str,
+    cache: ResultCache | None = None,
+) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    result = cached_run_graph_engine(
         series.values.astype(float),
+        cache,
         m=m,
         tau=tau,
         n_micro=n_micro,
@@ -354,7 +366,9 @@ def main() -> None:
         default="0.8,0.9,0.95",
         help="Comma-separated quantiles for score->binary conversion (score mode)",
     )
+    parser.add_argument("--cache-dir", default="", help="Reuse run_graph_engine results cached here across reruns")
     args = parser.parse_args()
+    cache = ResultCache(args.cache_dir) if args.cache_dir else None
 
     if args.auto_smoothing and args.min_run == 1 and args.cooldown == 0:
         if args.risk_mode == "unstable_only":
@@ -408,6 +422,7 @@ def main() -> None:
                 theiler=args.theiler,
                 alpha=args.alpha,
                 method=args.method,
+                cache=cache,
             )
 
             df = pd.DataFrame({"engine": labels, "confidence": confidence, "quality": quality})
@@ -707,6 +722,8 @@ def main() -> None:
             lines.append(f"- turning points vol: {val['turning_points']['vol']}")
         lines.append("")
     (outdir / "report.md").write_text("\n".join(lines), encoding="utf-8")
+    if cache is not None:
+        print(f"[cache] {cache.stats.as_dict()}")
     print(f"[ok] wrote {out_path}")
 
 
@@ -13,6 +13,11 @@ import pandas as pd
 
 
 ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.event_study import evaluate_alert_matrix, event_positions, random_alert_metrics  # noqa: E402
+from engine.marketdata import read_price_csv  # noqa: E402
 
 
 @dataclass
@@ -41,7 +46,7 @@ def _load_returns_csv(path: Path) -> pd.DataFrame | None:
     if not path.exists():
         return None
     try:
-        df = pd.read_csv(path)
+        df = read_price_csv(path)
     except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError, OSError):
         return None
     if "date" not in df.columns:
@@ -169,60 +174,14 @@ def evaluate_alerts(
     lookback_days: int,
     assoc_horizon_days: int = 20,
 ) -> EvalResult:
-    dts = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
-    s_alert = pd.Series(alert.to_numpy(dtype=bool)).reset_index(drop=True)
-    date_to_idx = {d: i for i, d in enumerate(dts)}
-    event_idx = sorted([date_to_idx[d] for d in pd.to_datetime(pd.Series(event_dates)).tolist() if d in date_to_idx])
-
-    detected = 0
-    coincident = 0
-    lead_days: list[int] = []
-    for e in event_idx:
-        lo = max(0, e - int(lookback_days))
-        hi = e - 1
-        if hi >= lo:
-            w_pre = s_alert.iloc[lo : hi + 1]
-            if bool(w_pre.any()):
-                detected += 1
-                first_rel = int(np.argmax(w_pre.to_numpy(dtype=bool)))
-                first_idx = lo + first_rel
-                lead_days.append(int(e - first_idx))
-        co_lo = e
-        co_hi = min(len(s_alert) - 1, e + 2)
-        if co_hi >= co_lo and bool(s_alert.iloc[co_lo : co_hi + 1].any()):
-            coincident += 1
-
-    alert_days_idx = np.where(s_alert.to_numpy(dtype=bool))[0]
     # Precision/false alarm are episode-based (entry alerts), avoiding distortion from long alert streaks.
-    starts_mask = s_alert.to_numpy(dtype=bool) & (~s_alert.shift(1, fill_value=False).to_numpy(dtype=bool))
-    alert_episode_idx = np.where(starts_mask)[0]
-    good_alerts = 0
-    for a in alert_episode_idx:
-        has_future_event = any((ev >= a + 1) and (ev <= a + int(assoc_horizon_days)) for ev in event_idx)
-        if has_future_event:
-            good_alerts += 1
-    n_alert_episodes = int(len(alert_episode_idx))
-    n_false_episodes = int(max(0, n_alert_episodes - good_alerts))
-    good_alert_days = 0
-    for a in alert_days_idx:
-        has_future_event = any((ev >= a + 1) and (ev <= a + int(assoc_horizon_days)) for ev in event_idx)
-        if has_future_event:
-            good_alert_days += 1
-    n_false_alert_days = int(max(0, len(alert_days_idx) - good_alert_days))
-    years = max(1e-9, len(dts) / 252.0)
-
-    return EvalResult(
-        recall=float(detected / len(event_idx)) if event_idx else float("nan"),
-        precision=float(good_alerts / n_alert_episodes) if n_alert_episodes > 0 else float("nan"),
-        false_alarm_per_year=float(n_false_episodes / years),
-        mean_lead_days=float(np.mean(lead_days)) if lead_days else float("nan"),
-        coincident_rate=float(coincident / len(event_idx)) if event_idx else float("nan"),
-        n_events=int(len(event_idx)),
-        n_alert_days=int(len(alert_days_idx)),
-        n_false_alert_days=n_false_alert_days,
-        n_alert_episodes=n_alert_episodes,
-        n_false_alert_episodes=n_false_episodes,
+    m = evaluate_alert_matrix(
+        alert.to_numpy(dtype=bool)[None, :],
+        event_positions(dates, event_dates),
+        lookback_days=lookback_days,
+        assoc_horizon_days=assoc_horizon_days,
     )
+    return EvalResult(**{k: (float(v[0]) if v.dtype.kind == "f" else int(v[0])) for k, v in m.items()})
 
 
 def random_baseline_distribution(
@@ -233,23 +192,15 @@ def random_baseline_distribution(
     n_boot: int = 1000,
     seed: int = 7,
 ) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    idx = np.arange(len(dates))
-    out: list[dict[str, float]] = []
-    for _ in range(int(n_boot)):
-        pick = rng.choice(idx, size=min(n_alert_days, len(idx)), replace=False)
-        a = np.zeros(len(dates), dtype=bool)
-        a[pick] = True
-        ev = evaluate_alerts(dates=dates, alert=pd.Series(a), event_dates=event_dates, lookback_days=lookback_days)
-        out.append(
-            {
-                "recall": ev.recall,
-                "precision": ev.precision,
-                "false_alarm_per_year": ev.false_alarm_per_year,
-                "mean_lead_days": ev.mean_lead_days,
-            }
-        )
-    return pd.DataFrame(out)
+    metrics = random_alert_metrics(
+        n_total=len(dates),
+        n_alert_days=n_alert_days,
+        event_idx=event_positions(dates, event_dates),
+        lookback_days=lookback_days,
+        n_masks=n_boot,
+        rng=np.random.default_rng(seed),
+    )
+    return pd.DataFrame({k: metrics[k] for k in ("recall", "precision", "false_alarm_per_year", "mean_lead_days")})
 
 
 def _format_metric(x: float) -> str:
@@ -13,7 +13,23 @@ import pandas as pd
 
 
 ROOT = Path(__file__).resolve().parents[2]
-
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.event_study import evaluate_alert_matrix, event_positions, random_alert_metrics  # noqa: E402
+from engine.marketdata import read_price_csv  # noqa: E402
+
+DEFAULT_TICKERS_FILE = "results/universe_470/tickers_470.txt"
+DEFAULT_ASSETS_DIR = "results/latest_graph_universe470_batch/assets"
+DEFAULT_PRICES_DIR = "data/raw/finance/yfinance_daily"
+DEFAULT_SECTOR_MAP_FILES = [
+    "data/asset_groups_470_enriched.csv",
+    "data/asset_groups.csv",
+    "results/finance_download/local_pack_20260218T060240Z/universe_fixed.csv",
+]
+DEFAULT_CALIBRATION_END = "2019-12-31"
+DEFAULT_TEST_START = "2020-01-01"
+DEFAULT_AUTO_CANDIDATES = "regime_entry_confirm,regime_balanced,regime_guarded"
 
 @dataclass
 class EvalResult:
@@ -41,7 +57,7 @@ def _load_returns_csv(path: Path) -> pd.DataFrame | None:
     if not path.exists():
         return None
     try:
-        df = pd.read_csv(path)
+        df = read_price_csv(path)
     except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError, OSError):
         return None
     if "date" not in df.columns:
@@ -208,60 +224,14 @@ def evaluate_alerts(
     lookback_days: int,
     assoc_horizon_days: int = 20,
 ) -> EvalResult:
-    dts = pd.to_datetime(pd.Series(dates)).reset_index(drop=True)
-    s_alert = pd.Series(alert.to_numpy(dtype=bool)).reset_index(drop=True)
-    date_to_idx = {d: i for i, d in enumerate(dts)}
-    event_idx = sorted([date_to_idx[d] for d in pd.to_datetime(pd.Series(event_dates)).tolist() if d in date_to_idx])
-
-    detected = 0
-    coincident = 0
-    lead_days: list[int] = []
-    for e in event_idx:
-        lo = max(0, e - int(lookback_days))
-        hi = e - 1
-        if hi >= lo:
-            w_pre = s_alert.iloc[lo : hi + 1]
-            if bool(w_pre.any()):
-                detected += 1
-                first_rel = int(np.argmax(w_pre.to_numpy(dtype=bool)))
-                first_idx = lo + first_rel
-                lead_days.append(int(e - first_idx))
-        co_lo = e
-        co_hi = min(len(s_alert) - 1, e + 2)
-        if co_hi >= co_lo and bool(s_alert.iloc[co_lo : co_hi + 1].any()):
-            coincident += 1
-
-    alert_days_idx = np.where(s_alert.to_numpy(dtype=bool))[0]
     # Precision/false alarm are episode-based (entry alerts), avoiding distortion from long alert streaks.
-    starts_mask = s_alert.to_numpy(dtype=bool) & (~s_alert.shift(1, fill_value=False).to_numpy(dtype=bool))
-    alert_episode_idx = np.where(starts_mask)[0]
-    good_alerts = 0
-    for a in alert_episode_idx:
-        has_future_event = any((ev >= a + 1) and (ev <= a + int(assoc_horizon_days)) for ev in event_idx)
-        if has_future_event:
-            good_alerts += 1
-    n_alert_episodes = int(len(alert_episode_idx))
-    n_false_episodes = int(max(0, n_alert_episodes - good_alerts))
-    good_alert_days = 0
-    for a in alert_days_idx:
-        has_future_event = any((ev >= a + 1) and (ev <= a + int(assoc_horizon_days)) for ev in event_idx)
-        if has_future_event:
-            good_alert_days += 1
-    n_false_alert_days = int(max(0, len(alert_days_idx) - good_alert_days))
-    years = max(1e-9, len(dts) / 252.0)
-
-    return EvalResult(
-        recall=float(detected / len(event_idx)) if event_idx else float("nan"),
-        precision=float(good_alerts / n_alert_episodes) if n_alert_episodes > 0 else float("nan"),
-        false_alarm_per_year=float(n_false_episodes / years),
-        mean_lead_days=float(np.mean(lead_days)) if lead_days else float("nan"),
-        coincident_rate=float(coincident / len(event_idx)) if event_idx else float("nan"),
-        n_events=int(len(event_idx)),
-        n_alert_days=int(len(alert_days_idx)),
-        n_false_alert_days=n_false_alert_days,
-        n_alert_episodes=n_alert_episodes,
-        n_false_alert_episodes=n_false_episodes,
+    m = evaluate_alert_matrix(
+        alert.to_numpy(dtype=bool)[None, :],
+        event_positions(dates, event_dates),
+        lookback_days=lookback_days,
+        assoc_horizon_days=assoc_horizon_days,
     )
+    return EvalResult(**{k: (float(v[0]) if v.dtype.kind == "f" else int(v[0])) for k, v in m.items()})
 
 
 def random_baseline_distribution(
@@ -274,44 +244,17 @@ def random_baseline_distribution(
     method: str = "iid",
     block_size: int = 10,
 ) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    n_total = int(len(dates))
-    idx = np.arange(n_total)
-    target = int(max(0, min(int(n_alert_days), n_total)))
-    method = str(method).strip().lower()
-    bsz = int(max(2, min(int(block_size), max(2, n_total))))
-    block_starts = np.arange(0, max(1, n_total - bsz + 1))
-    out: list[dict[str, float]] = []
-    for _ in range(int(n_boot)):
-        a = np.zeros(n_total, dtype=bool)
-        if target > 0:
-            if method == "block":
-                selected: list[int] = []
-                max_iters = max(10, n_total * 4)
-                iters = 0
-                while len(selected) < target and iters < max_iters:
-                    iters += 1
-                    s = int(rng.choice(block_starts))
-                    e = min(n_total, s + bsz)
-                    selected.extend(range(s, e))
-                if selected:
-                    pick = np.unique(np.array(selected, dtype=int))
-                    if len(pick) > target:
-                        pick = rng.choice(pick, size=target, replace=False)
-                    a[pick] = True
-            else:
-                pick = rng.choice(idx, size=target, replace=False)
-                a[pick] = True
-        ev = evaluate_alerts(dates=dates, alert=pd.Series(a), event_dates=event_dates, lookback_days=lookback_days)
-        out.append(
-            {
-                "recall": ev.recall,
-                "precision": ev.precision,
-                "false_alarm_per_year": ev.false_alarm_per_year,
-                "mean_lead_days": ev.mean_lead_days,
-            }
-        )
-    return pd.DataFrame(out)
+    metrics = random_alert_metrics(
+        n_total=len(dates),
+        n_alert_days=n_alert_days,
+        event_idx=event_positions(dates, event_dates),
+        lookback_days=lookback_days,
+        n_masks=n_boot,
+        rng=np.random.default_rng(seed),
+        method=method,
+        block_size=block_size,
+    )
+    return pd.DataFrame({k: metrics[k] for k in ("recall", "precision", "false_alarm_per_year", "mean_lead_days")})
 
 
 def _entry_alert(signal: pd.Series) -> pd.Series:
@@ -741,6 +684,81 @@ def build_action_plan_row(
     }
 
 
+@dataclass
+class SectorStudyInputs:
+    df: pd.DataFrame
+    ret_q01: float
+    vol_q95: float
+    events: dict[str, list[pd.Timestamp]]
+    events_cal: dict[str, list[pd.Timestamp]]
+
+
+def load_sector_study_inputs(
+    tickers: list[str],
+    sector_map: dict[str, str],
+    assets_dir: Path,
+    prices_dir: Path,
+    calibration_end: pd.Timestamp,
+    test_start: pd.Timestamp,
+    test_end: pd.Timestamp | None,
+    log=lambda msg: None,
+) -> SectorStudyInputs:
+    log("step: build_reference")
+    ref = build_reference_series(tickers=tickers, prices_dir=prices_dir)
+    log("step: build_sector_daily")
+    sector_daily = build_sector_daily_series(
+        tickers=tickers,
+        sector_map=sector_map,
+        assets_dir=assets_dir,
+        prices_dir=prices_dir,
+    )
+    df = pd.merge(
+        sector_daily,
+        ref[["date", "ret", "vol20", "dd20"]],
+        on="date",
+        how="inner",
+    ).sort_values(["sector", "date"])
+    df = df[df["date"] >= pd.to_datetime("2018-01-01")].reset_index(drop=True)
+
+    ref_cal = ref[ref["date"] <= calibration_end].copy()
+    if ref_cal.empty:
+        raise RuntimeError("Reference calibration sample is empty.")
+    ret_q01 = float(ref_cal["ret"].quantile(0.01))
+    vol_q95 = float(ref_cal["vol20"].dropna().quantile(0.95))
+    all_events = build_event_dates(
+        ref=ref[["date", "ret", "vol20", "dd20"]],
+        test_start=pd.to_datetime("2018-01-01"),
+        ret_q01=ret_q01,
+        vol_q95=vol_q95,
+    )
+    events = _filter_events_between(
+        events=all_events,
+        start=test_start,
+        end=(test_end if test_end is not None else pd.Timestamp(ref["date"].max())),
+    )
+    events_cal = _filter_events_between(
+        events=all_events,
+        start=pd.to_datetime("2018-01-01"),
+        end=calibration_end,
+    )
+    return SectorStudyInputs(df=df, ret_q01=ret_q01, vol_q95=vol_q95, events=events, events_cal=events_cal)
+
+
+def split_sector_frames(
+    df: pd.DataFrame,
+    sector: str,
+    calibration_end: pd.Timestamp,
+    test_start: pd.Timestamp,
+    test_end: pd.Timestamp | None,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    sdf = df[df["sector"] == sector].sort_values("date").reset_index(drop=True)
+    cal = sdf[sdf["date"] <= calibration_end].copy()
+    test = sdf[sdf["date"] >= test_start].copy()
+    if test_end is not None:
+        test = test[test["date"] <= test_end].copy()
+    return cal, test.reset_index(drop=True)
+
+
 def _format_metric(x: float) -> str:
     if pd.isna(x):
         return "nan"
@@ -749,20 +767,12 @@ def _format_metric(x: float) -> str:
 
 def main() -> None:
     ap = argparse.ArgumentParser(description="Sector-level event study validation for the 470-asset motor.")
-    ap.add_argument("--tickers-file", type=str, default="results/universe_470/tickers_470.txt")
-    ap.add_argument("--assets-dir", type=str, default="results/latest_graph_universe470_batch/assets")
-    ap.add_argument("--prices-dir", type=str, default="data/raw/finance/yfinance_daily")
-    ap.add_argument(
-        "--sector-map-files",
-        nargs="*",
-        default=[
-            "data/asset_groups_470_enriched.csv",
-            "data/asset_groups.csv",
-            "results/finance_download/local_pack_20260218T060240Z/universe_fixed.csv",
-        ],
-    )
-    ap.add_argument("--calibration-end", type=str, default="2019-12-31")
-    ap.add_argument("--test-start", type=str, default="2020-01-01")
+    ap.add_argument("--tickers-file", type=str, default=DEFAULT_TICKERS_FILE)
+    ap.add_argument("--assets-dir", type=str, default=DEFAULT_ASSETS_DIR)
+    ap.add_argument("--prices-dir", type=str, default=DEFAULT_PRICES_DIR)
+    ap.add_argument("--sector-map-files", nargs="*", default=list(DEFAULT_SECTOR_MAP_FILES))
+    ap.add_argument("--calibration-end", type=str, default=DEFAULT_CALIBRATION_END)
+    ap.add_argument("--test-start", type=str, default=DEFAULT_TEST_START)
     ap.add_argument("--test-end", type=str, default="", help="Optional inclusive test end date (YYYY-MM-DD).")
     ap.add_argument("--lookbacks", type=str, default="1,5,10,20")
     ap.add_argument("--n-random", type=int, default=300)
@@ -796,7 +806,7 @@ def main() -> None:
     ap.add_argument(
         "--auto-candidates",
         type=str,
-        default="regime_entry_confirm,regime_balanced,regime_guarded",
+        default=DEFAULT_AUTO_CANDIDATES,
         help="Policies considered by regime_auto, comma separated.",
     )
     ap.add_argument(
@@ -847,44 +857,19 @@ def main() -> None:
     outdir = ROOT / args.out_root / _ts_id()
     outdir.mkdir(parents=True, exist_ok=True)
 
-    log("step: build_reference")
-    ref = build_reference_series(tickers=tickers, prices_dir=prices_dir)
-    log("step: build_sector_daily")
-    sector_daily = build_sector_daily_series(
+    study = load_sector_study_inputs(
         tickers=tickers,
         sector_map=sector_map,
         assets_dir=assets_dir,
         prices_dir=prices_dir,
+        calibration_end=calibration_end,
+        test_start=test_start,
+        test_end=test_end,
+        log=log,
     )
-    df = pd.merge(
-        sector_daily,
-        ref[["date", "ret", "vol20", "dd20"]],
-        on="date",
-        how="inner",
-    ).sort_values(["sector", "date"])
-    df = df[df["date"] >= pd.to_datetime("2018-01-01")].reset_index(drop=True)
-
-    ref_cal = ref[ref["date"] <= calibration_end].copy()
-    if ref_cal.empty:
-        raise RuntimeError("Reference calibration sample is empty.")
-    ret_q01 = float(ref_cal["ret"].quantile(0.01))
-    vol_q95 = float(ref_cal["vol20"].dropna().quantile(0.95))
-    all_events = build_event_dates(
-        ref=ref[["date", "ret", "vol20", "dd20"]],
-        test_start=pd.to_datetime("2018-01-01"),
-        ret_q01=ret_q01,
-        vol_q95=vol_q95,
-    )
-    events = _filter_events_between(
-        events=all_events,
-        start=test_start,
-        end=(test_end if test_end is not None else pd.Timestamp(ref["date"].max())),
-    )
-    events_cal = _filter_events_between(
-        events=all_events,
-        start=pd.to_datetime("2018-01-01"),
-        end=calibration_end,
-    )
+    df = study.df
+    ret_q01, vol_q95 = study.ret_q01, study.vol_q95
+    events, events_cal = study.events, study.events_cal
 
     metrics_rows: list[dict[str, object]] = []
     events_rows: list[dict[str, object]] = []
@@ -894,12 +879,7 @@ def main() -> None:
 
     log("step: sector_loop")
     for sector in sorted(df["sector"].dropna().astype(str).unique()):
-        sdf = df[df["sector"] == sector].sort_values("date").reset_index(drop=True)
-        cal = sdf[sdf["date"] <= calibration_end].copy()
-        test = sdf[sdf["date"] >= test_start].copy()
-        if test_end is not None:
-            test = test[test["date"] <= test_end].copy()
-        test = test.reset_index(drop=True)
+        cal, test = split_sector_frames(df, sector, calibration_end, test_start, test_end)
         n_assets_med = float(test["n_assets"].median()) if not test.empty else 0.0
         is_eligible = bool(
             (n_assets_med >= float(args.min_sector_assets))
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 import os
 import random
 import subprocess
@@ -10,12 +11,22 @@ import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Sequence
 
 import numpy as np
 import pandas as pd
 
 
 ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.event_study import evaluate_alert_matrix, event_positions, random_alert_metrics  # noqa: E402
+from engine.graph.parallel import run_tasks  # noqa: E402
+from scripts.bench import event_study_validate_sectors as es  # noqa: E402
+
+SCORED_EVENTS = ("drawdown20", "ret_tail")
+SCORED_LOOKBACKS = (5, 10)
 
 
 @dataclass
@@ -90,6 +101,7 @@ def run_validation(
     min_test_days: int,
     two_layer_mode: str,
     seed_tag: int,
+    data_args: Sequence[str] = (),
 ) -> Path:
     cmd = [
         sys.executable,
@@ -132,6 +144,7 @@ def run_validation(
         str(int(cfg.confirm_m)),
         "--min-alert-gap-days",
         str(int(cfg.min_alert_gap_days)),
+        *data_args,
     ]
     env = os.environ.copy()
     env["PYTHONHASHSEED"] = str(seed_tag)
@@ -155,7 +168,10 @@ def evaluate_outdir(outdir: Path) -> dict[str, float]:
     if not p.exists():
         raise RuntimeError(f"Missing metrics file: {p}")
     df = pd.read_csv(p)
-    motor = df[df["model"] == "motor"].copy()
+    return summarize_motor_metrics(df[df["model"] == "motor"].copy())
+
+
+def summarize_motor_metrics(motor: pd.DataFrame) -> dict[str, float]:
     if motor.empty:
         raise RuntimeError("No motor rows in metrics.")
 
@@ -192,6 +208,277 @@ def evaluate_outdir(outdir: Path) -> dict[str, float]:
     }
 
 
+def validator_params(cfg: CandidateConfig) -> dict[str, float]:
+    """The parameter dict the validator builds from the flags ``run_validation`` passes."""
+
+    def _q(x: float) -> float:
+        return float(max(0.01, min(0.99, float(f"{x:.6f}"))))
+
+    return {
+        "q_unstable": _q(cfg.q_unstable),
+        "q_transition": _q(cfg.q_transition),
+        "q_confidence": _q(cfg.q_confidence),
+        "q_confidence_guarded": _q(cfg.q_confidence_guarded),
+        "q_score_balanced": _q(cfg.q_score_balanced),
+        "q_score_guarded": _q(cfg.q_score_guarded),
+        "confirm_n": float(max(1, int(cfg.confirm_n))),
+        "confirm_m": float(max(1, int(cfg.confirm_m))),
+        "min_alert_gap_days": float(max(0, int(cfg.min_alert_gap_days))),
+    }
+
+
+class SectorSeries:
+    """One eligible sector: test columns as arrays, event positions, memoised thresholds and masks."""
+
+    _MAX_MASKS = 4096
+
+    def __init__(self, name: str, cal: pd.DataFrame, test: pd.DataFrame, events: dict[str, list[pd.Timestamp]]) -> None:
+        self.name = name
+        self.cal = cal
+        self.n = int(len(test))
+        self.columns = {
+            c: test[c].to_numpy(dtype=float)
+            for c in ("share_unstable", "share_transition", "mean_confidence", "sector_score")
+        }
+        self.event_idx = {ev: event_positions(test["date"], events.get(ev, [])) for ev in SCORED_EVENTS}
+        self._thresholds: dict[tuple[str, float], float] = {}
+        self._masks: dict[tuple[str, float], np.ndarray] = {}
+        self._auto: dict[tuple[object, ...], str] = {}
+
+    def threshold(self, col: str, q: float) -> float:
+        key = (col, q)
+        if key not in self._thresholds:
+            self._thresholds[key] = float(self.cal[col].quantile(q))
+        return self._thresholds[key]
+
+    def above(self, col: str, q: float) -> np.ndarray:
+        """``test[col] >= cal[col].quantile(q)``."""
+        key = (col, q)
+        mask = self._masks.get(key)
+        if mask is None:
+            if len(self._masks) >= self._MAX_MASKS:
+                self._masks.clear()
+            mask = self.columns[col] >= self.threshold(col, q)
+            self._masks[key] = mask
+        return mask
+
+    def auto_policy(self, events_cal: dict[str, list[pd.Timestamp]], params: dict[str, float], candidates: list[str]) -> str:
+        key = tuple(sorted(params.items())) + tuple(candidates)
+        if key not in self._auto:
+            self._auto[key], _ = es.choose_auto_policy_for_sector(
+                cal=self.cal, events_cal=events_cal, params=params, candidates=candidates
+            )
+        return self._auto[key]
+
+
+def _raw_state(s: SectorSeries, policy: str, p: dict[str, float]) -> np.ndarray:
+    """Array form of the raw state in ``build_layered_alerts_for_sector``."""
+    if policy == "score_q80":
+        return s.above("sector_score", 0.80)
+    if policy == "score_q90":
+        return s.above("sector_score", 0.90)
+    unstable = s.above("share_unstable", p["q_unstable"])
+    transition = s.above("share_transition", p["q_transition"])
+    if policy in {"regime_entry", "regime_entry_confirm"}:
+        return unstable | (transition & s.above("mean_confidence", p["q_confidence"]))
+    if policy == "regime_balanced":
+        conf, score = s.above("mean_confidence", p["q_confidence"]), s.above("sector_score", p["q_score_balanced"])
+    elif policy == "regime_guarded":
+        conf, score = s.above("mean_confidence", p["q_confidence_guarded"]), s.above("sector_score", p["q_score_guarded"])
+    else:
+        raise ValueError(f"Unknown alert policy for layered mode: {policy}")
+    return (unstable & score) | (transition & conf & score)
+
+
+def _confirm_n_of_m(raw: np.ndarray, n: int, m: int) -> np.ndarray:
+    out = np.zeros(raw.size, dtype=bool)
+    if m <= raw.size:
+        c = np.concatenate([[0], np.cumsum(raw, dtype=np.int64)])
+        out[m - 1 :] = (c[m:] - c[:-m]) >= n
+    return out
+
+
+def _entry(x: np.ndarray) -> np.ndarray:
+    return x & ~np.concatenate([[False], x[:-1]])
+
+
+def _min_gap(alert: np.ndarray, gap: int) -> np.ndarray:
+    idx = np.flatnonzero(alert)
+    if gap <= 0 or idx.size <= 1:
+        return alert
+    keep = np.zeros(alert.size, dtype=bool)
+    last_kept = -(10**9)
+    for i in idx.tolist():
+        if i - last_kept > gap:
+            keep[i] = True
+            last_kept = i
+    return keep
+
+
+class SectorSearchEngine:
+    """Scores candidates in-process against a sector panel loaded once.
+
+    Produces the motor rows of ``sector_metrics_summary.csv`` that the search
+    scores (``drawdown20``/``ret_tail`` at L=5/10) with the validator's
+    definitions and random-baseline seeds, so ``summarize_motor_metrics`` gives
+    the same numbers as a validator run with the same flags. Only the block
+    baseline for ``drawdown20`` is drawn, as that is the only one scored.
+    """
+
+    def __init__(
+        self,
+        study: es.SectorStudyInputs,
+        calibration_end: pd.Timestamp,
+        test_start: pd.Timestamp,
+        test_end: pd.Timestamp | None,
+        min_sector_assets: int,
+        min_cal_days: int,
+        min_test_days: int,
+        lookbacks: Sequence[int],
+        two_layer_mode: str = "on",
+        auto_candidates: Sequence[str] = tuple(es.DEFAULT_AUTO_CANDIDATES.split(",")),
+    ) -> None:
+        self.events_cal = study.events_cal
+        self.lookbacks = [int(L) for L in lookbacks if int(L) in SCORED_LOOKBACKS]
+        self.two_layer_on = str(two_layer_mode).lower() == "on"
+        self.auto_candidates = [str(x).strip() for x in auto_candidates if str(x).strip()]
+        self.sectors: list[SectorSeries] = []
+        df = study.df
+        for sector in sorted(df["sector"].dropna().astype(str).unique()):
+            cal, test = es.split_sector_frames(df, sector, calibration_end, test_start, test_end)
+            n_assets_med = float(test["n_assets"].median()) if not test.empty else 0.0
+            if (
+                n_assets_med >= float(min_sector_assets)
+                and len(cal) >= int(min_cal_days)
+                and len(test) >= int(min_test_days)
+            ):
+                self.sectors.append(SectorSeries(sector, cal, test, study.events))
+
+    @classmethod
+    def load(
+        cls,
+        tickers_file: Path,
+        assets_dir: Path,
+        prices_dir: Path,
+        sector_map_files: Sequence[Path],
+        **kwargs,
+    ) -> "SectorSearchEngine":
+        calibration_end = pd.to_datetime(es.DEFAULT_CALIBRATION_END)
+        test_start = pd.to_datetime(es.DEFAULT_TEST_START)
+        study = es.load_sector_study_inputs(
+            tickers=es._read_tickers(tickers_file),
+            sector_map=es._load_sector_map(list(sector_map_files)),
+            assets_dir=assets_dir,
+            prices_dir=prices_dir,
+            calibration_end=calibration_end,
+            test_start=test_start,
+            test_end=None,
+        )
+        return cls(study, calibration_end=calibration_end, test_start=test_start, test_end=None, **kwargs)
+
+    def motor_alert(self, s: SectorSeries, policy: str, params: dict[str, float]) -> np.ndarray:
+        if policy == "regime_auto":
+            policy = s.auto_policy(self.events_cal, params, self.auto_candidates)
+        m = max(1, int(params["confirm_m"]))
+        n = max(1, min(int(params["confirm_n"]), m))
+        gap = max(0, int(params["min_alert_gap_days"]))
+        raw = _raw_state(s, str(policy).strip().lower(), params)
+        if self.two_layer_on:
+            return _min_gap(_entry(_confirm_n_of_m(raw, n, m)), gap)
+        return _min_gap(_entry(raw), gap)
+
+    def motor_rows(self, cfg: CandidateConfig, n_random: int, sector_ids: Sequence[int] | None = None) -> list[dict[str, object]]:
+        params = validator_params(cfg)
+        ids = range(len(self.sectors)) if sector_ids is None else sector_ids
+        rows: list[dict[str, object]] = []
+        for i in ids:
+            s = self.sectors[i]
+            alert = self.motor_alert(s, cfg.policy, params)
+            n_episodes = int(_entry(alert).sum())
+            for ev_name in SCORED_EVENTS:
+                ev_idx = s.event_idx[ev_name]
+                for L in self.lookbacks:
+                    m = evaluate_alert_matrix(alert[None, :], ev_idx, L)
+                    recall = float(m["recall"][0])
+                    p_block = float("nan")
+                    if ev_name == "drawdown20" and np.isfinite(recall):
+                        rnd = random_alert_metrics(
+                            n_total=s.n,
+                            n_alert_days=n_episodes,
+                            event_idx=ev_idx,
+                            lookback_days=L,
+                            n_masks=int(n_random),
+                            rng=np.random.default_rng(170 + L),
+                            method="block",
+                            block_size=int(cfg.block_size),
+                        )
+                        p_block = float(np.mean(rnd["recall"] >= recall))
+                    rows.append(
+                        {
+                            "sector": s.name,
+                            "event_def": ev_name,
+                            "lookback_days": L,
+                            "model": "motor",
+                            "recall": recall,
+                            "precision": float(m["precision"][0]),
+                            "false_alarm_per_year": float(m["false_alarm_per_year"][0]),
+                            "mean_lead_days": float(m["mean_lead_days"][0]),
+                            "n_events": int(m["n_events"][0]),
+                            "n_alert_episodes": int(m["n_alert_episodes"][0]),
+                            "p_vs_random_recall_block": p_block,
+                        }
+                    )
+        return rows
+
+
+_SEARCH_ENGINE: SectorSearchEngine | None = None
+
+
+def _init_search_worker(engine: SectorSearchEngine) -> None:
+    global _SEARCH_ENGINE
+    _SEARCH_ENGINE = engine
+
+
+def _motor_rows_task(cfg: CandidateConfig, n_random: int, sector_ids: Sequence[int] | None) -> list[dict[str, object]]:
+    assert _SEARCH_ENGINE is not None
+    return _SEARCH_ENGINE.motor_rows(cfg, n_random, sector_ids)
+
+
+def evaluate_candidates(
+    engine: SectorSearchEngine,
+    cfgs: Sequence[CandidateConfig],
+    n_random: int,
+    sector_ids: Sequence[int] | None = None,
+    workers: int = 1,
+) -> list[list[dict[str, object]]]:
+    """Motor rows for each candidate; ``workers > 1`` fans candidates out over processes."""
+    if int(workers) <= 1 or len(cfgs) <= 1:
+        return [engine.motor_rows(cfg, n_random, sector_ids) for cfg in cfgs]
+    outcomes = run_tasks(
+        _motor_rows_task,
+        [(cfg, int(n_random), sector_ids) for cfg in cfgs],
+        workers=int(workers),
+        initializer=_init_search_worker,
+        initargs=(engine,),
+    )
+    for o in outcomes:
+        if not o.ok:
+            raise RuntimeError(f"Candidate evaluation failed ({o.status}): {o.error}")
+    return [o.value for o in outcomes]
+
+
+def halving_fractions(eta: int, min_fraction: float) -> list[float]:
+    """Sector fractions per rung: ``min_fraction * eta**k``, ending at the full panel."""
+    if int(eta) < 2 or float(min_fraction) >= 1.0:
+        return [1.0]
+    out: list[float] = []
+    f = max(1e-6, float(min_fraction))
+    while f < 1.0:
+        out.append(f)
+        f *= int(eta)
+    return out + [1.0]
+
+
 def compute_score(metrics: dict[str, float], weights: ScoreWeights) -> float:
     return float(
         weights.w_draw10 * np.nan_to_num(metrics.get("drawdown_recall_l10", np.nan))
@@ -337,6 +624,22 @@ def main() -> None:
     ap.add_argument("--gate-max-false-alarm", type=float, default=10.0)
     ap.add_argument("--gate-min-draw10", type=float, default=0.35)
     ap.add_argument("--gate-min-sig-rate", type=float, default=0.25)
+    ap.add_argument(
+        "--engine",
+        type=str,
+        default="inprocess",
+        choices=["inprocess", "subprocess"],
+        help="inprocess: load the sector panel once and score candidates in this process (and --workers); "
+        "subprocess: one validator run per candidate.",
+    )
+    ap.add_argument("--workers", type=int, default=1, help="Processes scoring candidates in parallel (inprocess engine).")
+    ap.add_argument("--batch-size", type=int, default=0, help="Candidates drawn per champion update (0 = --workers).")
+    ap.add_argument("--halving-eta", type=int, default=0, help="Successive halving per batch: keep 1/eta per rung (0 = off).")
+    ap.add_argument("--halving-min-fraction", type=float, default=0.25, help="Share of eligible sectors in the first rung.")
+    ap.add_argument("--tickers-file", type=str, default=es.DEFAULT_TICKERS_FILE)
+    ap.add_argument("--assets-dir", type=str, default=es.DEFAULT_ASSETS_DIR)
+    ap.add_argument("--prices-dir", type=str, default=es.DEFAULT_PRICES_DIR)
+    ap.add_argument("--sector-map-files", nargs="*", default=list(es.DEFAULT_SECTOR_MAP_FILES))
     args = ap.parse_args()
     if bool(args.no_require_gates):
         args.require_gates = False
@@ -373,6 +676,91 @@ def main() -> None:
     else:
         base_cfg = _baseline_config()
 
+    data_args = [
+        "--tickers-file",
+        str(args.tickers_file),
+        "--assets-dir",
+        str(args.assets_dir),
+        "--prices-dir",
+        str(args.prices_dir),
+        "--sector-map-files",
+        *[str(x) for x in args.sector_map_files],
+    ]
+    inprocess = str(args.engine) == "inprocess"
+    engine: SectorSearchEngine | None = None
+    if inprocess:
+        engine = SectorSearchEngine.load(
+            tickers_file=ROOT / str(args.tickers_file),
+            assets_dir=ROOT / str(args.assets_dir),
+            prices_dir=ROOT / str(args.prices_dir),
+            sector_map_files=[ROOT / str(x) for x in args.sector_map_files],
+            min_sector_assets=int(args.min_sector_assets),
+            min_cal_days=int(args.min_cal_days),
+            min_test_days=int(args.min_test_days),
+            lookbacks=[int(x) for x in str(args.lookbacks).split(",") if x.strip()],
+            two_layer_mode=str(args.two_layer_mode),
+        )
+        if not engine.sectors:
+            raise RuntimeError("No eligible sectors produced metrics. Lower --min-sector-assets or check data.")
+    workers = max(1, int(args.workers))
+    batch_size = max(1, int(args.batch_size) or workers)
+    fractions = halving_fractions(int(args.halving_eta), float(args.halving_min_fraction)) if inprocess else [1.0]
+    # Partial rungs score a fixed, seeded subset of sectors so candidates in a rung are comparable.
+    sector_order = np.random.default_rng(int(args.seed)).permutation(len(engine.sectors)) if engine else np.zeros(0, dtype=int)
+
+    def _evaluate(batch: list[tuple[int, str, CandidateConfig]]) -> list[dict[str, object]]:
+        """Score a batch; returns one record per candidate (pruned ones carry their last partial metrics)."""
+        if not inprocess:
+            out = []
+            for i, tag, cfg in batch:
+                sim_out_root = runs_root / tag
+                sim_out_root.mkdir(parents=True, exist_ok=True)
+                outdir = run_validation(
+                    cfg=cfg,
+                    out_root=sim_out_root,
+                    n_random=int(args.search_n_random),
+                    lookbacks=str(args.lookbacks),
+                    min_sector_assets=int(args.min_sector_assets),
+                    min_cal_days=int(args.min_cal_days),
+                    min_test_days=int(args.min_test_days),
+                    two_layer_mode=str(args.two_layer_mode),
+                    seed_tag=int(args.seed + i),
+                    data_args=data_args,
+                )
+                out.append({"outdir": outdir, "metrics": evaluate_outdir(outdir), "rung": 0, "fidelity": 1.0, "pruned": False})
+            return out
+        assert engine is not None
+        records: list[dict[str, object]] = [{} for _ in batch]
+        alive = list(range(len(batch)))
+        for rung, frac in enumerate(fractions):
+            full = frac >= 1.0
+            sector_ids = None if full else sorted(sector_order[: max(1, math.ceil(frac * len(engine.sectors)))].tolist())
+            rows = evaluate_candidates(
+                engine, [batch[k][2] for k in alive], int(args.search_n_random), sector_ids=sector_ids, workers=workers
+            )
+            for k, motor_rows in zip(alive, rows):
+                metrics = summarize_motor_metrics(pd.DataFrame(motor_rows))
+                records[k] = {
+                    "outdir": Path(),
+                    "metrics": metrics,
+                    "rung": rung,
+                    "fidelity": float(frac),
+                    "pruned": not full,
+                    "rows": motor_rows,
+                }
+            if not full:
+                keep = max(1, math.ceil(len(alive) / int(args.halving_eta)))
+                alive = sorted(alive, key=lambda k: -compute_score(records[k]["metrics"], weights))[:keep]
+                alive.sort()
+        for k in alive:
+            outdir = runs_root / batch[k][1]
+            outdir.mkdir(parents=True, exist_ok=True)
+            pd.DataFrame(records[k].pop("rows")).to_csv(outdir / "sector_metrics_summary.csv", index=False)
+            records[k]["outdir"] = outdir
+        for rec in records:
+            rec.pop("rows", None)
+        return records
+
     history: list[dict[str, object]] = []
     seen: set[tuple[object, ...]] = set()
     champion_cfg = base_cfg
@@ -386,84 +774,83 @@ def main() -> None:
     total = int(max(0, args.n_sims)) + 1
     prev_score = float("nan")
 
-    for i in range(total):
+    i = 0
+    while i < total:
+        batch: list[tuple[int, str, CandidateConfig]] = []
         if i == 0:
-            cfg = base_cfg
-            tag = "baseline"
+            batch.append((0, "baseline", base_cfg))
+            seen.add(base_cfg.as_key())
         else:
-            cfg = _sample_candidate(rng=rng, base=champion_cfg)
-            tries = 0
-            while cfg.as_key() in seen and tries < 50:
+            # Every candidate in a batch is drawn around the champion as of the batch start.
+            for k in range(i, min(total, i + batch_size)):
                 cfg = _sample_candidate(rng=rng, base=champion_cfg)
-                tries += 1
-            tag = f"sim_{i:03d}"
-        seen.add(cfg.as_key())
-
-        sim_out_root = runs_root / tag
-        sim_out_root.mkdir(parents=True, exist_ok=True)
-
-        outdir = run_validation(
-            cfg=cfg,
-            out_root=sim_out_root,
-            n_random=int(args.search_n_random),
-            lookbacks=str(args.lookbacks),
-            min_sector_assets=int(args.min_sector_assets),
-            min_cal_days=int(args.min_cal_days),
-            min_test_days=int(args.min_test_days),
-            two_layer_mode=str(args.two_layer_mode),
-            seed_tag=int(args.seed + i),
-        )
-        metrics = evaluate_outdir(outdir)
-        score = compute_score(metrics=metrics, weights=weights)
-        pass_gate = passes_gates(metrics=metrics, gates=gates)
-        better_than_prev = bool(np.isfinite(prev_score) and score > prev_score)
-        better_than_champion_before = bool(score > champion_score)
-        if score > fallback_score:
-            fallback_cfg = cfg
-            fallback_score = score
-            fallback_outdir = outdir
-        if bool(args.require_gates):
-            can_promote = bool(pass_gate and (score > champion_score or not champion_passes_gates))
-        else:
-            can_promote = bool(score > champion_score)
-        if can_promote:
-            champion_cfg = cfg
-            champion_score = score
-            champion_outdir = outdir
-            champion_passes_gates = bool(pass_gate)
-        prev_score = score
-
-        row: dict[str, object] = {
-            "sim_index": i,
-            "tag": tag,
-            "outdir": str(outdir),
-            "is_baseline": i == 0,
-            "better_than_prev": better_than_prev,
-            "better_than_champion_before": better_than_champion_before,
-            "is_champion_after": cfg.as_key() == champion_cfg.as_key(),
-            "passes_gates": bool(pass_gate),
-            "policy": cfg.policy,
-            "q_unstable": cfg.q_unstable,
-            "q_transition": cfg.q_transition,
-            "q_confidence": cfg.q_confidence,
-            "q_confidence_guarded": cfg.q_confidence_guarded,
-            "q_score_balanced": cfg.q_score_balanced,
-            "q_score_guarded": cfg.q_score_guarded,
-            "confirm_n": cfg.confirm_n,
-            "confirm_m": cfg.confirm_m,
-            "min_alert_gap_days": cfg.min_alert_gap_days,
-            "block_size": cfg.block_size,
-            **metrics,
-            "score": float(score),
-        }
-        history.append(row)
-
-        print(
-            f"[{i+1}/{total}] {tag} policy={cfg.policy} score={score:.4f} "
-            f"vs_prev={'+' if better_than_prev else '-'} vs_best={'+' if can_promote else '-'} "
-            f"gates={'ok' if pass_gate else 'fail'}",
-            flush=True,
-        )
+                tries = 0
+                while cfg.as_key() in seen and tries < 50:
+                    cfg = _sample_candidate(rng=rng, base=champion_cfg)
+                    tries += 1
+                seen.add(cfg.as_key())
+                batch.append((k, f"sim_{k:03d}", cfg))
+        i += len(batch)
+
+        for (sim_index, tag, cfg), rec in zip(batch, _evaluate(batch)):
+            metrics = rec["metrics"]
+            outdir = Path(rec["outdir"])
+            pruned = bool(rec["pruned"])
+            score = compute_score(metrics=metrics, weights=weights)
+            pass_gate = passes_gates(metrics=metrics, gates=gates)
+            better_than_prev = bool(np.isfinite(prev_score) and score > prev_score) and not pruned
+            better_than_champion_before = bool(score > champion_score) and not pruned
+            can_promote = False
+            if not pruned:
+                if score > fallback_score:
+                    fallback_cfg = cfg
+                    fallback_score = score
+                    fallback_outdir = outdir
+                if bool(args.require_gates):
+                    can_promote = bool(pass_gate and (score > champion_score or not champion_passes_gates))
+                else:
+                    can_promote = bool(score > champion_score)
+                if can_promote:
+                    champion_cfg = cfg
+                    champion_score = score
+                    champion_outdir = outdir
+                    champion_passes_gates = bool(pass_gate)
+                prev_score = score
+
+            row: dict[str, object] = {
+                "sim_index": sim_index,
+                "tag": tag,
+                "outdir": str(outdir) if not pruned else "",
+                "is_baseline": sim_index == 0,
+                "better_than_prev": better_than_prev,
+                "better_than_champion_before": better_than_champion_before,
+                "is_champion_after": cfg.as_key() == champion_cfg.as_key(),
+                "passes_gates": bool(pass_gate),
+                "policy": cfg.policy,
+                "q_unstable": cfg.q_unstable,
+                "q_transition": cfg.q_transition,
+                "q_confidence": cfg.q_confidence,
+                "q_confidence_guarded": cfg.q_confidence_guarded,
+                "q_score_balanced": cfg.q_score_balanced,
+                "q_score_guarded": cfg.q_score_guarded,
+                "confirm_n": cfg.confirm_n,
+                "confirm_m": cfg.confirm_m,
+                "min_alert_gap_days": cfg.min_alert_gap_days,
+                "block_size": cfg.block_size,
+                **metrics,
+                "score": float(score),
+                "rung": int(rec["rung"]),
+                "sector_fraction": float(rec["fidelity"]),
+                "pruned": pruned,
+            }
+            history.append(row)
+
+            print(
+                f"[{sim_index+1}/{total}] {tag} policy={cfg.policy} score={score:.4f} "
+                f"vs_prev={'+' if better_than_prev else '-'} vs_best={'+' if can_promote else '-'} "
+                f"gates={'ok' if pass_gate else 'fail'}" + (f" pruned@rung{int(rec['rung'])}" if pruned else ""),
+                flush=True,
+            )
 
     if (not champion_outdir.exists()) and fallback_outdir.exists():
         champion_cfg = fallback_cfg
@@ -483,6 +870,7 @@ def main() -> None:
         min_test_days=int(args.min_test_days),
         two_layer_mode=str(args.two_layer_mode),
         seed_tag=int(args.seed + 9999),
+        data_args=data_args,
     )
     final_metrics = evaluate_outdir(final_outdir)
     final_score = compute_score(metrics=final_metrics, weights=weights)
@@ -503,6 +891,12 @@ def main() -> None:
             "profile_version": profile_version,
             "baseline_profile_file": str(profile_path),
             "require_gates": bool(args.require_gates),
+            "engine": str(args.engine),
+            "workers": int(workers),
+            "batch_size": int(batch_size),
+            "halving_eta": int(args.halving_eta),
+            "halving_fractions": fractions,
+            "n_pruned": int(sum(bool(r["pruned"]) for r in history)),
         },
         "weights": weights.__dict__,
         "gates": gates.__dict__,
@@ -582,7 +976,7 @@ def main() -> None:
         lines.append(f"- {k}: {float(v):.6f}")
     lines.append("")
     lines.append("Top 5 simulations by score:")
-    top = hist_df.sort_values("score", ascending=False).head(5)
+    top = hist_df[~hist_df["pruned"].astype(bool)].sort_values("score", ascending=False).head(5)
     for _, r in top.iterrows():
         lines.append(
             f"- sim={int(r['sim_index'])} tag={r['tag']} policy={r['policy']} "
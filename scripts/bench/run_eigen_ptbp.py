@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable
@@ -11,6 +12,13 @@ from typing import Callable
 import numpy as np
 import pandas as pd
 
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.rolling import cusum_abs, rolling_std  # noqa: E402
+from engine.graph.streaming import robust_z_online  # noqa: E402
+
 
 @dataclass
 class Scenario:
@@ -21,40 +29,15 @@ class Scenario:
 
 
 def _robust_z(x: np.ndarray, eps: float = 1e-9) -> np.ndarray:
-    out = np.full_like(x, np.nan, dtype=float)
-    for i in range(len(x)):
-        h = x[: i + 1]
-        h = h[np.isfinite(h)]
-        if h.size < 10:
-            continue
-        med = float(np.median(h))
-        mad = float(np.median(np.abs(h - med)))
-        scale = 1.4826 * mad + eps
-        out[i] = (x[i] - med) / scale
-    return out
+    return robust_z_online(x, min_points=10, eps=eps)
 
 
 def _rolling_std(x: np.ndarray, w: int) -> np.ndarray:
-    out = np.full_like(x, np.nan, dtype=float)
-    for i in range(w - 1, len(x)):
-        s = x[i - w + 1 : i + 1]
-        out[i] = float(np.std(s))
-    return out
+    return rolling_std(x, w)
 
 
 def _cusum_abs(x: np.ndarray, w: int = 80) -> np.ndarray:
-    mu = np.full_like(x, np.nan, dtype=float)
-    for i in range(w - 1, len(x)):
-        mu[i] = float(np.mean(x[i - w + 1 : i + 1]))
-    pos = 0.0
-    neg = 0.0
-    out = np.zeros_like(x, dtype=float)
-    for i, xi in enumerate(x):
-        m = mu[i] if np.isfinite(mu[i]) else 0.0
-        pos = max(0.0, pos + (xi - m))
-        neg = max(0.0, neg - (xi - m))
-        out[i] = pos + neg
-    return out
+    return cusum_abs(x, w)
 
 
 def _perm_entropy(series: np.ndarray, order: int = 3) -> float:
@@ -63,6 +63,7 @@ def main() -> None:
     parser.add_argument("--outdir", default="results/hypertest")
     parser.add_argument("--max-assets", type=int, default=0, help="Limit number of tickers for test runs")
     parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--cache-dir", default="", help="Shared result cache passed to every grid run")
     args = parser.parse_args()
 
     data_dir = Path(args.data_dir)
@@ -113,6 +114,8 @@ def main() -> None:
             cmd += ["--auto-embed", "--tau-method", "ami", "--m-method", "cao"]
         elif cfg["embed"] == "auto_acf_fnn":
             cmd += ["--auto-embed", "--tau-method", "acf", "--m-method", "fnn"]
+        if args.cache_dir:
+            cmd += ["--cache-dir", args.cache_dir]
 
         code = _run_command(cmd, args.dry_run)
         if code != 0:
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import sys
+import tempfile
 from pathlib import Path
 from typing import List
 
@@ -16,17 +17,22 @@ import json
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 
-from engine.graph.core import run_graph_engine  # noqa: E402
+from engine.graph.core import GraphResult  # noqa: E402
+from engine.graph.incremental import GraphEngineState, state_path  # noqa: E402
+from engine.graph.multilayer import run_multilayer_engine  # noqa: E402
 from engine.graph.embedding import estimate_embedding_params  # noqa: E402
-from engine.graph.diagnostics import compute_diagnostics  # noqa: E402
+from engine.graph.cache import ResultCache, cached_compute_diagnostics, cached_run_graph_engine  # noqa: E402
+from engine.graph.parallel import SeriesPanel, run_tasks  # noqa: E402
 from engine.graph.plots import (  # noqa: E402
     plot_embedding_2d,
     plot_stretch_hist,
     plot_timeline_regime,
     plot_transition_matrix,
 )
+from engine.graph.sparse_backend import SmoothedTransitionMatrix  # noqa: E402
 from engine.graph.schema import GraphAsset, GraphConfig, GraphLinks, GraphMetrics, GraphState, iso_now  # noqa: E402
 from engine.graph.version import ENGINE_VERSION  # noqa: E402
+from engine.marketdata import read_price_csv  # noqa: E402
 from engine.graph.export import write_asset_bundle, write_universe  # noqa: E402
 from engine.graph.merge_existing import merge_forecast_risk  # noqa: E402
 from engine.graph.sanity import sanity_alerts  # noqa: E402
@@ -54,12 +60,14 @@ def _load_asset_groups(path: Path = Path("data/asset_groups.csv")) -> dict:
 
 
 ASSET_GROUPS = _load_asset_groups()
+# Sparse transition matrices above this many states are never densified for export, plots or entropy.
+DENSE_TRANSITION_MAX_STATES = 512
 
 
 def load_series_from_csv(path: Path, timeframe: str) -> np.ndarray:
     import pandas as pd
 
-    df = pd.read_csv(path)
+    df = read_price_csv(path)
     date_col = "date" if "date" in df.columns else df.columns[0]
     col = "close" if "close" in df.columns else df.columns[-1]
     df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
@@ -162,6 +170,9 @@ def _rolling_mode(labels: list[str], window: int = 3) -> list[str]:
 def _graph_entropy_metrics(p_matrix: np.ndarray) -> dict:
     if p_matrix is None:
         return {"shannon": None, "von_neumann": None}
+    if isinstance(p_matrix, SmoothedTransitionMatrix) and p_matrix.shape[0] > DENSE_TRANSITION_MAX_STATES:
+        # Rows come from the CSR counts; von Neumann is a stochastic Lanczos estimate.
+        return {"shannon": float(np.mean(p_matrix.row_entropy())), "von_neumann": p_matrix.von_neumann_entropy()}
     p = np.array(p_matrix, dtype=float)
     if p.size == 0:
         return {"shannon": None, "von_neumann": None}
@@ -254,6 +265,59 @@ def _align_lag(labels: list[str], ref: list[str], max_lag: int = 6) -> tuple[lis
     return [lbl if lbl is not None else labels[0] for lbl in aligned], best_lag, best_score
 
 
+# Sized from the series length when the state is fitted; a reused state keeps its own values.
+FIT_SIZED_PARAMS = ("n_micro", "k_nn")
+
+
+def _run_graph_incremental(
+    state_dir: Path,
+    ticker: str,
+    timeframe: str,
+    series: np.ndarray,
+    sizing: dict,
+    **params,
+) -> tuple[GraphResult, dict]:
+    """Advance the persisted per-asset graph state with the new bars (refit when incompatible).
+
+    ``sizing`` is the request ``n_micro``/``k_nn`` were derived from. While it is
+    unchanged, a stored state is reused with the values it was fitted with, so
+    a growing series does not force a refit every few bars. Returns the result
+    and the parameters actually in use.
+    """
+    path = state_path(state_dir, ticker, timeframe)
+    state = None
+    if path.exists():
+        try:
+            state = GraphEngineState.load(path)
+        except Exception:
+            state = None
+    values = np.asarray(series, dtype=float)
+    n_prev = len(state.series) if state is not None else 0
+    expected = dict(params, timeframe=timeframe, sizing=dict(sizing))
+    reusable = (
+        state is not None
+        and all(state.params.get(k) == v for k, v in expected.items() if k not in FIT_SIZED_PARAMS)
+        and n_prev <= values.size
+        and np.array_equal(state.series, values[:n_prev])
+    )
+    if not reusable:
+        state = GraphEngineState.fit(values, timeframe=timeframe, sizing=sizing, **params)
+    elif n_prev < values.size:
+        state.update(values[n_prev:])
+    state.save(path)
+    result = state.to_result()
+    try:
+        result.multilayer = run_multilayer_engine(
+            series=values,
+            timeframe=timeframe,
+            m_hint=params["m"],
+            tau_hint=params["tau"],
+        )
+    except Exception:
+        result.multilayer = {"status": "error"}
+    return result, dict(state.params)
+
+
 def build_asset_output(
     ticker: str,
     timeframe: str,
@@ -277,6 +341,14 @@ def build_asset_output(
     tau_method: str,
     m_method: str,
     method: str,
+    state_dir: Path | None = None,
+    transition_backend: str = "dense",
+    cache: ResultCache | None = None,
+    dtype: str = "float64",
+    lle_max_points: int | None = None,
+    cpd_model: str = "rbf",
+    cpd_jump: int = 1,
+    ftle_window: int = 0,
 ) -> tuple[GraphAsset, dict]:
     if auto_embed or m is None or tau is None:
         m_auto, tau_auto = estimate_embedding_params(series, tau_method=tau_method, m_method=m_method)
@@ -291,25 +363,53 @@ def build_asset_output(
     else:
         effective_micro = min(n_micro, max(50, len(series) // 8))
     effective_knn = k_nn if mode == "heavy" else max(5, min(10, effective_micro // 10))
-    result = run_graph_engine(
-        series,
-        m=m_use,
-        tau=tau_use,
-        n_micro=effective_micro,
-        micro_method=micro_method,
-        micro_params=micro_params,
-        micro_smooth=micro_smooth,
-        micro_smooth_noise=micro_smooth_noise,
-        n_regimes=n_regimes,
-        k_nn=effective_knn,
-        theiler=theiler,
-        alpha=alpha,
-        seed=7,
-        method=method,
-        timeframe=timeframe,
-        state_smooth=state_smooth,
-        state_smooth_noise=state_smooth_noise,
-    )
+    # Incremental state skips non-causal smoothing; those runs always refit.
+    if state_dir is not None and micro_smooth is None and state_smooth is None:
+        result, state_params = _run_graph_incremental(
+            state_dir,
+            ticker,
+            timeframe,
+            series,
+            m=int(m_use),
+            tau=int(tau_use),
+            n_micro=int(effective_micro),
+            micro_method=micro_method,
+            micro_params=micro_params,
+            n_regimes=int(n_regimes),
+            k_nn=int(effective_knn),
+            theiler=int(theiler),
+            alpha=float(alpha),
+            seed=7,
+            method=method,
+            transition_backend=transition_backend,
+            dtype=dtype,
+            sizing={"n_micro": int(n_micro), "k_nn": int(k_nn), "mode": mode},
+        )
+        effective_micro = int(state_params["n_micro"])
+        effective_knn = int(state_params["k_nn"])
+    else:
+        result = cached_run_graph_engine(
+            series,
+            cache,
+            m=m_use,
+            tau=tau_use,
+            n_micro=effective_micro,
+            micro_method=micro_method,
+            micro_params=micro_params,
+            micro_smooth=micro_smooth,
+            micro_smooth_noise=micro_smooth_noise,
+            n_regimes=n_regimes,
+            k_nn=effective_knn,
+            theiler=theiler,
+            alpha=alpha,
+            seed=7,
+            method=method,
+            timeframe=timeframe,
+            state_smooth=state_smooth,
+            state_smooth_noise=state_smooth_noise,
+            transition_backend=transition_backend,
+            dtype=dtype,
+        )
 
     raw_labels = [str(lbl) for lbl in result.state_labels]
     smooth_labels = _smooth_labels(
@@ -568,7 +668,18 @@ def build_asset_output(
     }
 
     # Diagnosticos dinamicos (experimental, nao bloqueia)
-    asset.diagnostics = compute_diagnostics(series, m=m_use, tau=tau_use, theiler=theiler)
+    asset.diagnostics = cached_compute_diagnostics(
+        series,
+        cache,
+        m=m_use,
+        tau=tau_use,
+        theiler=theiler,
+        dtype=dtype,
+        lle_max_points=lle_max_points,
+        cpd_model=cpd_model,
+        cpd_jump=cpd_jump,
+        ftle_window=ftle_window,
+    )
     if asset.diagnostics is None:
         asset.diagnostics = {}
     asset.diagnostics["multilayer"] = multilayer
@@ -629,7 +740,20 @@ def build_asset_output(
         {"t": int(i), "regime": str(r), "confidence": float(c)}
         for i, (r, c) in enumerate(zip(aligned_labels, result.confidence))
     ]
-    transitions = {"matrix": result.p_matrix.tolist()}
+    p_large = isinstance(result.p_matrix, SmoothedTransitionMatrix) and result.p_matrix.shape[0] > DENSE_TRANSITION_MAX_STATES
+    if p_large:
+        # P = (counts + alpha) / row_sums; the counts are exported in CSR form.
+        counts = result.p_matrix.counts
+        transitions = {
+            "format": "csr_counts",
+            "shape": list(counts.shape),
+            "alpha": result.p_matrix.alpha,
+            "indptr": counts.indptr.tolist(),
+            "indices": counts.indices.tolist(),
+            "data": counts.data.tolist(),
+        }
+    else:
+        transitions = {"matrix": result.p_matrix.tolist()}
 
     write_asset_bundle(
         asset,
@@ -658,7 +782,8 @@ def build_asset_output(
     plots_dir = (outdir / "assets" / f"{ticker}_{timeframe}_plots")
     plots_dir.mkdir(parents=True, exist_ok=True)
     plot_timeline_regime(plots_dir, aligned_labels, result.confidence)
-    plot_transition_matrix(plots_dir, result.p_matrix)
+    if not p_large:
+        plot_transition_matrix(plots_dir, result.p_matrix)
     plot_embedding_2d(plots_dir, result.embedding[:, :2], result.micro_regime[result.micro_labels])
     plot_stretch_hist(plots_dir, result.stretch_mu, aligned_labels)
 
@@ -691,6 +816,33 @@ def build_asset_output(
     return asset, audit
 
 
+_WORKER: dict = {}
+
+
+def _init_universe_worker(panel_dir: str, outdir: str, engine_kwargs: dict, cache_dir: str, cache_max_bytes: int) -> None:
+    _WORKER["panel"] = SeriesPanel(panel_dir)
+    _WORKER["outdir"] = Path(outdir)
+    _WORKER["kwargs"] = engine_kwargs
+    _WORKER["cache"] = ResultCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
+
+
+def _universe_task(timeframe: str, ticker: str, n_micro: int) -> tuple[GraphAsset, dict, dict]:
+    cache = _WORKER["cache"]
+    before = cache.stats.as_dict() if cache is not None else {}
+    series = np.array(_WORKER["panel"][(timeframe, ticker)])
+    asset, audit = build_asset_output(
+        ticker,
+        timeframe,
+        series,
+        _WORKER["outdir"],
+        n_micro=n_micro,
+        cache=cache,
+        **_WORKER["kwargs"],
+    )
+    after = cache.stats.as_dict() if cache is not None else {}
+    return asset, audit, {k: after[k] - before[k] for k in after}
+
+
 def summarize_universe(records: list[GraphAsset], run_meta: dict) -> dict:
     recs = [r.to_dict() for r in records]
     def _count(key):
@@ -767,7 +919,54 @@ def main() -> None:
     parser.add_argument("--auto-embed", action="store_true", help="Enable experimental auto embedding (FNN/ACF)")
     parser.add_argument("--tau-method", default="ami", choices=["ami", "acf"], help="Auto tau method")
     parser.add_argument("--m-method", default="cao", choices=["cao", "fnn"], help="Auto m method")
+    parser.add_argument(
+        "--graph-state-dir",
+        default="",
+        help="Persist per-asset GraphEngineState here and only append new bars on reruns",
+    )
+    parser.add_argument(
+        "--transition-backend",
+        default="dense",
+        choices=["dense", "sparse", "auto"],
+        help="Transition matrix backend (sparse = CSR counts + partial eigensolvers for large n_micro)",
+    )
+    parser.add_argument("--cache-dir", default="", help="Reuse engine/diagnostics results cached here across reruns")
+    parser.add_argument("--cache-max-mb", type=int, default=512, help="LRU size bound for --cache-dir")
+    parser.add_argument(
+        "--dtype",
+        default="float64",
+        choices=["float64", "float32"],
+        help="Embedding/clustering precision (float32 halves memory; incremental state stays float64)",
+    )
+    parser.add_argument(
+        "--lle-max-points",
+        type=int,
+        default=None,
+        help="Run LLE/FTLE diagnostics on up to this many points instead of the 800-point subsample (0 = full series)",
+    )
+    parser.add_argument(
+        "--ftle-window",
+        type=int,
+        default=0,
+        help="Also emit diagnostics.ftle_series, the FTLE over this many trailing embedding rows (0 = off)",
+    )
+    parser.add_argument(
+        "--cpd-model",
+        default="rbf",
+        choices=["rbf", "l2", "normal"],
+        help="Change-point cost (rbf = ruptures or fallback scorer; l2/normal = built-in PELT)",
+    )
+    parser.add_argument("--cpd-jump", type=int, default=1, help="PELT breakpoint grid step")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes (>1 loads all series into a memory-mapped panel and runs assets in parallel)",
+    )
+    parser.add_argument("--task-timeout", type=float, default=0.0, help="Per-asset timeout in seconds with --workers (0 = none)")
+    parser.add_argument("--blas-threads", type=int, default=1, help="BLAS/OpenMP threads per worker with --workers")
     args = parser.parse_args()
+    cache = ResultCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
 
     if args.run_id:
         outdir = Path(f"{args.outdir}_{args.run_id}")
@@ -803,50 +1002,58 @@ def main() -> None:
         else ((tf, ticker) for tf in timeframes for ticker in tickers)
     )
     missing = []
+    failed = []
     audit_rows = []
-    for tf, ticker in iterator:
+    engine_kwargs = dict(
+        n_regimes=args.n_regimes,
+        k_nn=args.k_nn,
+        theiler=args.theiler,
+        alpha=args.alpha,
+        micro_method=args.micro_method,
+        micro_params=micro_params,
+        micro_smooth=None if args.micro_smooth == "none" else args.micro_smooth,
+        micro_smooth_noise=args.micro_smooth_noise,
+        state_smooth=None if args.state_smooth == "none" else args.state_smooth,
+        state_smooth_noise=args.state_smooth_noise,
+        mode=args.mode,
+        m=args.m,
+        tau=args.tau,
+        auto_embed=args.auto_embed,
+        tau_method=args.tau_method,
+        m_method=args.m_method,
+        method=args.metastable_method,
+        state_dir=Path(args.graph_state_dir) if args.graph_state_dir else None,
+        transition_backend=args.transition_backend,
+        dtype=args.dtype,
+        lle_max_points=args.lle_max_points,
+        cpd_model=args.cpd_model,
+        cpd_jump=args.cpd_jump,
+        ftle_window=args.ftle_window,
+    )
+
+    def _n_micro_for(tf: str) -> int:
+        if tf == "daily" and args.n_micro_daily > 0:
+            return args.n_micro_daily
+        if tf == "weekly" and args.n_micro_weekly > 0:
+            return args.n_micro_weekly
+        return args.n_micro
+
+    def _load(tf: str, ticker: str) -> np.ndarray | None:
         # Placeholder loader: expects CSV in data/raw/finance/yfinance_daily/{ticker}.csv
         # Replace with existing loaders if needed.
         csv_path = Path("data/raw/finance/yfinance_daily") / f"{ticker}.csv"
         if not csv_path.exists():
             missing.append(ticker)
             print(f"[skip] missing {csv_path}")
-            continue
-        series = load_series_from_csv(csv_path, tf)
-        n_micro_tf = args.n_micro
-        if tf == "daily" and args.n_micro_daily > 0:
-            n_micro_tf = args.n_micro_daily
-        if tf == "weekly" and args.n_micro_weekly > 0:
-            n_micro_tf = args.n_micro_weekly
-        asset, audit = build_asset_output(
-            ticker,
-            tf,
-            series,
-            outdir,
-            n_micro=n_micro_tf,
-            n_regimes=args.n_regimes,
-            k_nn=args.k_nn,
-            theiler=args.theiler,
-            alpha=args.alpha,
-            micro_method=args.micro_method,
-            micro_params=micro_params,
-            micro_smooth=None if args.micro_smooth == "none" else args.micro_smooth,
-            micro_smooth_noise=args.micro_smooth_noise,
-            state_smooth=None if args.state_smooth == "none" else args.state_smooth,
-            state_smooth_noise=args.state_smooth_noise,
-            mode=args.mode,
-            m=args.m,
-            tau=args.tau,
-            auto_embed=args.auto_embed,
-            tau_method=args.tau_method,
-            m_method=args.m_method,
-            method=args.metastable_method,
-        )
+            return None
+        return load_series_from_csv(csv_path, tf)
+
+    def _collect(tf: str, ticker: str, n_points: int, asset: GraphAsset, audit: dict) -> None:
         audit_rows.append(audit)
         extra_alerts = sanity_alerts(
             ticker,
             n_micro=args.n_micro,
-            n_points=len(series),
+            n_points=n_points,
             escape_prob=asset.metrics.escape_prob,
             quality_score=asset.quality.get("score", 1.0) if asset.quality else 1.0,
             timeframe=tf,
@@ -862,6 +1069,48 @@ def main() -> None:
         else:
             universe_weekly.append(asset)
 
+    if args.workers > 1:
+        # Load every series once; workers read them from a shared memory-mapped panel.
+        loaded = {}
+        for tf, ticker in iterator:
+            series = _load(tf, ticker)
+            if series is not None:
+                loaded[(tf, ticker)] = series
+        keys = list(loaded)
+
+        def _progress(outcome) -> None:
+            tf, ticker = keys[outcome.index]
+            print(f"[{outcome.status}] {ticker} {tf} {outcome.seconds:.1f}s", flush=True)
+
+        with tempfile.TemporaryDirectory(prefix="graph_panel_") as panel_dir:
+            SeriesPanel.write(panel_dir, loaded)
+            outcomes = run_tasks(
+                _universe_task,
+                [(tf, ticker, _n_micro_for(tf)) for tf, ticker in keys],
+                workers=args.workers,
+                timeout=args.task_timeout if args.task_timeout > 0 else None,
+                initializer=_init_universe_worker,
+                initargs=(panel_dir, str(outdir), engine_kwargs, args.cache_dir, args.cache_max_mb * 1024 * 1024),
+                blas_threads=args.blas_threads,
+                on_result=_progress,
+            )
+        for (tf, ticker), outcome in zip(keys, outcomes):
+            if not outcome.ok:
+                failed.append({"asset": ticker, "timeframe": tf, "status": outcome.status, "error": outcome.error})
+                continue
+            asset, audit, cache_delta = outcome.value
+            if cache is not None:
+                for name, value in cache_delta.items():
+                    setattr(cache.stats, name, getattr(cache.stats, name) + value)
+            _collect(tf, ticker, len(loaded[(tf, ticker)]), asset, audit)
+    else:
+        for tf, ticker in iterator:
+            series = _load(tf, ticker)
+            if series is None:
+                continue
+            asset, audit = build_asset_output(ticker, tf, series, outdir, n_micro=_n_micro_for(tf), cache=cache, **engine_kwargs)
+            _collect(tf, ticker, len(series), asset, audit)
+
     def _apply_entropy_percentile(universe: list[GraphAsset], percentile: float = 0.9) -> None:
         deltas = []
         for asset in universe:
@@ -934,6 +1183,8 @@ def main() -> None:
         "timeframes": timeframes,
         "tickers": tickers,
     }
+    if cache is not None:
+        run_meta["cache"] = cache.stats.as_dict()
     if universe_weekly:
         summary = summarize_universe(universe_weekly, run_meta | {"timeframe": "weekly"})
         (outdir / "summary_weekly.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
@@ -1071,6 +1322,8 @@ def main() -> None:
             json.dumps(sorted(set(missing)), indent=2),
             encoding="utf-8",
         )
+    if failed:
+        (outdir / "failed_assets.json").write_text(json.dumps(failed, indent=2), encoding="utf-8")
 
     # Example command:
     # python scripts/bench/run_graph_regime_universe.py --tickers "SPY,QQQ" --timeframes weekly --mode fast
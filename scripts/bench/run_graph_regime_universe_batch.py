@@ -7,6 +7,7 @@ import os
 import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -112,6 +113,7 @@ def main() -> None:
     ap.add_argument("--resume", type=int, default=1)
     ap.add_argument("--timeout-sec", type=int, default=180)
     ap.add_argument("--stop-on-fail", type=int, default=0)
+    ap.add_argument("--workers", type=int, default=1, help="Tickers run concurrently (one isolated subprocess each)")
     args = ap.parse_args()
 
     tickers = _read_tickers(args.tickers, args.tickers_file)
@@ -146,14 +148,10 @@ def main() -> None:
     base_env["MKL_NUM_THREADS"] = str(base_env.get("MKL_NUM_THREADS", "1"))
     base_env["NUMEXPR_NUM_THREADS"] = str(base_env.get("NUMEXPR_NUM_THREADS", "1"))
 
-    for i, ticker in enumerate(tickers, start=1):
-        global_idx = int(args.start_index) + i
-        print(f"[batch] {global_idx}/{int(args.start_index) + len(tickers)} ticker={ticker} start", flush=True)
-        if int(args.resume) == 1 and _already_done(outdir=outdir, ticker=ticker, timeframes=timeframes):
-            logs.append({"ticker": ticker, "status": "skip_resume", "index": global_idx})
-            print(f"[batch] {global_idx}/{int(args.start_index) + len(tickers)} ticker={ticker} skip_resume", flush=True)
-            continue
+    n_total = int(args.start_index) + len(tickers)
 
+    def _run_ticker(global_idx: int, ticker: str) -> tuple[Path, int, str]:
+        print(f"[batch] {global_idx}/{n_total} ticker={ticker} start", flush=True)
         run_dir = runs_dir / f"{global_idx:04d}_{_slug(ticker)}"
         cmd = [
             sys.executable,
@@ -196,12 +194,30 @@ def main() -> None:
         except subprocess.TimeoutExpired as exc:
             code = 124
             tail = f"timeout after {int(args.timeout_sec)}s: {exc}"
+        return run_dir, code, tail
 
+    todo: list[tuple[int, str]] = []
+    for i, ticker in enumerate(tickers, start=1):
+        global_idx = int(args.start_index) + i
+        if int(args.resume) == 1 and _already_done(outdir=outdir, ticker=ticker, timeframes=timeframes):
+            logs.append({"ticker": ticker, "status": "skip_resume", "index": global_idx})
+            print(f"[batch] {global_idx}/{n_total} ticker={ticker} skip_resume", flush=True)
+            continue
+        todo.append((global_idx, ticker))
+
+    # Results are merged in ticker order whatever order the subprocesses finish in.
+    pool = ThreadPoolExecutor(max_workers=int(args.workers)) if int(args.workers) > 1 else None
+    if pool is not None:
+        futures = [pool.submit(_run_ticker, global_idx, ticker) for global_idx, ticker in todo]
+        results = (future.result() for future in futures)
+    else:
+        results = (_run_ticker(global_idx, ticker) for global_idx, ticker in todo)
+    for (global_idx, ticker), (run_dir, code, tail) in zip(todo, results):
         has_output = _has_min_asset_output(run_dir=run_dir, ticker=ticker, timeframes=timeframes)
         if code != 0 and not has_output:
             n_fail += 1
             logs.append({"ticker": ticker, "status": "fail", "index": global_idx, "code": code, "tail": tail})
-            print(f"[batch] {global_idx}/{int(args.start_index) + len(tickers)} ticker={ticker} fail code={code}", flush=True)
+            print(f"[batch] {global_idx}/{n_total} ticker={ticker} fail code={code}", flush=True)
             if int(args.stop_on_fail) == 1:
                 break
             continue
@@ -217,7 +233,7 @@ def main() -> None:
         n_ok += 1
         if code == 0:
             logs.append({"ticker": ticker, "status": "ok", "index": global_idx, "code": 0})
-            print(f"[batch] {global_idx}/{int(args.start_index) + len(tickers)} ticker={ticker} ok", flush=True)
+            print(f"[batch] {global_idx}/{n_total} ticker={ticker} ok", flush=True)
         else:
             logs.append(
                 {
@@ -228,7 +244,9 @@ def main() -> None:
                     "tail": tail,
                 }
             )
-            print(f"[batch] {global_idx}/{int(args.start_index) + len(tickers)} ticker={ticker} ok_salvaged code={code}", flush=True)
+            print(f"[batch] {global_idx}/{n_total} ticker={ticker} ok_salvaged code={code}", flush=True)
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
 
     for tf in timeframes:
         rows = list(merged[tf].values())
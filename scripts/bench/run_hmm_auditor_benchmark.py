@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Benchmark the layer-4 GMM auditor: cold refit per window vs warm-started online EM."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.multilayer import (  # noqa: E402
+    MultilayerConfig,
+    _hmm_auditor,
+    _hmm_auditor_online,
+    _robust_z_online,
+    _safe_returns,
+)
+
+
+def _load_returns(path: Path, max_points: int) -> np.ndarray:
+    df = pd.read_csv(path)
+    col = "price" if "price" in df.columns else df.columns[-1]
+    returns = _safe_returns(pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float))
+    return returns[-max_points:] if max_points > 0 else returns
+
+
+def _agreement(ref: np.ndarray, other: np.ndarray, alert_z: float) -> dict:
+    mask = np.isfinite(ref) & np.isfinite(other)
+    if mask.sum() < 3:
+        return {"n": int(mask.sum())}
+    z_ref = _robust_z_online(ref)
+    z_other = _robust_z_online(other)
+    zmask = np.isfinite(z_ref) & np.isfinite(z_other)
+    flag_ref = z_ref[zmask] > alert_z
+    flag_other = z_other[zmask] > alert_z
+    return {
+        "n": int(mask.sum()),
+        "corr": float(np.corrcoef(ref[mask], other[mask])[0, 1]),
+        "median_abs_diff": float(np.median(np.abs(ref[mask] - other[mask]))),
+        "flag_agreement": float(np.mean(flag_ref == flag_other)) if zmask.any() else None,
+        "flag_rate_ref": float(np.mean(flag_ref)) if zmask.any() else None,
+        "flag_rate": float(np.mean(flag_other)) if zmask.any() else None,
+    }
+
+
+def _timed(fn, *args, **kwargs) -> tuple[np.ndarray, float]:
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", default="SPY,GLD,BTC-USD")
+    parser.add_argument("--data-dir", default="data/raw/finance/yfinance_daily")
+    parser.add_argument("--max-points", type=int, default=6000)
+    parser.add_argument("--em-iters", type=int, default=3)
+    parser.add_argument("--outdir", default="results/bench/hmm_auditor")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    cfg = MultilayerConfig()
+    window, step = cfg.hmm_window, max(1, cfg.step)
+    rows = []
+    for ticker in [t.strip() for t in args.tickers.split(",") if t.strip()]:
+        path = Path(args.data_dir) / f"{ticker}.csv"
+        if not path.exists():
+            print(f"[skip] missing {path}")
+            continue
+        returns = _load_returns(path, args.max_points)
+        ref, t_ref = _timed(_hmm_auditor, returns, window=window, step=step)
+        row = {"ticker": ticker, "n": int(returns.size), "refit_step": step, "refit_seconds": t_ref, "variants": []}
+        for var_step in (step, 1):
+            for suff in (False, True):
+                out, secs = _timed(
+                    _hmm_auditor_online,
+                    returns,
+                    window=window,
+                    step=var_step,
+                    em_iters=args.em_iters,
+                    sufficient_stats=suff,
+                )
+                row["variants"].append(
+                    {
+                        "step": var_step,
+                        "sufficient_stats": suff,
+                        "seconds": secs,
+                        "speedup_vs_refit": t_ref / max(secs, 1e-9),
+                        "vs_refit": _agreement(ref, out, cfg.hmm_alert_z),
+                    }
+                )
+        rows.append(row)
+        best = max(row["variants"], key=lambda v: v["speedup_vs_refit"])
+        print(f"[ok] {ticker} n={returns.size} refit={t_ref:.2f}s best_online={best['seconds']:.2f}s")
+
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    payload = {"window": window, "em_iters": args.em_iters, "rows": rows}
+    (outdir / "hmm_auditor_benchmark.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"[ok] wrote {outdir / 'hmm_auditor_benchmark.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import subprocess
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -13,6 +14,10 @@ import pandas as pd
 
 
 ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.marketdata import read_price_csv  # noqa: E402
 
 
 def _ts_id() -> str:
@@ -71,7 +76,7 @@ def _load_asset_history(asset: str, assets_dir: Path, prices_dir: Path, sector:
 
     try:
         rg = pd.read_csv(rg_path)
-        px = pd.read_csv(px_path)
+        px = read_price_csv(px_path)
     except (FileNotFoundError, pd.errors.EmptyDataError, pd.errors.ParserError, OSError, UnicodeDecodeError):
         return pd.DataFrame()
 
@@ -99,6 +99,7 @@ def main() -> None:
     parser.add_argument("--theiler", type=int, default=10)
     parser.add_argument("--alpha", type=float, default=2.0)
     parser.add_argument("--timeframe", type=str, default="daily", choices=["daily", "weekly"])
+    parser.add_argument("--cache-dir", type=str, default="", help="Reuse motor results cached here; only changed cells recompute")
     args = parser.parse_args()
 
     outdir = Path(args.outdir)
@@ -114,7 +115,7 @@ def main() -> None:
     engine_available = True
     engine_reason = ""
     try:
-        from engine.graph.core import run_graph_engine  # type: ignore
+        from engine.graph.cache import ResultCache, cached_run_graph_engine  # type: ignore
         from engine.graph.embedding import estimate_embedding_params  # type: ignore
     except Exception as exc:
         engine_available = False
@@ -154,6 +155,7 @@ def main() -> None:
         {"window": 50, "tau_mode": 2, "seed": 2},
     ]
 
+    cache = ResultCache(args.cache_dir) if engine_available and args.cache_dir else None
     label_runs: list[list[str]] = []
     run_status: list[dict[str, Any]] = []
 
@@ -194,8 +196,9 @@ def main() -> None:
         try:
             m, tau_auto = estimate_embedding_params(smoothed, max_tau=20, max_m=6)
             tau = int(tau_auto if tau_mode == "auto" else tau_mode)
-            result = run_graph_engine(
+            result = cached_run_graph_engine(
                 smoothed,
+                cache,
                 m=m,
                 tau=tau,
                 n_micro=args.n_micro,
@@ -97,13 +97,14 @@ def _historical_events() -> list[EventRef]:
     ]
 
 
-def _run_motor(values: np.ndarray, seed: int, timeframe: str) -> Any:
-    from engine.graph.core import run_graph_engine  # type: ignore
+def _run_motor(values: np.ndarray, seed: int, timeframe: str, cache_dir: str = "") -> Any:
+    from engine.graph.cache import ResultCache, cached_run_graph_engine  # type: ignore
     from engine.graph.embedding import estimate_embedding_params  # type: ignore
 
     m, tau = estimate_embedding_params(values, max_tau=20, max_m=6)
-    result = run_graph_engine(
+    result = cached_run_graph_engine(
         values,
+        ResultCache(cache_dir) if cache_dir else None,
         m=m,
         tau=tau,
         n_micro=80,
@@ -416,6 +417,7 @@ def main() -> None:
     parser.add_argument("--merge-gap-days", type=int, default=20)
     parser.add_argument("--min-duration", type=int, default=5)
     parser.add_argument("--max-duration", type=int, default=180)
+    parser.add_argument("--cache-dir", type=str, default="", help="Reuse motor results cached here across reruns")
     args = parser.parse_args()
 
     outdir = Path(args.outdir)
@@ -452,7 +454,7 @@ def main() -> None:
         print(f"[fail] insufficient points: {x.shape[0]}")
         return
 
-    result, m, tau = _run_motor(x, seed=args.seed, timeframe=args.timeframe)
+    result, m, tau = _run_motor(x, seed=args.seed, timeframe=args.timeframe, cache_dir=args.cache_dir)
     n = int(result.state_labels.shape[0])
     if n <= 0:
         _write_status(outdir, {"status": "fail", "reason": "empty_motor_output"})
@@ -4,6 +4,7 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import sys
 from pathlib import Path
 from typing import Any
 
@@ -11,6 +12,11 @@ import numpy as np
 import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[3]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.rolling import ewma_variance, rolling_autocorr, rolling_std  # noqa: E402
+
 OUTDIR_DEFAULT = ROOT / "results" / "validation" / "hybrid_risk"
 
 
@@ -98,23 +104,18 @@ def _load_series(path: Path, date_col: str, value_col: str) -> tuple[pd.DataFram
 
 
 def _rolling_acf1(x: pd.Series, window: int) -> pd.Series:
+    # Value at i uses the window vals[i - window : i] (ends one bar earlier).
     vals = x.to_numpy(dtype=float)
     out = np.full(vals.shape[0], np.nan, dtype=float)
-    for i in range(window, len(vals)):
-        w = vals[i - window : i]
-        if np.std(w) < 1e-12:
-            out[i] = 0.0
-        else:
-            out[i] = float(pd.Series(w).autocorr(lag=1))
+    if vals.shape[0] > window:
+        acf = rolling_autocorr(vals, window, lag=1)[window - 1 : -1]
+        flat = rolling_std(vals, window)[window - 1 : -1] < 1e-12
+        out[window:] = np.where(flat, 0.0, acf)
     return pd.Series(out, index=x.index)
 
 
 def _ewma_sigma(r: pd.Series, lam: float = 0.94) -> pd.Series:
-    arr = r.fillna(0.0).to_numpy(dtype=float)
-    v = np.zeros_like(arr)
-    v[0] = float(np.var(arr[: min(30, len(arr))])) if len(arr) > 0 else 0.0
-    for i in range(1, len(arr)):
-        v[i] = lam * v[i - 1] + (1.0 - lam) * (arr[i - 1] ** 2)
+    v = ewma_variance(r.fillna(0.0).to_numpy(dtype=float), lam=lam)
     return pd.Series(np.sqrt(np.clip(v, 0.0, None)), index=r.index)
 
 
@@ -23,6 +23,7 @@ from engine.sanity import ensure_sorted_dates, safe_test_indices, split_hash, va
 from scripts.finance.yf_fetch_or_load import find_local_data, load_price_series, fetch_yfinance, unify_to_daily, save_cache
 from engine.features.phase_features import compute_phase_features
 from engine.models.baselines import persistence_next, zero_mean_next, ar1_fit, ar1_predict
+from engine.models.takens_knn import embed
 from engine.api_records import PredictionRecord, save_prediction_records
 
 
@@ -30,21 +31,6 @@ def safe_name(name):
     return name.replace("/", "_").replace("^", "").replace(" ", "_")
 
 
-def embed(series, tau, m):
-    series = np.asarray(series, dtype=float)
-    start = (m - 1) * tau
-    X = []
-    y = []
-    idx = []
-    for i in range(start, len(series) - 1):
-        X.append([series[i - j * tau] for j in range(m)])
-        y.append(series[i + 1])
-        idx.append(i + 1)
-    if not X:
-        return None, None, None
-    return np.array(X), np.array(y), np.array(idx)
-
-
 def zscore_fit(X):
     mean = X.mean(axis=0)
     std = X.std(axis=0)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Compile or refresh the memory-mapped price store for a CSV directory.
+
+Scripts reading price CSVs through ``engine.marketdata.read_price_csv`` pick
+the store up automatically once it is built and fall back to the CSVs for any
+file changed since.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.marketdata import PriceStore, build_store, open_store, store_dir_for  # noqa: E402
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Build/refresh the columnar price store.")
+    ap.add_argument("action", choices=["build", "refresh", "info"])
+    ap.add_argument("--source-dir", default="data/raw/finance/yfinance_daily")
+    ap.add_argument("--store-root", default="", help="Store root (default: $PRICE_STORE_DIR or data/price_store)")
+    args = ap.parse_args()
+
+    source_dir = Path(args.source_dir)
+    if not source_dir.is_absolute():
+        source_dir = ROOT / source_dir
+    store_dir = store_dir_for(source_dir, args.store_root or None)
+    t0 = time.perf_counter()
+    store: PriceStore | None = open_store(store_dir)
+    if args.action == "build" or (args.action == "refresh" and store is None):
+        store = build_store(source_dir, store_dir)
+        out = {"action": "build", "tickers": len(store)}
+    elif args.action == "refresh":
+        report = store.refresh(source_dir)
+        out = {"action": "refresh", **{k: (len(v) if k == "unchanged" else v) for k, v in report.items()}}
+    else:
+        if store is None:
+            raise SystemExit(f"no price store at {store_dir}")
+        out = {"action": "info", "tickers": len(store)}
+    dates = store.dates()
+    out.update(
+        store=str(store_dir),
+        n_dates=int(dates.size),
+        first=str(dates[0]) if dates.size else None,
+        last=str(dates[-1]) if dates.size else None,
+        seconds=round(time.perf_counter() - t0, 3),
+    )
+    print(json.dumps(out))
+
+
+if __name__ == "__main__":
+    main()
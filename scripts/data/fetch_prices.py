@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Fetch only the bars missing from the price store, for many tickers at once.
+
+Defaults to every ticker already in the CSV directory. ``--serve-dir`` starts
+the local file-backed stand-in API over a directory of CSVs and fetches from
+it, which exercises the full path offline.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.marketdata import (  # noqa: E402
+    FetchPolicy,
+    HTTPProvider,
+    LocalPriceServer,
+    YFinanceProvider,
+    fetch_updates,
+    store_dir_for,
+)
+from engine.marketdata.fetch import open_or_create_store  # noqa: E402
+
+
+def _read_tickers(tickers: str, tickers_file: str, csv_dir: Path) -> list[str]:
+    out = [x.strip() for x in tickers.split(",") if x.strip()]
+    if tickers_file:
+        out += [x.strip() for x in Path(tickers_file).read_text(encoding="utf-8").splitlines() if x.strip()]
+    if not out and csv_dir.exists():
+        out = sorted(p.stem for p in csv_dir.glob("*.csv"))
+    return list(dict.fromkeys(out))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Incremental price refresh into the price store (and CSV mirror).")
+    ap.add_argument("--tickers", default="")
+    ap.add_argument("--tickers-file", default="")
+    ap.add_argument("--csv-dir", default="data/raw/finance/yfinance_daily", help="CSV directory to mirror appends into")
+    ap.add_argument("--no-csv", action="store_true", help="Only update the store")
+    ap.add_argument("--store-root", default="", help="Store root (default: $PRICE_STORE_DIR or data/price_store)")
+    ap.add_argument("--provider", default="yfinance", choices=["yfinance", "http"])
+    ap.add_argument("--base-url", default="", help="Base URL for --provider http")
+    ap.add_argument("--serve-dir", default="", help="Serve CSVs from this directory locally and fetch from it")
+    ap.add_argument("--workers", type=int, default=8)
+    ap.add_argument("--retries", type=int, default=3)
+    ap.add_argument("--backoff", type=float, default=0.5)
+    ap.add_argument("--history-start", default="2009-01-01", help="First date requested for tickers not in the store")
+    args = ap.parse_args()
+
+    csv_dir = Path(args.csv_dir)
+    if not csv_dir.is_absolute():
+        csv_dir = ROOT / csv_dir
+    store = open_or_create_store(store_dir_for(csv_dir, args.store_root or None), source_dir=csv_dir)
+    if not args.no_csv and csv_dir.exists():
+        # Pick up CSV edits made outside the fetcher before appending to them.
+        store.refresh(csv_dir)
+    tickers = _read_tickers(args.tickers, args.tickers_file, csv_dir)
+    policy = FetchPolicy(workers=args.workers, retries=args.retries, backoff=args.backoff, history_start=args.history_start)
+
+    def _run(provider) -> dict:
+        return fetch_updates(store, tickers, provider, policy=policy, csv_dir=None if args.no_csv else csv_dir)
+
+    if args.serve_dir:
+        with LocalPriceServer(args.serve_dir) as server:
+            manifest = _run(HTTPProvider(server.url))
+    elif args.provider == "http":
+        if not args.base_url:
+            raise SystemExit("--base-url is required for --provider http")
+        manifest = _run(HTTPProvider(args.base_url))
+    else:
+        manifest = _run(YFinanceProvider())
+    print(json.dumps({k: manifest[k] for k in ("run_id", "provider", "counts", "new_rows", "store")}))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,12 @@ from pathlib import Path
 import numpy as np
 import pandas as pd
 
+from engine.marketdata import find_csv, read_price_csv
 
-def find_local_data(ticker, base_dir):
+
+def find_local_data(ticker, base_dir, use_catalog=True):
+    if use_catalog:
+        return find_csv(ticker, base_dir)
     ticker_upper = ticker.upper()
     candidates = []
     for root, _, files in os.walk(base_dir):
@@ -48,7 +52,7 @@ def _detect_price_column(columns):
 
 
 def load_price_series(path):
-    df = pd.read_csv(path)
+    df = read_price_csv(path)
     date_col = _detect_date_column(df.columns)
     price_col = _detect_price_column(df.columns)
     if not date_col or not price_col:
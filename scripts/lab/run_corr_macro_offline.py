@@ -5,6 +5,7 @@ import argparse
 import hashlib
 import json
 import math
+import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -12,20 +13,33 @@ from typing import Any
 import numpy as np
 import pandas as pd
 
-try:
-    from scipy.cluster.hierarchy import fcluster, linkage
-    from scipy.spatial.distance import squareform
-
-    SCIPY_OK = True
-except Exception:
-    SCIPY_OK = False
-
 
 ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.corr_clusters import CLUSTERING_BACKEND, ClusterTracker, pair_turnover  # noqa: E402
+from engine.diagnostics.corr_null import (  # noqa: E402
+    analytic_null,
+    block_bootstrap_batch,
+    null_spectrum,
+    replicate_rngs,
+    shuffle_batch,
+    tracy_widom_pvalue,
+)
+from engine.diagnostics.corr_spectrum import SpectrumTracker, vector_overlap  # noqa: E402
+from engine.diagnostics.rolling_corr import RollingCorrelation  # noqa: E402
+from engine.graph.parallel import run_tasks  # noqa: E402
+
 DEFAULT_OUT_BASE = ROOT / "results" / "lab_corr_macro"
 DEFAULT_FINANCE_BASE = ROOT / "results" / "finance_download"
 DEFAULT_BASELINE_DIR = DEFAULT_OUT_BASE / "_official_baseline"
 ERA_ORDER = ["2018_2019", "2020", "2021_2022", "2023_2026"]
+NULL_MODELS = ("resample", "analytic")
+WINDOWS = (60, 120, 252)
+# Below this many replicates (1 + hits) / (1 + R) cannot reach 0.05, so no p-value is reported.
+MIN_PVALUE_REPLICATES = 20
+WINDOW_STATE_VERSION = 3
 
 
 def _run_id() -> str:
@@ -55,59 +69,6 @@ def _safe_sign(a: np.ndarray) -> np.ndarray:
     return s
 
 
-def _cluster_metrics(corr: np.ndarray) -> tuple[np.ndarray, int, float, float]:
-    c = np.clip(np.asarray(corr, dtype=float), -1.0, 1.0)
-    dist = np.sqrt(np.clip(2.0 * (1.0 - c), 0.0, None))
-    np.fill_diagonal(dist, 0.0)
-    z = linkage(squareform(dist, checks=False), method="average")
-    cid = fcluster(z, t=1.0, criterion="distance")
-    _, counts = np.unique(cid, return_counts=True)
-    p = counts.astype(float) / counts.sum()
-    entropy = float(-np.sum(p * np.log(p + 1e-12)))
-    return cid.astype(int), int(counts.size), float(np.max(p)), entropy
-
-
-def _turnover_pair_frac(labels_a: np.ndarray, labels_b: np.ndarray) -> float:
-    m = labels_a.size
-    if m < 2:
-        return float("nan")
-    eq_a = labels_a[:, None] == labels_a[None, :]
-    eq_b = labels_b[:, None] == labels_b[None, :]
-    upper = np.triu(np.ones((m, m), dtype=bool), k=1)
-    changed = np.logical_xor(eq_a, eq_b)[upper]
-    return float(np.sum(changed) / max(int(upper.sum()), 1))
-
-
-def _spectral_metrics(corr: np.ndarray) -> tuple[np.ndarray, float, float, float]:
-    eig = np.real(np.sort(np.linalg.eigvalsh(corr))[::-1])
-    s = float(np.sum(eig))
-    if s <= 0:
-        return eig, float("nan"), float("nan"), float("nan")
-    p = eig / s
-    p1 = float(p[0])
-    deff = float(1.0 / np.sum(np.square(p)))
-    top5 = float(np.sum(p[: min(5, p.size)]))
-    return eig, p1, deff, top5
-
-
-def _spectral_metrics_with_v1(corr: np.ndarray) -> tuple[np.ndarray, float, float, float, np.ndarray]:
-    w, v = np.linalg.eigh(np.asarray(corr, dtype=float))
-    order = np.argsort(w)[::-1]
-    eig = np.real(w[order]).astype(float)
-    v1 = np.real(v[:, order[0]]).astype(float)
-    nrm = float(np.linalg.norm(v1))
-    if nrm > 1e-12:
-        v1 = v1 / nrm
-    s = float(np.sum(eig))
-    if s <= 0:
-        return eig, float("nan"), float("nan"), float("nan"), v1
-    p = eig / s
-    p1 = float(p[0])
-    deff = float(1.0 / np.sum(np.square(p)))
-    top5 = float(np.sum(p[: min(5, p.size)]))
-    return eig, p1, deff, top5, v1
-
-
 def _zscore_series(x: pd.Series) -> pd.Series:
     s = pd.to_numeric(x, errors="coerce")
     mu = float(s.mean(skipna=True))
@@ -133,59 +94,149 @@ def _expanding_quantile(x: pd.Series, q: float, min_history: int) -> pd.Series:
     return s.expanding(min_periods=k).quantile(float(q)).shift(1)
 
 
-def _block_bootstrap_col(x: np.ndarray, block_size: int, rng: np.random.Generator) -> np.ndarray:
-    n = int(x.shape[0])
-    if n <= 1:
-        return x.copy()
-    b = int(max(2, min(block_size, n)))
-    out = np.empty(n, dtype=float)
-    pos = 0
-    while pos < n:
-        start = int(rng.integers(0, n - b + 1))
-        seg = x[start : start + b]
-        take = min(seg.shape[0], n - pos)
-        out[pos : pos + take] = seg[:take]
-        pos += take
+def _null_baselines(
+    x: np.ndarray,
+    lambda1: float,
+    p1: float,
+    null_model: str,
+    n_replicates: int,
+    bootstrap_block: int,
+    key: tuple[int, ...],
+) -> dict[str, float]:
+    """Mean null p1/deff and the p-value of the observed p1 for the shuffle and bootstrap nulls.
+
+    Replicate p-values are only reported with at least ``MIN_PVALUE_REPLICATES``
+    usable replicates; fewer would only ever give non-significant values.
+    """
+    out: dict[str, float] = {}
+    if null_model == "analytic":
+        # Both nulls break cross-sectional dependence, so they share the closed form.
+        ref = analytic_null(x.shape[0], x.shape[1])
+        pv = tracy_widom_pvalue(lambda1, x.shape[0], x.shape[1])
+        for kind in ("shuffle", "bootstrap"):
+            out[f"p1_{kind}"], out[f"deff_{kind}"], out[f"p1_pvalue_{kind}"] = ref["p1"], ref["deff"], pv
+        return out
+    n_rep = int(max(1, n_replicates))
+    for code, kind in enumerate(("shuffle", "bootstrap"), start=1):
+        rngs = replicate_rngs((*key, code), n_rep)
+        xs = shuffle_batch(x, rngs) if kind == "shuffle" else block_bootstrap_batch(x, int(max(2, bootstrap_block)), rngs)
+        spec = null_spectrum(xs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p1_rep = spec["lambda1"] / spec["trace"]
+            deff_rep = spec["trace"] ** 2 / spec["frob2"]
+        ok = np.isfinite(p1_rep) & np.isfinite(deff_rep)
+        if not np.any(ok):
+            continue
+        out[f"p1_{kind}"] = float(np.mean(p1_rep[ok]))
+        out[f"deff_{kind}"] = float(np.mean(deff_rep[ok]))
+        n_ok = int(np.sum(ok))
+        out[f"p1_pvalue_{kind}"] = float((1 + np.sum(p1_rep[ok] >= p1)) / (1 + n_ok)) if n_ok >= MIN_PVALUE_REPLICATES else np.nan
     return out
 
 
-def _block_bootstrap_matrix(x: np.ndarray, block_size: int, rng: np.random.Generator) -> np.ndarray:
-    y = np.empty_like(x)
-    for j in range(x.shape[1]):
-        y[:, j] = _block_bootstrap_col(x[:, j], block_size=block_size, rng=rng)
-    return y
-
-
-def _process_window(
-    returns_wide: pd.DataFrame,
-    sector_by_ticker: dict[str, str],
-    window: int,
-    cov_window: float,
-    min_assets: int,
-    noise_step: int,
-    bootstrap_block: int,
-    overlap_step: int,
-    seed: int,
-) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    dates = returns_wide.index
-    rows: list[dict[str, Any]] = []
-    snaps: list[dict[str, Any]] = []
-    sector_rows: list[dict[str, Any]] = []
-    cluster_assign: dict[pd.Timestamp, dict[str, int]] = {}
-    min_obs = max(30, int(np.ceil(window * cov_window)))
-    prev_v1: np.ndarray | None = None
-    prev_cols: list[str] | None = None
-    if (len(dates) - window + 1) <= 0:
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-    for i in range(window - 1, len(dates)):
+def _panel_digest(returns_wide: pd.DataFrame, sector_by_ticker: dict[str, str], n_rows: int) -> str:
+    """Hash of the columns, sectors and the first ``n_rows`` rows (dates and values) of the panel."""
+    h = hashlib.sha256()
+    cols = [str(c) for c in returns_wide.columns]
+    h.update(json.dumps([cols, [str(sector_by_ticker.get(c, "unknown")) for c in cols]]).encode("utf-8"))
+    h.update(pd.DatetimeIndex(returns_wide.index[:n_rows]).asi8.tobytes())
+    vals = returns_wide.to_numpy(dtype=float)[:n_rows]
+    h.update(np.where(np.isnan(vals), np.nan, vals).tobytes())  # one NaN bit pattern
+    return h.hexdigest()
+
+
+def _write_atomic(path: Path, write: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    tmp.replace(path)
+
+
+class _WindowRun:
+    """Per-date metrics of one window, resumable from an on-disk checkpoint.
+
+    ``run`` processes the dates not covered yet. ``save`` writes the rows
+    produced so far next to the state the next date needs: rolling window
+    sums, the tracked eigenvectors, the last overlap vector, the last
+    clustered matrix and the cluster labels of the last five dates. ``load``
+    only accepts a checkpoint whose parameters, tickers, sectors and already
+    processed panel rows are unchanged, so a resumed run produces the same
+    rows as a full one.
+    Anything else starts from scratch.
+    """
+
+    def __init__(
+        self,
+        returns_wide: pd.DataFrame,
+        sector_by_ticker: dict[str, str],
+        window: int,
+        cov_window: float,
+        min_assets: int,
+        noise_step: int,
+        bootstrap_block: int,
+        overlap_step: int,
+        seed: int,
+        null_model: str = "resample",
+        null_replicates: int = 1,
+        cluster_tol: float = 0.0,
+    ) -> None:
+        self.returns_wide = returns_wide
+        self.sector_by_ticker = sector_by_ticker
+        self.params = {
+            "window": int(window),
+            "cov_window": float(cov_window),
+            "min_assets": int(min_assets),
+            "noise_step": int(noise_step),
+            "bootstrap_block": int(bootstrap_block),
+            "overlap_step": int(overlap_step),
+            "seed": int(seed),
+            "null_model": str(null_model),
+            "null_replicates": int(null_replicates),
+            "cluster_tol": float(cluster_tol),
+        }
+        # Sums and cross-products over the window's complete rows, moved one row
+        # at a time instead of re-slicing and re-correlating every date.
+        self.roll = RollingCorrelation(returns_wide.to_numpy(dtype=float), window=window, min_coverage=cov_window)
+        # Only lambda1..10 and v1 are read; track them from the previous date's eigenvectors.
+        self.tracker = SpectrumTracker(k=10)
+        self.clusters = ClusterTracker(n_ids=returns_wide.shape[1], tol=cluster_tol)
+        self.next_i = int(window) - 1
+        self.resumed_rows = 0
+        self.prev_v1: np.ndarray | None = None
+        self.prev_cols: np.ndarray | None = None
+        self.cluster_labels: dict[int, np.ndarray] = {}
+        # Month-end snapshot of the last processed date; only final once the next date is known.
+        self.provisional_eom: str | None = None
+        self._done = (pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+        self.rows: list[dict[str, Any]] = []
+        self.snaps: list[dict[str, Any]] = []
+        self.sector_rows: list[dict[str, Any]] = []
+
+    def run(self) -> "_WindowRun":
+        dates = self.returns_wide.index
+        if self.next_i >= len(dates):
+            return self
+        if self.provisional_eom is not None:
+            last = pd.Timestamp(dates[self.next_i - 1])
+            if pd.Timestamp(dates[self.next_i]).month == last.month:
+                snap = self._done[1]
+                self._done = (self._done[0], snap[snap["date"] != self.provisional_eom].reset_index(drop=True), self._done[2])
+            self.provisional_eom = None
+        for i in range(self.next_i, len(dates)):
+            self.rows.append(self._step(i))
+        self.next_i = len(dates)
+        return self
+
+    def _step(self, i: int) -> dict[str, Any]:
+        p = self.params
+        window, min_assets = p["window"], p["min_assets"]
+        dates = self.returns_wide.index
+        tickers = self.returns_wide.columns.to_list()
+        roll = self.roll
         date = pd.Timestamp(dates[i])
-        block = returns_wide.reindex(dates[i - window + 1 : i + 1])
-        cov = block.notna().mean(axis=0)
-        tickers_t = cov[cov >= cov_window].index.to_list()
+        cols = roll.update(i).columns
         rec: dict[str, Any] = {
             "date": date.date().isoformat(),
-            "N_used": int(len(tickers_t)),
+            "N_used": int(cols.size),
             "p1": np.nan,
             "deff": np.nan,
             "top5": np.nan,
@@ -199,6 +250,8 @@ def _process_window(
             "p1_bootstrap": np.nan,
             "deff_bootstrap": np.nan,
             "structure_score_bootstrap": np.nan,
+            "p1_pvalue_shuffle": np.nan,
+            "p1_pvalue_bootstrap": np.nan,
             "eigvec_overlap_1d": np.nan,
             "eigvec_instability_1d": np.nan,
             "insufficient_universe": True,
@@ -207,121 +260,226 @@ def _process_window(
             rec[f"lambda{k}"] = np.nan
 
         if rec["N_used"] < min_assets:
-            rows.append(rec)
-            continue
+            return rec
 
-        aligned = block[tickers_t].dropna(how="any")
-        if aligned.shape[0] < min_obs or aligned.shape[1] < min_assets:
-            rows.append(rec)
-            continue
-        x = aligned.to_numpy(dtype=float)
-        std = np.nanstd(x, axis=0)
-        keep = std > 1e-12
+        if roll.n_obs < max(30, int(np.ceil(window * p["cov_window"]))):
+            return rec
+        keep = roll.std(cols) > 1e-12
         if int(np.sum(keep)) < min_assets:
             rec["N_used"] = int(np.sum(keep))
-            rows.append(rec)
-            continue
+            return rec
         if not np.all(keep):
-            aligned = aligned.loc[:, keep]
-            x = aligned.to_numpy(dtype=float)
-            rec["N_used"] = int(aligned.shape[1])
+            cols = cols[keep]
+            rec["N_used"] = int(cols.size)
 
-        corr = np.corrcoef(x, rowvar=False)
+        corr = roll.corr(cols)
         if not np.all(np.isfinite(corr)):
-            rows.append(rec)
-            continue
-        eig, p1, deff, top5 = _spectral_metrics(corr)
+            return rec
+        spec = self.tracker.update(corr, ids=cols)
+        eig, p1, deff, top5 = spec.values, spec.p1, spec.deff, spec.top_share(5)
         if not (np.isfinite(p1) and np.isfinite(deff) and np.isfinite(top5)):
-            rows.append(rec)
-            continue
+            return rec
         rec["p1"] = p1
         rec["deff"] = deff
         rec["top5"] = top5
         rec["insufficient_universe"] = False
         for k in range(1, 11):
             rec[f"lambda{k}"] = float(eig[k - 1]) if eig.size >= k else np.nan
-        calc_overlap = (int(max(1, overlap_step)) == 1) or (i % int(max(1, overlap_step)) == 0)
+        calc_overlap = (int(max(1, p["overlap_step"])) == 1) or (i % int(max(1, p["overlap_step"])) == 0)
         if calc_overlap:
-            try:
-                _, _, _, _, v1 = _spectral_metrics_with_v1(corr)
-                if (prev_v1 is not None) and (prev_cols is not None):
-                    common = sorted(set(prev_cols).intersection(aligned.columns.to_list()))
-                    if len(common) >= 3:
-                        prev_idx = [prev_cols.index(c) for c in common]
-                        cur_idx = [aligned.columns.get_loc(c) for c in common]
-                        a = prev_v1[prev_idx]
-                        b = v1[cur_idx]
-                        na = float(np.linalg.norm(a))
-                        nb = float(np.linalg.norm(b))
-                        if (na > 1e-12) and (nb > 1e-12):
-                            ov = float(abs(np.dot(a / na, b / nb)))
-                            rec["eigvec_overlap_1d"] = ov
-                            rec["eigvec_instability_1d"] = float(1.0 - ov)
-                prev_v1 = v1
-                prev_cols = aligned.columns.to_list()
-            except Exception:
-                pass
-
-        if SCIPY_OK:
-            cid, ccount, largest_share, entropy = _cluster_metrics(corr)
-            rec["cluster_count"] = ccount
-            rec["largest_share"] = largest_share
-            rec["entropy"] = entropy
-            amap = {t: int(c) for t, c in zip(aligned.columns.to_list(), cid.tolist())}
-            cluster_assign[date] = amap
-            is_eom = (i == len(dates) - 1) or (pd.Timestamp(dates[i + 1]).month != date.month)
-            if is_eom:
-                for t, c in amap.items():
-                    snaps.append({"date": date.date().isoformat(), "ticker": t, "cluster_id": c})
-            vc = pd.Series([sector_by_ticker.get(t, "unknown") for t in amap.keys()]).value_counts()
-            for sec, cnt in vc.items():
-                sector_rows.append({"date": date.date().isoformat(), "sector": str(sec), "count": int(cnt)})
+            if (self.prev_v1 is not None) and (self.prev_cols is not None):
+                ov = vector_overlap(self.prev_cols, self.prev_v1, cols, spec.v1)
+                if np.isfinite(ov):
+                    rec["eigvec_overlap_1d"] = ov
+                    rec["eigvec_instability_1d"] = float(1.0 - ov)
+            self.prev_v1 = spec.v1
+            self.prev_cols = cols
+
+        assign = self.clusters.update(corr, ids=cols)
+        rec["cluster_count"] = assign.count
+        rec["largest_share"] = assign.largest_share
+        rec["entropy"] = assign.entropy
+        self.cluster_labels[i] = assign.labels
+        is_eom = (i == len(dates) - 1) or (pd.Timestamp(dates[i + 1]).month != date.month)
+        if is_eom:
+            for j in cols.tolist():
+                self.snaps.append({"date": date.date().isoformat(), "ticker": tickers[j], "cluster_id": int(assign.labels[j])})
+            if i == len(dates) - 1:
+                self.provisional_eom = date.date().isoformat()
+        vc = pd.Series([self.sector_by_ticker.get(tickers[j], "unknown") for j in cols.tolist()]).value_counts()
+        for sec, cnt in vc.items():
+            self.sector_rows.append({"date": date.date().isoformat(), "sector": str(sec), "count": int(cnt)})
 
         prev_i = i - 5
-        if prev_i >= (window - 1):
-            prev_date = pd.Timestamp(dates[prev_i])
-            cm = cluster_assign.get(date)
-            pm = cluster_assign.get(prev_date)
-            if cm is not None and pm is not None:
-                common = sorted(set(cm.keys()).intersection(pm.keys()))
-                if len(common) >= 2:
-                    rec["turnover_pair_frac"] = _turnover_pair_frac(
-                        np.asarray([cm[t] for t in common], dtype=int),
-                        np.asarray([pm[t] for t in common], dtype=int),
-                    )
-
-        if (i % max(noise_step, 1) == 0) and (aligned.shape[1] >= min_assets):
-            rng = np.random.default_rng(seed + window * 10_000 + i)
-            x_shuffle = aligned.to_numpy(dtype=float).copy()
-            for j in range(x_shuffle.shape[1]):
-                rng.shuffle(x_shuffle[:, j])
-            keep_sh = np.nanstd(x_shuffle, axis=0) > 1e-12
-            if int(np.sum(keep_sh)) >= 2:
-                corr_shuffle = np.corrcoef(x_shuffle[:, keep_sh], rowvar=False)
-                if np.all(np.isfinite(corr_shuffle)):
-                    _, p1_sh, deff_sh, _ = _spectral_metrics(corr_shuffle)
-                    if np.isfinite(p1_sh) and np.isfinite(deff_sh):
-                        rec["p1_shuffle"] = p1_sh
-                        rec["deff_shuffle"] = deff_sh
-                        rec["structure_score"] = float((rec["p1"] - p1_sh) + (deff_sh - rec["deff"]))
-
-            x_boot = _block_bootstrap_matrix(
-                aligned.to_numpy(dtype=float),
-                block_size=int(max(2, bootstrap_block)),
-                rng=np.random.default_rng(seed + window * 20_000 + i),
+        for old in [j for j in self.cluster_labels if j < prev_i]:
+            del self.cluster_labels[old]
+        if prev_i >= (window - 1) and prev_i in self.cluster_labels:
+            rec["turnover_pair_frac"] = pair_turnover(assign.labels, self.cluster_labels[prev_i])
+
+        if (i % max(p["noise_step"], 1) == 0) and (cols.size >= min_assets):
+            null = _null_baselines(
+                roll.data(cols),
+                lambda1=float(eig[0]),
+                p1=p1,
+                null_model=p["null_model"],
+                n_replicates=p["null_replicates"],
+                bootstrap_block=p["bootstrap_block"],
+                key=(p["seed"], window, i),
             )
-            keep_bs = np.nanstd(x_boot, axis=0) > 1e-12
-            if int(np.sum(keep_bs)) >= 2:
-                corr_boot = np.corrcoef(x_boot[:, keep_bs], rowvar=False)
-                if np.all(np.isfinite(corr_boot)):
-                    _, p1_bs, deff_bs, _ = _spectral_metrics(corr_boot)
-                    if np.isfinite(p1_bs) and np.isfinite(deff_bs):
-                        rec["p1_bootstrap"] = p1_bs
-                        rec["deff_bootstrap"] = deff_bs
-                        rec["structure_score_bootstrap"] = float((rec["p1"] - p1_bs) + (deff_bs - rec["deff"]))
+            rec.update(null)
+            if "p1_shuffle" in null:
+                rec["structure_score"] = float((p1 - null["p1_shuffle"]) + (null["deff_shuffle"] - deff))
+            if "p1_bootstrap" in null:
+                rec["structure_score_bootstrap"] = float((p1 - null["p1_bootstrap"]) + (null["deff_bootstrap"] - deff))
+
+        return rec
+
+    def frames(self) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Time series, month-end cluster snapshots and sector counts for every processed date."""
+        out = []
+        for done, new in zip(self._done, (self.rows, self.snaps, self.sector_rows)):
+            new_df = pd.DataFrame(new)
+            if done.empty:
+                out.append(new_df)
+            elif new_df.empty:
+                out.append(done.copy())
+            else:
+                out.append(pd.concat([done, new_df], ignore_index=True))
+        return out[0], out[1], out[2]
+
+    def save(self, state_dir: Path) -> None:
+        state_dir.mkdir(parents=True, exist_ok=True)
+        frames = self.frames()
+        names = ("timeseries", "snapshots", "sectors")
+        for name, df in zip(names, frames):
+            _write_atomic(state_dir / f"{name}.csv", lambda p, df=df: df.to_csv(p, index=False))
+        arrays = {f"roll_{k}": v for k, v in self.roll.state().items()}
+        arrays.update({f"spec_{k}": v for k, v in self.tracker.state().items()})
+        arrays.update({f"clus_{k}": v for k, v in self.clusters.state().items()})
+        days = sorted(self.cluster_labels)
+        arrays["label_days"] = np.asarray(days, dtype=np.int64)
+        arrays["label_rows"] = (
+            np.vstack([self.cluster_labels[d] for d in days]) if days else np.zeros((0, self.returns_wide.shape[1]), dtype=np.int64)
+        )
+        arrays["prev_v1"] = self.prev_v1 if self.prev_v1 is not None else np.zeros(0)
+        arrays["prev_cols"] = self.prev_cols if self.prev_cols is not None else np.zeros(0, dtype=np.int64)
+        meta = {
+            "version": WINDOW_STATE_VERSION,
+            "params": self.params,
+            "next_i": int(self.next_i),
+            "panel_digest": _panel_digest(self.returns_wide, self.sector_by_ticker, self.next_i),
+            "has_prev_v1": self.prev_v1 is not None,
+            "provisional_eom": self.provisional_eom,
+            "n_rows": {name: int(len(df)) for name, df in zip(names, frames)},
+        }
+
+        def _write_npz(p: Path) -> None:
+            with open(p, "wb") as fh:
+                np.savez_compressed(fh, meta=np.array(json.dumps(meta)), **arrays)
+
+        _write_atomic(state_dir / "state.npz", _write_npz)
+
+    @classmethod
+    def load(cls, state_dir: Path, returns_wide: pd.DataFrame, sector_by_ticker: dict[str, str], **params: Any) -> "_WindowRun":
+        """Resume from ``state_dir`` when its checkpoint matches this panel; otherwise start fresh."""
+        run = cls(returns_wide, sector_by_ticker, **params)
+        path = state_dir / "state.npz"
+        if not path.exists():
+            return run
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                next_i = int(meta["next_i"])
+                if (
+                    meta.get("version") != WINDOW_STATE_VERSION
+                    or meta.get("params") != run.params
+                    or next_i > len(returns_wide)
+                    or meta.get("panel_digest") != _panel_digest(returns_wide, sector_by_ticker, next_i)
+                ):
+                    return run
+                arrays = {k: data[k] for k in data.files if k != "meta"}
+            done = []
+            for name in ("timeseries", "snapshots", "sectors"):
+                n = int(meta["n_rows"][name])
+                df = (
+                    pd.read_csv(state_dir / f"{name}.csv", keep_default_na=False, na_values=[""], float_precision="round_trip")
+                    if n > 0
+                    else pd.DataFrame()
+                )
+                if len(df) != n:
+                    return cls(returns_wide, sector_by_ticker, **params)
+                done.append(df)
+            run.roll.restore({k[5:]: v for k, v in arrays.items() if k.startswith("roll_")})
+            run.tracker.restore({k[5:]: v for k, v in arrays.items() if k.startswith("spec_")})
+            run.clusters.restore({k[5:]: v for k, v in arrays.items() if k.startswith("clus_")})
+        except (OSError, ValueError, KeyError, TypeError, pd.errors.ParserError):
+            return cls(returns_wide, sector_by_ticker, **params)
+        if meta["has_prev_v1"]:
+            run.prev_v1 = arrays["prev_v1"]
+            run.prev_cols = arrays["prev_cols"]
+        run.cluster_labels = {int(d): row for d, row in zip(arrays["label_days"], arrays["label_rows"])}
+        run.provisional_eom = meta["provisional_eom"]
+        run.next_i = next_i
+        run.resumed_rows = int(meta["n_rows"]["timeseries"])
+        run._done = (done[0], done[1], done[2])
+        return run
+
+
+def _process_window(
+    returns_wide: pd.DataFrame,
+    sector_by_ticker: dict[str, str],
+    window: int,
+    cov_window: float,
+    min_assets: int,
+    noise_step: int,
+    bootstrap_block: int,
+    overlap_step: int,
+    seed: int,
+    null_model: str = "resample",
+    null_replicates: int = 1,
+    cluster_tol: float = 0.0,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    run = _WindowRun(
+        returns_wide,
+        sector_by_ticker,
+        window=window,
+        cov_window=cov_window,
+        min_assets=min_assets,
+        noise_step=noise_step,
+        bootstrap_block=bootstrap_block,
+        overlap_step=overlap_step,
+        seed=seed,
+        null_model=null_model,
+        null_replicates=null_replicates,
+        cluster_tol=cluster_tol,
+    )
+    return run.run().frames()
+
+
+_WINDOW_CTX: dict[str, Any] = {}
+
+
+def _init_window_worker(
+    returns_wide: pd.DataFrame,
+    sector_by_ticker: dict[str, str],
+    params: dict[str, Any],
+    state_dir: str,
+    resume: bool,
+) -> None:
+    _WINDOW_CTX.update(returns_wide=returns_wide, sector_by_ticker=sector_by_ticker, params=params, state_dir=state_dir, resume=resume)
 
-        rows.append(rec)
-    return pd.DataFrame(rows), pd.DataFrame(snaps), pd.DataFrame(sector_rows)
+
+def _window_task(window: int) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, dict[str, int]]:
+    """Run (or resume) one window from the worker context; checkpoints when a state dir is set."""
+    ctx = _WINDOW_CTX
+    kwargs = dict(returns_wide=ctx["returns_wide"], sector_by_ticker=ctx["sector_by_ticker"], window=int(window), **ctx["params"])
+    state_dir = Path(ctx["state_dir"]) / f"T{int(window)}" if ctx["state_dir"] else None
+    run = _WindowRun.load(state_dir, **kwargs) if (state_dir is not None and ctx["resume"]) else _WindowRun(**kwargs)
+    run.run()
+    if state_dir is not None:
+        run.save(state_dir)
+    ts, snap, sec = run.frames()
+    return ts, snap, sec, {"resumed_rows": int(run.resumed_rows), "computed_rows": int(len(run.rows))}
 
 
 def _summary_block(ts: pd.DataFrame, sector_daily: pd.DataFrame, window: int, outdir: Path) -> str:
@@ -1112,6 +1270,11 @@ def _build_significance_tables(ts_map: dict[int, pd.DataFrame], outdir: Path) ->
             latest_z = float(latest_delta / sd) if (np.isfinite(latest_delta) and np.isfinite(sd) and sd > 1e-12) else float("nan")
             latest_p = _normal_two_sided_p(latest_z)
             sig_share = float((p[s.notna()] < 0.05).mean()) if n > 0 else float("nan")
+            # Per-date p-values against the null replicates themselves (p1 only).
+            rep_p = None
+            if col == "delta_p1_vs_bootstrap" and "p1_pvalue_bootstrap" in d.columns:
+                rep_p = pd.to_numeric(d["p1_pvalue_bootstrap"], errors="coerce")
+            rep_share = float((rep_p.dropna() < 0.05).mean()) if (rep_p is not None and rep_p.notna().any()) else float("nan")
             summary_rows.append(
                 {
                     "window": int(w),
@@ -1120,6 +1283,7 @@ def _build_significance_tables(ts_map: dict[int, pd.DataFrame], outdir: Path) ->
                     "mean_delta": mu,
                     "std_delta": sd,
                     "significant_share_p_lt_0_05": sig_share,
+                    "replicate_significant_share_p_lt_0_05": rep_share,
                     "mean_z_vs_zero": mean_z,
                     "mean_pvalue_vs_zero": mean_p,
                     "latest_delta": latest_delta,
@@ -1130,6 +1294,8 @@ def _build_significance_tables(ts_map: dict[int, pd.DataFrame], outdir: Path) ->
             d[f"z_{col}"] = z
             d[f"p_{col}"] = p
             out_cols += [col, f"z_{col}", f"p_{col}"]
+            if rep_p is not None:
+                out_cols.append("p1_pvalue_bootstrap")
         d[out_cols].to_csv(outdir / f"significance_timeseries_T{int(w)}.csv", index=False)
     out = pd.DataFrame(summary_rows)
     if not out.empty:
@@ -2423,8 +2589,27 @@ def main() -> None:
         default=1,
         help="Keep only Monday-Friday rows before building windows.",
     )
-    ap.add_argument("--noise-step", type=int, default=5, help="Compute shuffle/bootstrap baseline every N days.")
+    ap.add_argument("--noise-step", type=int, default=1, help="Compute shuffle/bootstrap baseline every N days.")
+    ap.add_argument(
+        "--null-model",
+        type=str,
+        default="resample",
+        choices=list(NULL_MODELS),
+        help="resample: batched shuffle/block-bootstrap replicates; analytic: Marchenko-Pastur/Tracy-Widom closed form.",
+    )
+    ap.add_argument(
+        "--null-replicates",
+        type=int,
+        default=1,
+        help=f"Replicates per null and date; replicate p-values (and their significant share) are NaN below {MIN_PVALUE_REPLICATES}.",
+    )
     ap.add_argument("--bootstrap-block", type=int, default=10)
+    ap.add_argument(
+        "--cluster-tol",
+        type=float,
+        default=0.0,
+        help="Keep the last cluster assignment while no correlation moved more than this since it was computed (0 = exact).",
+    )
     ap.add_argument("--overlap-step", type=int, default=5, help="Compute eigvec overlap every N days.")
     ap.add_argument("--seed", type=int, default=123)
     ap.add_argument("--official-window", type=int, default=120)
@@ -2470,6 +2655,14 @@ def main() -> None:
     ap.add_argument("--apply-grid-best", type=int, default=0)
     ap.add_argument("--calibration-objective", type=str, default="composite", choices=["composite", "ann_over_dd", "sharpe"])
     ap.add_argument("--update-release-pointer", type=int, default=1)
+    ap.add_argument("--workers", type=int, default=1, help="Processes running the T=60/120/252 windows in parallel.")
+    ap.add_argument(
+        "--window-state-dir",
+        type=str,
+        default="",
+        help="Per-window checkpoints (default: <out-base>/_window_state; 'none' disables checkpointing).",
+    )
+    ap.add_argument("--resume", type=int, default=1, help="Resume windows from matching checkpoints and compute only new dates.")
     args = ap.parse_args()
 
     policy_path = Path(args.policy_path)
@@ -2607,21 +2800,45 @@ def main() -> None:
     ]
     for _, r in core_counts.sort_values("sector").iterrows():
         summary.append(f"  - {r['sector']}: {int(r['n_tickers'])}")
-    summary.append(f"scipy_enabled_for_clustering: {SCIPY_OK}")
+    summary.append(f"clustering_backend: {CLUSTERING_BACKEND}")
 
-    ts_map: dict[int, pd.DataFrame] = {}
-    for w in (60, 120, 252):
-        ts, snap, sec = _process_window(
-            returns_wide=R,
-            sector_by_ticker={t: sector_map.get(t, "unknown") for t in core},
-            window=w,
-            cov_window=float(args.coverage_window),
-            min_assets=int(args.min_assets),
-            noise_step=int(args.noise_step),
-            bootstrap_block=int(args.bootstrap_block),
-            overlap_step=int(args.overlap_step),
-            seed=int(args.seed),
+    window_params = {
+        "cov_window": float(args.coverage_window),
+        "min_assets": int(args.min_assets),
+        "noise_step": int(args.noise_step),
+        "bootstrap_block": int(args.bootstrap_block),
+        "overlap_step": int(args.overlap_step),
+        "seed": int(args.seed),
+        "null_model": str(args.null_model),
+        "null_replicates": int(args.null_replicates),
+        "cluster_tol": float(args.cluster_tol),
+    }
+    if str(args.window_state_dir).strip().lower() == "none":
+        window_state_dir = ""
+    else:
+        window_state_dir = str(Path(args.window_state_dir) if args.window_state_dir else out_base / "_window_state")
+    initargs = (R, {t: sector_map.get(t, "unknown") for t in core}, window_params, window_state_dir, bool(int(args.resume)))
+    if int(args.workers) > 1:
+        outcomes = run_tasks(
+            _window_task,
+            [(w,) for w in WINDOWS],
+            workers=int(args.workers),
+            initializer=_init_window_worker,
+            initargs=initargs,
         )
+        failed = [f"T{w}: {o.error}" for w, o in zip(WINDOWS, outcomes) if not o.ok]
+        if failed:
+            raise SystemExit("window runs failed:\n" + "\n".join(failed))
+        window_results = [o.value for o in outcomes]
+    else:
+        _init_window_worker(*initargs)
+        window_results = [_window_task(w) for w in WINDOWS]
+    summary.append(f"window_state_dir: {window_state_dir or 'disabled'}")
+    for w, (_, _, _, info) in zip(WINDOWS, window_results):
+        summary.append(f"  - T{w}: resumed_rows={info['resumed_rows']}, computed_rows={info['computed_rows']}")
+
+    ts_map: dict[int, pd.DataFrame] = {}
+    for w, (ts, snap, sec, _) in zip(WINDOWS, window_results):
         ts_map[w] = ts.copy()
         cols = [
             "date",
@@ -2649,6 +2866,8 @@ def main() -> None:
             "p1_bootstrap",
             "deff_bootstrap",
             "structure_score_bootstrap",
+            "p1_pvalue_shuffle",
+            "p1_pvalue_bootstrap",
             "eigvec_overlap_1d",
             "eigvec_instability_1d",
             "insufficient_universe",
@@ -3010,7 +3229,7 @@ def main() -> None:
         "policy_loaded": bool(policy),
         "deployment_gate": gate,
         "policy_lock": policy_lock,
-        "checks": {"qa_ok": bool(qa["ok"]), "scipy_clustering": bool(SCIPY_OK)},
+        "checks": {"qa_ok": bool(qa["ok"]), "clustering_backend": CLUSTERING_BACKEND},
         "scores": {
             "joint_majority_60d": float(robust_metrics.get("joint_majority_60d", np.nan)),
             "latest_joint_majority_5": float(robust_metrics.get("latest_joint_majority_5", np.nan)),
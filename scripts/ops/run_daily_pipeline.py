@@ -33,12 +33,15 @@ def main() -> None:
     parser.add_argument("--auto-embed", action="store_true")
     parser.add_argument("--tau-method", default="ami", choices=["ami", "acf"])
     parser.add_argument("--m-method", default="cao", choices=["cao", "fnn"])
+    parser.add_argument("--refresh-prices", action="store_true", help="Fetch missing daily bars into the price store first")
     args = parser.parse_args()
 
     if args.fred_key:
         run(["python3", "scripts/data/fetch_finance.py", "--fred-key", args.fred_key])
     run(["python3", "scripts/data/fetch_logistics.py"])
     run(["python3", "scripts/data/fetch_realestate.py"])
+    if args.refresh_prices:
+        run(["python3", "scripts/data/fetch_prices.py"] + (["--tickers", args.tickers] if args.tickers else []))
 
     tickers = args.tickers
     if not tickers:
@@ -9,7 +9,8 @@ import numpy as np
 import pandas as pd
 
 from engine.graph.embedding import takens_embed
-from engine.graph.diagnostics import _rqa_metrics, estimate_tau_adaptive, estimate_embedding_dim
+from engine.graph.diagnostics import estimate_tau_adaptive, estimate_embedding_dim
+from engine.graph.rqa import rqa_metrics, windowed_rqa
 
 
 def _load_series(path: Path) -> pd.Series:
@@ -25,6 +26,9 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="RQA metrics (realestate).")
     parser.add_argument("--input-dir", default="data/realestate/normalized")
     parser.add_argument("--outdir", default="results/realestate/rqa")
+    parser.add_argument("--max-points", type=int, default=600, help="RQA point budget per asset (0 = all points)")
+    parser.add_argument("--window", type=int, default=0, help="Also compute windowed RQA over this many points")
+    parser.add_argument("--step", type=int, default=1)
     args = parser.parse_args()
 
     outdir = Path(args.outdir)
@@ -38,7 +42,7 @@ def main() -> None:
         emb_dim = estimate_embedding_dim(values, tau=tau, max_dim=min(10, max(3, len(values) // 10)))
         m = emb_dim["m_opt"]
         emb = takens_embed(values, m=m, tau=tau)
-        rqa = _rqa_metrics(emb)
+        rqa = rqa_metrics(emb, max_points=args.max_points or None)
         out = {
             "asset": csv.stem.upper(),
             "tau": tau,
@@ -47,6 +51,12 @@ def main() -> None:
             "cao": emb_dim,
             "rqa": rqa,
         }
+        if args.window > 0 and emb.shape[0] >= args.window:
+            ends, rolling = windowed_rqa(emb, window=args.window, step=args.step, eps=rqa["eps"])
+            out["rqa_windowed"] = {
+                "dates": [str(d.date()) for d in series.index[ends - 1 + (m - 1) * tau]],
+                **{k: v.tolist() for k, v in rolling.items()},
+            }
         dest = outdir / f"{csv.stem.upper()}_rqa.json"
         dest.write_text(json.dumps(out, indent=2))
         summary[csv.stem.upper()] = out
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics import corr_clusters
+from engine.diagnostics.corr_clusters import (
+    CLUSTERING_BACKEND,
+    ClusterTracker,
+    _nn_chain_labels,
+    average_linkage_labels,
+    corr_distance,
+    pair_turnover,
+)
+
+
+def _block_corr(seed: int, n: int, k: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    groups = rng.integers(0, k, n)
+    x = rng.uniform(0.3, 1.5) * rng.standard_normal((300, k))[:, groups] + rng.standard_normal((300, n))
+    return np.corrcoef(x, rowvar=False)
+
+
+def _same_partition(a: np.ndarray, b: np.ndarray) -> bool:
+    return len(set(zip(a.tolist(), b.tolist()))) == len(set(a.tolist())) == len(set(b.tolist()))
+
+
+def test_numpy_fallback_matches_scipy_cut():
+    pytest.importorskip("scipy")
+    for seed, (n, k) in enumerate([(5, 2), (40, 3), (120, 8), (200, 1)]):
+        c = _block_corr(seed, n, k)
+        assert _same_partition(average_linkage_labels(c), _nn_chain_labels(corr_distance(c), 1.0))
+
+
+def test_backend_flag_names_the_linkage_in_use(monkeypatch):
+    groups = np.arange(25) % 2
+    c = np.where(groups[:, None] == groups[None, :], 0.8, 0.0)
+    np.fill_diagonal(c, 1.0)
+    assert CLUSTERING_BACKEND == ("scipy" if corr_clusters.linkage is not None else "numpy")
+    monkeypatch.setattr(corr_clusters, "linkage", None)  # what machines without scipy run
+    out = ClusterTracker(n_ids=25).update(c, ids=np.arange(25))
+    assert out.count == 2 and _same_partition(out.labels, groups)
+
+
+def test_pair_turnover_counts_changed_pairs():
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        a, b = rng.integers(0, 5, 40), rng.integers(0, 4, 40)  # 0 = not clustered that day
+        both = (a > 0) & (b > 0)
+        x, y = a[both], b[both]
+        iu = np.triu_indices(x.size, k=1)
+        ref = np.mean((x[:, None] == x[None, :])[iu] != (y[:, None] == y[None, :])[iu])
+        assert pair_turnover(a, b) == pytest.approx(ref, abs=1e-15)
+    assert np.isnan(pair_turnover(np.array([1, 0, 2]), np.array([0, 1, 1])))
+
+
+def test_tracker_labels_on_fixed_index_and_reuse_within_tol():
+    c = _block_corr(7, 30, 3)
+    ids = np.arange(2, 32)
+    tracker = ClusterTracker(n_ids=40, tol=0.02)
+    first = tracker.update(c, ids=ids)
+    assert first.labels.shape == (40,) and np.all(first.labels[:2] == 0) and np.all(first.labels[ids] > 0)
+    assert not first.reused
+    nudged = c + 0.01 * np.sign(np.random.default_rng(1).standard_normal(c.shape))
+    again = tracker.update(nudged, ids=ids)
+    assert again.reused and np.array_equal(again.labels, first.labels)
+    # Drift is measured against the clustered matrix, so a second nudge forces a recluster.
+    assert not tracker.update(nudged + 0.015, ids=ids).reused
+    assert not tracker.update(c[1:, 1:], ids=ids[1:]).reused
+    restored = ClusterTracker(n_ids=40, tol=0.02).restore(tracker.state())
+    assert restored.update(c[1:, 1:], ids=ids[1:]).reused
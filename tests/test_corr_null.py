@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.corr_null import (
+    analytic_null,
+    block_bootstrap_batch,
+    null_spectrum,
+    replicate_rngs,
+    shuffle_batch,
+    tracy_widom_pvalue,
+)
+
+
+def _returns(n: int, k: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 0.01 * (0.7 * rng.standard_normal((n, 1)) + rng.standard_normal((n, k)))
+
+
+def test_null_spectrum_matches_corrcoef_on_both_gram_sides():
+    for n, k in ((40, 90), (150, 30)):
+        xs = shuffle_batch(_returns(n, k), replicate_rngs(11, 3))
+        xs[2, :, 4] = 0.5  # a constant column is dropped from that replicate only
+        spec = null_spectrum(xs)
+        for r in range(3):
+            x = xs[r][:, np.std(xs[r], axis=0) > 1e-12]
+            eig = np.linalg.eigvalsh(np.corrcoef(x, rowvar=False))
+            assert abs(spec["lambda1"][r] - eig[-1]) < 1e-10
+            assert abs(spec["trace"][r] - eig.sum()) < 1e-10
+            assert abs(spec["frob2"][r] - np.sum(eig**2)) < 1e-8
+
+
+def test_replicate_streams_do_not_depend_on_replicate_count():
+    x = _returns(60, 12)
+    few = block_bootstrap_batch(x, 10, replicate_rngs((1, 120, 7), 2))
+    many = block_bootstrap_batch(x, 10, replicate_rngs((1, 120, 7), 9))
+    np.testing.assert_array_equal(few, many[:2])
+    assert not np.array_equal(many[0], many[1])
+
+
+def test_resampled_columns_keep_their_values():
+    x = _returns(50, 6)
+    shuffled = shuffle_batch(x, replicate_rngs(3, 4))
+    for r in range(4):
+        np.testing.assert_array_equal(np.sort(shuffled[r], axis=0), np.sort(x, axis=0))
+    boot = block_bootstrap_batch(x, 10, replicate_rngs(3, 1))[0]
+    for j in range(6):
+        # Every length-10 block of the output is a contiguous run of the source column.
+        for lo in range(0, 50, 10):
+            seg = boot[lo : lo + 10, j]
+            start = int(np.flatnonzero(x[:, j] == seg[0])[0])
+            np.testing.assert_array_equal(x[start : start + seg.size, j], seg)
+
+
+def test_analytic_null_tracks_shuffled_replicates():
+    n, k = 120, 200
+    rng = np.random.default_rng(5)
+    spec = null_spectrum(shuffle_batch(rng.standard_normal((n, k)), replicate_rngs(5, 40)))
+    ref = analytic_null(n, k)
+    assert abs(np.mean(spec["trace"] ** 2 / spec["frob2"]) - ref["deff"]) / ref["deff"] < 0.01
+    assert abs(np.mean(spec["lambda1"]) - ref["lambda1"]) / ref["lambda1"] < 0.05
+    p_edge = tracy_widom_pvalue(ref["lambda_plus"], n, k)
+    assert 0.0 < tracy_widom_pvalue(ref["lambda_plus"] * 1.2, n, k) < p_edge < tracy_widom_pvalue(ref["lambda1"] * 0.9, n, k) <= 1.0
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.corr_spectrum import SpectrumTracker, dense_spectrum, vector_overlap
+from engine.diagnostics.rolling_corr import RollingCorrelation
+
+
+def _sector_panel(seed: int = 0, n_days: int = 260, n_assets: int = 150) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sectors = rng.integers(0, 8, n_assets)
+    market = rng.standard_normal((n_days, 1))
+    sector_f = rng.standard_normal((n_days, 8))
+    x = 0.01 * (0.8 * market + 0.6 * sector_f[:, sectors] + rng.standard_normal((n_days, n_assets)))
+    x[:150, 7] = np.nan  # joins mid-sample
+    x[200:, 11] = np.nan  # drops out
+    return x
+
+
+def test_deff_from_trace_and_frobenius_matches_full_spectrum():
+    x = _sector_panel()[:200]
+    c = np.corrcoef(x[:, np.isfinite(x).all(axis=0)], rowvar=False)
+    eig = np.linalg.eigvalsh(c)
+    p = eig / eig.sum()
+    spec = dense_spectrum(c, 10)
+    assert abs(spec.deff - 1.0 / np.sum(p * p)) < 1e-9
+    assert abs(spec.p1 - p.max()) < 1e-12
+
+
+def test_tracker_follows_dense_eigh_through_universe_changes():
+    x = _sector_panel()
+    roll = RollingCorrelation(x, window=60, min_coverage=0.98)
+    tracker = SpectrumTracker(k=10, dense_below=40)
+    iterations = []
+    for end in range(59, x.shape[0]):
+        cols = roll.update(end).columns
+        c = roll.corr(cols)
+        spec = tracker.update(c, ids=cols)
+        ref = dense_spectrum(c, 10)
+        iterations.append(spec.iterations)
+        np.testing.assert_allclose(spec.values, ref.values, rtol=0, atol=1e-8 * ref.values[0])
+        assert abs(spec.deff - ref.deff) < 1e-10
+        assert abs(abs(float(spec.v1 @ ref.v1)) - 1.0) < 1e-10
+    assert iterations[0] == 0  # cold start is dense
+    assert max(iterations[1:]) > 0  # later dates are tracked
+
+
+def test_vector_overlap_uses_common_ids_only():
+    a = np.array([0.6, 0.8, 0.0])
+    b = np.array([-0.8, -0.6, 5.0])
+    assert abs(vector_overlap(np.array([1, 2, 3]), a, np.array([2, 1, 9]), b, min_common=2) - 1.0) < 1e-12
+    assert np.isnan(vector_overlap(np.array([1, 2, 3]), a, np.array([2, 1, 9]), b, min_common=3))
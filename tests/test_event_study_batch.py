@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.event_study import evaluate_alert_matrix, random_alert_metrics, sample_alert_masks
+
+
+def _reference(alert: np.ndarray, event_idx: list[int], lookback: int, horizon: int) -> dict[str, float]:
+    """Per-mask loop the batch evaluator replaces."""
+    detected, coincident, leads = 0, 0, []
+    for e in event_idx:
+        lo, hi = max(0, e - lookback), e - 1
+        if hi >= lo and alert[lo : hi + 1].any():
+            detected += 1
+            leads.append(e - (lo + int(np.argmax(alert[lo : hi + 1]))))
+        if alert[e : min(len(alert) - 1, e + 2) + 1].any():
+            coincident += 1
+    good = lambda a: any(a + 1 <= ev <= a + horizon for ev in event_idx)  # noqa: E731
+    starts = np.flatnonzero(alert & ~np.r_[False, alert[:-1]])
+    days = np.flatnonzero(alert)
+    n_false = len(starts) - sum(good(a) for a in starts)
+    return {
+        "recall": detected / len(event_idx) if event_idx else np.nan,
+        "precision": (len(starts) - n_false) / len(starts) if len(starts) else np.nan,
+        "false_alarm_per_year": n_false / max(1e-9, len(alert) / 252.0),
+        "mean_lead_days": float(np.mean(leads)) if leads else np.nan,
+        "coincident_rate": coincident / len(event_idx) if event_idx else np.nan,
+        "n_alert_days": len(days),
+        "n_false_alert_days": len(days) - sum(good(a) for a in days),
+        "n_alert_episodes": len(starts),
+    }
+
+
+def test_batch_metrics_match_per_mask_loop() -> None:
+    rng = np.random.default_rng(3)
+    for _ in range(60):
+        n = int(rng.integers(1, 200))
+        alerts = rng.random((7, n)) < rng.uniform(0.0, 0.3)
+        events = sorted(rng.integers(0, n, size=int(rng.integers(0, 6))).tolist())
+        lookback, horizon = int(rng.choice([0, 1, 5, 20])), int(rng.choice([1, 20]))
+        got = evaluate_alert_matrix(alerts, np.array(events), lookback, assoc_horizon_days=horizon)
+        for row in range(alerts.shape[0]):
+            for key, value in _reference(alerts[row], events, lookback, horizon).items():
+                np.testing.assert_allclose(got[key][row], value, err_msg=key)
+
+
+def test_random_masks_have_requested_size_and_shape() -> None:
+    rng = np.random.default_rng(5)
+    iid = sample_alert_masks(500, 37, 64, rng, method="iid")
+    assert iid.shape == (64, 500) and (iid.sum(axis=1) == 37).all()
+    block = sample_alert_masks(500, 37, 64, rng, method="block", block_size=10)
+    assert (block.sum(axis=1) <= 37).all() and (block.sum(axis=1) > 10).all()
+    # Blocks leave few, long runs: far fewer episodes than alert days.
+    runs = (block & ~np.pad(block, ((0, 0), (1, 0)))[:, :-1]).sum(axis=1)
+    assert runs.mean() < 15
+    assert not sample_alert_masks(10, 0, 3, rng).any()
+    metrics = random_alert_metrics(300, 20, np.array([50, 150, 250]), 10, n_masks=70, rng=rng, chunk=32)
+    assert all(v.shape == (70,) for v in metrics.values())
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import os
+import sys
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph import cache as cache_mod
+from engine.graph.cache import ResultCache, cache_key, cached_compute_diagnostics, cached_run_graph_engine
+from engine.graph.core import GraphResult
+from engine.graph.sparse_backend import SmoothedTransitionMatrix
+
+
+def _series(n: int = 500, seed: int = 11) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, size=n)))
+
+
+def _params(**overrides) -> dict:
+    params = dict(m=3, tau=1, n_micro=30, n_regimes=3, k_nn=5, theiler=5, seed=7)
+    params.update(overrides)
+    return params
+
+
+def test_graph_result_round_trip_is_exact(tmp_path: Path) -> None:
+    x = _series()
+    store = ResultCache(tmp_path)
+    fresh = cached_run_graph_engine(x, store, **_params())
+    hit = cached_run_graph_engine(x, store, **_params())
+    assert store.stats.as_dict() == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+    for f in fields(GraphResult):
+        a, b = getattr(fresh, f.name), getattr(hit, f.name)
+        if isinstance(a, np.ndarray):
+            assert a.dtype == b.dtype and np.array_equal(a, b), f.name
+        else:
+            assert a == b, f.name
+
+
+def test_sparse_p_matrix_round_trip(tmp_path: Path) -> None:
+    x = _series()
+    store = ResultCache(tmp_path)
+    fresh = cached_run_graph_engine(x, store, **_params(transition_backend="sparse"))
+    hit = cached_run_graph_engine(x, store, **_params(transition_backend="sparse"))
+    assert isinstance(hit.p_matrix, SmoothedTransitionMatrix)
+    assert np.array_equal(fresh.p_matrix.toarray(), hit.p_matrix.toarray())
+
+
+def test_key_changes_with_params_series_and_version(monkeypatch) -> None:
+    x = _series()
+    base = cache_key("run_graph_engine", x, _params())
+    assert base == cache_key("run_graph_engine", x.copy(), dict(reversed(list(_params().items()))))
+    assert base != cache_key("run_graph_engine", x, _params(n_regimes=4))
+    y = x.copy()
+    y[-1] += 1e-9
+    assert base != cache_key("run_graph_engine", y, _params())
+    assert base != cache_key("compute_diagnostics", x, _params())
+    monkeypatch.setattr(cache_mod, "ENGINE_VERSION", "other")
+    assert base != cache_key("run_graph_engine", x, _params())
+
+
+def test_diagnostics_cached_and_lru_eviction(tmp_path: Path) -> None:
+    x = _series(400)
+    store = ResultCache(tmp_path)
+    diag = cached_compute_diagnostics(x, store, m=3, tau=1, theiler=5)
+    again = cached_compute_diagnostics(x, store, m=3, tau=1, theiler=5)
+    assert store.stats.hits == 1
+    assert again["status"] == diag["status"]
+    assert again["cpd"] == diag["cpd"]
+
+    oldest = next(tmp_path.glob("*/*.npz"))
+    os.utime(oldest, (1.0, 1.0))
+    store.max_bytes = store.size_bytes()
+    cached_run_graph_engine(x, store, **_params())
+    assert not oldest.exists()
+    assert store.stats.evictions == 1
+    assert store.get_graph(cache_key("run_graph_engine", x, _params())) is not None
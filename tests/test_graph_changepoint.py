@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.changepoint import SegmentCost, pelt, top_splits
+from engine.graph.diagnostics import _detect_change_points, compute_diagnostics
+
+
+def _steps(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.normal(loc, scale, size=size) for loc, scale, size in [(0, 1, 90), (4, 1, 70), (4, 3, 80), (-2, 0.5, 60)]])
+
+
+def _slice_scores(data: np.ndarray, min_size: int) -> list[int]:
+    scores = []
+    for i in range(min_size, len(data) - min_size):
+        pre, post = data[i - min_size : i], data[i : i + min_size]
+        scores.append((i, abs(np.mean(post) - np.mean(pre)) + abs(np.var(post) - np.var(pre))))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    bkpts: list[int] = []
+    for idx, _ in scores[:5]:
+        if all(abs(idx - b) > min_size for b in bkpts):
+            bkpts.append(idx)
+    return sorted(bkpts)
+
+
+def _optimal_partition(cost: SegmentCost, pen: float, min_size: int, jump: int) -> list[int]:
+    n = cost.n
+    grid = [k for k in range(0, n, jump) if k >= min_size] + [n]
+    best, prev = {0: 0.0}, {}
+    for end in grid:
+        cands = [t for t in best if end - t >= min_size]
+        totals = [best[t] + float(cost.error(t, end)) + pen for t in cands]
+        if cands:
+            k = int(np.argmin(totals))
+            best[end], prev[end] = totals[k], cands[k]
+    out, t = [], n
+    while t > 0:
+        out.append(t)
+        t = prev[t]
+    return sorted(out)
+
+
+def test_fallback_scorer_matches_slice_loop() -> None:
+    for seed in range(3):
+        data = _steps(seed)
+        for min_size in (15, 40):
+            assert top_splits(data, min_size) == _slice_scores(data, min_size)
+
+
+def test_pelt_matches_exhaustive_partition() -> None:
+    data = _steps(4)
+    for model in ("l2", "normal"):
+        cost = SegmentCost(data, model=model)
+        for jump in (1, 5):
+            got = pelt(cost, pen=2.0 * np.log(data.size), min_size=10, jump=jump)
+            assert got == _optimal_partition(cost, 2.0 * np.log(data.size), 10, jump)
+            assert got[-1] == data.size
+    found = pelt(SegmentCost(data, model="normal"), pen=2.0 * np.log(data.size), min_size=20, jump=1)
+    assert len(found) == 4 and np.abs(np.array(found[:3]) - [90, 160, 240]).max() <= 2
+
+
+def test_suffix_runs_reuse_full_series_costs() -> None:
+    data = np.cumsum(_steps(7))
+    for model in ("l2", "normal"):
+        cost = SegmentCost(data, model=model)
+        reused = _detect_change_points(data[-150:], 25, model=model, jump=5, cost=cost, offset=data.size - 150)
+        alone = _detect_change_points(data[-150:], 25, model=model, jump=5)
+        assert reused == alone
+    diag = compute_diagnostics(100.0 + data, m=3, tau=1, theiler=5, cpd_model="normal", cpd_jump=5)
+    assert set(diag["cpd"]) == {"returns", "price", "recent", "cpd_last_offset"}
+    assert set(diag["cpd"]["price"]) == {"cpd_indices", "cpd_last_offset", "cpd_score"}
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.diagnostics import compute_diagnostics, estimate_lle_rosenstein
+from engine.graph.embedding import takens_embed
+
+
+def _logistic(n: int, r: float = 3.9, x0: float = 0.4) -> np.ndarray:
+    out = np.empty(n)
+    x = x0
+    for i in range(n):
+        x = r * x * (1.0 - x)
+        out[i] = x
+    return out
+
+
+def _reference_lle(embedded: np.ndarray, theiler: int, max_t: int) -> tuple[float, float]:
+    from sklearn.neighbors import NearestNeighbors
+
+    n = embedded.shape[0]
+    _, indices = NearestNeighbors(n_neighbors=10).fit(embedded).kneighbors(embedded)
+    pairs = []
+    for i in range(n):
+        for c in indices[i, 1:]:
+            if abs(int(c) - i) > theiler:
+                pairs.append((i, int(c)))
+                break
+    max_t = min(max_t, n - 1)
+    div = np.zeros(max_t)
+    counts = np.zeros(max_t)
+    for i, j in pairs:
+        for k in range(1, min(max_t, n - max(i, j) - 1)):
+            d0 = np.linalg.norm(embedded[i] - embedded[j]) + 1e-12
+            d1 = np.linalg.norm(embedded[i + k] - embedded[j + k]) + 1e-12
+            div[k] += np.log(d1 / d0)
+            counts[k] += 1
+    y = div[counts > 0] / counts[counts > 0]
+    lle = float(np.polyfit(np.arange(10), y[:10], 1)[0])
+    h = min(5, max_t - 1)
+    ftle = [
+        np.log((np.linalg.norm(embedded[i + h] - embedded[j + h]) + 1e-12) / (np.linalg.norm(embedded[i] - embedded[j]) + 1e-12)) / h
+        for i, j in pairs
+        if i + h < n and j + h < n
+    ]
+    return lle, float(np.mean(ftle))
+
+
+def test_vectorized_rosenstein_matches_pair_loop() -> None:
+    emb = takens_embed(_logistic(700), m=3, tau=1)
+    lle_ref, ftle_ref = _reference_lle(emb, theiler=5, max_t=20)
+    out = estimate_lle_rosenstein(emb, theiler=5, max_t=20)
+    assert set(out) == {"lle", "ftle_recent"}
+    np.testing.assert_allclose(out["lle"], lle_ref, rtol=1e-12)
+    np.testing.assert_allclose(out["ftle_recent"], ftle_ref, rtol=1e-12)
+    assert out["lle"] > 0.2
+
+
+def test_rolling_ftle_series_averages_trailing_pairs() -> None:
+    emb = takens_embed(_logistic(500), m=3, tau=1)
+    full = estimate_lle_rosenstein(emb, theiler=5, max_t=20, ftle_window=emb.shape[0])
+    series = full["ftle_series"]
+    assert series.shape == (emb.shape[0],)
+    np.testing.assert_allclose(series[-1], full["ftle_recent"], rtol=1e-12)
+    rolling = estimate_lle_rosenstein(emb, theiler=5, max_t=20, ftle_window=40)["ftle_series"]
+    # Nothing is known before the first pair's 5-step horizon ends.
+    assert np.isnan(rolling[:5]).all() and np.isfinite(rolling[-1])
+
+
+def test_compute_diagnostics_lle_cap_is_opt_in() -> None:
+    series = 10.0 + np.cumsum(np.random.default_rng(1).normal(size=1500))
+    base = compute_diagnostics(series, m=3, tau=1, theiler=5)
+    again = compute_diagnostics(series, m=3, tau=1, theiler=5, lle_max_points=800)
+    full = compute_diagnostics(series, m=3, tau=1, theiler=5, lle_max_points=0)
+    assert base["lle"] == again["lle"]
+    assert np.isfinite(full["lle"]) and full["rqa_det"] == base["rqa_det"]
+
+
+def test_compute_diagnostics_emits_rolling_ftle_per_window() -> None:
+    from sklearn.neighbors import NearestNeighbors
+
+    values = _logistic(600)
+    window, theiler, h = 50, 5, 5
+    out = compute_diagnostics(values, m=3, tau=2, theiler=theiler, lle_max_points=0, ftle_window=window)
+    assert "ftle_series" not in compute_diagnostics(values, m=3, tau=2, theiler=theiler)
+    series = np.asarray(out["ftle_series"], dtype=float)
+    assert series.shape == values.shape and np.isnan(series[:4]).all()
+
+    emb = takens_embed(values, m=3, tau=2)
+    n = emb.shape[0]
+    _, indices = NearestNeighbors(n_neighbors=10).fit(emb).kneighbors(emb)
+    ends, ftle = [], []
+    for i in range(n):
+        j = next((int(c) for c in indices[i, 1:] if abs(int(c) - i) > theiler), None)
+        if j is not None and max(i, j) + h < n:
+            ends.append(max(i, j) + h)
+            ftle.append(np.log((np.linalg.norm(emb[i + h] - emb[j + h]) + 1e-12) / (np.linalg.norm(emb[i] - emb[j]) + 1e-12)) / h)
+    ends, ftle = np.array(ends), np.array(ftle)
+    for r in range(0, n, 7):
+        inside = (ends > r - window) & (ends <= r)
+        expected = ftle[inside].mean() if inside.any() else np.nan
+        np.testing.assert_allclose(series[4 + r], expected, rtol=1e-10)
@@ -8,7 +8,18 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
-from engine.graph.embedding import select_tau, takens_embed
+from engine.graph.embedding import (
+    ami_curve,
+    delay_embedding,
+    rolling_ami,
+    rolling_tau,
+    scan_embedding_dims,
+    select_m,
+    select_tau,
+    takens_embed,
+)
+from engine.features.phase_features import embed as phase_embed
+from engine.models.takens_knn import embed as knn_embed
 
 
 def test_takens_embed_shape_and_order() -> None:
@@ -40,3 +51,110 @@ def test_select_tau_respects_max_tau_cap() -> None:
     series = np.sin(x) + 0.1 * np.cos(3 * x)
     tau = select_tau(series, max_lag=20, max_tau=2, method="ami")
     assert 1 <= tau <= 2
+
+
+def _column_stack_embed(values: np.ndarray, m: int, tau: int) -> np.ndarray:
+    n = values.size - (m - 1) * tau
+    return np.column_stack([values[(m - 1 - lag) * tau : (m - 1 - lag) * tau + n] for lag in range(m)])
+
+
+def test_delay_embedding_view_matches_column_stack() -> None:
+    series = np.random.default_rng(3).normal(size=97)
+    for m in (1, 2, 4):
+        for tau in (1, 3):
+            expected = _column_stack_embed(series, m, tau)
+            view = delay_embedding(series, m=m, tau=tau)
+            assert np.shares_memory(view, series) and not view.flags.writeable
+            assert np.array_equal(view, expected)
+            out = takens_embed(series, m=m, tau=tau)
+            assert out.flags.c_contiguous and np.array_equal(out, expected)
+            f32 = takens_embed(series, m=m, tau=tau, dtype="float32")
+            assert f32.dtype == np.float32 and np.array_equal(f32, expected.astype(np.float32))
+
+
+def test_model_embed_helpers_use_delay_view() -> None:
+    series = np.arange(12, dtype=float)
+    X, y, idx = knn_embed(series, tau=2, m=3)
+    assert np.array_equal(X, _column_stack_embed(series[:-1], 3, 2))
+    assert np.array_equal(y, series[5:]) and np.array_equal(idx, np.arange(5, 12))
+    Xp, idx_p = phase_embed(series, tau=2, m=3)
+    assert np.array_equal(Xp, _column_stack_embed(series, 3, 2)) and np.array_equal(idx_p, np.arange(4, 12))
+    assert knn_embed(series[:5], tau=2, m=3) == (None, None, None)
+    assert phase_embed(series[:4], tau=2, m=3) == (None, None)
+
+
+def _reference_dim_curves(series: np.ndarray, tau: int, max_m: int) -> tuple[list, list, list]:
+    from sklearn.neighbors import NearestNeighbors
+
+    std = float(np.std(series))
+    e1, e2, fnn = [], [], []
+    for m in range(1, max_m):
+        emb_m1 = takens_embed(series, m=m + 1, tau=tau)
+        emb_m = takens_embed(series, m=m, tau=tau)[: emb_m1.shape[0]]
+        dist, idx = NearestNeighbors(n_neighbors=2).fit(emb_m).kneighbors(emb_m)
+        nbr, d_m = idx[:, 1], dist[:, 1]
+        d_m1 = np.linalg.norm(emb_m1 - emb_m1[nbr], axis=1)
+        added = np.abs(emb_m1[:, -1] - emb_m1[nbr, -1])
+        prev = np.abs(emb_m[:, -1] - emb_m[nbr, -1])
+        e1.append(np.mean((d_m1 + 1e-12) / (d_m + 1e-12)))
+        e2.append(np.mean((added + 1e-12) / (prev + 1e-12)))
+        fnn.append(np.mean((added / (d_m + 1e-12) > 10.0) | (d_m1 / std > 2.0)))
+    return e1, e2, fnn
+
+
+def test_scan_embedding_dims_matches_per_dimension_loop() -> None:
+    t = np.arange(900) * 0.07
+    series = np.sin(t) + 0.3 * np.sin(2.1 * t) + 0.05 * np.random.default_rng(2).normal(size=t.size)
+    for tau in (1, 3):
+        scan = scan_embedding_dims(series, tau=tau, max_m=7)
+        e1, e2, fnn = _reference_dim_curves(series, tau=tau, max_m=7)
+        assert scan["m"].tolist() == list(range(1, 7))
+        np.testing.assert_allclose(scan["e1"], e1, rtol=1e-10)
+        np.testing.assert_allclose(scan["e2"], e2, rtol=1e-10)
+        np.testing.assert_allclose(scan["fnn"], fnn)
+    first_ok = [m for m, f in zip(range(2, 7), fnn[1:]) if f <= 0.15]
+    assert select_m(series, tau=3, max_m=6, method="fnn") == (first_ok[0] if first_ok else 6)
+
+
+def _histogram2d_ami(values: np.ndarray, max_lag: int, edges: np.ndarray) -> np.ndarray:
+    out = np.zeros(max_lag)
+    for lag in range(1, max_lag + 1):
+        hist2d, _, _ = np.histogram2d(values[:-lag], values[lag:], bins=[edges, edges])
+        pxy = hist2d / max(hist2d.sum(), 1.0)
+        px = pxy.sum(axis=1, keepdims=True)
+        py = pxy.sum(axis=0, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[lag - 1] = np.nansum(pxy * np.log(pxy / (px @ py + 1e-12) + 1e-12))
+    return out
+
+
+def test_ami_curve_matches_histogram2d_loop() -> None:
+    rng = np.random.default_rng(4)
+    series = np.round(np.cumsum(rng.normal(size=600)) * 0.1, 1)
+    edges = np.linspace(series.min(), series.max(), 17)
+    assert np.array_equal(ami_curve(series, 12, edges), _histogram2d_ami(series, 12, edges))
+    quantile_edges = np.unique(np.quantile(series, np.linspace(0, 1, 9)))
+    assert np.allclose(ami_curve(series, 5, quantile_edges), _histogram2d_ami(series, 5, quantile_edges), atol=1e-15)
+
+
+def test_rolling_ami_matches_per_window_histograms() -> None:
+    t = np.arange(500) * 0.2
+    series = np.sin(t) + 0.2 * np.random.default_rng(8).normal(size=t.size)
+    series[123] = np.nan
+    edges = np.linspace(np.nanmin(series), np.nanmax(series), 17)
+    ends, scores = rolling_ami(series, window=120, max_lag=8, step=7, edges=edges)
+    assert ends[0] == 120 and ends[-1] <= series.size and np.all(np.diff(ends) == 7)
+    for end, row in zip(ends, scores):
+        chunk = series[end - 120 : end]
+        expected = np.zeros(8)
+        for lag in range(1, 9):
+            x, y = chunk[:-lag], chunk[lag:]
+            ok = np.isfinite(x) & np.isfinite(y)
+            hist2d, _, _ = np.histogram2d(x[ok], y[ok], bins=[edges, edges])
+            pxy = hist2d / max(hist2d.sum(), 1.0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ratio = pxy / (pxy.sum(axis=1, keepdims=True) @ pxy.sum(axis=0, keepdims=True) + 1e-12)
+                expected[lag - 1] = np.nansum(pxy * np.log(ratio + 1e-12))
+        np.testing.assert_allclose(row, expected, atol=1e-12)
+    _, taus = rolling_tau(series, window=120, max_lag=8, step=7)
+    assert taus.shape == ends.shape and set(taus.tolist()) <= {1, 2, 3}
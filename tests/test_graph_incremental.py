@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.incremental import GraphEngineState, RefitPolicy
+from engine.graph.kernels import regime_row_mass
+from engine.graph.labels import labels_for_series
+
+
+def _series(n: int = 420) -> np.ndarray:
+    x = np.linspace(0, 30 * np.pi, n)
+    return np.sin(x) + 0.1 * np.random.default_rng(5).normal(size=n)
+
+
+def test_update_appends_bars_and_matches_full_thresholds() -> None:
+    series = _series()
+    state = GraphEngineState.fit(series[:-6], n_micro=12, n_regimes=3, k_nn=3, theiler=3, policy=RefitPolicy(max_bars=0))
+    n_before = len(state.micro_labels)
+    labels = state.update(series[-6:])
+
+    assert labels.shape == (6,)
+    assert set(labels.tolist()).issubset({"STABLE", "TRANSITION", "UNSTABLE", "NOISY"})
+    assert len(state.micro_labels) == n_before + 6
+    assert state.state_labels.shape == state.micro_labels.shape
+    assert state.counts.sum() == len(state.micro_labels) - 1
+    np.testing.assert_allclose(state.p_matrix.sum(axis=1), 1.0)
+    assert state.refit_count == 0
+
+    full_labels, full_thr = labels_for_series(
+        state.confidence,
+        state.stretch_mu,
+        state.stretch_frac_pos,
+        quality_score=state.quality["score"],
+    )
+    assert full_labels[-1] == labels[-1]
+    for key, value in full_thr.items():
+        assert np.isclose(state.thresholds[key], value)
+
+
+def test_staleness_policy_triggers_refit() -> None:
+    series = _series()
+    state = GraphEngineState.fit(series[:-4], n_micro=10, n_regimes=2, k_nn=3, theiler=3, policy=RefitPolicy(max_bars=3))
+    state.update(series[-4:-2])
+    assert state.refit_count == 0
+    state.update(series[-2:])
+    assert state.refit_count == 1
+    assert state.last_refit_reason == "stale"
+    assert state.bars_since_refit == 0
+    assert len(state.state_labels) == len(state.micro_labels)
+
+
+def test_state_save_load_roundtrip(tmp_path: Path) -> None:
+    series = _series()
+    state = GraphEngineState.fit(series[:-2], n_micro=10, n_regimes=2, k_nn=3, theiler=3)
+    state.update(series[-2:])
+    path = state.save(tmp_path / "SPY_daily.npz")
+
+    loaded = GraphEngineState.load(path)
+    np.testing.assert_array_equal(loaded.micro_labels, state.micro_labels)
+    np.testing.assert_allclose(loaded.p_matrix, state.p_matrix)
+    np.testing.assert_allclose(loaded.confidence, state.confidence)
+    assert loaded.state_labels.tolist() == state.state_labels.tolist()
+    assert loaded.params == state.params
+
+    result = loaded.to_result()
+    assert result.embedding.shape[0] == len(result.state_labels)
+    assert result.multilayer is None
+
+
+def test_sparse_backend_state_matches_dense_and_roundtrips(tmp_path: Path) -> None:
+    series = _series()
+    kw = dict(n_micro=12, n_regimes=3, k_nn=3, theiler=3, policy=RefitPolicy(max_bars=0))
+    dense = GraphEngineState.fit(series[:-5], **kw)
+    lazy = GraphEngineState.fit(series[:-5], transition_backend="sparse", **kw)
+    dense.update(series[-5:])
+    lazy.update(series[-5:])
+    np.testing.assert_allclose(lazy.p_matrix.toarray(), dense.p_matrix)
+    # Regimes come from the sparse eigensolver; the row masses must follow them exactly.
+    np.testing.assert_allclose(lazy.confidence, regime_row_mass(lazy.p_matrix.toarray(), lazy.micro_regime)[lazy.micro_labels])
+
+    loaded = GraphEngineState.load(lazy.save(tmp_path / "SPY_daily.npz"))
+    np.testing.assert_allclose(loaded.to_result().p_matrix.toarray(), dense.p_matrix)
+    assert loaded.params["transition_backend"] == "sparse"
+
+
+def test_runner_reuses_state_while_series_grows(tmp_path: Path) -> None:
+    from scripts.bench.run_graph_regime_universe import _run_graph_incremental
+
+    series = _series()
+    kw = dict(m=3, tau=1, micro_method="kmeans", micro_params=None, n_regimes=3, theiler=3, alpha=2.0, seed=7, method="spectral")
+    sizing = {"n_micro": 200, "k_nn": 5, "mode": "light"}
+    _, params = _run_graph_incremental(tmp_path, "SPY", "daily", series[:-16], sizing, n_micro=50, k_nn=5, **kw)
+    # A longer series would size n_micro differently; the stored state keeps its fit-time value.
+    _, later = _run_graph_incremental(tmp_path, "SPY", "daily", series, sizing, n_micro=52, k_nn=5, **kw)
+    state = GraphEngineState.load(tmp_path / "SPY_daily.npz")
+    assert later["n_micro"] == params["n_micro"] == 50
+    assert state.refit_count == 0 and len(state.series) == len(series)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.core import local_divergence
+from engine.graph.embedding import takens_embed
+from engine.graph.graph_builder import normalize_counts, transition_counts
+from engine.graph.labels import _causal_quantile, _median_filter, compute_confidence, label_state, labels_for_series
+from engine.graph.metastable import metastable_regimes
+from engine.graph.microstates import build_microstates
+
+DATA_DIR = ROOT / "data" / "raw" / "finance" / "yfinance_daily"
+TICKERS = ["SPY", "GLD", "BTC-USD"]
+
+
+# Reference loop implementations (pre-kernel versions).
+def _legacy_local_divergence(embedded: np.ndarray, theiler: int = 10) -> tuple[np.ndarray, np.ndarray]:
+    n = embedded.shape[0]
+    stretch = np.zeros(n - 1)
+    frac_pos = np.zeros(n - 1)
+    for i in range(n - 1):
+        k = min(n - 1, i + theiler)
+        d0 = np.linalg.norm(embedded[i] - embedded[k]) + 1e-8
+        d1 = np.linalg.norm(embedded[i + 1] - embedded[min(n - 1, k + 1)]) + 1e-8
+        ell = np.log(d1 / d0)
+        stretch[i] = ell
+        frac_pos[i] = 1.0 if ell > 0 else 0.0
+    return stretch, frac_pos
+
+
+def _legacy_transition_counts(labels: np.ndarray) -> np.ndarray:
+    n = int(labels.max()) + 1
+    counts = np.zeros((n, n), dtype=float)
+    for a, b in zip(labels[:-1], labels[1:]):
+        counts[int(a), int(b)] += 1.0
+    return counts
+
+
+def _legacy_confidence(p_matrix: np.ndarray, micro_regime: np.ndarray, micro_labels: np.ndarray) -> np.ndarray:
+    conf = np.zeros_like(micro_labels, dtype=float)
+    for i, state in enumerate(micro_labels):
+        same = micro_regime == micro_regime[state]
+        conf[i] = p_matrix[state, same].sum()
+    return conf
+
+
+def _legacy_median_filter(values: np.ndarray, window: int) -> np.ndarray:
+    if window <= 1 or len(values) == 0:
+        return values
+    half = window // 2
+    out = np.empty_like(values, dtype=float)
+    for i in range(len(values)):
+        lo = max(0, i - half)
+        hi = min(len(values), i + half + 1)
+        out[i] = float(np.median(values[lo:hi]))
+    return out
+
+
+def _legacy_labels(conf, stretch_mu, frac_pos, quality_score, timeframe="daily"):
+    conf_smoothed = _legacy_median_filter(conf, window=5)
+    escape = 1.0 - conf_smoothed
+    if timeframe == "daily":
+        escape_lo_q, stretch_lo_q, window = 0.50, 0.40, 252
+    else:
+        escape_lo_q, stretch_lo_q, window = 0.45, 0.35, 104
+    min_periods = max(20, window // 8)
+    thr = {
+        "escape_lo": _causal_quantile(escape, escape_lo_q, window, min_periods),
+        "escape_hi": _causal_quantile(escape, 0.80, window, min_periods),
+        "stretch_lo": _causal_quantile(stretch_mu, stretch_lo_q, window, min_periods),
+        "stretch_hi": _causal_quantile(stretch_mu, 0.75, window, min_periods),
+        "frac_hi": _causal_quantile(frac_pos, 0.75, window, min_periods),
+        "conf_lo": _causal_quantile(conf_smoothed, 0.35, window, min_periods),
+    }
+    labels = []
+    for i, (c, s, f) in enumerate(zip(conf_smoothed, stretch_mu, frac_pos)):
+        thr_i = {k: float(v[i]) for k, v in thr.items()}
+        if quality_score < 0.3:
+            labels.append("NOISY")
+        elif float(c) < thr_i["conf_lo"]:
+            labels.append("UNSTABLE" if (1.0 - float(c)) >= thr_i["escape_hi"] else "TRANSITION")
+        else:
+            labels.append(label_state(float(c), float(s), float(1.0 - float(c)), float(f), thr_i))
+    return np.asarray(labels)
+
+
+def _load_prices(ticker: str, n: int = 1500) -> np.ndarray:
+    path = DATA_DIR / f"{ticker}.csv"
+    if not path.exists():
+        pytest.skip(f"missing {path}")
+    return pd.read_csv(path)["price"].to_numpy(dtype=float)[-n:]
+
+
+@pytest.mark.parametrize("ticker", TICKERS)
+def test_kernels_match_loop_reference_on_bundled_prices(ticker: str) -> None:
+    series = _load_prices(ticker)
+    embedding = takens_embed(series, m=3, tau=1)
+    micro_labels, _ = build_microstates(embedding, n_micro=40, seed=7)
+    counts = transition_counts(micro_labels)
+    np.testing.assert_array_equal(counts, _legacy_transition_counts(micro_labels))
+
+    p_matrix = normalize_counts(counts, alpha=2.0)
+    micro_regime = metastable_regimes(p_matrix, n_regimes=4, seed=7)
+    conf = compute_confidence(p_matrix, micro_regime, micro_labels)
+    np.testing.assert_array_equal(conf, _legacy_confidence(p_matrix, micro_regime, micro_labels))
+    np.testing.assert_array_equal(_median_filter(conf, 5), _legacy_median_filter(conf, 5))
+
+    stretch, frac_pos = local_divergence(embedding, theiler=10)
+    ref_stretch, ref_frac = _legacy_local_divergence(embedding, theiler=10)
+    np.testing.assert_array_equal(stretch, ref_stretch)
+    np.testing.assert_array_equal(frac_pos, ref_frac)
+
+    lo, hi = np.quantile(stretch, [0.05, 0.95])
+    stretch_mu = np.pad(np.clip(stretch, lo, hi), (0, 1), mode="edge")
+    frac_mu = np.pad(frac_pos, (0, 1), mode="edge")
+    for timeframe in ("daily", "weekly"):
+        labels, _ = labels_for_series(conf, stretch_mu, frac_mu, quality_score=0.8, timeframe=timeframe)
+        expected = _legacy_labels(conf, stretch_mu, frac_mu, quality_score=0.8, timeframe=timeframe)
+        assert labels.dtype == expected.dtype
+        np.testing.assert_array_equal(labels, expected)
+
+
+def test_kernel_edge_cases_match_reference() -> None:
+    short = np.array([0.3, 0.9, 0.1])
+    np.testing.assert_array_equal(_median_filter(short, 5), _legacy_median_filter(short, 5))
+    labels = np.array([2, 2, 0])
+    np.testing.assert_array_equal(transition_counts(labels), _legacy_transition_counts(labels))
+    noisy, _ = labels_for_series(short, short, short, quality_score=0.1)
+    assert noisy.tolist() == ["NOISY"] * 3
+    assert noisy.dtype == np.asarray(["NOISY"]).dtype
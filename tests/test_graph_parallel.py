@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.parallel import SeriesPanel, run_tasks
+
+_STATE: dict = {}
+
+
+def _init(panel_dir: str) -> None:
+    _STATE["panel"] = SeriesPanel(panel_dir)
+
+
+def _task(key: str, mode: str) -> float:
+    if mode == "raise":
+        raise ValueError(f"bad asset {key}")
+    if mode == "crash":
+        os._exit(3)
+    if mode == "hang":
+        time.sleep(60)
+    if mode == "slow":
+        time.sleep(0.6)
+    return float(np.sum(_STATE["panel"][("daily", key)]))
+
+
+def test_series_panel_round_trip(tmp_path: Path) -> None:
+    series = {("daily", "A"): np.arange(5.0), ("weekly", "A"): np.array([]), ("daily", "B"): np.linspace(0, 1, 7)}
+    panel = SeriesPanel.write(tmp_path / "panel", series)
+    reopened = SeriesPanel(tmp_path / "panel")
+    assert len(reopened) == 3 and ("daily", "C") not in reopened
+    for key, values in series.items():
+        np.testing.assert_array_equal(reopened[key], values)
+        np.testing.assert_array_equal(panel[key], values)
+
+
+def test_run_tasks_isolates_failures_and_keeps_task_order(tmp_path: Path) -> None:
+    names = ["A", "B", "C", "D", "E"]
+    panel_dir = tmp_path / "panel"
+    SeriesPanel.write(panel_dir, {("daily", n): np.full(10, i + 1.0) for i, n in enumerate(names)})
+    modes = ["ok", "raise", "crash", "hang", "ok"]
+    outcomes = run_tasks(
+        _task,
+        list(zip(names, modes)),
+        workers=2,
+        timeout=5.0,
+        initializer=_init,
+        initargs=(str(panel_dir),),
+    )
+    assert [o.index for o in outcomes] == list(range(5))
+    assert [o.status for o in outcomes] == ["ok", "error", "crash", "timeout", "ok"]
+    assert outcomes[0].value == 10.0 and outcomes[4].value == 50.0
+    assert "bad asset B" in outcomes[1].error
+
+    inline = run_tasks(_task, [("A", "ok"), ("B", "raise")], workers=0, initializer=_init, initargs=(str(panel_dir),))
+    assert [o.status for o in inline] == ["ok", "error"] and inline[0].value == 10.0
+
+
+def test_run_tasks_survives_dead_workers_with_nothing_pending(tmp_path: Path) -> None:
+    panel_dir = tmp_path / "panel"
+    SeriesPanel.write(panel_dir, {("daily", n): np.ones(4) for n in "ABC"})
+    # With nothing pending, the crashed worker dies while the other two tasks are still running.
+    outcomes = run_tasks(
+        _task,
+        [("A", "hang"), ("B", "crash"), ("C", "slow")],
+        workers=3,
+        timeout=1.0,
+        initializer=_init,
+        initargs=(str(panel_dir),),
+    )
+    assert [o.status for o in outcomes] == ["timeout", "crash", "ok"]
+    assert outcomes[2].value == 4.0
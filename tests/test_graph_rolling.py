@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.rolling import (
+    cusum_abs,
+    ewma_variance,
+    rolling_autocorr,
+    rolling_mean,
+    rolling_moments,
+    rolling_std,
+)
+
+
+def _series() -> list[np.ndarray]:
+    rng = np.random.default_rng(12)
+    returns = rng.standard_t(4, size=1200) * 0.01
+    prices = 4000.0 + np.cumsum(rng.normal(size=1200))
+    stale = np.r_[np.zeros(90), rng.normal(size=200), np.full(70, 1.5)]
+    gappy = rng.normal(size=600)
+    gappy[[40, 41, 333]] = np.nan
+    return [returns, prices, stale, gappy]
+
+
+def _loop(values: np.ndarray, window: int, fn) -> np.ndarray:
+    out = np.full(values.size, np.nan)
+    for i in range(window - 1, values.size):
+        out[i] = fn(values[i - window + 1 : i + 1])
+    return out
+
+
+def _assert_close(got: np.ndarray, expected: np.ndarray, rtol: float = 1e-9, atol: float = 1e-12) -> None:
+    assert np.array_equal(np.isnan(got), np.isnan(expected))
+    np.testing.assert_allclose(got, expected, rtol=rtol, atol=atol, equal_nan=True)
+
+
+def test_rolling_mean_std_and_moments_match_slice_loops() -> None:
+    for values in _series():
+        for window in (20, 80):
+            _assert_close(rolling_mean(values, window), _loop(values, window, np.mean))
+            _assert_close(rolling_std(values, window), _loop(values, window, np.std))
+            moments = rolling_moments(values, window)
+
+            def skew(seg: np.ndarray) -> float:
+                seg = seg - np.mean(seg)
+                return float(np.mean((seg / (np.std(seg) + 1e-12)) ** 3))
+
+            def kurt(seg: np.ndarray) -> float:
+                seg = seg - np.mean(seg)
+                return float(np.mean((seg / (np.std(seg) + 1e-12)) ** 4))
+
+            _assert_close(moments["skew"], _loop(values, window, skew), rtol=1e-7, atol=1e-9)
+            _assert_close(moments["kurt"], _loop(values, window, kurt), rtol=1e-7, atol=1e-9)
+
+
+def test_rolling_autocorr_matches_pandas() -> None:
+    for values in _series():
+        for lag in (1, 2):
+            expected = _loop(
+                values,
+                60,
+                lambda seg: np.nan if np.std(seg[:-lag]) == 0 or np.std(seg[lag:]) == 0 else np.corrcoef(seg[:-lag], seg[lag:])[0, 1],
+            )
+            _assert_close(rolling_autocorr(values, 60, lag=lag), expected, atol=1e-10)
+    seg = _series()[0][:60]
+    assert np.isclose(rolling_autocorr(seg, 60)[-1], pd.Series(seg).autocorr(lag=1), atol=1e-12)
+
+
+def test_ewma_variance_and_cusum_match_recursions() -> None:
+    returns, prices, stale, gappy = _series()
+    v = np.zeros(returns.size)
+    v[0] = np.var(returns[:30])
+    for i in range(1, returns.size):
+        v[i] = 0.94 * v[i - 1] + 0.06 * returns[i - 1] ** 2
+    np.testing.assert_allclose(ewma_variance(returns, lam=0.94), v, rtol=1e-12)
+
+    for values in (returns, prices, stale, gappy):
+        mu = _loop(values, 80, np.mean)
+        pos = neg = 0.0
+        expected = np.zeros(values.size)
+        for i, x in enumerate(values):
+            m = mu[i] if np.isfinite(mu[i]) else 0.0
+            pos = max(0.0, pos + (x - m))
+            neg = max(0.0, neg - (x - m))
+            expected[i] = pos + neg
+        np.testing.assert_allclose(cusum_abs(values, 80), expected, rtol=1e-9, atol=1e-9)
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.rqa import recurrence_pairs, recurrence_radius, rqa_from_pairs, rqa_metrics, windowed_rqa
+
+
+def _dense_rqa(data: np.ndarray, eps: float) -> dict:
+    R = (cdist(data, data) <= eps).astype(int)
+    np.fill_diagonal(R, 0)
+    total = R.sum()
+    diag = []
+    for k in range(-R.shape[0] + 1, R.shape[0]):
+        run = 0
+        for v in list(np.diag(R, k=k)) + [0]:
+            if v:
+                run += 1
+            elif run:
+                diag.append(run)
+                run = 0
+    vert = []
+    for col in range(R.shape[1]):
+        run = 0
+        for v in list(R[:, col]) + [0]:
+            if v:
+                run += 1
+            elif run:
+                vert.append(run)
+                run = 0
+    diag, vert = np.array(diag), np.array(vert)
+    return {
+        "det": diag[diag >= 2].sum() / total,
+        "lam": vert[vert >= 2].sum() / total,
+        "tt": vert[vert >= 2].mean(),
+        "l_max": diag.max(),
+        "v_max": vert.max(),
+        "rr": total / R.size,
+    }
+
+
+def _embedded(n: int, seed: int = 0) -> np.ndarray:
+    x = np.sin(np.arange(n + 2) * 0.3) + 0.3 * np.random.default_rng(seed).normal(size=n + 2)
+    return np.column_stack([x[2:], x[1:-1], x[:-2]])
+
+
+def test_sparse_rqa_matches_dense_line_counts() -> None:
+    data = _embedded(250)
+    eps = recurrence_radius(data, 0.1)
+    assert np.isclose(eps, np.quantile(cdist(data, data), 0.1), rtol=1e-12)
+    got = rqa_from_pairs(recurrence_pairs(data, eps), data.shape[0])
+    expected = _dense_rqa(data, eps)
+    for key, value in expected.items():
+        assert np.isclose(got[key], value, rtol=1e-12), key
+
+
+def test_windowed_rqa_matches_per_window_metrics() -> None:
+    data = _embedded(300, seed=3)
+    eps = recurrence_radius(data, 0.1)
+    ends, rolling = windowed_rqa(data, window=80, step=37, eps=eps)
+    assert ends.tolist() == list(range(80, 301, 37))
+    for w, end in enumerate(ends):
+        single = rqa_metrics(data[end - 80 : end], max_points=None, eps=eps)
+        for key, series in rolling.items():
+            assert np.isclose(series[w], single[key], rtol=1e-12), key
+
+
+def test_sampled_radius_for_large_inputs() -> None:
+    data = _embedded(1500, seed=5)
+    exact = recurrence_radius(data, 0.1)
+    sampled = recurrence_radius(data, 0.1, max_pairs=10_000)
+    assert abs(sampled - exact) / exact < 0.02
+    out = rqa_metrics(data, max_points=None)
+    assert 0.09 < out["rr"] < 0.11 and 0.0 <= out["det"] <= 1.0
+    assert np.isnan(rqa_metrics(data[:5])["det"])
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.core import run_graph_engine
+from engine.graph.graph_builder import normalize_counts, transition_counts
+from engine.graph.labels import _entropy_rate, _stationary_distribution, compute_confidence, compute_graph_quality
+from engine.graph.metastable import metastable_regimes
+from engine.graph.sparse_backend import SmoothedTransitionMatrix, transition_counts_sparse
+
+
+def _block_chain(n_blocks: int = 3, block: int = 40, steps: int = 6000, seed: int = 3) -> np.ndarray:
+    # Random walk that mostly stays inside its block of microstates.
+    rng = np.random.default_rng(seed)
+    labels = np.empty(steps, dtype=int)
+    cur = 0
+    for t in range(steps):
+        b = cur // block
+        if rng.random() < 0.01:
+            b = int(rng.integers(n_blocks))
+        cur = b * block + int(rng.integers(block))
+        labels[t] = cur
+    return labels
+
+
+def test_sparse_matrix_matches_dense_smoothing_and_quality() -> None:
+    labels = _block_chain()
+    dense = normalize_counts(transition_counts(labels), alpha=2.0)
+    lazy = normalize_counts(transition_counts_sparse(labels), alpha=2.0)
+    assert isinstance(lazy, SmoothedTransitionMatrix)
+    np.testing.assert_allclose(lazy.toarray(), dense)
+    np.testing.assert_allclose(np.asarray(lazy), dense)
+
+    x = np.random.default_rng(0).random(dense.shape[0])
+    np.testing.assert_allclose(lazy.matvec(x), dense @ x)
+    np.testing.assert_allclose(lazy.rmatvec(x), x @ dense)
+
+    pi_dense = _stationary_distribution(dense)
+    pi_lazy = lazy.stationary_distribution()
+    np.testing.assert_allclose(pi_lazy, pi_dense, atol=1e-8)
+    assert lazy.entropy_rate(pi_lazy) == pytest.approx(_entropy_rate(dense, pi_dense), rel=1e-8)
+
+    regimes = np.arange(dense.shape[0]) // 40
+    np.testing.assert_allclose(compute_confidence(lazy, regimes, labels), compute_confidence(dense, regimes, labels))
+
+    n = dense.shape[0]
+    edges = [(i, (i + 1) % n) for i in range(n)]
+    occupancy = np.bincount(labels, minlength=n).astype(float)
+    q_dense = compute_graph_quality(n, edges, occupancy, dense, {})
+    q_lazy = compute_graph_quality(n, edges, occupancy, lazy, {})
+    for key, value in q_dense.items():
+        assert q_lazy[key] == pytest.approx(value, rel=1e-6)
+
+
+@pytest.mark.parametrize("method", ["spectral", "pcca"])
+def test_sparse_metastable_regimes_recover_blocks(method: str) -> None:
+    labels = _block_chain()
+    lazy = normalize_counts(transition_counts_sparse(labels), alpha=0.01)
+    regimes = metastable_regimes(lazy, n_regimes=3, seed=7, method=method)
+    assert regimes.shape == (120,)
+    blocks = np.arange(120) // 40
+    for b in range(3):
+        assert np.unique(regimes[blocks == b]).size == 1
+    assert np.unique(regimes).size == 3
+
+
+def test_run_graph_engine_sparse_backend() -> None:
+    x = np.linspace(0, 12 * np.pi, 400)
+    series = np.sin(x) + 0.05 * np.random.default_rng(9).normal(size=x.size)
+    result = run_graph_engine(series, n_micro=80, n_regimes=3, k_nn=3, theiler=3, use_multilayer=False, transition_backend="sparse")
+    n = result.embedding.shape[0]
+    assert isinstance(result.p_matrix, SmoothedTransitionMatrix)
+    assert result.p_matrix.shape == (80, 80)
+    assert result.confidence.shape == (n,)
+    assert result.state_labels.shape == (n,)
+    assert 0.0 <= result.quality["score"] <= 1.0
+
+
+def test_sparse_entropies_match_dense_laplacian() -> None:
+    labels = _block_chain(n_blocks=4, block=150, steps=20000)
+    lazy = normalize_counts(transition_counts_sparse(labels), alpha=0.05)
+    dense = lazy.toarray()
+    logp = np.where(dense > 0, np.log(dense), 0.0)
+    np.testing.assert_allclose(lazy.row_entropy(), -np.sum(dense * logp, axis=1), rtol=1e-10)
+
+    a = 0.5 * (dense + dense.T)
+    lap = np.diag(a.sum(axis=1)) - a
+    eig = np.linalg.eigvalsh(lap / np.trace(lap))
+    eig = eig[eig > 1e-12]
+    exact = float(-np.sum(eig * np.log(eig)))
+    assert lazy.von_neumann_entropy() == pytest.approx(exact, rel=0.01)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.graph.streaming import RunningMedianMAD, WarmStartGMM1D, robust_z_online
+
+
+def _prefix_loop(values: np.ndarray, min_points: int = 25, eps: float = 1e-9) -> np.ndarray:
+    # Reference: full median/MAD of the finite prefix at every index.
+    out = np.full(values.shape, np.nan, dtype=float)
+    for i in range(values.size):
+        x = values[: i + 1]
+        x = x[np.isfinite(x)]
+        if x.size < min_points:
+            continue
+        med = float(np.median(x))
+        mad = float(np.median(np.abs(x - med)))
+        out[i] = (values[i] - med) / (1.4826 * mad + eps)
+    return out
+
+
+def test_robust_z_online_matches_prefix_loop_exactly() -> None:
+    rng = np.random.default_rng(5)
+    cases = [
+        rng.normal(size=400),
+        rng.integers(0, 4, size=300).astype(float),
+        np.round(rng.standard_t(2, size=350), 2),
+        np.cumsum(rng.normal(size=500)),
+        np.array([], dtype=float),
+    ]
+    gappy = rng.normal(size=300)
+    gappy[rng.random(300) < 0.2] = np.nan
+    gappy[7] = np.inf
+    cases.append(gappy)
+    for values in cases:
+        for min_points in (1, 10, 25):
+            expected = _prefix_loop(values, min_points=min_points)
+            got = robust_z_online(values, min_points=min_points)
+            assert np.array_equal(expected, got, equal_nan=True)
+
+
+def test_running_median_mad_streams_one_value_at_a_time() -> None:
+    stats = RunningMedianMAD()
+    assert np.isnan(stats.median()) and np.isnan(stats.mad())
+    seen: list[float] = []
+    for v in [3.0, np.nan, 1.0, 7.0, 7.0, -2.0, 0.5]:
+        stats.push(v)
+        if np.isfinite(v):
+            seen.append(v)
+        med = float(np.median(seen))
+        assert stats.median() == med
+        assert stats.mad() == float(np.median(np.abs(np.asarray(seen) - med)))
+    assert len(stats) == 6
+
+
+def test_warm_start_gmm_em_matches_sklearn_from_same_init() -> None:
+    mixture = pytest.importorskip("sklearn.mixture")
+    rng = np.random.default_rng(9)
+    x = np.concatenate([rng.normal(-1.0, 0.3, 80), rng.normal(1.5, 0.6, 40)])
+    labels = (x > 0.2).astype(int)
+    resp = np.eye(2)[labels]
+
+    gmm = WarmStartGMM1D(em_iters=100)
+    gmm.m_step(x, resp)
+    gmm.fit(x)
+
+    means = np.array([x[labels == k].mean() for k in range(2)])
+    ref = mixture.GaussianMixture(2, means_init=means[:, None], random_state=0).fit(x[:, None])
+    assert np.allclose(np.sort(gmm.means), np.sort(ref.means_.ravel()), atol=1e-6)
+    assert np.allclose(np.sort(gmm.weights), np.sort(ref.weights_), atol=1e-6)
+
+    shifted = x + 0.05
+    gmm.fit(shifted)
+    assert np.allclose(np.sort(gmm.means), np.sort(ref.means_.ravel()) + 0.05, atol=0.05)
+    assert np.allclose(gmm.predict_proba(shifted).sum(axis=1), 1.0)
@@ -15,6 +15,7 @@ from scripts.lab.run_corr_macro_offline import (
     _build_era_evaluation,
     _build_operational_alerts,
     _build_ui_view_model,
+    _null_baselines,
 )
 
 
@@ -173,3 +174,13 @@ def test_ui_view_model_has_stable_contract_keys() -> None:
     assert vm["playbook_latest"]["action_code"] == "DEFENSIVE_REBALANCE"
     assert isinstance(vm["case_preview"], list)
     assert isinstance(vm["era_summary"], list)
+
+
+def test_replicate_pvalues_need_enough_replicates() -> None:
+    rng = np.random.default_rng(4)
+    x = 0.01 * (0.8 * rng.standard_normal((80, 1)) + rng.standard_normal((80, 15)))
+    kw = dict(lambda1=5.0, p1=5.0 / 15, null_model="resample", bootstrap_block=10, key=(1, 60, 79))
+    few = _null_baselines(x, n_replicates=5, **kw)
+    assert np.isfinite(few["p1_shuffle"]) and np.isnan(few["p1_pvalue_shuffle"]) and np.isnan(few["p1_pvalue_bootstrap"])
+    many = _null_baselines(x, n_replicates=25, **kw)
+    assert 0.0 < many["p1_pvalue_shuffle"] < 0.05 and 0.0 < many["p1_pvalue_bootstrap"] < 0.05
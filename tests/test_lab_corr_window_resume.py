@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.lab.run_corr_macro_offline import _WindowRun
+
+PARAMS = dict(
+    window=60,
+    cov_window=0.95,
+    min_assets=10,
+    noise_step=3,
+    bootstrap_block=10,
+    overlap_step=2,
+    seed=7,
+    null_model="resample",
+    null_replicates=2,
+)
+
+
+def _panel(n_days: int = 170, n_assets: int = 30) -> tuple[pd.DataFrame, dict[str, str]]:
+    rng = np.random.default_rng(3)
+    sectors = rng.integers(0, 4, n_assets)
+    x = 0.01 * (0.7 * rng.standard_normal((n_days, 1)) + 0.5 * rng.standard_normal((n_days, 4))[:, sectors])
+    x += 0.01 * rng.standard_normal((n_days, n_assets))
+    x[:90, 3] = np.nan  # joins mid-sample
+    x[rng.random(n_days) < 0.03, 8] = np.nan  # scattered gaps
+    tickers = [f"T{j:02d}" for j in range(n_assets)]
+    df = pd.DataFrame(x, index=pd.bdate_range("2021-01-04", periods=n_days), columns=tickers)
+    return df, {t: f"S{s}" for t, s in zip(tickers, sectors)}
+
+
+def _assert_same(a: tuple[pd.DataFrame, ...], b: tuple[pd.DataFrame, ...]) -> None:
+    for x, y in zip(a, b):
+        pd.testing.assert_frame_equal(x.reset_index(drop=True), y.reset_index(drop=True))
+
+
+def test_resumed_window_matches_full_run(tmp_path: Path) -> None:
+    R, sectors = _panel()
+    full = _WindowRun(R, sectors, **PARAMS).run().frames()
+    assert not full[1].empty and full[2]["count"].sum() > 0
+    month_ends = np.flatnonzero(R.index.month[1:] != R.index.month[:-1])
+    # Cut mid-month (provisional month-end snapshot must go) and on a month end (it must stay).
+    for cut in (100, int(month_ends[-1]) + 1):
+        state = tmp_path / f"cut{cut}"
+        _WindowRun(R.iloc[:cut], sectors, **PARAMS).run().save(state)
+        resumed = _WindowRun.load(state, R, sectors, **PARAMS)
+        assert resumed.resumed_rows == cut - PARAMS["window"] + 1
+        resumed.run()
+        assert len(resumed.rows) == len(R) - cut
+        _assert_same(resumed.frames(), full)
+        resumed.save(state)
+        again = _WindowRun.load(state, R, sectors, **PARAMS).run()
+        assert again.rows == []
+        _assert_same(again.frames(), full)
+
+
+def test_checkpoint_is_ignored_when_history_or_params_change(tmp_path: Path) -> None:
+    R, sectors = _panel()
+    _WindowRun(R.iloc[:120], sectors, **PARAMS).run().save(tmp_path)
+    revised = R.copy()
+    revised.iloc[50, 5] += 0.001
+    assert _WindowRun.load(tmp_path, revised, sectors, **PARAMS).resumed_rows == 0
+    assert _WindowRun.load(tmp_path, R, sectors, **{**PARAMS, "seed": 8}).resumed_rows == 0
+    assert _WindowRun.load(tmp_path, R, {**sectors, "T00": "other"}, **PARAMS).resumed_rows == 0
+    assert _WindowRun.load(tmp_path, R, sectors, **PARAMS).resumed_rows > 0
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.marketdata.catalog import DataCatalog
+from scripts.finance.yf_fetch_or_load import find_local_data
+
+
+def _csv(path: Path, rows: int, start: int = 1) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    body = "".join(f"2020-01-{d:02d},{100 + d}\n" for d in range(start, start + rows))
+    path.write_text("date,price\n" + body, encoding="utf-8")
+
+
+def _tree(base: Path) -> None:
+    _csv(base / "data" / "raw" / "SPY.csv", 5)
+    _csv(base / "data" / "clean" / "spy_cleaned.csv", 3)
+    _csv(base / "data" / "QQQ.csv", 4, start=3)
+    _csv(base / "results" / "SPY.csv", 2)
+    _csv(base / "deep" / "venv" / "lib" / "QQQ.csv", 2)
+    (base / "data" / "notes.txt").write_text("x", encoding="utf-8")
+
+
+def test_catalog_matches_directory_walk(tmp_path: Path) -> None:
+    _tree(tmp_path)
+    catalog = DataCatalog(tmp_path, path=tmp_path / "cat.json")
+    stats = catalog.refresh()
+    assert stats["files"] == 3
+    for ticker in ("SPY", "spy", "QQQ", "IWM"):
+        assert catalog.lookup(ticker) == find_local_data(ticker, tmp_path, use_catalog=False)
+    meta = catalog.describe(tmp_path / "data" / "QQQ.csv")
+    assert meta["columns"] == ["date", "price"] and meta["rows"] == 4
+    assert (meta["first"], meta["last"]) == ("2020-01-03", "2020-01-06")
+    assert meta["sha256"] == hashlib.sha256((tmp_path / "data" / "QQQ.csv").read_bytes()).hexdigest()
+
+
+def test_catalog_refresh_is_incremental_and_persistent(tmp_path: Path) -> None:
+    cat_path = tmp_path / "cat.json"
+    tmp_path = tmp_path / "repo"
+    _tree(tmp_path)
+    catalog = DataCatalog(tmp_path, path=cat_path)
+    catalog.refresh()
+    catalog.save()
+
+    reopened = DataCatalog(tmp_path, path=cat_path)
+    stats = reopened.refresh()
+    assert stats["dirs_listed"] == 0 and stats["files_read"] == 0
+    assert reopened.lookup("SPY") == catalog.lookup("SPY")
+
+    _csv(tmp_path / "data" / "raw" / "IWM.csv", 2)
+    _csv(tmp_path / "data" / "QQQ.csv", 9)
+    os.remove(tmp_path / "data" / "clean" / "spy_cleaned.csv")
+    stats = reopened.refresh()
+    assert stats["files_read"] == 2 and stats["dirs_listed"] == 2
+    assert reopened.lookup("IWM") == [tmp_path / "data" / "raw" / "IWM.csv"]
+    assert reopened.describe(tmp_path / "data" / "QQQ.csv")["rows"] == 9
+    for ticker in ("SPY", "QQQ", "IWM"):
+        assert reopened.lookup(ticker) == find_local_data(ticker, tmp_path, use_catalog=False)
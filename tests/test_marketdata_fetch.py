@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.marketdata import FetchPolicy, HTTPProvider, LocalPriceServer, build_store, fetch_updates, read_price_csv
+
+
+def _write_prices(path: Path, dates: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    price = np.round(100.0 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, size=dates.size))), 2)
+    log_price = np.log(price)
+    df = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "price": price, "log_price": log_price, "r": np.r_[0.0, np.diff(log_price)]})
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+class _Recording(HTTPProvider):
+    def __init__(self, base_url: str) -> None:
+        super().__init__(base_url)
+        self.calls: list[tuple[str, date | None]] = []
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((ticker, start))
+        return super().fetch(ticker, start, end)
+
+
+def test_fetch_appends_deltas_to_store_and_csv_mirror(tmp_path: Path) -> None:
+    remote, local = tmp_path / "remote", tmp_path / "local"
+    remote.mkdir()
+    local.mkdir()
+    full = {
+        "AAA": _write_prices(remote / "AAA.csv", pd.bdate_range("2021-01-01", "2021-12-31"), 1),
+        "BBB": _write_prices(remote / "BBB.csv", pd.bdate_range("2021-03-01", "2021-12-31"), 2),
+        "NEW": _write_prices(remote / "NEW.csv", pd.bdate_range("2021-06-01", "2021-12-31"), 3),
+    }
+    for ticker in ("AAA", "BBB"):
+        full[ticker].iloc[:-20].to_csv(local / f"{ticker}.csv", index=False)
+    store = build_store(local, tmp_path / "store" / "local")
+    sleeps: list[float] = []
+    with LocalPriceServer(remote, fail_first=1) as server:
+        provider = _Recording(server.url)
+        manifest = fetch_updates(
+            store,
+            ["AAA", "BBB", "NEW", "MISSING"],
+            provider,
+            policy=FetchPolicy(workers=2, retries=2, history_start="2021-01-01"),
+            csv_dir=local,
+            manifest_dir=tmp_path / "runs",
+            today=date(2022, 1, 1),
+            sleep=sleeps.append,
+        )
+        status = {r["ticker"]: r for r in manifest["results"]}
+        assert {t: r["status"] for t, r in status.items()} == {"AAA": "appended", "BBB": "appended", "NEW": "added", "MISSING": "no_data"}
+        assert status["AAA"]["new_rows"] == 20 and status["NEW"]["new_rows"] == len(full["NEW"])
+        assert all(r["attempts"] == 2 for r in status.values()) and len(sleeps) == 4
+        # Only the missing tail is requested for tickers the store already holds.
+        first_ask = {t: s for t, s in reversed(provider.calls)}
+        assert first_ask["AAA"] == date.fromisoformat(full["AAA"]["date"].iloc[-21]) + pd.Timedelta(days=1)
+        assert first_ask["NEW"] == date(2021, 1, 1)
+
+        again = fetch_updates(store, ["AAA", "NEW"], HTTPProvider(server.url), csv_dir=local, manifest_dir=tmp_path / "runs", today=date(2022, 1, 1))
+        assert again["counts"] == {"up_to_date": 2}
+    saved = [json.loads(p.read_text(encoding="utf-8")) for p in (tmp_path / "runs").glob("fetch_*.json")]
+    assert any(doc["counts"] == manifest["counts"] and doc["new_rows"] == manifest["new_rows"] for doc in saved)
+
+    for ticker in ("AAA", "BBB", "NEW"):
+        path = local / f"{ticker}.csv"
+        on_disk = pd.read_csv(path)
+        assert store.is_current(ticker, path)
+        got = read_price_csv(path, store_root=tmp_path / "store")
+        assert got["date"].dtype.kind == "M"  # served from the store
+        np.testing.assert_array_equal(got["price"].to_numpy(), on_disk["price"].to_numpy())
+        np.testing.assert_array_equal(got["r"].to_numpy(), on_disk["r"].to_numpy())
+        np.testing.assert_array_equal(on_disk["price"].to_numpy(), full[ticker]["price"].to_numpy())
+        np.testing.assert_allclose(on_disk["r"].to_numpy()[1:], full[ticker]["r"].to_numpy()[1:], atol=1e-12)
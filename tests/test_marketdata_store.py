@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.marketdata import PriceStore, build_store, read_price_csv
+
+
+def _write_prices(path: Path, dates: pd.DatetimeIndex, seed: int) -> pd.DataFrame:
+    price = np.round(100.0 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, size=dates.size))), 2)
+    log_price = np.log(price)
+    df = pd.DataFrame({"date": dates.strftime("%Y-%m-%d"), "price": price, "log_price": log_price, "r": np.r_[0.0, np.diff(log_price)]})
+    df.to_csv(path, index=False)
+    return pd.read_csv(path)
+
+
+def _assert_same(got: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert (got["date"].to_numpy() == pd.to_datetime(expected["date"]).to_numpy()).all()
+    for field in ("price", "log_price", "r"):
+        np.testing.assert_array_equal(got[field].to_numpy(), expected[field].to_numpy())
+
+
+def test_store_reads_match_csv_and_weekly_resample(tmp_path: Path) -> None:
+    src = tmp_path / "prices"
+    src.mkdir()
+    frames = {
+        "AAA": _write_prices(src / "AAA.csv", pd.bdate_range("2020-01-01", "2021-06-30"), 1),
+        "BBB": _write_prices(src / "BBB.csv", pd.bdate_range("2020-07-15", "2021-03-01"), 2),
+    }
+    store = build_store(src, tmp_path / "store" / "prices")
+    for ticker, df in frames.items():
+        _assert_same(store.get(ticker), df)
+        _assert_same(read_price_csv(src / f"{ticker}.csv", store_root=tmp_path / "store"), df)
+        daily = df.assign(date=pd.to_datetime(df["date"])).set_index("date")
+        weekly = daily.resample("W").last().dropna()
+        _assert_same(store.get(ticker, freq="W"), weekly.reset_index())
+        part = daily.loc["2020-09-02":"2020-12-16"].resample("W").last().dropna()
+        _assert_same(store.get(ticker, start="2020-09-02", end="2020-12-16", freq="W"), part.reset_index())
+    assert store.date_range("BBB") == ("2020-07-15", "2021-03-01")
+
+
+def test_refresh_appends_in_place_and_rewrites_on_insertions(tmp_path: Path) -> None:
+    src = tmp_path / "prices"
+    src.mkdir()
+    dates = pd.bdate_range("2020-01-01", "2020-12-31")
+    full = _write_prices(src / "AAA.csv", dates, 3)
+    full.iloc[:-20].to_csv(src / "AAA.csv", index=False)
+    store = build_store(src, tmp_path / "store" / "prices")
+    assert store.refresh()["unchanged"] == ["AAA"]
+
+    full.to_csv(src / "AAA.csv", index=False)
+    new = _write_prices(src / "NEW.csv", dates[-50:], 4)
+    report = store.refresh()
+    assert report["appended"] == ["AAA"] and report["added"] == ["NEW"]
+    assert store.manifest["generation"] == 0
+    reopened = PriceStore(tmp_path / "store" / "prices")
+    _assert_same(reopened.get("AAA"), full)
+    _assert_same(reopened.get("NEW"), new)
+
+    assert store.append("NEW", pd.to_datetime(["2021-01-04", "2020-06-01"]), [101.0, 1.0]) == 1
+    tail = store.get("NEW").iloc[-1]
+    assert tail["price"] == 101.0 and np.isclose(tail["r"], np.log(101.0) - new["log_price"].iloc[-1])
+
+    thinned = full.iloc[::2]
+    thinned.to_csv(src / "AAA.csv", index=False)
+    extra = pd.concat([full.iloc[:5], full.iloc[5:]]).assign(date=lambda d: pd.to_datetime(d["date"]) + pd.Timedelta(days=1))
+    extra.to_csv(src / "SAT.csv", index=False)
+    report = store.refresh()
+    assert sorted(report["rewritten"]) == ["AAA", "SAT"] and store.manifest["generation"] == 1
+    _assert_same(store.get("AAA"), thinned)
+    _assert_same(store.get("NEW").iloc[:-1], new)
@@ -4,12 +4,21 @@ import sys
 from pathlib import Path
 
 import numpy as np
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from engine.graph.multilayer import run_multilayer_engine
+from engine.graph.multilayer import (
+    MultilayerConfig,
+    _hmm_auditor,
+    _hmm_auditor_online,
+    _robust_z_online,
+    _subspace_metrics,
+    _subspace_metrics_batch,
+    run_multilayer_engine,
+)
 
 
 def test_multilayer_engine_smoke() -> None:
@@ -25,3 +34,56 @@ def test_multilayer_engine_smoke() -> None:
         assert 0.0 <= float(out["decision"]["confidence"]) <= 1.0
         assert isinstance(out["decision"]["alert_triggered"], bool)
         assert "eigen_persist_ok" in out["layers"]["layer4"]
+
+
+def test_subspace_tracker_matches_per_window_svd() -> None:
+    rng = np.random.default_rng(3)
+    returns = np.concatenate([rng.normal(0, 0.01, 700), 0.02 * np.sin(np.arange(700) / 3.0) + rng.normal(0, 0.004, 700)])
+    w_ref, w_cur = 180, 120
+    for l_ref, l_cur in ((9, 9), (18, 18)):
+        ends = np.arange(w_ref + w_cur - 1, returns.size)
+        got = _subspace_metrics_batch(returns, ends, w_ref, w_cur, l_ref, l_cur, refresh=64)
+        for j in range(0, ends.size, 37):
+            t = int(ends[j])
+            ref = _subspace_metrics(returns[t - w_ref - w_cur + 1 : t - w_cur + 1], returns[t - w_cur + 1 : t + 1], l_ref, l_cur)
+            for key, val in ref.items():
+                assert abs(got[key][j] - val) < 1e-8, (key, t)
+
+
+def test_multilayer_engine_every_bar_subspace() -> None:
+    rng = np.random.default_rng(4)
+    series = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, size=900)))
+    out = run_multilayer_engine(series, timeframe="daily", m_hint=3, tau_hint=1, cfg=MultilayerConfig(subspace_every_bar=True))
+    assert out["status"] == "ok"
+    assert out["layers"]["layer3"]["d_proj_last"] is not None
+    assert out["layers"]["layer2"]["rank_cur_last"] is not None
+
+
+def test_online_hmm_auditor_every_bar() -> None:
+    rng = np.random.default_rng(6)
+    returns = np.concatenate([rng.normal(0, 0.005, 300), rng.normal(0, 0.03, 300)])
+    for suff in (False, True):
+        out = _hmm_auditor_online(returns, window=120, step=1, sufficient_stats=suff)
+        assert np.all(np.isnan(out[:119]))
+        assert np.all(np.isfinite(out[119:]))
+        assert np.all(out[119:] >= 0.0)
+    series = 100.0 * np.exp(np.cumsum(returns))
+    res = run_multilayer_engine(series, m_hint=3, tau_hint=1, cfg=MultilayerConfig(hmm_mode="online", hmm_step=1))
+    assert res["status"] == "ok"
+    assert np.isfinite(res["layers"]["layer4"]["hmm_z_last"])
+
+
+def test_online_hmm_auditor_tracks_refit_across_regimes() -> None:
+    pytest.importorskip("sklearn")
+    rng = np.random.default_rng(1)
+    returns = np.concatenate([rng.standard_t(4, 250) * (0.005, 0.02)[k % 2] for k in range(6)])
+    ref = _hmm_auditor(returns, window=120, step=5)
+    z_ref = _robust_z_online(ref)
+    for suff in (False, True):
+        out = _hmm_auditor_online(returns, window=120, step=5, sufficient_stats=suff)
+        mask = np.isfinite(ref)
+        assert np.all(np.isfinite(out[mask]))
+        assert np.corrcoef(ref[mask], out[mask])[0, 1] > 0.6
+        z_out = _robust_z_online(out)
+        zmask = np.isfinite(z_ref) & np.isfinite(z_out)
+        assert np.mean((z_ref[zmask] > 1.8) == (z_out[zmask] > 1.8)) > 0.85
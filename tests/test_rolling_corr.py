@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from engine.diagnostics.rolling_corr import RollingCorrelation
+
+
+def _panel(seed: int = 0, n_days: int = 400, n_assets: int = 30) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    factor = rng.standard_normal((n_days, 1))
+    x = 0.01 * (0.6 * factor + rng.standard_normal((n_days, n_assets))) + 5e-4
+    x[rng.random(x.shape) < 0.004] = np.nan
+    x[:120, 2] = np.nan  # enters coverage late
+    x[260:, 3] = np.nan  # leaves coverage
+    x[200:215, 4] = np.nan  # temporary gap
+    x[:, 5] = 0.0  # constant
+    x[150, 6] = np.inf
+    return x
+
+
+def _reference(x: np.ndarray, end: int, window: int, min_coverage: float):
+    """Per-date recipe the rolling engine replaces: coverage filter, listwise dropna, corrcoef."""
+    block = pd.DataFrame(x).iloc[end - window + 1 : end + 1]
+    cov = block.notna().mean(axis=0)
+    aligned = block[cov[cov >= min_coverage].index.to_list()].dropna(how="any")
+    with np.errstate(invalid="ignore"):  # columns holding inf have an undefined std
+        std = np.nanstd(aligned.to_numpy(), axis=0)
+    return aligned, std
+
+
+def test_rolling_corr_matches_full_recompute_per_date():
+    x = _panel()
+    for window in (40, 120):
+        roll = RollingCorrelation(x, window=window, min_coverage=0.98)
+        for end in range(window - 1, x.shape[0]):
+            roll.update(end)
+            aligned, std = _reference(x, end, window, 0.98)
+            assert roll.columns.tolist() == aligned.columns.tolist()
+            assert roll.n_obs == aligned.shape[0]
+            with np.errstate(invalid="ignore"):
+                keep = std > 1e-12
+                assert np.array_equal(roll.std() > 1e-12, keep)
+            if keep.sum() < 2 or aligned.shape[0] < 3:
+                continue
+            expected = np.corrcoef(aligned.to_numpy()[:, keep], rowvar=False)
+            np.testing.assert_allclose(roll.corr(roll.columns[keep]), expected, atol=1e-12)
+            np.testing.assert_array_equal(roll.data(roll.columns[keep]), aligned.to_numpy()[:, keep])
+
+
+def test_rolling_corr_jumps_and_refresh_agree_with_sequential_updates():
+    x = _panel(seed=3)
+    seq = RollingCorrelation(x, window=60, min_coverage=0.95, refresh_every=10_000)
+    for end in range(59, 300):
+        seq.update(end)
+    jump = RollingCorrelation(x, window=60, min_coverage=0.95).update(299)
+    assert seq.columns.tolist() == jump.columns.tolist()
+    assert seq.n_obs == jump.n_obs
+    cols = seq.columns[seq.std() > 1e-12]
+    np.testing.assert_allclose(seq.corr(cols), jump.corr(cols), atol=1e-12)
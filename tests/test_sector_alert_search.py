@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.bench import event_study_validate_sectors as es
+from scripts.bench import hyper_simulate_sector_alerts as hs
+
+
+def _study(seed: int = 0) -> es.SectorStudyInputs:
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2018-01-01", "2022-12-30")
+    frames = []
+    for k, sector in enumerate(["energy", "tech", "utilities"]):
+        stress = np.clip(np.convolve(rng.random(dates.size) < 0.02, np.ones(15), mode="same"), 0, 1)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "sector": sector,
+                    "n_assets": 12 if k < 2 else 4,
+                    "share_transition": np.clip(0.3 * stress + rng.uniform(0, 0.4, dates.size), 0, 1),
+                    "share_unstable": np.clip(0.4 * stress + rng.uniform(0, 0.3, dates.size), 0, 1),
+                    "mean_confidence": rng.uniform(0.3, 0.8, dates.size),
+                }
+            )
+        )
+    df = pd.concat(frames, ignore_index=True)
+    df["sector_score"] = 0.6 * df["share_transition"] + df["share_unstable"] + 0.4 * (1 - df["mean_confidence"])
+    pick = lambda lo, hi, n: [pd.Timestamp(d) for d in sorted(rng.choice(dates[(dates >= lo) & (dates <= hi)], n, replace=False))]  # noqa: E731
+    events = {"drawdown20": pick("2020-01-01", "2022-12-30", 12), "ret_tail": pick("2020-01-01", "2022-12-30", 8)}
+    events_cal = {"drawdown20": pick("2018-01-01", "2019-12-31", 8), "ret_tail": pick("2018-01-01", "2019-12-31", 6), "stress_combo": []}
+    return es.SectorStudyInputs(df=df, ret_q01=-0.03, vol_q95=0.3, events=events, events_cal=events_cal)
+
+
+def _engine(study: es.SectorStudyInputs, two_layer_mode: str = "on") -> hs.SectorSearchEngine:
+    return hs.SectorSearchEngine(
+        study,
+        calibration_end=pd.Timestamp("2019-12-31"),
+        test_start=pd.Timestamp("2020-01-01"),
+        test_end=None,
+        min_sector_assets=10,
+        min_cal_days=252,
+        min_test_days=252,
+        lookbacks=[1, 5, 10, 20],
+        two_layer_mode=two_layer_mode,
+    )
+
+
+def test_inprocess_rows_match_validator_functions() -> None:
+    study = _study()
+    rng = random.Random(5)
+    cfgs = [hs._sample_candidate(rng) for _ in range(12)]
+    cfgs[0].policy, cfgs[1].policy = "regime_auto", "score_q80"
+    for mode in ("on", "off"):
+        engine = _engine(study, mode)
+        assert [s.name for s in engine.sectors] == ["energy", "tech"]
+        for cfg in cfgs:
+            params = hs.validator_params(cfg)
+            got = pd.DataFrame(engine.motor_rows(cfg, n_random=40))
+            for s in engine.sectors:
+                cal, test = es.split_sector_frames(study.df, s.name, pd.Timestamp("2019-12-31"), pd.Timestamp("2020-01-01"), None)
+                policy = cfg.policy
+                if policy == "regime_auto":
+                    policy, _ = es.choose_auto_policy_for_sector(cal, study.events_cal, params, es.DEFAULT_AUTO_CANDIDATES.split(","))
+                layered, _ = es.build_layered_alerts_for_sector(cal, test, policy, params)
+                motor = layered["confirmed_alert" if mode == "on" else "fast_alert"].astype(bool)
+                np.testing.assert_array_equal(engine.motor_alert(s, cfg.policy, params), motor.to_numpy())
+                for L in (5, 10):
+                    ev = es.evaluate_alerts(test["date"], motor, study.events["drawdown20"], lookback_days=L)
+                    rnd = es.random_baseline_distribution(
+                        test["date"], int(es._entry_alert(motor).sum()), study.events["drawdown20"], L,
+                        n_boot=40, seed=170 + L, method="block", block_size=cfg.block_size,
+                    )
+                    row = got[(got["sector"] == s.name) & (got["event_def"] == "drawdown20") & (got["lookback_days"] == L)].iloc[0]
+                    assert row["recall"] == ev.recall and row["n_alert_episodes"] == ev.n_alert_episodes
+                    np.testing.assert_allclose(row["false_alarm_per_year"], ev.false_alarm_per_year)
+                    assert row["p_vs_random_recall_block"] == float((rnd["recall"] >= ev.recall).mean())
+
+
+def test_parallel_batches_and_halving_rungs() -> None:
+    engine = _engine(_study(1))
+    cfgs = [hs._sample_candidate(random.Random(k)) for k in range(3)]
+    inline = hs.evaluate_candidates(engine, cfgs, n_random=20)
+    pooled = hs.evaluate_candidates(engine, cfgs, n_random=20, workers=2)
+    assert [pd.DataFrame(r).equals(pd.DataFrame(p)) for r, p in zip(inline, pooled)] == [True] * 3
+    partial = hs.evaluate_candidates(engine, cfgs[:1], n_random=20, sector_ids=[1])[0]
+    assert {r["sector"] for r in partial} == {"tech"}
+    assert hs.halving_fractions(3, 1 / 9) == [1 / 9, 1 / 3, 1.0]
+    assert hs.halving_fractions(0, 0.25) == [1.0]